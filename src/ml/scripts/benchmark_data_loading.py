@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+from src.utils.benchmarking import generate_transaction_extract
+from src.utils.column_types import apply_date_types, clear_format_cache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def legacy_date_typing(df: pd.DataFrame) -> pd.DataFrame:
+    """The date detection preprocess_data used before column types were declared, for comparison"""
+    object_columns = df.select_dtypes(include=['object'])
+    date_columns = object_columns.columns[object_columns.apply(lambda x: pd.to_datetime(x, errors='coerce').notnull().all())]
+    for col in date_columns:
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+def schema_date_typing(df: pd.DataFrame) -> pd.DataFrame:
+    """The schema-driven date typing of preprocess_data, starting from an empty format cache"""
+    clear_format_cache()
+    return apply_date_types(df)[0]
+
+def parse_arguments() -> argparse.Namespace:
+    """Parses command-line arguments for the data loading benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark loading and date typing of a transaction extract")
+    parser.add_argument("--rows", type=int, default=10000000, help="Rows of the synthetic extract")
+    parser.add_argument("--data-source", type=str, help="Existing CSV extract to load instead of a synthetic one")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per step")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not time the previous date detection")
+    parser.add_argument("--output", type=str, help="File to write the JSON results to (defaults to stdout)")
+    return parser.parse_args()
+
+def time_step(name: str, fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    """Times repeated runs of one loading step and reports the fastest and median run"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    stats = {'best_s': timings[0], 'median_s': timings[len(timings) // 2]}
+    logger.info(f"{name}: best {stats['best_s']:.2f} s, median {stats['median_s']:.2f} s")
+    return stats
+
+def main():
+    """Main function to run the data loading benchmark"""
+    args = parse_arguments()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.data_source
+        if path is None:
+            path = os.path.join(directory, 'extract.csv')
+            logger.info(f"Writing a synthetic extract of {args.rows} rows to {path}")
+            generate_transaction_extract(args.rows, seed=args.seed).to_csv(path, index=False)
+
+        # Read as plain objects, as load_data does, so the typing steps start from the same frame
+        raw = pd.read_csv(path, dtype=object)
+        results = {'read_csv': time_step('read_csv', lambda: pd.read_csv(path, dtype=object), args.repeats)}
+        results['schema_date_typing'] = time_step('schema_date_typing', lambda: schema_date_typing(raw.copy()), args.repeats)
+        if not args.skip_legacy:
+            results['legacy_date_typing'] = time_step('legacy_date_typing', lambda: legacy_date_typing(raw.copy()), args.repeats)
+            results['speedup'] = results['legacy_date_typing']['median_s'] / results['schema_date_typing']['median_s']
+
+        # Both approaches must agree on which columns are dates
+        schema_columns = set(schema_date_typing(raw.copy()).select_dtypes(include=['datetime64']).columns)
+        if not args.skip_legacy:
+            legacy_columns = set(legacy_date_typing(raw.copy()).select_dtypes(include=['datetime64']).columns)
+            if schema_columns != legacy_columns:
+                logger.error(f"Date columns differ: schema {sorted(schema_columns)}, legacy {sorted(legacy_columns)}")
+                sys.exit(1)
+
+    report = {
+        'environment': {'timestamp': datetime.utcnow().isoformat(), 'python': platform.python_version(),
+                        'pandas': pd.__version__, 'cpu_count': os.cpu_count()},
+        'rows': len(raw),
+        'columns': len(raw.columns),
+        'date_columns': sorted(schema_columns),
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import argparse
+import logging
+import platform
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.models.credit_score_prediction import CREDIT_SCORE_PREDICTION_MODEL
+from src.inference.model_registry import INFERENCE_BACKENDS, load_all_models
+from src.inference.credit_score_predictor import CreditScorePredictor
+from src.inference.spending_predictor import SpendingPredictor
+from src.inference.investment_recommender import InvestmentRecommender
+from src.inference.transaction_categorizer import categorize_transactions
+from src.inference.categorization_cache import categorization_cache
+from src.api.streaming import NDJSON_MEDIA_TYPE
+from src.utils.benchmarking import (generate_transactions, generate_spending_users, generate_investment_profiles,
+                                    generate_credit_records, benchmark, compare_to_baseline)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+# Timings depend on the machine, so the baseline is produced where the check runs, from src/ml:
+#   python -m scripts.benchmark_inference --skip-api --update-baseline
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'inference_baseline.json')
+
+def _post_each(client: Any, path: str) -> Callable[[List[Dict]], None]:
+    # Sends one request per record, as individual API callers do
+    def run(records: List[Dict]) -> None:
+        for record in records:
+            response = client.post(path, json=record)
+            response.raise_for_status()
+    return run
+
+def _post_bulk(client: Any) -> Callable[[List[Dict]], None]:
+    def run(records: List[Dict]) -> None:
+        body = ''.join(json.dumps(record) + '\n' for record in records)
+        response = client.post('/categorize-transactions/bulk', data=body, headers={'content-type': NDJSON_MEDIA_TYPE})
+        response.raise_for_status()
+    return run
+
+def get_targets(client: Any = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the benchmark targets: a data generator, the call under test, an optional setup
+    run before every call and the largest batch size worth running for it. Targets that
+    handle one record per call are capped, since their latency grows linearly with the batch.
+    """
+    credit_features = [f"feature_{i}" for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])]
+    recommender = InvestmentRecommender()
+
+    targets = {
+        'credit_score_batch': {
+            'generate': lambda n, seed: generate_credit_records(n, credit_features, seed),
+            'run': lambda data: CreditScorePredictor().batch_predict_credit_scores(data),
+            'max_batch_size': None,
+        },
+        'spending_batch': {
+            'generate': generate_spending_users,
+            'run': lambda users: SpendingPredictor().batch_predict(users),
+            'max_batch_size': None,
+        },
+        'categorize_transactions': {
+            'generate': generate_transactions,
+            'run': categorize_transactions,
+            # Measure the model, not the cache the previous repeat filled
+            'setup': categorization_cache.clear,
+            'max_batch_size': None,
+        },
+        'investment_recommend': {
+            'generate': generate_investment_profiles,
+            'run': lambda profiles: [recommender.recommend(profile) for profile in profiles],
+            'max_batch_size': 1000,
+        },
+    }
+
+    if client is not None:
+        targets.update({
+            'api_categorize_transaction': {'generate': generate_transactions, 'setup': categorization_cache.clear,
+                                           'run': _post_each(client, '/categorize-transaction'), 'max_batch_size': 1000},
+            'api_categorize_transactions_bulk': {'generate': generate_transactions, 'setup': categorization_cache.clear,
+                                                 'run': _post_bulk(client), 'max_batch_size': None},
+            'api_predict_spending': {'generate': generate_spending_users,
+                                     'run': _post_each(client, '/predict-spending'), 'max_batch_size': 1000},
+            'api_recommend_investments': {'generate': generate_investment_profiles,
+                                          'run': _post_each(client, '/recommend-investments'), 'max_batch_size': 1000},
+            'api_predict_credit_score': {
+                'generate': lambda n, seed: generate_credit_records(n, credit_features, seed).to_dict('records'),
+                'run': _post_each(client, '/predict-credit-score'), 'max_batch_size': 1000},
+        })
+    return targets
+
+def parse_arguments() -> argparse.Namespace:
+    """Parses command-line arguments for the inference benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark inference latency and throughput of the predictors and API endpoints")
+    parser.add_argument("--targets", type=str, help="Comma-separated targets to run (defaults to all)")
+    parser.add_argument("--batch-sizes", type=str, default=','.join(map(str, DEFAULT_BATCH_SIZES)),
+                        help="Comma-separated batch sizes")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls per target and batch size")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed calls made before timing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generators")
+    parser.add_argument("--skip-api", action="store_true", help="Do not benchmark the FastAPI endpoints")
+    parser.add_argument("--output", type=str, help="File to write the JSON results to (defaults to stdout)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE_PATH, help="Stored baseline results to compare against, written by --update-baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Largest acceptable relative slowdown against the baseline")
+    return parser.parse_args()
+
+def get_environment() -> Dict[str, Any]:
+    """Describes the machine and configuration the benchmark ran with, so results are comparable"""
+    return {
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'inference_backends': INFERENCE_BACKENDS,
+    }
+
+def run_benchmarks(targets: Dict[str, Dict[str, Any]], batch_sizes: List[int], args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """Runs every target at every batch size within its cap"""
+    results = {}
+    for name, target in targets.items():
+        results[name] = {}
+        for batch_size in batch_sizes:
+            if target['max_batch_size'] and batch_size > target['max_batch_size']:
+                continue
+
+            inputs = target['generate'](batch_size, seed=args.seed)
+            try:
+                stats = benchmark(target['run'], inputs, batch_size, repeats=args.repeats, warmup=args.warmup,
+                                  setup=target.get('setup'))
+            except Exception as e:
+                logger.error(f"Error benchmarking {name} at batch size {batch_size}: {str(e)}")
+                stats = {'rows': batch_size, 'error': str(e)}
+            else:
+                logger.info(f"{name} x{batch_size}: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+                            f"{stats['rows_per_sec']:.0f} rows/s")
+            results[name][str(batch_size)] = stats
+    return results
+
+def main():
+    """Main function to run the benchmark. Exits non-zero on a regression against the baseline"""
+    args = parse_arguments()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    load_all_models()
+    with ExitStack() as stack:
+        client = None
+        if not args.skip_api:
+            from fastapi.testclient import TestClient
+            from src.api.ml_api import app
+
+            # Entering the client runs the app's startup hooks, as a real server would
+            client = stack.enter_context(TestClient(app))
+
+        targets = get_targets(client)
+        if args.targets:
+            targets = {name: targets[name] for name in args.targets.split(',')}
+        results = run_benchmarks(targets, batch_sizes, args)
+
+    report = {'environment': get_environment(), 'settings': {'repeats': args.repeats, 'warmup': args.warmup, 'seed': args.seed},
+              'results': results}
+
+    regressions = []
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Stored baseline at {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        valid_results = {name: {size: stats for size, stats in batches.items() if 'error' not in stats}
+                         for name, batches in results.items()}
+        regressions = compare_to_baseline(valid_results, baseline['results'], args.max_regression)
+        report['regressions'] = regressions
+    else:
+        logger.warning(f"No baseline found at {args.baseline}; run with --update-baseline to store one")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for regression in regressions:
+        logger.error(f"Regression in {regression['target']} x{regression['batch_size']}: {regression['metric']} "
+                     f"{regression['baseline']:.2f} -> {regression['current']:.2f}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import argparse
 import logging
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
 
 # Assuming these modules exist in the project structure
-from src.utils.data_loader import load_and_prepare_data
+from src.utils.data_loader import preprocess_data
+from src.utils.parquet_dataset import write_dataset
 from src.config.index import get_config
+from src.preprocessing.data_cleaning import clean_data
+from src.preprocessing.feature_store import TransactionFeatureStore
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -32,32 +36,51 @@ def parse_arguments() -> argparse.Namespace:
     """
     parser = argparse.ArgumentParser(description="Ingest financial data for Mint Replica ML models")
     parser.add_argument("--data-source", type=str, required=True, help="Path or URL to the data source")
-    parser.add_argument("--output-path", type=str, required=True, help="Path to save the processed data")
+    parser.add_argument("--output-path", type=str, required=True,
+                        help="Directory of the partitioned Parquet dataset to add the processed data to, or a .csv file")
     parser.add_argument("--config", type=str, default="default", help="Configuration to use")
+    parser.add_argument("--feature-store", type=str, help="Also add the transactions to the feature store at this path")
+    parser.add_argument("--batch-id", type=str,
+                        help="Identifier of this batch, so re-running it does not add its rows to the dataset or the feature store twice")
     return parser.parse_args()
 
-def ingest_data(data_source: str, output_path: str, config: Dict[str, Any]) -> None:
+def ingest_data(data_source: str, output_path: str, config: Dict[str, Any],
+                feature_store: TransactionFeatureStore = None, batch_id: str = None) -> None:
     """
     Main function to ingest and process the financial data.
 
+    The cleaned, typed data is added to the partitioned Parquet dataset at output_path,
+    which the training scripts read directly instead of parsing and cleaning the raw data
+    again. A path ending in .csv writes a plain CSV file instead.
+
     Args:
         data_source (str): Path or URL to the data source
-        output_path (str): Path to save the processed data
+        output_path (str): Dataset directory, or CSV file, to save the processed data to
         config (Dict[str, Any]): Configuration dictionary
+        feature_store (TransactionFeatureStore): Optional store whose aggregates are updated with the new transactions
+        batch_id (str): Identifier of the ingested batch
     """
     logger.info(f"Starting data ingestion process from {data_source}")
 
     try:
-        # Load and prepare data using the utility function
-        df = load_and_prepare_data(data_source, config)
+        # Load and clean the raw data, then type its columns
+        df = preprocess_data(clean_data(data_source))
 
         # Perform additional data transformations specific to the Mint Replica project
         df = transform_data_for_mint_replica(df, config)
 
         # Save the processed data
-        df.to_csv(output_path, index=False)
+        if output_path.endswith('.csv'):
+            df.to_csv(output_path, index=False)
+        else:
+            manifest = write_dataset(df, output_path, batch_id=batch_id)
+            logger.info(f"Dataset now holds {manifest['rows']} rows in {len(manifest['partitions'])} partitions")
         logger.info(f"Processed data saved to {output_path}")
 
+        if feature_store is not None:
+            added = feature_store.update(df, batch_id=batch_id)
+            logger.info(f"Added {added} transactions to the feature store")
+
     except Exception as e:
         logger.error(f"Error during data ingestion: {str(e)}")
         raise
@@ -99,7 +122,8 @@ def main() -> None:
 
     try:
         config = get_config(args.config)
-        ingest_data(args.data_source, args.output_path, config)
+        feature_store = TransactionFeatureStore(args.feature_store) if args.feature_store else None
+        ingest_data(args.data_source, args.output_path, config, feature_store, args.batch_id)
         logger.info("Data ingestion completed successfully")
     except Exception as e:
         logger.error(f"Data ingestion failed: {str(e)}")
@@ -0,0 +1,79 @@
+import sys
+import json
+import argparse
+import logging
+import pandas as pd
+from typing import Any, Dict
+
+from src.inference.model_registry import (MODEL_PATHS, TRANSACTION_CATEGORIZATION, SPENDING_PREDICTION,
+                                          INVESTMENT_RECOMMENDATION, CREDIT_SCORE_PREDICTION)
+from src.models.transaction_categorization import TransactionCategorizationModel
+from src.models.spending_prediction import SpendingPredictionModel
+from src.models.investment_recommendation import InvestmentRecommendationModel
+from src.models.credit_score_prediction import CreditScorePredictionModel
+from src.inference.numpy_backend import SUPPORTED_DTYPES
+from src.utils.model_export import export_model, PARITY_ATOL, PARITY_RTOL
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Model types accepted on the command line, as in model_training_pipeline.py
+MODEL_TYPES = {
+    "transaction": (TRANSACTION_CATEGORIZATION, TransactionCategorizationModel),
+    "spending": (SPENDING_PREDICTION, SpendingPredictionModel),
+    "investment": (INVESTMENT_RECOMMENDATION, lambda: InvestmentRecommendationModel(build=False)),
+    "credit": (CREDIT_SCORE_PREDICTION, lambda: CreditScorePredictionModel(build=False)),
+}
+
+def parse_arguments() -> argparse.Namespace:
+    """Parses command-line arguments for the model export"""
+    parser = argparse.ArgumentParser(description="Export trained Keras models to TFLite or NumPy for TensorFlow-free serving")
+    parser.add_argument("--model-type", type=str, default="all", choices=list(MODEL_TYPES) + ["all"],
+                        help="Type of model to export")
+    parser.add_argument("--sample-data", type=str, required=True,
+                        help="CSV file with raw input rows for the parity check. With --model-type all, "
+                             "'{model_type}' in the path is replaced by each model type")
+    parser.add_argument("--model-path", type=str, help="Path of the saved Keras model (defaults to the configured model path)")
+    parser.add_argument("--backend", type=str, default="tflite", choices=["tflite", "numpy"],
+                        help="Inference backend to export for; numpy supports the Dense-only models")
+    parser.add_argument("--quantize", action="store_true", help="Apply dynamic range quantization of the TFLite weights")
+    parser.add_argument("--dtype", type=str, default="float32", choices=list(SUPPORTED_DTYPES),
+                        help="Precision of the NumPy weights")
+    parser.add_argument("--atol", type=float, default=PARITY_ATOL, help="Absolute tolerance of the parity check")
+    parser.add_argument("--rtol", type=float, default=PARITY_RTOL, help="Relative tolerance of the parity check")
+    return parser.parse_args()
+
+def export_model_type(model_type: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Loads one trained model, exports it and checks parity against the Keras outputs"""
+    model_name, model_factory = MODEL_TYPES[model_type]
+    model_path = args.model_path or MODEL_PATHS[model_name]
+
+    model = model_factory()
+    model.load_model(model_path)
+    sample_data = pd.read_csv(args.sample_data.format(model_type=model_type))
+
+    report = export_model(model, model_path, sample_data, backend=args.backend, quantize=args.quantize,
+                          dtype=args.dtype, atol=args.atol, rtol=args.rtol)
+    logger.info(f"Exported {model_name}: max abs diff {report['max_abs_diff']:.2e} over {report['rows']} rows")
+    return report
+
+def main():
+    """Main function to export the requested models. Exits non-zero if any parity check fails"""
+    args = parse_arguments()
+    model_types = list(MODEL_TYPES) if args.model_type == "all" else [args.model_type]
+
+    reports = {}
+    for model_type in model_types:
+        try:
+            reports[model_type] = export_model_type(model_type, args)
+        except Exception as e:
+            logger.error(f"Error exporting {model_type} model: {str(e)}")
+            reports[model_type] = {"passed": False, "error": str(e)}
+
+    print(json.dumps(reports, indent=2))
+    if not all(report["passed"] for report in reports.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import boto3
 import mlflow
 from typing import Dict, Any
 
+from src.utils.model_export import export_to_tflite, prune_model
+
 # Assuming these will be defined in the future src/config/model_config.ts file
 from src.config.model_config import (
     TRANSACTION_CATEGORIZATION_MODEL,
@@ -47,13 +49,20 @@ def prepare_model_for_deployment(model: tf.keras.Model, model_config: Dict[str,
         tf.keras.Model: Prepared model object.
     """
     try:
-        # Apply optimizations based on the model_config
-        if model_config.get('quantize', False):
-            model = tf.lite.TFLiteConverter.from_keras_model(model).convert()
-        
         if model_config.get('prune', False):
-            # Apply pruning (this is a placeholder, actual pruning would depend on your specific requirements)
-            pass
+            # Magnitude pruning runs before any export so the TFLite artifact carries the zeros
+            prune_model(model, model_config.get('prune_sparsity', 0.5))
+
+        # Quantized artifacts are only served once they pass the accuracy gate, which needs
+        # calibration and test data this path does not have
+        if model_config.get('quantize', False):
+            raise ValueError("Quantization is not applied at deployment; run scripts/quantize_models.py, "
+                             "which promotes the int8 model only if it passes the accuracy gate")
+
+        # The TFLite export is written next to the Keras model, where the 'tflite' inference backend picks it up
+        if model_config.get('export_tflite', False):
+            tflite_path = export_to_tflite(model, model_config['path'])
+            logger.info(f"TFLite export written to {tflite_path}")
 
         logger.info("Model prepared for deployment")
         return model
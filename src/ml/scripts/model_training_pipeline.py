@@ -1,31 +1,38 @@
+import os
+import sys
+import json
+import time
 import argparse
 import logging
-from typing import Dict, Any
+import tempfile
+from typing import Dict, Any, Union
 
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
-# Assuming these imports work correctly
-from src.ml.src.config.model_config import (
-    TRANSACTION_CATEGORIZATION_MODEL,
-    SPENDING_PREDICTION_MODEL,
-    INVESTMENT_RECOMMENDATION_MODEL,
-    CREDIT_SCORE_PREDICTION_MODEL,
-)
-from src.ml.src.models.transaction_categorization import TransactionCategorizationModel
-from src.ml.src.models.spending_prediction import SpendingPredictionModel
-from src.ml.src.models.investment_recommendation import InvestmentRecommendationModel
-from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel
-from src.ml.src.preprocessing.data_cleaning import clean_data
-from src.ml.src.preprocessing.feature_engineering import engineer_features
+from src.ml.src.models.transaction_categorization import TransactionCategorizationModel, SOURCE_COLUMNS
+from src.ml.src.models.spending_prediction import SpendingPredictionModel, SPENDING_PREDICTION_MODEL
+from src.ml.src.models.investment_recommendation import InvestmentRecommendationModel, INVESTMENT_RECOMMENDATION_MODEL
+from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel, CREDIT_SCORE_PREDICTION_MODEL
+from src.ml.src.preprocessing.preprocessing_cache import PreprocessingCache, load_engineered_features
 from src.ml.src.evaluation.model_evaluation import (
     evaluate_transaction_categorization,
     evaluate_spending_prediction,
-    evaluate_investment_recommendation,
+    evaluate_investment_allocations,
     evaluate_credit_score_prediction,
+    cross_validate_model,
+)
+from src.ml.src.inference.model_registry import (
+    MODEL_PATHS,
+    TRANSACTION_CATEGORIZATION,
+    SPENDING_PREDICTION,
+    INVESTMENT_RECOMMENDATION,
+    CREDIT_SCORE_PREDICTION,
 )
-from src.ml.src.utils.data_loader import load_and_prepare_data
-from src.ml.src.utils.model_utils import save_model
+from src.ml.src.utils.parquet_dataset import build_filters
+from src.ml.src.training.parallel_training import run_pinned
+from src.ml.src.training.hyperparameter_search import search_hyperparameters
+from src.ml.src.training.checkpointing import TrainingCheckpoint, job_checkpoint
 
 logger = logging.getLogger(__name__)
 
@@ -43,102 +50,234 @@ def setup_logging():
 def parse_arguments() -> argparse.Namespace:
     """Parses command-line arguments for the model training pipeline"""
     parser = argparse.ArgumentParser(description="Model Training Pipeline")
-    parser.add_argument("--model-type", type=str, required=True, choices=["transaction", "spending", "investment", "credit"],
-                        help="Type of model to train")
-    parser.add_argument("--data-source", type=str, required=True, help="Path to the data source")
-    parser.add_argument("--hyperparameters", type=str, help="JSON string of hyperparameters")
+    parser.add_argument("--model-type", type=str, required=True, choices=["transaction", "spending", "investment", "credit", "all"],
+                        help="Type of model to train, or 'all' to train every model concurrently, each on its own columns of the data")
+    parser.add_argument("--data-source", type=str, required=True,
+                        help="Path to the dataset written by data_ingestion.py, or to a raw data file")
+    parser.add_argument("--columns", type=str, help="Comma-separated columns to read from the dataset (defaults to all)")
+    parser.add_argument("--start-month", type=str, help="First month of the dataset to train on, as YYYY-MM")
+    parser.add_argument("--end-month", type=str, help="Last month of the dataset to train on, as YYYY-MM")
+    parser.add_argument("--institutions", type=str, help="Comma-separated institutions of the dataset to train on")
+    parser.add_argument("--no-cache", action="store_true", help="Preprocess the data again instead of reusing cached features")
+    parser.add_argument("--hyperparameters", type=str,
+                        help="JSON string of hyperparameters. With --model-type all, keyed by model type")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume training from the latest checkpoint of an interrupted run instead of starting afresh")
+    parser.add_argument("--max-workers", type=int, help="Training processes with --model-type all (defaults to one per model)")
+    parser.add_argument("--search-trials", type=int,
+                        help="Search the hyperparameters over this many trials first, resuming an earlier search")
+    parser.add_argument("--sampler", type=str, choices=["tpe", "random"], help="Hyperparameter search sampler")
+    parser.add_argument("--study-path", type=str, help="SQLite database of the hyperparameter search studies")
+    parser.add_argument("--cv-folds", type=int,
+                        help="Also cross-validate the trained models over this many folds, run concurrently")
+    parser.add_argument("--report-path", type=str, default="training_report.json", help="File to write the evaluation report to")
     return parser.parse_args()
 
-def train_transaction_categorization_model(data: pd.DataFrame, hyperparameters: Dict[str, Any]) -> TransactionCategorizationModel:
+def train_transaction_categorization_model(data: pd.DataFrame, hyperparameters: Dict[str, Any],
+                                           checkpoint: TrainingCheckpoint = None) -> TransactionCategorizationModel:
     """Trains the transaction categorization model"""
     model = TransactionCategorizationModel(**hyperparameters)
-    X = data.drop("category", axis=1)
-    y = data["category"]
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
-    model.train(X_train, y_train)
+    train_data, _ = train_test_split(data, test_size=0.2, random_state=42)
+    model.train(train_data, checkpoint=checkpoint)
     return model
 
-def train_spending_prediction_model(data: pd.DataFrame, hyperparameters: Dict[str, Any]) -> SpendingPredictionModel:
+def train_spending_prediction_model(data: pd.DataFrame, hyperparameters: Dict[str, Any],
+                                    checkpoint: TrainingCheckpoint = None) -> SpendingPredictionModel:
     """Trains the spending prediction model"""
     model = SpendingPredictionModel(**hyperparameters)
-    X = data.drop("spending_amount", axis=1)
-    y = data["spending_amount"]
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
-    model.train(X_train, y_train)
+    train_data, _ = train_test_split(data, test_size=0.2, random_state=42)
+    model.train(train_data, checkpoint=checkpoint)
     return model
 
-def train_investment_recommendation_model(data: pd.DataFrame, hyperparameters: Dict[str, Any]) -> InvestmentRecommendationModel:
+def train_investment_recommendation_model(data: pd.DataFrame, hyperparameters: Dict[str, Any],
+                                          checkpoint: TrainingCheckpoint = None) -> InvestmentRecommendationModel:
     """Trains the investment recommendation model"""
     model = InvestmentRecommendationModel(**hyperparameters)
-    X = data.drop("recommended_investment", axis=1)
-    y = data["recommended_investment"]
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
-    model.train(X_train, y_train)
+    train_data, _ = train_test_split(data, test_size=0.2, random_state=42)
+    model.train(train_data, checkpoint=checkpoint)
     return model
 
-def train_credit_score_prediction_model(data: pd.DataFrame, hyperparameters: Dict[str, Any]) -> CreditScorePredictionModel:
+def train_credit_score_prediction_model(data: pd.DataFrame, hyperparameters: Dict[str, Any],
+                                        checkpoint: TrainingCheckpoint = None) -> CreditScorePredictionModel:
     """Trains the credit score prediction model"""
     model = CreditScorePredictionModel(**hyperparameters)
     X = data.drop("credit_score", axis=1)
     y = data["credit_score"]
     X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
-    model.train(X_train, y_train)
+    model.train(X_train, y_train, checkpoint=checkpoint)
     return model
 
+# Training function, evaluation function, registered model name and target column of every model type.
+# The targets are those the models train on, as in evaluation.model_evaluation.CROSS_VALIDATION_MODELS
+MODEL_TRAINERS = {
+    "transaction": (train_transaction_categorization_model, evaluate_transaction_categorization,
+                    TRANSACTION_CATEGORIZATION, "category"),
+    "spending": (train_spending_prediction_model, evaluate_spending_prediction,
+                 SPENDING_PREDICTION, "target_spending"),
+    "investment": (train_investment_recommendation_model, evaluate_investment_allocations,
+                   INVESTMENT_RECOMMENDATION, "investment_allocation"),
+    "credit": (train_credit_score_prediction_model, evaluate_credit_score_prediction,
+               CREDIT_SCORE_PREDICTION, "credit_score"),
+}
+
+# Feature and target columns of every model type, selected from the data when all models are trained on it
+MODEL_COLUMNS = {
+    "transaction": SOURCE_COLUMNS,
+    "spending": SPENDING_PREDICTION_MODEL["input_features"] + ["target_spending"],
+    "investment": INVESTMENT_RECOMMENDATION_MODEL["input_features"] + ["investment_allocation"],
+    # The credit network takes input_dim numerical features
+    "credit": [f"feature_{i}" for i in range(CREDIT_SCORE_PREDICTION_MODEL["input_dim"])] + ["credit_score"],
+}
+
+# Cache key of the features shared with the training processes
+SHARED_DATA_KEY = "shared"
+
+def select_model_data(model_type: str, data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Selects the columns of one model type (see MODEL_COLUMNS) and the rows that have its target,
+    so that data can pool the rows of several models, e.g. the tables of all four concatenated
+    """
+    _, _, _, target_column = MODEL_TRAINERS[model_type]
+    missing_columns = [column for column in MODEL_COLUMNS[model_type] if column not in data.columns]
+    if missing_columns:
+        raise ValueError(f"The data has no {model_type} columns {missing_columns}")
+    data = data.loc[data[target_column].notna(), MODEL_COLUMNS[model_type]].reset_index(drop=True)
+    # Columns that held missing values of other models' rows are restored to their own type
+    return data.infer_objects()
+
+def train_and_evaluate(model_type: str, data: pd.DataFrame, hyperparameters: Dict[str, Any],
+                       resume: bool = False) -> Dict[str, Any]:
+    """
+    Trains one model, evaluates it on the held-out split and saves it where the model registry
+    serves it from. Training is checkpointed, and with resume continues from the latest
+    checkpoint of an interrupted run of the model type
+    """
+    train_func, evaluation_func, model_name, target_column = MODEL_TRAINERS[model_type]
+    started = time.perf_counter()
+
+    checkpoint = job_checkpoint(model_type)
+    if not resume:
+        checkpoint.clear()
+    model = train_func(data, hyperparameters, checkpoint)
+
+    # The training functions split with the same seed, so these rows were held out of training
+    _, X_test, _, y_test = train_test_split(data.drop(target_column, axis=1), data[target_column],
+                                            test_size=0.2, random_state=42)
+    evaluation_results = evaluation_func(model, X_test, y_test)
+    logger.info(f"{model_type} model evaluation results: {evaluation_results}")
+
+    model_path = MODEL_PATHS[model_name]
+    if os.path.dirname(model_path):
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    model.save_model(model_path)
+    logger.info(f"{model_type} model saved to: {model_path}")
+    # The job is done, so a later --resume starts afresh
+    checkpoint.clear()
+    # Epochs and time saved by early stopping or the time budget (see training.callbacks)
+    training_report = getattr(model, "training_report", None)
+    if training_report:
+        logger.info(f"{model_type} trained {training_report['epochs_run']} of {training_report['epochs_planned']} epochs, "
+                    f"saving {training_report['epochs_saved']} epochs (~{training_report['seconds_saved']:.1f} s)")
+    return {"status": "trained", "metrics": evaluation_results, "model_path": model_path,
+            "duration_s": time.perf_counter() - started, "training": training_report}
+
+def train_from_shared_data(model_type: str, shared: Union[str, pd.DataFrame], hyperparameters: Dict[str, Any],
+                           resume: bool = False) -> Dict[str, Any]:
+    """Runs in a training process: maps the features written by the parent, then trains one model on its own columns"""
+    setup_logging()
+    data = PreprocessingCache(shared).get(SHARED_DATA_KEY) if isinstance(shared, str) else shared
+    return train_and_evaluate(model_type, select_model_data(model_type, data), hyperparameters, resume)
+
+def train_all_models(data: pd.DataFrame, hyperparameters: Dict[str, Dict[str, Any]], max_workers: int = None,
+                     resume: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Trains every model type concurrently, each training process pinned to its own CPUs.
+
+    The features are loaded once by the caller and written to one Arrow file that every
+    process memory-maps, instead of being pickled to each of them. Every process trains on
+    the columns and rows of its own model type (see select_model_data).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        shared_cache = PreprocessingCache(directory, max_entries=1)
+        shared_cache.put(SHARED_DATA_KEY, data)
+        # Without pyarrow the cache is disabled, and the features are sent to the processes instead
+        shared = directory if shared_cache.enabled else data
+
+        futures = run_pinned({model_type: train_from_shared_data for model_type in MODEL_TRAINERS},
+                             {model_type: (model_type, shared, hyperparameters.get(model_type, {}), resume)
+                              for model_type in MODEL_TRAINERS},
+                             max_workers=max_workers)
+
+    report = {}
+    for model_type, future in futures.items():
+        try:
+            report[model_type] = future.result()
+        except Exception as e:
+            logger.error(f"Error training {model_type} model: {str(e)}")
+            report[model_type] = {"status": "failed", "error": str(e)}
+    return report
+
 def main():
-    """Main function to run the model training pipeline"""
+    """Main function to run the model training pipeline. Exits non-zero if any model failed to train"""
     setup_logging()
     args = parse_arguments()
 
     logger.info(f"Starting model training pipeline for {args.model_type} model")
 
-    # Load and prepare data
-    data = load_and_prepare_data(args.data_source)
-    
-    # Clean the data
-    data = clean_data(data)
-    
-    # Perform feature engineering
-    data = engineer_features(data)
+    # Load the data and engineer features. Only the requested columns, months and institutions
+    # of a dataset are read, and the result of an earlier run on the same data is reused
+    filters = build_filters(args.start_month, args.end_month, args.institutions.split(',') if args.institutions else None)
+    columns = args.columns.split(',') if args.columns else None
+    if args.no_cache:
+        data = load_engineered_features(args.data_source, columns, filters, cache=PreprocessingCache(max_entries=0))
+    else:
+        data = load_engineered_features(args.data_source, columns, filters)
 
     # Parse hyperparameters
     hyperparameters = eval(args.hyperparameters) if args.hyperparameters else {}
 
-    # Select the appropriate training function based on the model type
-    if args.model_type == "transaction":
-        model = train_transaction_categorization_model(data, hyperparameters)
-        evaluation_func = evaluate_transaction_categorization
-        model_config = TRANSACTION_CATEGORIZATION_MODEL
-    elif args.model_type == "spending":
-        model = train_spending_prediction_model(data, hyperparameters)
-        evaluation_func = evaluate_spending_prediction
-        model_config = SPENDING_PREDICTION_MODEL
-    elif args.model_type == "investment":
-        model = train_investment_recommendation_model(data, hyperparameters)
-        evaluation_func = evaluate_investment_recommendation
-        model_config = INVESTMENT_RECOMMENDATION_MODEL
-    elif args.model_type == "credit":
-        model = train_credit_score_prediction_model(data, hyperparameters)
-        evaluation_func = evaluate_credit_score_prediction
-        model_config = CREDIT_SCORE_PREDICTION_MODEL
+    # Search the hyperparameters not given explicitly, one model type at a time with its trials in parallel
+    if args.search_trials:
+        for model_type in (MODEL_TRAINERS if args.model_type == "all" else [args.model_type]):
+            model_data = select_model_data(model_type, data) if args.model_type == "all" else data
+            best = search_hyperparameters(model_type, model_data, args.study_path, args.search_trials,
+                                          args.max_workers, args.sampler)
+            if best is None:
+                logger.warning(f"No {model_type} hyperparameter search trial completed, training with the defaults")
+            elif args.model_type == "all":
+                hyperparameters[model_type] = {**best["params"], **hyperparameters.get(model_type, {})}
+            else:
+                hyperparameters = {**best["params"], **hyperparameters}
+
+    if args.model_type == "all":
+        report = train_all_models(data, hyperparameters, args.max_workers, args.resume)
     else:
-        raise ValueError(f"Invalid model type: {args.model_type}")
+        report = {args.model_type: train_and_evaluate(args.model_type, data, hyperparameters, args.resume)}
+
+    # Cross-validate every model trained, one model at a time with its folds in parallel
+    if args.cv_folds:
+        for model_type, result in report.items():
+            if result["status"] != "trained":
+                continue
+            model_data = select_model_data(model_type, data) if args.model_type == "all" else data
+            result["cross_validation"] = cross_validate_model(model_type, model_data, n_splits=args.cv_folds,
+                                                              max_workers=args.max_workers)
+            logger.info(f"{model_type} model cross-validation metrics: {result['cross_validation']['metrics']}")
 
-    # Evaluate the model
-    evaluation_results = evaluation_func(model, data)
-    logger.info(f"Model evaluation results: {evaluation_results}")
+    # Write the consolidated evaluation report
+    with open(args.report_path, "w") as f:
+        json.dump(report, f, indent=2, default=float)
+    logger.info(f"Evaluation report written to {args.report_path}")
 
-    # Save the trained model
-    model_path = save_model(model, model_config["save_path"])
-    logger.info(f"Model saved to: {model_path}")
+    if any(result["status"] != "trained" for result in report.values()):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
 
 # Human tasks:
 # - Review and optimize hyperparameters for each model type
-# - Implement cross-validation for more robust model evaluation
 # - Add support for distributed training for large datasets
 # - Implement model versioning and experiment tracking
 # - Create a configuration file for easily adjustable pipeline parameters
-# - Implement error handling and recovery mechanisms for long-running training jobs
\ No newline at end of file
+# - Keep the data of a run fixed (e.g. --end-month) when resuming it, so the checkpoint matches the data
\ No newline at end of file
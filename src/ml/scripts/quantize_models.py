@@ -0,0 +1,78 @@
+import sys
+import json
+import argparse
+import logging
+from typing import Any, Dict
+
+from src.inference.model_registry import (MODEL_PATHS, TRANSACTION_CATEGORIZATION, SPENDING_PREDICTION,
+                                          INVESTMENT_RECOMMENDATION, CREDIT_SCORE_PREDICTION)
+from src.models.transaction_categorization import TransactionCategorizationModel
+from src.models.spending_prediction import SpendingPredictionModel
+from src.models.investment_recommendation import InvestmentRecommendationModel
+from src.models.credit_score_prediction import CreditScorePredictionModel
+from src.utils.data_loader import load_and_prepare_data, draw_calibration_sample
+from src.utils.quantization import quantize_model, QUANTIZATION_CONFIG
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Model types accepted on the command line, with the target column of their data
+MODEL_TYPES = {
+    "transaction": (TRANSACTION_CATEGORIZATION, TransactionCategorizationModel, "category"),
+    "spending": (SPENDING_PREDICTION, SpendingPredictionModel, "target_spending"),
+    "investment": (INVESTMENT_RECOMMENDATION, lambda: InvestmentRecommendationModel(build=False), "investment_allocation"),
+    "credit": (CREDIT_SCORE_PREDICTION, lambda: CreditScorePredictionModel(build=False), "credit_score"),
+}
+
+def parse_arguments() -> argparse.Namespace:
+    """Parses command-line arguments for the post-training quantization"""
+    parser = argparse.ArgumentParser(description="Quantize trained models to int8 TFLite, promoting only those within the accuracy tolerance")
+    parser.add_argument("--model-type", type=str, default="all", choices=list(MODEL_TYPES) + ["all"],
+                        help="Type of model to quantize")
+    parser.add_argument("--data-source", type=str, required=True,
+                        help="CSV file or SQL query with labelled data. With --model-type all, "
+                             "'{model_type}' in it is replaced by each model type")
+    parser.add_argument("--model-path", type=str, help="Path of the saved Keras model (defaults to the configured model path)")
+    parser.add_argument("--calibration-size", type=int, default=QUANTIZATION_CONFIG['calibration_size'],
+                        help="Number of training rows used to calibrate activation ranges")
+    parser.add_argument("--max-metric-drop", type=float, default=QUANTIZATION_CONFIG['max_metric_drop'],
+                        help="Largest acceptable degradation of the gating metric")
+    parser.add_argument("--dry-run", action="store_true", help="Report the comparison without promoting any model")
+    return parser.parse_args()
+
+def quantize_model_type(model_type: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Loads one trained model and its data, then quantizes and gates it"""
+    model_name, model_factory, target_column = MODEL_TYPES[model_type]
+    model_path = args.model_path or MODEL_PATHS[model_name]
+
+    model = model_factory()
+    model.load_model(model_path)
+    X_train, X_test, _, y_test = load_and_prepare_data(args.data_source.format(model_type=model_type), target_column)
+    calibration_data = draw_calibration_sample(X_train, args.calibration_size)
+
+    report = quantize_model(model, model_path, calibration_data, X_test, y_test,
+                            max_metric_drop=args.max_metric_drop, promote=not args.dry_run)
+    logger.info(f"Quantized {model_name}: {report['gate_metric']} dropped by {report['metric_drop']:.4f}, "
+                f"size {report['size_bytes']['keras']} -> {report['size_bytes']['int8']} bytes")
+    return report
+
+def main():
+    """Main function to quantize the requested models. Exits non-zero if any model fails the gate"""
+    args = parse_arguments()
+    model_types = list(MODEL_TYPES) if args.model_type == "all" else [args.model_type]
+
+    reports = {}
+    for model_type in model_types:
+        try:
+            reports[model_type] = quantize_model_type(model_type, args)
+        except Exception as e:
+            logger.error(f"Error quantizing {model_type} model: {str(e)}")
+            reports[model_type] = {"passed": False, "error": str(e)}
+
+    print(json.dumps(reports, indent=2, default=float))
+    if not all(report["passed"] for report in reports.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,61 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Dict
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, List
 
 # Import services
 # Note: These imports assume the services are implemented in their respective files
-from ..services.transaction_categorization_service import categorize_transaction
-from ..services.spending_prediction_service import predict_spending
-from ..services.investment_recommendation_service import recommend_investments
-from ..services.credit_score_prediction_service import predict_credit_score
+from ..inference.model_registry import load_all_models, TRANSACTION_CATEGORIZATION, SPENDING_PREDICTION, INVESTMENT_RECOMMENDATION, CREDIT_SCORE_PREDICTION
+from ..inference.batching import MicroBatcher
+from ..inference.executor import inference_executor, ExecutorSaturatedError
+from ..inference.transaction_categorizer import categorize_transactions
+from ..inference.categorization_cache import categorization_cache
+from ..inference.spending_predictor import predict_spending_batch
+from ..inference.credit_score_predictor import CreditScorePredictor, predict_credit_scores
+from ..inference.investment_recommender import recommend_investments
+from ..models.transaction_categorization import TRANSACTION_CATEGORIZATION_MODEL
+from .streaming import (iter_ndjson_records, iter_arrow_records, iter_chunks, to_ndjson_line, arrow_available,
+                        RecordError, NDJSON_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE)
 
 app = FastAPI()
 
+# Concurrent requests to the same model are coalesced into one batched forward pass,
+# which then runs in the inference executor rather than on the event loop
+batchers = {
+    TRANSACTION_CATEGORIZATION: MicroBatcher(TRANSACTION_CATEGORIZATION, categorize_transactions, executor=inference_executor),
+    SPENDING_PREDICTION: MicroBatcher(SPENDING_PREDICTION, predict_spending_batch, executor=inference_executor),
+    CREDIT_SCORE_PREDICTION: MicroBatcher(CREDIT_SCORE_PREDICTION, predict_credit_scores, executor=inference_executor),
+}
+
+@app.on_event("startup")
+def load_models_on_startup():
+    """
+    Loads all four models into the shared model registry once, before the API starts
+    serving, so no request pays for deserializing a model from disk
+    """
+    # In process mode every worker loads its own copy of the models instead
+    if inference_executor.mode != 'process':
+        load_all_models()
+    inference_executor.start()
+
+@app.on_event("shutdown")
+async def close_batchers():
+    """
+    Stops the micro-batching workers and the inference executor
+    """
+    for batcher in batchers.values():
+        await batcher.close()
+    inference_executor.shutdown()
+
+def validate_required_fields(data: Dict, required_fields: List[str]) -> None:
+    """
+    Rejects a request that is missing required fields before it is queued for batching,
+    so that it cannot affect the other requests in its batch
+    """
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        raise HTTPException(status_code=400, detail=f"Missing required fields: {', '.join(missing_fields)}")
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,14 +75,73 @@ async def categorize_transaction_endpoint(transaction_data: Dict):
         if not transaction_data:
             raise HTTPException(status_code=400, detail="Transaction data is required")
         
-        # Call transaction_categorization_service to categorize the transaction
-        categorized_transaction = categorize_transaction(transaction_data)
+        validate_required_fields(transaction_data, TRANSACTION_CATEGORIZATION_MODEL['input_features'])
+
+        # Queue the transaction for the next batched categorization pass
+        category = await batchers[TRANSACTION_CATEGORIZATION].submit(transaction_data)
+        categorized_transaction = {**transaction_data, "category": category}
         
         # Return the categorized transaction data as a JSONResponse
         return JSONResponse(content=categorized_transaction)
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post('/categorize-transactions/bulk')
+async def categorize_transactions_bulk_endpoint(request: Request):
+    """
+    Endpoint to categorize a large number of transactions sent as newline-delimited JSON
+    or as an Arrow IPC stream. Categorized transactions are streamed back as NDJSON, one
+    line per input record in input order, while the upload is still being read
+    """
+    content_type = request.headers.get('content-type', NDJSON_MEDIA_TYPE).split(';')[0].strip()
+
+    if content_type == ARROW_STREAM_MEDIA_TYPE:
+        if not arrow_available():
+            raise HTTPException(status_code=415, detail="Arrow IPC input requires pyarrow to be installed")
+        records = iter_arrow_records(request.stream())
+    elif content_type in (NDJSON_MEDIA_TYPE, 'application/json', 'text/plain'):
+        records = iter_ndjson_records(request.stream())
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+
+    return StreamingResponse(categorize_record_stream(records), media_type=NDJSON_MEDIA_TYPE)
+
+async def categorize_record_stream(records: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """
+    Categorizes a record stream chunk by chunk, so that at most one chunk of records is
+    held in memory. Invalid records and failed chunks produce an error line instead of
+    ending the stream
+    """
+    required_fields = TRANSACTION_CATEGORIZATION_MODEL['input_features']
+
+    async for chunk in iter_chunks(records):
+        errors = {}
+        for i, record in enumerate(chunk):
+            if isinstance(record, RecordError):
+                errors[i] = record.message
+            else:
+                missing_fields = [field for field in required_fields if field not in record]
+                if missing_fields:
+                    errors[i] = f"Missing required fields: {', '.join(missing_fields)}"
+
+        valid_records = [record for i, record in enumerate(chunk) if i not in errors]
+        categories = iter([])
+        if valid_records:
+            try:
+                categories = iter(await inference_executor.run(TRANSACTION_CATEGORIZATION, categorize_transactions, valid_records))
+            except Exception as e:
+                errors.update({i: str(e) for i in range(len(chunk)) if i not in errors})
+
+        for i, record in enumerate(chunk):
+            if i in errors:
+                yield to_ndjson_line({"error": errors[i]})
+            else:
+                yield to_ndjson_line({**record, "category": next(categories)})
+
 @app.post('/predict-spending')
 async def predict_spending_endpoint(user_data: Dict):
     """
@@ -49,11 +152,19 @@ async def predict_spending_endpoint(user_data: Dict):
         if not user_data:
             raise HTTPException(status_code=400, detail="User data is required")
         
-        # Call spending_prediction_service to generate spending predictions
-        spending_prediction = predict_spending(user_data)
+        # Queue the user for the next batched spending prediction pass
+        predicted_spending = await batchers[SPENDING_PREDICTION].submit(user_data)
+        spending_prediction = {"predicted_spending": predicted_spending}
         
         # Return the spending prediction data as a JSONResponse
         return JSONResponse(content=spending_prediction)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # Invalid user data is reported per request by the batched predictor
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -67,11 +178,17 @@ async def recommend_investments_endpoint(user_profile: Dict):
         if not user_profile:
             raise HTTPException(status_code=400, detail="User profile data is required")
         
-        # Call investment_recommendation_service to generate investment recommendations
-        investment_recommendations = recommend_investments(user_profile)
+        # Generate the investment recommendations in the inference executor
+        investment_recommendations = await inference_executor.run(INVESTMENT_RECOMMENDATION, recommend_investments, user_profile)
         
         # Return the investment recommendations as a JSONResponse
         return JSONResponse(content=investment_recommendations)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -85,14 +202,37 @@ async def predict_credit_score_endpoint(user_financial_data: Dict):
         if not user_financial_data:
             raise HTTPException(status_code=400, detail="User financial data is required")
         
-        # Call credit_score_prediction_service to predict the credit score
-        credit_score_prediction = predict_credit_score(user_financial_data)
+        # The required features are those the served model was fitted on
+        validate_required_fields(user_financial_data, CreditScorePredictor().input_features())
+
+        # Queue the user for the next batched credit score prediction pass
+        predicted_score = await batchers[CREDIT_SCORE_PREDICTION].submit(user_financial_data)
+        credit_score_prediction = {"predicted_score": predicted_score}
         
-        # Return the predicted credit score and contributing factors as a JSONResponse
+        # Return the predicted credit score as a JSONResponse
         return JSONResponse(content=credit_score_prediction)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # Invalid feature values fail only their own request (see MicroBatcher)
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get('/metrics/inference')
+async def inference_metrics_endpoint():
+    """
+    Endpoint exposing inference executor queue wait times, micro-batching statistics and
+    categorization cache hit rates
+    """
+    return JSONResponse(content={
+        "executor": inference_executor.get_metrics(),
+        "batchers": {name: batcher.get_stats() for name, batcher in batchers.items()},
+        "categorization_cache": categorization_cache.get_stats()
+    })
+
 # Error handling middleware
 @app.middleware("http")
 async def error_handling_middleware(request, call_next):
@@ -7,9 +7,12 @@ from ..services import transaction_categorization_service
 from ..services import spending_prediction_service
 from ..services import investment_recommendation_service
 from ..services import credit_score_prediction_service
+from ..inference.model_registry import load_all_models, TRANSACTION_CATEGORIZATION, SPENDING_PREDICTION, INVESTMENT_RECOMMENDATION, CREDIT_SCORE_PREDICTION
+from ..inference.executor import inference_executor, ExecutorSaturatedError
 
-# Create router instance
-router = APIRouter()
+# Create router instance; models are loaded into the shared registry once at startup
+# and inference runs in the shared executor instead of on the event loop
+router = APIRouter(on_startup=[load_all_models, inference_executor.start], on_shutdown=[inference_executor.shutdown])
 
 @router.post('/categorize-transaction')
 async def categorize_transaction(transaction_data: Dict):
@@ -21,11 +24,15 @@ async def categorize_transaction(transaction_data: Dict):
         if not transaction_data or not isinstance(transaction_data, dict):
             raise HTTPException(status_code=400, detail="Invalid transaction data")
 
-        # Call transaction_categorization_service to categorize the transaction
-        categorized_transaction = await transaction_categorization_service.categorize_transaction(transaction_data)
+        # Call transaction_categorization_service in the inference executor to categorize the transaction
+        categorized_transaction = await inference_executor.run(TRANSACTION_CATEGORIZATION, transaction_categorization_service.categorize_transaction, transaction_data)
 
         # Return the categorized transaction data as a JSONResponse
         return JSONResponse(content=categorized_transaction)
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,11 +46,15 @@ async def predict_spending(user_data: Dict):
         if not user_data or not isinstance(user_data, dict):
             raise HTTPException(status_code=400, detail="Invalid user data")
 
-        # Call spending_prediction_service to generate spending predictions
-        spending_prediction = await spending_prediction_service.predict_spending(user_data)
+        # Call spending_prediction_service in the inference executor to generate spending predictions
+        spending_prediction = await inference_executor.run(SPENDING_PREDICTION, spending_prediction_service.predict_spending, user_data)
 
         # Return the spending prediction data as a JSONResponse
         return JSONResponse(content=spending_prediction)
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -57,11 +68,15 @@ async def recommend_investments(user_profile: Dict):
         if not user_profile or not isinstance(user_profile, dict):
             raise HTTPException(status_code=400, detail="Invalid user profile data")
 
-        # Call investment_recommendation_service to generate investment recommendations
-        investment_recommendations = await investment_recommendation_service.recommend_investments(user_profile)
+        # Call investment_recommendation_service in the inference executor to generate investment recommendations
+        investment_recommendations = await inference_executor.run(INVESTMENT_RECOMMENDATION, investment_recommendation_service.recommend_investments, user_profile)
 
         # Return the investment recommendations as a JSONResponse
         return JSONResponse(content=investment_recommendations)
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -75,11 +90,15 @@ async def predict_credit_score(user_financial_data: Dict):
         if not user_financial_data or not isinstance(user_financial_data, dict):
             raise HTTPException(status_code=400, detail="Invalid user financial data")
 
-        # Call credit_score_prediction_service to predict the credit score
-        credit_score_prediction = await credit_score_prediction_service.predict_credit_score(user_financial_data)
+        # Call credit_score_prediction_service in the inference executor to predict the credit score
+        credit_score_prediction = await inference_executor.run(CREDIT_SCORE_PREDICTION, credit_score_prediction_service.predict_credit_score, user_financial_data)
 
         # Return the predicted credit score and contributing factors as a JSONResponse
         return JSONResponse(content=credit_score_prediction)
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,213 @@
+import io
+import os
+import json
+import queue
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, List
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Settings for bulk streaming endpoints, overridable through the environment.
+# chunk_size is the number of records passed to the model at once; max_pending_chunks is the
+# number of Arrow body chunks buffered ahead of the reader thread before the upload is paused.
+STREAMING_CONFIG = {
+    'chunk_size': int(os.environ.get('ML_BULK_CHUNK_SIZE', 1024)),
+    'max_pending_chunks': int(os.environ.get('ML_BULK_MAX_PENDING_CHUNKS', 16)),
+}
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Marks the end of the record batches of an Arrow stream
+_END_OF_STREAM = object()
+
+class RecordError:
+    """
+    Placeholder for an input record that could not be parsed, kept in the record
+    stream so that output lines stay aligned with input lines
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+
+def arrow_available() -> bool:
+    """
+    Checks whether pyarrow is installed, which is required for Arrow IPC input.
+
+    Returns:
+        bool: True if Arrow IPC streams can be read.
+    """
+    return pa is not None
+
+async def iter_ndjson_records(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parses newline-delimited JSON from an async byte stream, one line at a time.
+
+    Only the current partial line is buffered, so memory stays bounded regardless of
+    the size of the upload. Blank lines are skipped.
+
+    Args:
+        byte_stream (AsyncIterator[bytes]): Raw request body chunks.
+
+    Yields:
+        Any: A dict per JSON object line, or a RecordError for a malformed line.
+    """
+    buffer = b''
+    async for chunk in byte_stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+
+    if buffer.strip():
+        yield _parse_ndjson_line(buffer)
+
+class _ChunkReader(io.RawIOBase):
+    """
+    Blocking, read-only file over body chunks handed over from the event loop through
+    a queue, on which pyarrow reads the stream in a thread. None marks the end of the body
+    """
+
+    def __init__(self, chunks: queue.Queue):
+        self._chunks = chunks
+        self._buffer = memoryview(b'')
+        self._ended = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # pyarrow expects a read to be short only at the end, so wait until buffer is full
+        filled = 0
+        while filled < len(buffer):
+            if not self._buffer:
+                if self._ended:
+                    break
+                chunk = self._chunks.get()
+                if chunk is None:
+                    self._ended = True
+                    continue
+                self._buffer = memoryview(chunk)
+            size = min(len(buffer) - filled, len(self._buffer))
+            buffer[filled:filled + size] = self._buffer[:size]
+            self._buffer = self._buffer[size:]
+            filled += size
+        return filled
+
+def _read_arrow_batches(source: _ChunkReader, batches: queue.Queue) -> None:
+    # Runs in the reader thread: parses every record batch as soon as its bytes have arrived
+    try:
+        for batch in pa.ipc.open_stream(source):
+            batches.put(batch)
+        batches.put(_END_OF_STREAM)
+    except Exception as e:
+        batches.put(e)
+
+async def iter_arrow_records(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Reads records from an Arrow IPC stream uploaded as an async byte stream.
+
+    The body is parsed incrementally by a reader thread while it is being received, so
+    records are yielded before the upload ends and the event loop never blocks on it.
+    At most max_pending_chunks body chunks are buffered ahead of the reader; beyond that
+    the upload is paused.
+
+    Args:
+        byte_stream (AsyncIterator[bytes]): Raw request body chunks.
+
+    Yields:
+        Dict: One dict per row.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+    if not arrow_available():
+        raise RuntimeError("pyarrow is required to read Arrow IPC streams")
+
+    loop = asyncio.get_event_loop()
+    chunks = queue.Queue(maxsize=STREAMING_CONFIG['max_pending_chunks'])
+    batches = queue.Queue()
+    threading.Thread(target=_read_arrow_batches, args=(_ChunkReader(chunks), batches), daemon=True).start()
+
+    try:
+        async for chunk in byte_stream:
+            if not chunk:
+                continue
+            try:
+                chunks.put_nowait(chunk)
+            except queue.Full:
+                await loop.run_in_executor(None, chunks.put, chunk)
+
+            # Yield the batches parsed so far without waiting for more
+            while not batches.empty():
+                batch = batches.get_nowait()
+                if batch is _END_OF_STREAM:
+                    return
+                for record in _batch_records(batch):
+                    yield record
+
+        await loop.run_in_executor(None, chunks.put, None)
+        while True:
+            batch = await loop.run_in_executor(None, batches.get)
+            if batch is _END_OF_STREAM:
+                return
+            for record in _batch_records(batch):
+                yield record
+    finally:
+        # Ends the body for the reader thread, also when the consumer stops early
+        while not chunks.empty():
+            chunks.get_nowait()
+        chunks.put_nowait(None)
+
+def _batch_records(batch: Any) -> List[Dict]:
+    # Items of the batch queue are record batches, or the exception that ended the stream
+    if isinstance(batch, Exception):
+        raise batch
+    return batch.to_pylist()
+
+async def iter_chunks(records: AsyncIterator[Any], chunk_size: int = STREAMING_CONFIG['chunk_size']) -> AsyncIterator[List[Any]]:
+    """
+    Groups an async record stream into lists of at most chunk_size records.
+
+    Args:
+        records (AsyncIterator[Any]): The record stream.
+        chunk_size (int): Maximum number of records per chunk.
+
+    Yields:
+        List[Any]: The next chunk of records.
+    """
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+def to_ndjson_line(record: Dict[str, Any]) -> bytes:
+    """
+    Serializes a record as one NDJSON line.
+
+    Args:
+        record (Dict[str, Any]): The record to serialize.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON line, including the trailing newline.
+    """
+    return (json.dumps(record, default=str) + '\n').encode('utf-8')
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return RecordError(f"Invalid JSON: {str(e)}")
+    if not isinstance(record, dict):
+        return RecordError("Expected a JSON object")
+    return record
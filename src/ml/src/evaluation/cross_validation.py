@@ -0,0 +1,256 @@
+import os
+import math
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from ..preprocessing.preprocessing_cache import PreprocessingCache
+from ..training.parallel_training import run_pinned
+
+logger = logging.getLogger(__name__)
+
+# Default cross-validation settings, overridable through the environment.
+# max_workers is the number of fold processes; 0 means one per fold.
+CROSS_VALIDATION_CONFIG = {
+    'n_splits': int(os.environ.get('ML_CV_FOLDS', 5)),
+    'max_workers': int(os.environ.get('ML_CV_MAX_WORKERS', 0)),
+    'confidence': float(os.environ.get('ML_CV_CONFIDENCE', 0.95)),
+    'gap': int(os.environ.get('ML_CV_GAP', 0)),
+    'seed': 42,
+}
+
+# Columns that order the rows in time, in order of preference
+TIME_COLUMNS = ['date', 'transaction_date', 'year_month']
+
+# Cache key of the data shared with the fold processes
+SHARED_DATA_KEY = 'cv_data'
+
+Split = Tuple[np.ndarray, np.ndarray]
+
+def kfold_splits(n_samples: int, n_splits: int = None, shuffle: bool = True, seed: int = None) -> List[Split]:
+    """
+    Splits row positions into k folds; every row is tested exactly once.
+
+    Args:
+        n_samples (int): Number of rows.
+        n_splits (int): Number of folds. Defaults to ML_CV_FOLDS.
+        shuffle (bool): Whether to shuffle the rows before splitting.
+        seed (int): Seed of the shuffle.
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: The training and test positions of every fold.
+    """
+    n_splits = n_splits or CROSS_VALIDATION_CONFIG['n_splits']
+    if not 2 <= n_splits <= n_samples:
+        raise ValueError(f"Cannot split {n_samples} rows into {n_splits} folds")
+
+    positions = np.arange(n_samples)
+    if shuffle:
+        positions = np.random.RandomState(CROSS_VALIDATION_CONFIG['seed'] if seed is None else seed).permutation(n_samples)
+
+    splits = []
+    for test in np.array_split(positions, n_splits):
+        mask = np.ones(n_samples, dtype=bool)
+        mask[test] = False
+        splits.append((np.flatnonzero(mask), np.sort(test)))
+    return splits
+
+def time_series_splits(timestamps: Union[pd.Series, np.ndarray], n_splits: int = None, gap: int = None) -> List[Split]:
+    """
+    Splits row positions into expanding-window folds that never train on the future.
+
+    The distinct timestamps are cut into n_splits + 1 consecutive blocks. Fold i tests on
+    block i + 1 and trains on all earlier blocks, so rows with the same timestamp are never
+    split between training and test and every test block follows its training data.
+
+    Args:
+        timestamps (Union[pd.Series, np.ndarray]): Sortable time of every row, e.g. dates or months.
+        n_splits (int): Number of folds. Defaults to ML_CV_FOLDS.
+        gap (int): Distinct timestamps left out between training and test, so that features
+            looking back in time do not leak the test period. Defaults to ML_CV_GAP.
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: The training and test positions of every fold.
+    """
+    n_splits = n_splits or CROSS_VALIDATION_CONFIG['n_splits']
+    gap = CROSS_VALIDATION_CONFIG['gap'] if gap is None else gap
+
+    # Position of every row's timestamp among the sorted distinct timestamps
+    periods, codes = np.unique(np.asarray(timestamps), return_inverse=True)
+    if len(periods) < n_splits + 1 + gap:
+        raise ValueError(f"Cannot split {len(periods)} distinct timestamps into {n_splits} time-ordered folds")
+
+    blocks = np.array_split(np.arange(len(periods)), n_splits + 1)
+    splits = []
+    for block in blocks[1:]:
+        train_end = block[0] - gap
+        splits.append((np.flatnonzero(codes < train_end),
+                       np.flatnonzero((codes >= block[0]) & (codes <= block[-1]))))
+    return splits
+
+def find_time_column(data: pd.DataFrame) -> str:
+    """
+    Finds the column that orders the rows of data in time.
+
+    Args:
+        data (pd.DataFrame): The data to split.
+
+    Returns:
+        str: The first of TIME_COLUMNS present in data.
+    """
+    for column in TIME_COLUMNS:
+        if column in data.columns:
+            return column
+    raise ValueError(f"Time-series splits need one of the columns {TIME_COLUMNS}")
+
+def splits_by_time(data: pd.DataFrame, time_series: bool) -> bool:
+    """
+    Whether make_splits splits data by time: if asked to and data has one of TIME_COLUMNS.
+    Data without one, such as the per-user spending rows, whose 'month' is a calendar month
+    and not a period, cannot be ordered in time and is split by shuffled k-fold instead.
+
+    Args:
+        data (pd.DataFrame): The data to split.
+        time_series (bool): Whether a split by time is asked for.
+
+    Returns:
+        bool: Whether the rows are split by time.
+    """
+    return time_series and any(column in data.columns for column in TIME_COLUMNS)
+
+def make_splits(data: pd.DataFrame, n_splits: int = None, time_series: bool = False, seed: int = None) -> List[Split]:
+    """
+    Splits the rows of data into cross-validation folds.
+
+    Args:
+        data (pd.DataFrame): The data to split.
+        n_splits (int): Number of folds. Defaults to ML_CV_FOLDS.
+        time_series (bool): Whether to split by time with time_series_splits instead of shuffled k-fold,
+            if data has a time column (see splits_by_time).
+        seed (int): Seed of the shuffle of k-fold splits.
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: The training and test positions of every fold.
+    """
+    if splits_by_time(data, time_series):
+        return time_series_splits(data[find_time_column(data)], n_splits)
+    return kfold_splits(len(data), n_splits, seed=seed)
+
+def _t_quantile(probability: float, degrees_of_freedom: int) -> float:
+    # Student's t quantile from SciPy, which scikit-learn depends on; the normal quantile otherwise
+    try:
+        from scipy import stats
+        return float(stats.t.ppf(probability, degrees_of_freedom))
+    except ImportError:
+        return NormalDist().inv_cdf(probability)
+
+def aggregate_metrics(fold_metrics: Sequence[Dict[str, float]], confidence: float = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Aggregates the metrics of the folds into their mean, spread and a confidence interval
+    of the mean from Student's t distribution.
+
+    Args:
+        fold_metrics (Sequence[Dict[str, float]]): The metrics of every fold, as returned by the evaluate functions.
+        confidence (float): Confidence level of the intervals. Defaults to ML_CV_CONFIDENCE.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: For every metric present in all folds, its 'mean', sample 'std',
+        'ci_low' and 'ci_high' and the per-fold 'values'.
+    """
+    confidence = confidence or CROSS_VALIDATION_CONFIG['confidence']
+    names = [name for name in fold_metrics[0] if all(name in metrics for metrics in fold_metrics[1:])]
+
+    aggregated = {}
+    for name in names:
+        values = np.array([float(metrics[name]) for metrics in fold_metrics])
+        mean = float(values.mean())
+        std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+        half_width = 0.0
+        if len(values) > 1:
+            half_width = _t_quantile((1 + confidence) / 2, len(values) - 1) * std / math.sqrt(len(values))
+        aggregated[name] = {'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width,
+                            'values': values.tolist()}
+    return aggregated
+
+def run_fold(shared: Union[str, pd.DataFrame], fit: Callable[[pd.DataFrame], Any],
+             evaluate: Callable[[Any, pd.DataFrame, pd.Series], Dict[str, float]], target_column: str,
+             train_positions: np.ndarray, test_positions: np.ndarray) -> Dict[str, float]:
+    """
+    Trains a model on the training rows of one fold and evaluates it on its test rows.
+
+    Args:
+        shared (Union[str, pd.DataFrame]): The data, or the directory it was shared through by cross_validate.
+        fit (Callable[[pd.DataFrame], Any]): Trains a new model on a frame holding the features and the target.
+        evaluate (Callable[[Any, pd.DataFrame, pd.Series], Dict[str, float]]): Evaluates a model
+            on test features and targets, e.g. an evaluate_* function of model_evaluation.
+        target_column (str): Column of the target.
+        train_positions (np.ndarray): Positions of the training rows.
+        test_positions (np.ndarray): Positions of the test rows.
+
+    Returns:
+        Dict[str, float]: The metrics of the fold.
+    """
+    data = PreprocessingCache(shared).get(SHARED_DATA_KEY) if isinstance(shared, str) else shared
+    model = fit(data.iloc[train_positions])
+    test_data = data.iloc[test_positions]
+    return evaluate(model, test_data.drop(target_column, axis=1), test_data[target_column])
+
+def cross_validate(data: pd.DataFrame, fit: Callable[[pd.DataFrame], Any],
+                   evaluate: Callable[[Any, pd.DataFrame, pd.Series], Dict[str, float]], target_column: str,
+                   n_splits: int = None, time_series: bool = False, max_workers: int = None,
+                   confidence: float = None) -> Dict[str, Any]:
+    """
+    Cross-validates a model, training the folds concurrently.
+
+    Every fold runs in its own process pinned to its own CPUs. The data is written once to
+    an Arrow file that the fold processes memory-map, instead of being pickled to each of them.
+
+    Args:
+        data (pd.DataFrame): Features and target.
+        fit (Callable[[pd.DataFrame], Any]): Trains a new model on a frame holding the features
+            and the target. Must be a module-level function, as it is sent to the fold processes.
+        evaluate (Callable[[Any, pd.DataFrame, pd.Series], Dict[str, float]]): Evaluates a model
+            on test features and targets. Must be a module-level function.
+        target_column (str): Column of the target.
+        n_splits (int): Number of folds. Defaults to ML_CV_FOLDS.
+        time_series (bool): Whether to split by time (see time_series_splits) instead of shuffled k-fold,
+            if data has a time column (see splits_by_time).
+        max_workers (int): Number of fold processes. Defaults to ML_CV_MAX_WORKERS, or one per fold.
+        confidence (float): Confidence level of the intervals. Defaults to ML_CV_CONFIDENCE.
+
+    Returns:
+        Dict[str, Any]: The aggregated 'metrics' (see aggregate_metrics), the 'folds' with their
+        sizes and metrics, and the 'split' used.
+    """
+    splits = make_splits(data, n_splits, time_series)
+    # Positions are used, so the index of data need not be unique
+    data = data.reset_index(drop=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared_cache = PreprocessingCache(directory, max_entries=1)
+        shared_cache.put(SHARED_DATA_KEY, data)
+        # Without pyarrow the cache is disabled, and the data is sent to the processes instead
+        shared = directory if shared_cache.enabled else data
+
+        names = [f"fold_{i}" for i in range(len(splits))]
+        futures = run_pinned({name: run_fold for name in names},
+                             {name: (shared, fit, evaluate, target_column, train, test)
+                              for name, (train, test) in zip(names, splits)},
+                             max_workers=max_workers or CROSS_VALIDATION_CONFIG['max_workers'] or None)
+
+    folds = []
+    for name, (train, test) in zip(names, splits):
+        metrics = futures[name].result()
+        logger.info(f"{name}: trained on {len(train)} rows, tested on {len(test)} rows: {metrics}")
+        folds.append({'train_rows': len(train), 'test_rows': len(test), 'metrics': metrics})
+
+    return {
+        'split': 'time_series' if splits_by_time(data, time_series) else 'kfold',
+        'folds': folds,
+        'metrics': aggregate_metrics([fold['metrics'] for fold in folds], confidence),
+    }
+
+# TODO: Add stratified k-fold splits for the classification models with rare classes
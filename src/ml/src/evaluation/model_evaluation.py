@@ -1,14 +1,10 @@
+import time
 import numpy as np
 from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 
-# Assuming these models are imported from the config file
-from ..config.model_config import (
-    TRANSACTION_CATEGORIZATION_MODEL,
-    SPENDING_PREDICTION_MODEL,
-    INVESTMENT_RECOMMENDATION_MODEL,
-    CREDIT_SCORE_PREDICTION_MODEL
-)
+# The model configurations are defined next to the models; config/model_config.ts has no Python counterpart
+from ..models.investment_recommendation import INVESTMENT_RECOMMENDATION_MODEL
 
 def evaluate_transaction_categorization(model, X_test, y_test):
     """
@@ -182,6 +178,195 @@ def plot_regression_results(y_true, y_pred, model_name):
     plt.ylabel('Predicted')
     plt.show()
 
+def measure_prediction_latency(model, X_test, repeats=5, single_rows=20):
+    """
+    Measures the prediction latency of a model, both for the whole test set at once and
+    for single rows as served by the API.
+
+    Args:
+    model (object): A model with a predict() method
+    X_test (pandas.DataFrame): The feature set for testing
+    repeats (int): Number of timed predictions on the whole test set
+    single_rows (int): Number of timed single-row predictions
+
+    Returns:
+    dict: Median batch latency and p50/p95 single-row latency in milliseconds
+    """
+    batch_timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X_test)
+        batch_timings.append((time.perf_counter() - start) * 1000)
+
+    row_timings = []
+    for i in range(min(single_rows, len(X_test))):
+        row = X_test.iloc[[i]] if hasattr(X_test, 'iloc') else X_test[i:i + 1]
+        start = time.perf_counter()
+        model.predict(row)
+        row_timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'batch_ms': float(np.median(batch_timings)),
+        'single_row_p50_ms': float(np.percentile(row_timings, 50)) if row_timings else 0.0,
+        'single_row_p95_ms': float(np.percentile(row_timings, 95)) if row_timings else 0.0
+    }
+
+def compare_metrics(baseline_metrics, candidate_metrics):
+    """
+    Computes the difference of every metric between a candidate and a baseline model.
+
+    Args:
+    baseline_metrics (dict): Metrics of the baseline model, as returned by the evaluate functions
+    candidate_metrics (dict): Metrics of the candidate model
+
+    Returns:
+    dict: Candidate minus baseline value for each metric present in both
+    """
+    return {
+        name: float(candidate_metrics[name]) - float(baseline_metrics[name])
+        for name in baseline_metrics if name in candidate_metrics
+    }
+
+def check_metric_drop(baseline_metrics, candidate_metrics, metric, max_drop, higher_is_better=True):
+    """
+    Checks that a candidate model does not degrade a metric by more than a tolerance.
+
+    Args:
+    baseline_metrics (dict): Metrics of the baseline model
+    candidate_metrics (dict): Metrics of the candidate model
+    metric (str): Name of the gating metric
+    max_drop (float): Largest acceptable degradation, in the units of the metric
+    higher_is_better (bool): Whether larger values of the metric are better
+
+    Returns:
+    tuple: (whether the candidate passes, degradation of the metric)
+    """
+    delta = float(candidate_metrics[metric]) - float(baseline_metrics[metric])
+    drop = -delta if higher_is_better else delta
+    return drop <= max_drop, drop
+
+def fit_transaction_categorization(training_data):
+    """
+    Trains a new transaction categorization model for cross-validation.
+
+    Args:
+    training_data (pandas.DataFrame): Transactions with their 'category'
+
+    Returns:
+    TransactionCategorizationModel: The trained model
+    """
+    from ..models.transaction_categorization import TransactionCategorizationModel
+
+    model = TransactionCategorizationModel()
+    model.train(training_data)
+    return model
+
+def fit_spending_prediction(training_data):
+    """
+    Trains a new spending prediction model for cross-validation.
+
+    Args:
+    training_data (pandas.DataFrame): User rows with their 'target_spending'
+
+    Returns:
+    SpendingPredictionModel: The trained model
+    """
+    from ..models.spending_prediction import SpendingPredictionModel
+
+    model = SpendingPredictionModel()
+    model.train(training_data)
+    return model
+
+def fit_investment_recommendation(training_data):
+    """
+    Trains a new investment recommendation model for cross-validation.
+
+    Args:
+    training_data (pandas.DataFrame): User rows with their 'investment_allocation'
+
+    Returns:
+    InvestmentRecommendationModel: The trained model
+    """
+    from ..models.investment_recommendation import InvestmentRecommendationModel
+
+    model = InvestmentRecommendationModel()
+    model.train(training_data)
+    return model
+
+def fit_credit_score_prediction(training_data):
+    """
+    Trains a new credit score prediction model for cross-validation.
+
+    Args:
+    training_data (pandas.DataFrame): Features with the 'credit_score'
+
+    Returns:
+    CreditScorePredictionModel: The trained model
+    """
+    from ..models.credit_score_prediction import CreditScorePredictionModel
+
+    model = CreditScorePredictionModel()
+    model.train(training_data.drop('credit_score', axis=1), training_data['credit_score'])
+    return model
+
+class AllocationPredictor:
+    """
+    Gives an investment recommendation model the DataFrame-in, array-out predict() of the
+    other models: the allocation probabilities of a batch of users
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X):
+        return self.model.predict_batch(X)
+
+def evaluate_investment_allocations(model, X_test, y_test):
+    """
+    Evaluates an investment recommendation model on allocation classes, comparing the
+    predicted probabilities with the one-hot encoded true allocations.
+
+    Args:
+    model (InvestmentRecommendationModel): The trained model
+    X_test (pandas.DataFrame): The feature set for testing
+    y_test (pandas.Series): The true allocation classes
+
+    Returns:
+    dict: The metrics of evaluate_investment_recommendation
+    """
+    y_true = np.eye(INVESTMENT_RECOMMENDATION_MODEL['output_classes'])[np.asarray(y_test).astype(int)]
+    return evaluate_investment_recommendation(AllocationPredictor(model), X_test, y_true)
+
+# Training function, evaluation function, target column and whether folds are split by time, per model type.
+# Transactions and spending depend on time, so they are validated on later periods than they are trained on
+# when the data has a time column; the per-user spending rows have none and fall back to k-fold (see splits_by_time).
+CROSS_VALIDATION_MODELS = {
+    'transaction': (fit_transaction_categorization, evaluate_transaction_categorization, 'category', True),
+    'spending': (fit_spending_prediction, evaluate_spending_prediction, 'target_spending', True),
+    'investment': (fit_investment_recommendation, evaluate_investment_allocations, 'investment_allocation', False),
+    'credit': (fit_credit_score_prediction, evaluate_credit_score_prediction, 'credit_score', False),
+}
+
+def cross_validate_model(model_type, data, n_splits=None, max_workers=None, confidence=None):
+    """
+    Cross-validates one of the models with its evaluate function, training the folds concurrently.
+
+    Args:
+    model_type (str): One of 'transaction', 'spending', 'investment' and 'credit'
+    data (pandas.DataFrame): Features and target of the model
+    n_splits (int): Number of folds. Defaults to ML_CV_FOLDS
+    max_workers (int): Number of fold processes. Defaults to ML_CV_MAX_WORKERS, or one per fold
+    confidence (float): Confidence level of the metric intervals. Defaults to ML_CV_CONFIDENCE
+
+    Returns:
+    dict: The mean, standard deviation and confidence interval of every metric and the per-fold results
+    """
+    from .cross_validation import cross_validate
+
+    fit, evaluate, target_column, time_series = CROSS_VALIDATION_MODELS[model_type]
+    return cross_validate(data, fit, evaluate, target_column, n_splits=n_splits, time_series=time_series,
+                          max_workers=max_workers, confidence=confidence)
+
 def calculate_risk_adjusted_return(y_true, y_pred):
     """
     Calculates a custom risk-adjusted return metric.
@@ -203,5 +388,5 @@ Human tasks:
 1. Implement additional evaluation metrics specific to each model type (Required)
 2. Create visualization functions for model-specific performance metrics (Required)
 3. Develop a comprehensive evaluation report generator for all models (Optional)
-4. Implement cross-validation functionality for more robust model evaluation (Required)
+4. Validate the time column and number of folds used for cross-validating each model on production data (Required)
 """
\ No newline at end of file
@@ -0,0 +1,181 @@
+import os
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .executor import InferenceExecutor, ExecutorSaturatedError
+
+logger = logging.getLogger(__name__)
+
+# Default micro-batching settings, overridable through the environment.
+# max_wait_ms bounds the extra latency a request can spend waiting for its batch to fill up.
+BATCHING_CONFIG = {
+    'max_batch_size': int(os.environ.get('ML_BATCH_MAX_SIZE', 64)),
+    'max_wait_ms': float(os.environ.get('ML_BATCH_MAX_WAIT_MS', 5)),
+}
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests for one model into batches.
+
+    Requests are queued until either max_batch_size items are waiting or the oldest
+    waiting item has waited max_wait_ms. The batch function is then called once for the
+    whole batch and its results are fanned back out to the awaiting coroutines in order.
+
+    With an executor, batches run in its worker pool instead of on the event loop, and
+    the next batch is collected while the previous one is still running.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = BATCHING_CONFIG['max_batch_size'],
+                 max_wait_ms: float = BATCHING_CONFIG['max_wait_ms'],
+                 executor: InferenceExecutor = None):
+        """
+        Initializes the MicroBatcher.
+
+        Args:
+            name (str): Name of the batcher, used in logs and stats.
+            batch_fn (Callable[[List[Any]], Sequence[Any]]): Function that maps a list of
+                items to a sequence of results of the same length. A result that is an
+                Exception instance is raised to the caller of that item only.
+            max_batch_size (int): Maximum number of items per batch.
+            max_wait_ms (float): Maximum time the first item of a batch waits before flushing.
+            executor (InferenceExecutor): Optional executor the batch function is dispatched
+                through, under the concurrency limit registered for name.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        self._queue = None
+        self._worker = None
+        self._flushes = set()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queues an item for the next batch and waits for its result.
+
+        Args:
+            item (Any): The input for a single prediction.
+
+        Returns:
+            Any: The result of the batch function for this item.
+        """
+        self._ensure_worker()
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Stops the background worker. Items still queued are failed with a RuntimeError.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"Batcher {self.name} was closed"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns batching statistics.
+
+        Returns:
+            Dict[str, Any]: Number of batches, number of items and average batch size.
+        """
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    def _ensure_worker(self) -> None:
+        # The queue and worker are created lazily so they bind to the running event loop
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+
+            # Keep collecting until the batch is full or the first item's deadline passes
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            if self.executor is None:
+                await self._flush(batch)
+            else:
+                flush = asyncio.ensure_future(self._flush(batch))
+                self._flushes.add(flush)
+                flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # Skip requests whose callers have already gone away
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        items = [item for item, _ in batch]
+        self._batches += 1
+        self._items += len(items)
+
+        try:
+            results = await self._execute(items)
+        except Exception as e:
+            if len(items) == 1 or isinstance(e, ExecutorSaturatedError):
+                results = [e] * len(items)
+            else:
+                # Retry one by one so that a single malformed request does not fail its neighbours
+                logger.warning(f"Batch of {len(items)} failed in {self.name}, retrying items individually: {str(e)}")
+                results = []
+                for item in items:
+                    try:
+                        results.extend(await self._execute([item]))
+                    except Exception as item_error:
+                        results.append(item_error)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _execute(self, items: List[Any]) -> List[Any]:
+        if self.executor is None:
+            results = list(self.batch_fn(items))
+        else:
+            results = list(await self.executor.run(self.name, self.batch_fn, items))
+        if len(results) != len(items):
+            raise RuntimeError(f"Batch function for {self.name} returned {len(results)} results for {len(items)} items")
+        return results
+
+# TODO: Adapt max_wait_ms to the observed arrival rate so lightly loaded workers do not wait needlessly
@@ -0,0 +1,190 @@
+import os
+import re
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Default cache settings, overridable through the environment. A max_size of 0 disables the cache.
+CATEGORIZATION_CACHE_CONFIG = {
+    'max_size': int(os.environ.get('ML_CATEGORIZATION_CACHE_SIZE', 10000)),
+    'ttl_seconds': float(os.environ.get('ML_CATEGORIZATION_CACHE_TTL_SECONDS', 3600)),
+}
+
+_NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+def normalize_description(description: str) -> str:
+    """
+    Normalizes a transaction description so that recurring merchant strings map to the
+    same key, e.g. 'NETFLIX.COM 866-579-7172' and 'Netflix.com #4411' both become 'netflix com'.
+
+    Args:
+        description (str): Raw transaction description.
+
+    Returns:
+        str: Lowercased description without punctuation and without tokens containing
+        digits (store numbers, reference ids, phone numbers).
+    """
+    tokens = _NON_ALPHANUMERIC.sub(' ', str(description).lower()).split()
+    return ' '.join(token for token in tokens if not any(char.isdigit() for char in token))
+
+def amount_bucket(amount: float) -> int:
+    """
+    Maps a transaction amount to a logarithmic bucket, so that amounts of the same order
+    of magnitude share cache entries while e.g. a $4 coffee and a $400 bill do not.
+
+    Args:
+        amount (float): Transaction amount.
+
+    Returns:
+        int: Signed bucket index.
+    """
+    amount = float(amount)
+    bucket = int(math.log2(abs(amount) + 1))
+    return -bucket if amount < 0 else bucket
+
+class CategorizationCache:
+    """
+    Thread-safe LRU cache with time-to-live of predicted categories, keyed on the
+    normalized description and amount bucket of a transaction.
+
+    Entries are bound to the model instance that produced them. When a different model
+    is served (for example after a hot swap in the model registry) the cache is cleared.
+    """
+
+    def __init__(self, max_size: int = CATEGORIZATION_CACHE_CONFIG['max_size'],
+                 ttl_seconds: float = CATEGORIZATION_CACHE_CONFIG['ttl_seconds']):
+        """
+        Initializes the CategorizationCache.
+
+        Args:
+            max_size (int): Maximum number of cached categories. 0 disables caching.
+            ttl_seconds (float): Time after which a cached category expires.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Tuple[str, int], Tuple[Any, float]]' = OrderedDict()
+        self._model = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def make_key(self, transaction: Dict) -> Optional[Tuple[str, int]]:
+        """
+        Builds the cache key of a transaction.
+
+        Args:
+            transaction (Dict): Transaction with 'description' and 'amount'.
+
+        Returns:
+            Optional[Tuple[str, int]]: The key, or None if the transaction cannot be cached.
+        """
+        try:
+            description = normalize_description(transaction['description'])
+            bucket = amount_bucket(transaction['amount'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return (description, bucket) if description else None
+
+    def get(self, transaction: Dict, model: Any) -> Optional[Any]:
+        """
+        Looks up the cached category of a transaction.
+
+        Args:
+            transaction (Dict): The transaction to categorize.
+            model (Any): The model currently being served.
+
+        Returns:
+            Optional[Any]: The cached category, or None on a miss.
+        """
+        if self.max_size <= 0:
+            return None
+
+        key = self.make_key(transaction)
+        with self._lock:
+            if model is not self._model:
+                self._invalidate(model)
+
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, transaction: Dict, category: Any, model: Any) -> None:
+        """
+        Caches the category predicted for a transaction.
+
+        Args:
+            transaction (Dict): The categorized transaction.
+            category (Any): The predicted category.
+            model (Any): The model that made the prediction. Predictions of a model that is
+                no longer being served are not cached.
+        """
+        if self.max_size <= 0:
+            return
+
+        key = self.make_key(transaction)
+        if key is None:
+            return
+
+        with self._lock:
+            if model is not self._model:
+                return
+
+            self._entries[key] = (category, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes all cached categories.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns cache statistics.
+
+        Returns:
+            Dict[str, Any]: Size, hit and miss counts, hit rate and eviction counts.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations
+            }
+
+    def _invalidate(self, model: Any) -> None:
+        # Called with the lock held when a different model starts being served
+        if self._model is not None:
+            self._invalidations += 1
+        self._entries.clear()
+        self._model = model
+
+# The cache shared by all transaction categorization calls in this process
+categorization_cache = CategorizationCache()
+
+# TODO: Share the cache between worker processes (e.g. through Redis) when running the process executor
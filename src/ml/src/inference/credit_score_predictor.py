@@ -2,23 +2,20 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List
 
-from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel
-from src.ml.src.config.model_config import CREDIT_SCORE_PREDICTION_MODEL
-
-# Define the path to the saved model
-MODEL_PATH = 'path/to/saved/credit_score_model'
+from ..models.credit_score_prediction import CreditScorePredictionModel
+from .model_registry import get_model, model_registry, CREDIT_SCORE_PREDICTION
 
 class CreditScorePredictor:
     """
     A class that loads the trained credit score prediction model and provides methods for making predictions.
     """
 
-    def __init__(self):
+    @property
+    def model(self) -> CreditScorePredictionModel:
         """
-        Initializes the CreditScorePredictor by loading the trained model.
+        The currently served credit score prediction model, shared through the model registry.
         """
-        self.model = CreditScorePredictionModel()
-        self.model.load(MODEL_PATH)
+        return get_model(CREDIT_SCORE_PREDICTION)
 
     def predict_credit_score(self, input_data: pd.DataFrame) -> float:
         """
@@ -36,11 +33,8 @@ class CreditScorePredictor:
         # Validate input_data
         self._validate_input(input_data)
 
-        # Preprocess the input_data
-        preprocessed_data = self.model.preprocess_data(input_data)
-
-        # Make prediction
-        prediction = self.model.predict(preprocessed_data)
+        # Make prediction; the model applies its fitted preprocessing itself
+        prediction = self.model.predict(input_data)
 
         return float(prediction[0])
 
@@ -60,11 +54,8 @@ class CreditScorePredictor:
         # Validate batch_data
         self._validate_input(batch_data)
 
-        # Preprocess the batch_data
-        preprocessed_data = self.model.preprocess_data(batch_data)
-
-        # Make predictions
-        predictions = self.model.predict(preprocessed_data)
+        # Make predictions with a single model handle, even if a new version is swapped in meanwhile
+        predictions = self.model.predict(batch_data)
 
         return predictions
 
@@ -76,11 +67,20 @@ class CreditScorePredictor:
             dict: Model information including version and input features.
         """
         return {
-            "model_name": CREDIT_SCORE_PREDICTION_MODEL["name"],
-            "model_version": CREDIT_SCORE_PREDICTION_MODEL["version"],
-            "input_features": CREDIT_SCORE_PREDICTION_MODEL["input_features"]
+            "model_name": CREDIT_SCORE_PREDICTION,
+            "model_version": model_registry.get_version(CREDIT_SCORE_PREDICTION),
+            "input_features": self.input_features()
         }
 
+    def input_features(self) -> List[str]:
+        """
+        Returns the features the served model requires: the numerical columns it was fitted on.
+
+        Returns:
+            List[str]: The feature names.
+        """
+        return list(self.model.fill_values)
+
     def _validate_input(self, input_data: pd.DataFrame) -> None:
         """
         Validates that the input data contains all required features.
@@ -91,7 +91,7 @@ class CreditScorePredictor:
         Raises:
             ValueError: If any required features are missing.
         """
-        required_features = set(CREDIT_SCORE_PREDICTION_MODEL["input_features"])
+        required_features = set(self.input_features())
         input_features = set(input_data.columns)
 
         if not required_features.issubset(input_features):
@@ -107,6 +107,19 @@ def load_credit_score_predictor() -> CreditScorePredictor:
     """
     return CreditScorePredictor()
 
+def predict_credit_scores(records: List[Dict]) -> List[float]:
+    """
+    Predicts credit scores for a list of records with a single batched forward pass.
+
+    Args:
+        records (List[Dict]): Input features, one dictionary per user.
+
+    Returns:
+        List[float]: Predicted credit scores, in the same order as records.
+    """
+    predictions = CreditScorePredictor().batch_predict_credit_scores(pd.DataFrame(records))
+    return [float(prediction) for prediction in predictions]
+
 # TODO: Implement proper error handling for invalid input data
 # TODO: Add logging for model predictions and any issues encountered
 # TODO: Implement caching mechanism for frequent predictions to improve performance
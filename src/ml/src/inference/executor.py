@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default executor settings, overridable through the environment.
+# mode is 'thread' (bounded thread pool) or 'process' (process pool whose workers preload all models).
+EXECUTOR_CONFIG = {
+    'mode': os.environ.get('ML_EXECUTOR_MODE', 'thread'),
+    'max_workers': int(os.environ.get('ML_EXECUTOR_MAX_WORKERS', os.cpu_count() or 4)),
+    'max_concurrency_per_model': int(os.environ.get('ML_EXECUTOR_MAX_CONCURRENCY_PER_MODEL', 2)),
+    'max_queue_depth': int(os.environ.get('ML_EXECUTOR_MAX_QUEUE_DEPTH', 100)),
+}
+
+# Number of recent queue wait samples kept per model for percentile metrics
+WAIT_TIME_SAMPLES = 1000
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a model's inference queue is full and the request should be retried later"""
+
+def _preload_models() -> None:
+    # Runs once in every worker process so that each worker serves from its own loaded models
+    from .model_registry import load_all_models
+    load_all_models()
+
+class InferenceExecutor:
+    """
+    Runs blocking model inference off the asyncio event loop.
+
+    Calls are dispatched to a bounded thread pool or a process pool. Each model has
+    its own concurrency limit, and once more than max_queue_depth calls are waiting
+    for a model new calls are rejected with ExecutorSaturatedError instead of queueing
+    without bound.
+    """
+
+    def __init__(self, mode: str = EXECUTOR_CONFIG['mode'],
+                 max_workers: int = EXECUTOR_CONFIG['max_workers'],
+                 max_concurrency_per_model: int = EXECUTOR_CONFIG['max_concurrency_per_model'],
+                 max_queue_depth: int = EXECUTOR_CONFIG['max_queue_depth'],
+                 model_concurrency: Dict[str, int] = None):
+        """
+        Initializes the InferenceExecutor. The worker pool is created on first use.
+
+        Args:
+            mode (str): 'thread' or 'process'.
+            max_workers (int): Size of the worker pool.
+            max_concurrency_per_model (int): Default number of concurrent calls per model.
+            max_queue_depth (int): Number of calls allowed to wait per model before rejecting.
+            model_concurrency (Dict[str, int]): Optional per-model overrides of the concurrency limit.
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Invalid executor mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self.max_queue_depth = max_queue_depth
+        self.model_concurrency = model_concurrency or {}
+        self._pool: Executor = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> None:
+        """
+        Creates the worker pool if it does not exist yet.
+        """
+        if self._pool is not None:
+            return
+
+        if self.mode == 'process':
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_preload_models)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inference')
+        logger.info(f"Started {self.mode} inference executor with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        """
+        Shuts down the worker pool, waiting for running calls to finish.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def run(self, model_name: str, fn: Callable, *args) -> Any:
+        """
+        Runs fn(*args) in the worker pool under the concurrency limit of model_name.
+
+        In process mode fn and its arguments must be picklable, i.e. fn has to be a
+        module-level function.
+
+        Args:
+            model_name (str): Name of the model the call runs inference on.
+            fn (Callable): The blocking inference function.
+            *args: Arguments for fn.
+
+        Returns:
+            Any: The return value of fn.
+
+        Raises:
+            ExecutorSaturatedError: If too many calls are already waiting for this model.
+        """
+        self.start()
+        metrics = self._get_metrics(model_name)
+
+        if metrics['queued'] >= self.max_queue_depth:
+            metrics['rejected'] += 1
+            raise ExecutorSaturatedError(f"Inference queue for {model_name} is full")
+
+        semaphore = self._get_semaphore(model_name)
+        metrics['queued'] += 1
+        enqueued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            metrics['queued'] -= 1
+
+        try:
+            wait_time = time.perf_counter() - enqueued_at
+            metrics['wait_times'].append(wait_time)
+            metrics['total_wait_time'] += wait_time
+            metrics['max_wait_time'] = max(metrics['max_wait_time'], wait_time)
+            metrics['requests'] += 1
+            metrics['in_flight'] += 1
+
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args))
+        finally:
+            metrics['in_flight'] -= 1
+            semaphore.release()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns per-model executor metrics, including queue wait time percentiles in milliseconds.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Metrics keyed by model name.
+        """
+        report = {}
+        for model_name, metrics in self._metrics.items():
+            wait_times = np.array(metrics['wait_times']) * 1000.0
+            report[model_name] = {
+                "requests": metrics['requests'],
+                "rejected": metrics['rejected'],
+                "queued": metrics['queued'],
+                "in_flight": metrics['in_flight'],
+                "avg_wait_ms": metrics['total_wait_time'] * 1000.0 / metrics['requests'] if metrics['requests'] else 0.0,
+                "max_wait_ms": metrics['max_wait_time'] * 1000.0,
+                "p50_wait_ms": float(np.percentile(wait_times, 50)) if len(wait_times) else 0.0,
+                "p95_wait_ms": float(np.percentile(wait_times, 95)) if len(wait_times) else 0.0,
+                "p99_wait_ms": float(np.percentile(wait_times, 99)) if len(wait_times) else 0.0
+            }
+        return report
+
+    def _get_semaphore(self, model_name: str) -> asyncio.Semaphore:
+        if model_name not in self._semaphores:
+            limit = self.model_concurrency.get(model_name, self.max_concurrency_per_model)
+            self._semaphores[model_name] = asyncio.Semaphore(limit)
+        return self._semaphores[model_name]
+
+    def _get_metrics(self, model_name: str) -> Dict[str, Any]:
+        if model_name not in self._metrics:
+            self._metrics[model_name] = {
+                'requests': 0,
+                'rejected': 0,
+                'queued': 0,
+                'in_flight': 0,
+                'total_wait_time': 0.0,
+                'max_wait_time': 0.0,
+                'wait_times': deque(maxlen=WAIT_TIME_SAMPLES)
+            }
+        return self._metrics[model_name]
+
+# The executor shared by all API routes
+inference_executor = InferenceExecutor()
+
+# TODO: Export the executor metrics to Prometheus alongside the other service metrics
@@ -2,7 +2,7 @@ import numpy as np
 import pandas as pd
 from typing import Dict, Any
 from ..models.investment_recommendation import InvestmentRecommendationModel
-from ..config.model_config import INVESTMENT_RECOMMENDATION_MODEL
+from .model_registry import get_model, INVESTMENT_RECOMMENDATION
 
 class InvestmentRecommender:
     """
@@ -10,15 +10,25 @@ class InvestmentRecommender:
     including loading the trained model and generating recommendations.
     """
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str = None):
         """
-        Initializes the InvestmentRecommender by loading the trained model.
+        Initializes the InvestmentRecommender. Without a model_path the recommender
+        serves the shared model from the model registry; with one it loads its own copy.
 
         Args:
-            model_path (str): The path to the trained model file.
+            model_path (str): Optional path to a specific trained model file.
         """
-        self.model = InvestmentRecommendationModel()
-        self.model.load(model_path)
+        self._model = None
+        if model_path:
+            self._model = InvestmentRecommendationModel()
+            self._model.load_model(model_path)
+
+    @property
+    def model(self) -> InvestmentRecommendationModel:
+        """
+        The model used for recommendations.
+        """
+        return self._model if self._model is not None else get_model(INVESTMENT_RECOMMENDATION)
 
     def recommend(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -173,13 +183,27 @@ class InvestmentRecommender:
 
 def load_investment_recommender() -> InvestmentRecommender:
     """
-    Loads and returns an instance of InvestmentRecommender with the trained model.
+    Returns an instance of InvestmentRecommender backed by the shared, registry-managed model.
 
     Returns:
         InvestmentRecommender: An instance of InvestmentRecommender.
     """
-    model_path = INVESTMENT_RECOMMENDATION_MODEL['path']
-    return InvestmentRecommender(model_path)
+    return InvestmentRecommender()
+
+def recommend_investments(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Recommends an investment allocation for one user with the shared model.
+
+    Args:
+        user_data (Dict[str, Any]): A dictionary containing user financial information.
+
+    Returns:
+        Dict[str, Any]: Recommended investment allocation.
+
+    Raises:
+        ValueError: If user_data is invalid.
+    """
+    return InvestmentRecommender().recommend(user_data)
 
 def preprocess_user_data(user_data: Dict[str, Any]) -> pd.DataFrame:
     """
@@ -191,7 +215,7 @@ def preprocess_user_data(user_data: Dict[str, Any]) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Preprocessed user data.
     """
-    return InvestmentRecommender("")._preprocess_user_data(user_data)
+    return InvestmentRecommender()._preprocess_user_data(user_data)
 
 # Human tasks:
 # TODO: Implement comprehensive error handling and logging
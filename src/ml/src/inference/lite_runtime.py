@@ -0,0 +1,153 @@
+import json
+import logging
+import threading
+import numpy as np
+from typing import Any, Dict, List, Union
+
+logger = logging.getLogger(__name__)
+
+def get_tflite_path(model_path: str) -> str:
+    """
+    Returns the location of the TFLite export of the Keras model saved at model_path.
+
+    Args:
+        model_path (str): Path of the saved Keras model.
+
+    Returns:
+        str: Path of the .tflite file written next to it.
+    """
+    return f"{model_path}.tflite"
+
+def get_tflite_metadata_path(model_path: str) -> str:
+    """
+    Returns the location of the metadata written alongside a TFLite export.
+
+    Args:
+        model_path (str): Path of the saved Keras model.
+
+    Returns:
+        str: Path of the JSON metadata file.
+    """
+    return f"{model_path}_tflite.json"
+
+def _get_interpreter_class():
+    # The standalone runtime is a few MB and does not pull in TensorFlow;
+    # full TensorFlow is only used when the runtime is not installed
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        logger.warning("tflite_runtime is not installed, falling back to tf.lite")
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+class LiteModel:
+    """
+    Runs an exported TFLite model behind the same predict() interface as a Keras model,
+    so it can replace the Keras network inside the model classes.
+
+    TFLite interpreters are not thread-safe, so every thread gets its own interpreter
+    created from the shared model bytes. Models exported with a fixed batch size (see
+    utils.model_export.export_to_tflite) run a batch in slices of that size.
+    """
+
+    def __init__(self, model_path: str):
+        """
+        Loads the TFLite export of the Keras model saved at model_path.
+
+        Args:
+            model_path (str): Path of the saved Keras model the export was made from.
+        """
+        with open(get_tflite_path(model_path), 'rb') as f:
+            self._model_content = f.read()
+        with open(get_tflite_metadata_path(model_path)) as f:
+            self.metadata: Dict[str, Any] = json.load(f)
+
+        self._interpreter_class = _get_interpreter_class()
+        self._local = threading.local()
+
+    def predict(self, inputs: Union[np.ndarray, List[np.ndarray]], **kwargs) -> np.ndarray:
+        """
+        Runs inference on a batch.
+
+        Args:
+            inputs (Union[np.ndarray, List[np.ndarray]]): One array per model input, in
+                the input order of the Keras model, each with the batch as first dimension.
+            **kwargs: Ignored, accepted for compatibility with Keras' predict().
+
+        Returns:
+            np.ndarray: Model output for the batch.
+        """
+        if not isinstance(inputs, (list, tuple)):
+            inputs = [inputs]
+
+        batch_size = self.metadata.get('batch_size')
+        if batch_size and len(inputs[0]) != batch_size:
+            rows = len(inputs[0])
+            outputs = []
+            for start in range(0, rows, batch_size):
+                # The last slice is padded by repeating its first row, and the padding's outputs dropped
+                indices = np.arange(start, start + batch_size)
+                indices[indices >= rows] = start
+                outputs.append(self.predict([np.asarray(values)[indices] for values in inputs])[:rows - start])
+            return np.concatenate(outputs)
+
+        interpreter, input_details, output_index = self._get_interpreter(len(inputs[0]))
+        for detail, values in zip(input_details, inputs):
+            interpreter.set_tensor(detail['index'], np.asarray(values, dtype=detail['dtype']))
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+
+    def _get_interpreter(self, batch_size: int):
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            interpreter = self._interpreter_class(model_content=self._model_content)
+            input_details = self._order_input_details(interpreter.get_input_details())
+            output_index = interpreter.get_output_details()[0]['index']
+            state = self._local.state = {
+                'interpreter': interpreter,
+                'input_details': input_details,
+                'output_index': output_index,
+                'batch_size': None
+            }
+
+        interpreter = state['interpreter']
+        if state['batch_size'] != batch_size:
+            # Exported models have a dynamic batch dimension, unless exported with a fixed
+            # batch size; size the tensors for this batch
+            if not self.metadata.get('batch_size'):
+                for detail in state['input_details']:
+                    interpreter.resize_tensor_input(detail['index'], [batch_size] + list(detail['shape'][1:]))
+            interpreter.allocate_tensors()
+            state['batch_size'] = batch_size
+            state['input_details'] = self._order_input_details(interpreter.get_input_details())
+
+        return interpreter, state['input_details'], state['output_index']
+
+    def _order_input_details(self, input_details: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # The interpreter does not keep the Keras input order, so match inputs by name
+        input_names = self.metadata.get('input_names', [])
+        if len(input_details) == 1 or not input_names:
+            return input_details
+
+        ordered = []
+        for name in input_names:
+            matches = [detail for detail in input_details if name in detail['name']]
+            if len(matches) != 1:
+                raise RuntimeError(f"Cannot match Keras input {name} to a TFLite input")
+            ordered.append(matches[0])
+        return ordered
+
+def load_lite_model(model_path: str) -> LiteModel:
+    """
+    Loads the TFLite export of a Keras model.
+
+    Args:
+        model_path (str): Path of the saved Keras model the export was made from.
+
+    Returns:
+        LiteModel: The exported model.
+    """
+    return LiteModel(model_path)
+
+# TODO: Use the XNNPACK delegate thread count from the executor configuration
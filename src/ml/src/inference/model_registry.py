@@ -0,0 +1,308 @@
+import os
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..models.transaction_categorization import TransactionCategorizationModel
+from ..models.spending_prediction import SpendingPredictionModel
+from ..models.investment_recommendation import InvestmentRecommendationModel
+from ..models.credit_score_prediction import CreditScorePredictionModel
+from .lite_runtime import load_lite_model
+from .numpy_backend import load_numpy_model
+
+logger = logging.getLogger(__name__)
+
+# Names under which the four models are registered
+TRANSACTION_CATEGORIZATION = 'transaction_categorization'
+SPENDING_PREDICTION = 'spending_prediction'
+INVESTMENT_RECOMMENDATION = 'investment_recommendation'
+CREDIT_SCORE_PREDICTION = 'credit_score_prediction'
+
+# Model artifact locations, overridable through the environment (see .env.example)
+MODEL_PATHS = {
+    TRANSACTION_CATEGORIZATION: os.environ.get('TRANSACTION_CATEGORIZATION_MODEL_PATH', './models/transaction_categorization_model.h5'),
+    SPENDING_PREDICTION: os.environ.get('SPENDING_PREDICTION_MODEL_PATH', './models/spending_prediction_model.h5'),
+    INVESTMENT_RECOMMENDATION: os.environ.get('INVESTMENT_RECOMMENDATION_MODEL_PATH', './models/investment_recommendation_model.h5'),
+    CREDIT_SCORE_PREDICTION: os.environ.get('CREDIT_SCORE_PREDICTION_MODEL_PATH', './models/credit_score_prediction_model.h5'),
+}
+
+# Inference backend per model: 'keras' serves the saved Keras network, 'tflite' serves
+# its TFLite export and 'numpy' (Dense-only models) its NumPy export, neither of which
+# imports TensorFlow. ML_INFERENCE_BACKEND sets the default, e.g.
+# CREDIT_SCORE_PREDICTION_INFERENCE_BACKEND overrides it for a single model.
+INFERENCE_BACKENDS = {
+    model_name: os.environ.get(f'{model_name.upper()}_INFERENCE_BACKEND', os.environ.get('ML_INFERENCE_BACKEND', 'keras'))
+    for model_name in MODEL_PATHS
+}
+
+DEFAULT_MODEL_VERSION = '1.0.0'
+
+class ModelRegistry:
+    """
+    A thread-safe, process-wide registry that loads each model once and hands out
+    shared handles to it.
+
+    Readers never take a lock: a handle obtained from get() stays valid for as long
+    as the caller holds it, so swapping in a new version never disturbs in-flight
+    requests. They simply finish on the version they started with.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty ModelRegistry.
+        """
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._loaders: Dict[str, Callable[[str], Any]] = {}
+        self._paths: Dict[str, str] = {}
+        self._models: Dict[str, Any] = {}
+        self._versions: Dict[str, str] = {}
+        self._loaded_at: Dict[str, datetime] = {}
+
+    def register(self, model_name: str, loader: Callable[[str], Any], model_path: str,
+                 version: str = DEFAULT_MODEL_VERSION) -> None:
+        """
+        Registers a loader for a model. The model itself is not loaded until
+        load() or get() is called.
+
+        Args:
+            model_name (str): Name of the model.
+            loader (Callable[[str], Any]): Function that loads the model from a path.
+            model_path (str): Path to the model artifact.
+            version (str): Version of the artifact at model_path.
+        """
+        with self._lock:
+            self._loaders[model_name] = loader
+            self._paths[model_name] = model_path
+            self._versions.setdefault(model_name, version)
+            self._load_locks.setdefault(model_name, threading.Lock())
+
+    def load(self, model_name: str) -> Any:
+        """
+        Loads a registered model from its configured path unless it is already loaded.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            Any: The loaded model.
+        """
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        if model_name not in self._loaders:
+            raise KeyError(f"Unknown model: {model_name}")
+
+        # Serialize loading per model so concurrent first requests load it only once
+        with self._load_locks[model_name]:
+            model = self._models.get(model_name)
+            if model is None:
+                model_path = self._paths[model_name]
+                logger.info(f"Loading {model_name} from {model_path}")
+                model = self._loaders[model_name](model_path)
+                with self._lock:
+                    self._models[model_name] = model
+                    self._loaded_at[model_name] = datetime.now()
+        return model
+
+    def load_all(self) -> Dict[str, str]:
+        """
+        Loads every registered model. Failures are logged and returned rather than
+        raised, so one missing artifact does not prevent the others from loading.
+
+        Returns:
+            Dict[str, str]: Error messages keyed by the names of models that failed to load.
+        """
+        errors = {}
+        for model_name in list(self._loaders):
+            try:
+                self.load(model_name)
+            except Exception as e:
+                logger.error(f"Failed to load {model_name}: {str(e)}")
+                errors[model_name] = str(e)
+        return errors
+
+    def get(self, model_name: str) -> Any:
+        """
+        Returns the shared handle to a model, loading it first if necessary.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            Any: The current version of the model.
+        """
+        model = self._models.get(model_name)
+        if model is None:
+            model = self.load(model_name)
+        return model
+
+    def get_version(self, model_name: str) -> Optional[str]:
+        """
+        Returns the version of the model currently being served.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            Optional[str]: The model version, or None if the model is unknown.
+        """
+        return self._versions.get(model_name)
+
+    def get_path(self, model_name: str) -> Optional[str]:
+        """
+        Returns the path of the artifact the model is served from.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            Optional[str]: The model path, or None if the model is unknown.
+        """
+        return self._paths.get(model_name)
+
+    def swap(self, model_name: str, model: Any, version: str) -> Optional[Any]:
+        """
+        Atomically replaces the served model with an already-loaded one.
+
+        Args:
+            model_name (str): Name of the model.
+            model (Any): The new model.
+            version (str): Version of the new model.
+
+        Returns:
+            Optional[Any]: The previously served model, if any.
+        """
+        with self._lock:
+            previous = self._models.get(model_name)
+            self._models[model_name] = model
+            self._versions[model_name] = version
+            self._loaded_at[model_name] = datetime.now()
+        logger.info(f"Swapped {model_name} to version {version}")
+        return previous
+
+    def reload(self, model_name: str, model_path: str, version: str) -> Any:
+        """
+        Loads a new version of a model and hot-swaps it in. Loading happens outside
+        the registry lock, so requests keep being served by the old version until the
+        new one is ready.
+
+        Args:
+            model_name (str): Name of the model.
+            model_path (str): Path to the new model artifact.
+            version (str): Version of the new model artifact.
+
+        Returns:
+            Any: The newly loaded model.
+        """
+        if model_name not in self._loaders:
+            raise KeyError(f"Unknown model: {model_name}")
+
+        model = self._loaders[model_name](model_path)
+        with self._lock:
+            self._paths[model_name] = model_path
+        self.swap(model_name, model, version)
+        return model
+
+    def get_model_info(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns information about every registered model.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Path, version, load state and load time per model.
+        """
+        with self._lock:
+            return {
+                model_name: {
+                    "model_path": self._paths[model_name],
+                    "model_version": self._versions.get(model_name),
+                    "backend": INFERENCE_BACKENDS.get(model_name),
+                    "loaded": model_name in self._models,
+                    "loaded_at": self._loaded_at[model_name].isoformat() if model_name in self._loaded_at else None
+                }
+                for model_name in self._loaders
+            }
+
+def _load_with_backend(model: Any, model_name: str, model_path: str) -> Any:
+    # Loads the fitted preprocessing and the network of the configured backend into model
+    backend = INFERENCE_BACKENDS[model_name]
+    if backend == 'keras':
+        model.load_model(model_path)
+    elif backend == 'tflite':
+        model.load_preprocessing(model_path)
+        model.model = load_lite_model(model_path)
+    elif backend == 'numpy':
+        model.load_preprocessing(model_path)
+        model.model = load_numpy_model(model_path)
+    else:
+        raise ValueError(f"Unknown inference backend for {model_name}: {backend}")
+    return model
+
+def _load_transaction_categorization_model(model_path: str) -> TransactionCategorizationModel:
+    return _load_with_backend(TransactionCategorizationModel(), TRANSACTION_CATEGORIZATION, model_path)
+
+def _load_spending_prediction_model(model_path: str) -> SpendingPredictionModel:
+    return _load_with_backend(SpendingPredictionModel(), SPENDING_PREDICTION, model_path)
+
+def _load_investment_recommendation_model(model_path: str) -> InvestmentRecommendationModel:
+    return _load_with_backend(InvestmentRecommendationModel(build=False), INVESTMENT_RECOMMENDATION, model_path)
+
+def _load_credit_score_prediction_model(model_path: str) -> CreditScorePredictionModel:
+    return _load_with_backend(CreditScorePredictionModel(build=False), CREDIT_SCORE_PREDICTION, model_path)
+
+# The process-wide registry shared by the API, the inference modules and the services
+model_registry = ModelRegistry()
+model_registry.register(TRANSACTION_CATEGORIZATION, _load_transaction_categorization_model, MODEL_PATHS[TRANSACTION_CATEGORIZATION])
+model_registry.register(SPENDING_PREDICTION, _load_spending_prediction_model, MODEL_PATHS[SPENDING_PREDICTION])
+model_registry.register(INVESTMENT_RECOMMENDATION, _load_investment_recommendation_model, MODEL_PATHS[INVESTMENT_RECOMMENDATION])
+model_registry.register(CREDIT_SCORE_PREDICTION, _load_credit_score_prediction_model, MODEL_PATHS[CREDIT_SCORE_PREDICTION])
+
+# Untrained instances of the models, into which a saved Keras network can be loaded
+_MODEL_FACTORIES = {
+    TRANSACTION_CATEGORIZATION: TransactionCategorizationModel,
+    SPENDING_PREDICTION: SpendingPredictionModel,
+    INVESTMENT_RECOMMENDATION: lambda: InvestmentRecommendationModel(build=False),
+    CREDIT_SCORE_PREDICTION: lambda: CreditScorePredictionModel(build=False),
+}
+
+def load_trainable_model(model_name: str) -> Any:
+    """
+    Loads the Keras network and preprocessing of a served model from its artifact, whatever
+    backend serves it, e.g. to fine-tune it. The served handle is not affected.
+
+    Args:
+        model_name (str): Name of the model.
+
+    Returns:
+        Any: A new instance of the model holding the saved Keras network.
+    """
+    model = _MODEL_FACTORIES[model_name]()
+    model.load_model(model_registry.get_path(model_name))
+    return model
+
+def get_model(model_name: str) -> Any:
+    """
+    Returns the shared handle to a model from the process-wide registry.
+
+    Args:
+        model_name (str): Name of the model.
+
+    Returns:
+        Any: The current version of the model.
+    """
+    return model_registry.get(model_name)
+
+def load_all_models() -> Dict[str, str]:
+    """
+    Loads all four models into the process-wide registry. Intended to be called
+    once at API startup.
+
+    Returns:
+        Dict[str, str]: Error messages keyed by the names of models that failed to load.
+    """
+    return model_registry.load_all()
+
+# TODO: Persist the served model versions so a restarted worker comes back on the same versions
+# TODO: Expose a reload endpoint for operators once API authentication is in place
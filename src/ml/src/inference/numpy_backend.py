@@ -0,0 +1,181 @@
+import json
+import numpy as np
+from typing import Any, List, Tuple, Union
+
+# Precisions the weights can be stored in
+SUPPORTED_DTYPES = ('float32', 'float16', 'int8')
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'tanh': np.tanh,
+    'softmax': lambda x: _softmax(x),
+}
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    exp = np.exp(x - x.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def get_numpy_path(model_path: str) -> str:
+    """
+    Returns the location of the NumPy export of the Keras model saved at model_path.
+
+    Args:
+        model_path (str): Path of the saved Keras model.
+
+    Returns:
+        str: Path of the .npz file written next to it.
+    """
+    return f"{model_path}_numpy.npz"
+
+class NumpyDenseModel:
+    """
+    Evaluates a stack of Dense layers as NumPy matrix products, behind the same predict()
+    interface as a Keras model. Meant for the small MLP regressors, where the per-call
+    overhead of Keras' predict() dominates the actual arithmetic.
+
+    Weights can be stored in float32, float16 or int8 (symmetric, per output unit). They
+    are dequantized to float32 once when the model is created, because NumPy has no fast
+    float16 or int8 matrix product; the lower precisions reduce the artifact size and
+    show the accuracy impact of quantized serving.
+    """
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, str]], dtype: str = 'float32'):
+        """
+        Initializes the NumpyDenseModel.
+
+        Args:
+            layers (List[Tuple[np.ndarray, np.ndarray, str]]): Kernel, bias and activation name of each Dense layer.
+            dtype (str): Precision the weights are stored in.
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        for _, _, activation in layers:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+
+        self.dtype = dtype
+        self._stored = [self._store(np.asarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32))
+                        for kernel, bias, _ in layers]
+        self.activations = [activation for _, _, activation in layers]
+        self._layers = [(self._restore(stored), stored['bias'], _ACTIVATIONS[activation])
+                        for stored, activation in zip(self._stored, self.activations)]
+
+    @classmethod
+    def from_keras(cls, keras_model: Any, dtype: str = 'float32') -> 'NumpyDenseModel':
+        """
+        Extracts the weights of a Keras model made only of Dense layers. Dropout layers
+        are skipped since they are inactive at inference time.
+
+        Args:
+            keras_model (tf.keras.Model): The Keras model.
+            dtype (str): Precision the weights are stored in.
+
+        Returns:
+            NumpyDenseModel: The equivalent NumPy model.
+
+        Raises:
+            ValueError: If the model contains layers other than Dense, Dropout and Input layers.
+        """
+        layers = []
+        for layer in keras_model.layers:
+            layer_type = type(layer).__name__
+            if layer_type in ('Dropout', 'InputLayer'):
+                continue
+            if layer_type != 'Dense':
+                raise ValueError(f"Layer {layer.name} of type {layer_type} is not supported by the NumPy backend")
+
+            weights = layer.get_weights()
+            kernel = weights[0]
+            bias = weights[1] if layer.use_bias else np.zeros(kernel.shape[1], dtype=np.float32)
+            layers.append((kernel, bias, layer.get_config()['activation']))
+
+        return cls(layers, dtype=dtype)
+
+    def predict(self, inputs: Union[np.ndarray, List[np.ndarray]], **kwargs) -> np.ndarray:
+        """
+        Runs the forward pass on a batch.
+
+        Args:
+            inputs (Union[np.ndarray, List[np.ndarray]]): Input features, one row per sample.
+            **kwargs: Ignored, accepted for compatibility with Keras' predict().
+
+        Returns:
+            np.ndarray: Model output for the batch.
+        """
+        if isinstance(inputs, (list, tuple)):
+            inputs = inputs[0]
+
+        x = np.asarray(inputs, dtype=np.float32)
+        for kernel, bias, activation in self._layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+    def save(self, file_path: str) -> None:
+        """
+        Saves the weights in their stored precision as an .npz archive.
+
+        Args:
+            file_path (str): Destination path.
+        """
+        arrays = {}
+        for i, stored in enumerate(self._stored):
+            for name, values in stored.items():
+                arrays[f"layer_{i}_{name}"] = values
+        metadata = json.dumps({'dtype': self.dtype, 'activations': self.activations})
+        with open(file_path, 'wb') as f:
+            np.savez(f, metadata=np.array(metadata), **arrays)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'NumpyDenseModel':
+        """
+        Loads a model saved with save().
+
+        Args:
+            file_path (str): Path of the .npz archive.
+
+        Returns:
+            NumpyDenseModel: The loaded model.
+        """
+        with np.load(file_path) as artifact:
+            metadata = json.loads(str(artifact['metadata']))
+            model = cls.__new__(cls)
+            model.dtype = metadata['dtype']
+            model.activations = metadata['activations']
+            model._stored = [
+                {name: artifact[f"layer_{i}_{name}"] for name in ('kernel', 'bias', 'scale')
+                 if f"layer_{i}_{name}" in artifact.files}
+                for i in range(len(model.activations))
+            ]
+        model._layers = [(model._restore(stored), stored['bias'].astype(np.float32), _ACTIVATIONS[activation])
+                         for stored, activation in zip(model._stored, model.activations)]
+        return model
+
+    def _store(self, kernel: np.ndarray, bias: np.ndarray) -> dict:
+        # Biases are tiny and kept in float32; only kernels are stored in lower precision
+        if self.dtype == 'int8':
+            scale = np.abs(kernel).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            return {'kernel': np.round(kernel / scale).astype(np.int8), 'bias': bias, 'scale': scale.astype(np.float32)}
+        return {'kernel': kernel.astype(self.dtype), 'bias': bias}
+
+    def _restore(self, stored: dict) -> np.ndarray:
+        kernel = stored['kernel'].astype(np.float32)
+        if 'scale' in stored:
+            kernel = kernel * stored['scale']
+        return kernel
+
+def load_numpy_model(model_path: str) -> NumpyDenseModel:
+    """
+    Loads the NumPy export of a Keras model.
+
+    Args:
+        model_path (str): Path of the saved Keras model the export was made from.
+
+    Returns:
+        NumpyDenseModel: The exported model.
+    """
+    return NumpyDenseModel.load(get_numpy_path(model_path))
+
+# TODO: Fuse the scaler of the fitted preprocessing into the first layer's kernel and bias
@@ -1,55 +1,79 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List
-from ..models.spending_prediction import SpendingPredictionModel
-from ..config.model_config import SPENDING_PREDICTION_MODEL
-from ..utils.model_utils import load_model
-
-# Global constant for the model path
-MODEL_PATH = '/path/to/saved/spending_prediction_model.h5'
+from typing import Dict, List, Optional, Tuple, Union
+from ..models.spending_prediction import SpendingPredictionModel, SPENDING_PREDICTION_MODEL
+from ..preprocessing.sequences import RaggedArray
+from .model_registry import get_model, SPENDING_PREDICTION
 
 def load_spending_prediction_model() -> SpendingPredictionModel:
     """
-    Loads the trained spending prediction model from disk.
+    Returns the shared spending prediction model from the model registry.
+    The model is read from disk only once per process.
 
     Returns:
         SpendingPredictionModel: Loaded spending prediction model
     """
-    model = SpendingPredictionModel()
-    model = load_model(MODEL_PATH)
-    return model
+    return get_model(SPENDING_PREDICTION)
+
+# Values used for optional features missing from a user's data
+FEATURE_DEFAULTS = {'income': 0, 'month': 1}
+
+def _parse_history(value) -> np.ndarray:
+    # A history is a list of monthly spending amounts, oldest first; a single number is a one-month history
+    history = np.atleast_1d(np.asarray(value, dtype=np.float64))
+    if history.ndim != 1 or not np.all(np.isfinite(history)):
+        raise ValueError
+    return history
 
-def preprocess_input_data(user_data: Dict) -> pd.DataFrame:
+def build_feature_frame(user_data_list: List[Dict]) -> Tuple[pd.DataFrame, RaggedArray, List[Optional[ValueError]]]:
     """
-    Preprocesses the input data for spending prediction.
+    Builds the model inputs for a batch of users in a single pass: one numeric column per
+    scalar feature, validated column-wise, and the spending histories as one ragged array.
 
     Args:
-        user_data (Dict): User data containing relevant features
+        user_data_list (List[Dict]): List of user data dictionaries
 
     Returns:
-        pd.DataFrame: Preprocessed input data
+        Tuple[pd.DataFrame, RaggedArray, List[Optional[ValueError]]]: Scalar features and
+        histories of the valid users, in input order, and for every user either None or
+        the error that makes its data invalid
     """
-    # Extract relevant features
-    historical_spending = user_data.get('historical_spending', [])
-    income = user_data.get('income', 0)
-    month = user_data.get('month', 1)
-
-    # Create a pandas DataFrame with the extracted features
-    df = pd.DataFrame({
-        'historical_spending': [historical_spending],
-        'income': [income],
-        'month': [month]
-    })
-
-    # Normalize numerical features if required
-    # For this example, we'll assume normalization is not needed
-    # but you might want to add normalization logic here based on your model's requirements
-
-    # Encode categorical features if any
-    # For this example, we'll assume no categorical features need encoding
-    # but you might want to add encoding logic here if needed
-
-    return df
+    scalar_features = ['income', 'month']
+    records = pd.DataFrame.from_records(user_data_list, columns=scalar_features)
+
+    columns = {}
+    invalid = {}
+    for feature in scalar_features:
+        values = records[feature]
+        values = values.where(values.notna(), FEATURE_DEFAULTS[feature])
+
+        # Lists and other non-scalar values cannot be model inputs; mask them before the numeric conversion
+        numeric = pd.to_numeric(values.where(values.map(np.isscalar), np.nan), errors='coerce').to_numpy(dtype=float)
+        invalid[feature] = ~np.isfinite(numeric)
+        columns[feature] = numeric
+
+    invalid['month'] |= (columns['month'] != np.round(columns['month'])) | (columns['month'] < 1) | (columns['month'] > 12)
+
+    errors = [None] * len(user_data_list)
+    histories = [None] * len(user_data_list)
+    for i, user_data in enumerate(user_data_list):
+        if 'historical_spending' not in user_data:
+            errors[i] = ValueError("Missing required field: historical_spending")
+            continue
+        try:
+            histories[i] = _parse_history(user_data['historical_spending'])
+        except (TypeError, ValueError):
+            errors[i] = ValueError(f"Invalid historical_spending: {user_data['historical_spending']!r}")
+
+    for feature in scalar_features:
+        for i in np.flatnonzero(invalid[feature]):
+            if errors[i] is None:
+                errors[i] = ValueError(f"Invalid {feature}: {user_data_list[i][feature]!r}")
+
+    valid = np.array([error is None for error in errors], dtype=bool)
+    history = RaggedArray.from_sequences([histories[i] for i in np.flatnonzero(valid)])
+
+    return pd.DataFrame({feature: columns[feature][valid] for feature in scalar_features}), history, errors
 
 def predict_spending(user_data: Dict) -> float:
     """
@@ -61,31 +85,20 @@ def predict_spending(user_data: Dict) -> float:
     Returns:
         float: Predicted spending amount
     """
-    # Load the spending prediction model
-    model = load_spending_prediction_model()
-
-    # Preprocess the user data
-    preprocessed_data = preprocess_input_data(user_data)
-
-    # Use the model to make a prediction
-    prediction = model.predict(preprocessed_data)
-
-    # Post-process the prediction if necessary (e.g., denormalize)
-    # For this example, we'll assume no post-processing is needed
-    # but you might want to add post-processing logic here based on your model's output
-
-    return float(prediction[0])
+    return SpendingPredictor().predict(user_data)
 
 class SpendingPredictor:
     """
     Class for making spending predictions using the trained model.
     """
 
-    def __init__(self):
+    @property
+    def model(self) -> SpendingPredictionModel:
         """
-        Initializes the SpendingPredictor class.
+        The currently served spending prediction model. Looked up on every access
+        so that a hot-swapped model version is picked up immediately.
         """
-        self.model = load_spending_prediction_model()
+        return load_spending_prediction_model()
 
     def predict(self, user_data: Dict) -> float:
         """
@@ -96,35 +109,55 @@ class SpendingPredictor:
 
         Returns:
             float: Predicted spending amount
+
+        Raises:
+            ValueError: If the user data is invalid
         """
-        preprocessed_data = preprocess_input_data(user_data)
-        prediction = self.model.predict(preprocessed_data)
-        return float(prediction[0])
+        prediction = self.batch_predict([user_data])[0]
+        if isinstance(prediction, ValueError):
+            raise prediction
+        return prediction
 
-    def batch_predict(self, user_data_list: List[Dict]) -> List[float]:
+    def batch_predict(self, user_data_list: List[Dict]) -> List[Union[float, ValueError]]:
         """
-        Makes spending predictions for multiple users.
+        Makes spending predictions for multiple users with a single forward pass over
+        one feature matrix.
 
         Args:
             user_data_list (List[Dict]): List of user data dictionaries
 
         Returns:
-            List[float]: List of predicted spending amounts
+            List[Union[float, ValueError]]: Predicted spending amount for each user, in input
+            order, or a ValueError for users whose data is invalid
         """
-        predictions = []
-        for user_data in user_data_list:
-            prediction = self.predict(user_data)
-            predictions.append(prediction)
-        return predictions
+        features, history, errors = build_feature_frame(user_data_list)
+        predictions = iter([])
+        if len(features):
+            # A single model handle for the whole batch, even if a new version is swapped in meanwhile
+            predictions = iter(self.model.predict(features, history=history).tolist())
+
+        return [error if error is not None else float(next(predictions)) for error in errors]
+
+def predict_spending_batch(user_data_list: List[Dict]) -> List[Union[float, ValueError]]:
+    """
+    Predicts future spending for multiple users.
+
+    Args:
+        user_data_list (List[Dict]): List of user data dictionaries
+
+    Returns:
+        List[Union[float, ValueError]]: Predicted spending amounts, in the same order as
+        user_data_list, with a ValueError in place of each invalid user
+    """
+    return SpendingPredictor().batch_predict(user_data_list)
 
 # List of human tasks
 """
 Human tasks:
 1. Implement proper error handling for invalid input data (Required)
 2. Add logging for prediction requests and results (Required)
-3. Optimize batch prediction for large-scale processing (Optional)
-4. Implement caching mechanism for frequently requested predictions (Optional)
-5. Add unit tests for SpendingPredictor class and its methods (Required)
-6. Implement versioning for the spending predictor to handle model updates (Required)
-7. Review and optimize preprocessing steps for efficiency (Required)
+3. Implement caching mechanism for frequently requested predictions (Optional)
+4. Add unit tests for SpendingPredictor class and its methods (Required)
+5. Implement versioning for the spending predictor to handle model updates (Required)
+6. Review and optimize preprocessing steps for efficiency (Required)
 """
\ No newline at end of file
@@ -1,32 +1,44 @@
 import numpy as np
 import pandas as pd
 from typing import List, Dict
-from src.ml.src.models.transaction_categorization import TransactionCategorizationModel
-from src.ml.src.config.model_config import TRANSACTION_CATEGORIZATION_MODEL
+from ..models.transaction_categorization import TransactionCategorizationModel, TRANSACTION_CATEGORIZATION_MODEL
+from .model_registry import model_registry, TRANSACTION_CATEGORIZATION
+from .categorization_cache import categorization_cache
 
-# Global variable to store the loaded model
-model: TransactionCategorizationModel = None
-
-def load_model(model_path: str) -> None:
+def load_model(model_path: str, version: str = TRANSACTION_CATEGORIZATION_MODEL.get('version', '1.0.0')) -> None:
     """
-    Loads the trained transaction categorization model.
+    Loads a trained transaction categorization model and hot-swaps it into the
+    model registry. Requests already in flight finish on the previous model.
 
     Args:
         model_path (str): The path to the saved model file.
+        version (str): Version of the saved model.
 
     Returns:
         None
     """
-    global model
     try:
-        model = TransactionCategorizationModel()
-        model.load(model_path)
+        model_registry.reload(TRANSACTION_CATEGORIZATION, model_path, version)
     except Exception as e:
         raise RuntimeError(f"Failed to load the model: {str(e)}")
 
+def get_model() -> TransactionCategorizationModel:
+    """
+    Returns the shared transaction categorization model, loading it from its
+    configured path on first use.
+
+    Returns:
+        TransactionCategorizationModel: The currently served model.
+    """
+    try:
+        return model_registry.get(TRANSACTION_CATEGORIZATION)
+    except Exception as e:
+        raise RuntimeError(f"Model not loaded: {str(e)}")
+
 def categorize_transaction(transaction: Dict) -> str:
     """
-    Categorizes a single transaction using the loaded model.
+    Categorizes a single transaction using the loaded model. Recurring merchant
+    descriptions are served from the categorization cache without running the model.
 
     Args:
         transaction (Dict): A dictionary containing transaction details.
@@ -34,10 +46,13 @@ def categorize_transaction(transaction: Dict) -> str:
     Returns:
         str: Predicted category for the transaction.
     """
-    if model is None:
-        raise RuntimeError("Model not loaded. Call load_model() first.")
+    model = get_model()
 
     try:
+        category = categorization_cache.get(transaction, model)
+        if category is not None:
+            return category
+
         # Convert the transaction dict to a pandas DataFrame
         df = pd.DataFrame([transaction])
         
@@ -45,13 +60,16 @@ def categorize_transaction(transaction: Dict) -> str:
         prediction = model.predict(df)
         
         # Assuming the predict method returns a numpy array or list
-        return prediction[0] if isinstance(prediction, (np.ndarray, list)) else prediction
+        category = prediction[0] if isinstance(prediction, (np.ndarray, list)) else prediction
+        categorization_cache.put(transaction, category, model)
+        return category
     except Exception as e:
         raise RuntimeError(f"Error categorizing transaction: {str(e)}")
 
 def categorize_transactions(transactions: List[Dict]) -> List[str]:
     """
-    Categorizes a batch of transactions using the loaded model.
+    Categorizes a batch of transactions using the loaded model. Only the transactions
+    that miss the categorization cache are passed to the model.
 
     Args:
         transactions (List[Dict]): A list of dictionaries containing transaction details.
@@ -59,18 +77,27 @@ def categorize_transactions(transactions: List[Dict]) -> List[str]:
     Returns:
         List[str]: List of predicted categories for the transactions.
     """
-    if model is None:
-        raise RuntimeError("Model not loaded. Call load_model() first.")
+    model = get_model()
 
     try:
-        # Convert the list of transaction dicts to a pandas DataFrame
-        df = pd.DataFrame(transactions)
+        categories = [categorization_cache.get(transaction, model) for transaction in transactions]
+        misses = [i for i, category in enumerate(categories) if category is None]
+        if not misses:
+            return categories
+
+        # Convert the uncached transaction dicts to a pandas DataFrame
+        df = pd.DataFrame([transactions[i] for i in misses])
         
-        # Use the model's predict method to get categories for all transactions
+        # Use the model's predict method to get categories for all uncached transactions
         predictions = model.predict(df)
         
         # Convert predictions to a list if it's a numpy array
-        return predictions.tolist() if isinstance(predictions, np.ndarray) else list(predictions)
+        predictions = predictions.tolist() if isinstance(predictions, np.ndarray) else list(predictions)
+
+        for i, category in zip(misses, predictions):
+            categories[i] = category
+            categorization_cache.put(transactions[i], category, model)
+        return categories
     except Exception as e:
         raise RuntimeError(f"Error categorizing transactions: {str(e)}")
 
@@ -81,8 +108,7 @@ def get_model_info() -> Dict:
     Returns:
         Dict: Model information including version and input features.
     """
-    if model is None:
-        raise RuntimeError("Model not loaded. Call load_model() first.")
+    model = get_model()
 
     try:
         # Retrieve model information from TRANSACTION_CATEGORIZATION_MODEL config
@@ -140,6 +166,5 @@ def safe_get_model_info() -> Dict:
         logger.error(f"Failed to get model information: {str(e)}")
         raise
 
-# TODO: Implement a caching mechanism to improve performance for frequent categorization requests
 # TODO: Optimize batch processing for large numbers of transactions
 # TODO: Create unit tests for each function in this file
\ No newline at end of file
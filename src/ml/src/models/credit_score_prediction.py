@@ -1,9 +1,11 @@
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.optimizers import Adam
+
+from ..preprocessing.artifacts import save_scaler, load_scaler, save_json, load_json
+from ..utils.input_pipeline import make_training_datasets
+from ..training.incremental_training import INCREMENTAL_TRAINING_CONFIG, set_learning_rate
+from ..training.callbacks import TrainingReport, callback_settings, create_training_callbacks
 
 # Assuming CREDIT_SCORE_PREDICTION_MODEL is imported from a config file
 # If it's not available, we'll use default values
@@ -13,7 +15,9 @@ except ImportError:
     CREDIT_SCORE_PREDICTION_MODEL = {
         'input_dim': 10,
         'hidden_layers': [64, 32],
-        'learning_rate': 0.001
+        'learning_rate': 0.001,
+        # Overrides of the training callback settings (see training.callbacks)
+        'callbacks': {'patience': 10, 'lr_schedule': 'plateau', 'lr_patience': 5}
     }
 
 class CreditScorePredictionModel:
@@ -21,65 +25,131 @@ class CreditScorePredictionModel:
     A class that encapsulates the credit score prediction model
     """
 
-    def __init__(self):
-        """
-        Initializes the CreditScorePredictionModel
-        """
-        self.model = self.build_model()
+    def __init__(self, build: bool = True, hidden_layers: list = None, learning_rate: float = None,
+                 batch_size: int = None, epochs: int = 100):
+        """
+        Initializes the CreditScorePredictionModel. With build=False the Keras network
+        is not built, so serving from an exported artifact does not import TensorFlow.
+        The hyperparameters default to CREDIT_SCORE_PREDICTION_MODEL; the batch size to
+        ML_INPUT_BATCH_SIZE, or is auto-tuned to the available memory (see utils.input_pipeline)
+        """
+        self.hidden_layers = hidden_layers or CREDIT_SCORE_PREDICTION_MODEL['hidden_layers']
+        self.learning_rate = learning_rate or CREDIT_SCORE_PREDICTION_MODEL['learning_rate']
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.model = self.build_model() if build else None
+        # Summary of the last training run (see training.callbacks.TrainingReport)
+        self.training_report = None
+        # Epochs trained so far, from which the learning rate schedule of the next train call continues
+        self.trained_epochs = 0
         self.scaler = StandardScaler()
+        # Training-time fill values for missing data and the feature columns after encoding
+        self.fill_values = {}
+        self.feature_columns = []
 
     def build_model(self):
         """
         Builds the neural network model for credit score prediction
         """
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense
+        from tensorflow.keras.optimizers import Adam
+
         model = Sequential()
         
         # Add input layer
-        model.add(Dense(CREDIT_SCORE_PREDICTION_MODEL['hidden_layers'][0], 
+        model.add(Dense(self.hidden_layers[0], 
                         input_dim=CREDIT_SCORE_PREDICTION_MODEL['input_dim'], 
                         activation='relu'))
         
         # Add hidden layers
-        for units in CREDIT_SCORE_PREDICTION_MODEL['hidden_layers'][1:]:
+        for units in self.hidden_layers[1:]:
             model.add(Dense(units, activation='relu'))
         
         # Add output layer
         model.add(Dense(1))
         
         # Compile the model
-        model.compile(optimizer=Adam(learning_rate=CREDIT_SCORE_PREDICTION_MODEL['learning_rate']),
+        model.compile(optimizer=Adam(learning_rate=self.learning_rate),
                       loss='mean_squared_error')
         
         return model
 
-    def preprocess_data(self, data: pd.DataFrame) -> np.ndarray:
+    def preprocess_data(self, data: pd.DataFrame, fit: bool = False) -> np.ndarray:
         """
-        Preprocesses the input data for the model
+        Preprocesses the input data for the model. With fit=True the fill values, encoded
+        columns and scaler are fitted on data; otherwise the training-time state is applied
+        so that a row is transformed the same way regardless of the rest of its batch
         """
+        if fit:
+            self.fill_values = data.mean(numeric_only=True).to_dict()
+
         # Handle missing values
-        data = data.fillna(data.mean())
+        data = data.fillna(self.fill_values)
         
         # Encode categorical variables if present
         # This is a placeholder - adjust based on your actual data
         data = pd.get_dummies(data)
+
+        if fit:
+            self.feature_columns = data.columns.tolist()
+            return self.scaler.fit_transform(data.values)
+
+        # Align with the training columns: missing dummies become 0, unseen ones are dropped
+        data = data.reindex(columns=self.feature_columns, fill_value=0)
         
         # Scale numerical features
-        return self.scaler.fit_transform(data)
+        return self.scaler.transform(data.values)
 
-    def train(self, X_train: pd.DataFrame, y_train: pd.Series):
+    def train(self, X_train: pd.DataFrame, y_train: pd.Series, epochs: int = None,
+              checkpoint: 'TrainingCheckpoint' = None):
         """
-        Trains the credit score prediction model
+        Trains the credit score prediction model. Called again, training continues from the
+        current weights, e.g. for the epochs granted to a hyperparameter search trial.
+        With a checkpoint, training resumes from its latest checkpoint up to epochs in total,
+        and is checkpointed periodically. Early stopping, the learning rate schedule, best-weight
+        restore and the time budget follow CREDIT_SCORE_PREDICTION_MODEL['callbacks']
         """
         # Preprocess the training data
-        X_train_preprocessed = self.preprocess_data(X_train)
+        X_train_preprocessed = self.preprocess_data(X_train, fit=True)
+        report = TrainingReport()
+        initial_epoch = checkpoint.restore(self.model, report) if checkpoint else 0
+        epochs = epochs or self.epochs
+        callbacks = create_training_callbacks(callback_settings(CREDIT_SCORE_PREDICTION_MODEL), epochs, initial_epoch, report,
+                                              learning_rate=self.learning_rate, trained_epochs=0 if checkpoint else self.trained_epochs)
         
-        # Train the model
-        history = self.model.fit(X_train_preprocessed, y_train, 
-                                 epochs=100, batch_size=32, 
-                                 validation_split=0.2, verbose=1)
+        # Train the model from a prefetching tf.data pipeline
+        train_dataset, validation_dataset = make_training_datasets(
+            X_train_preprocessed.astype(np.float32), y_train, self.batch_size, validation_split=0.2)
+        history = self.model.fit(train_dataset, validation_data=validation_dataset,
+                                 epochs=epochs,
+                                 verbose=1, initial_epoch=initial_epoch,
+                                 callbacks=callbacks + ([checkpoint.callback(report)] if checkpoint else []))
+        self.training_report = report.summary()
+        self.trained_epochs = report.trained_epochs
         
         return history
 
+    def fine_tune(self, X_train: pd.DataFrame, y_train: pd.Series, epochs: int = None,
+                  learning_rate_factor: float = None):
+        """
+        Continues training the current weights on new data at a reduced learning rate, keeping
+        the fitted preprocessing so the inputs keep the scale the weights were trained on.
+        Used to warm-start updates of the deployed model (see training.incremental_training).
+        Epochs default to ML_WARM_START_EPOCHS, the learning rate factor to ML_WARM_START_LEARNING_RATE_FACTOR
+        """
+        X_train_preprocessed = self.preprocess_data(X_train)
+        set_learning_rate(self.model, self.learning_rate * (learning_rate_factor or INCREMENTAL_TRAINING_CONFIG['learning_rate_factor']))
+
+        train_dataset, validation_dataset = make_training_datasets(
+            X_train_preprocessed.astype(np.float32), y_train, self.batch_size, validation_split=0.2)
+        epochs = epochs or INCREMENTAL_TRAINING_CONFIG['fine_tune_epochs']
+        report = TrainingReport()
+        history = self.model.fit(train_dataset, validation_data=validation_dataset, epochs=epochs, verbose=1,
+                                 callbacks=create_training_callbacks(callback_settings(CREDIT_SCORE_PREDICTION_MODEL), epochs, report=report))
+        self.training_report = report.summary()
+        return history
+
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
         Predicts credit scores using the trained model
@@ -116,15 +186,26 @@ class CreditScorePredictionModel:
         Saves the trained model to a file
         """
         self.model.save(file_path)
-        np.save(f"{file_path}_scaler.npy", self.scaler.get_params())
+        save_scaler(self.scaler, f"{file_path}_scaler.npz")
+        save_json({'fill_values': self.fill_values, 'feature_columns': self.feature_columns},
+                  f"{file_path}_preprocessing.json")
 
     def load_model(self, file_path: str):
         """
         Loads a trained model from a file
         """
-        self.model = tf.keras.models.load_model(file_path)
-        scaler_params = np.load(f"{file_path}_scaler.npy", allow_pickle=True).item()
-        self.scaler.set_params(**scaler_params)
+        from tensorflow.keras.models import load_model
+        self.model = load_model(file_path)
+        self.load_preprocessing(file_path)
+
+    def load_preprocessing(self, file_path: str):
+        """
+        Loads only the fitted preprocessing state saved next to a model, without the Keras network
+        """
+        self.scaler = load_scaler(f"{file_path}_scaler.npz")
+        preprocessing = load_json(f"{file_path}_preprocessing.json")
+        self.fill_values = preprocessing['fill_values']
+        self.feature_columns = preprocessing['feature_columns']
 
 def create_credit_score_prediction_model() -> CreditScorePredictionModel:
     """
@@ -1,20 +1,27 @@
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler
 from typing import Dict, Tuple
 
+from ..preprocessing.artifacts import (save_scaler, load_scaler, save_one_hot_encoder, load_one_hot_encoder,
+                                      dense_one_hot_encoder)
+from ..utils.input_pipeline import make_training_datasets
+from ..training.callbacks import TrainingReport, callback_settings, create_training_callbacks
+
 # Assuming INVESTMENT_RECOMMENDATION_MODEL configuration
 INVESTMENT_RECOMMENDATION_MODEL = {
     'input_features': ['age', 'income', 'risk_tolerance', 'investment_horizon'],
     'categorical_features': ['risk_tolerance'],
     'numerical_features': ['age', 'income', 'investment_horizon'],
+    # Values of every categorical feature, which fix the width of its one-hot encoding and so the network input
+    'categories': {'risk_tolerance': ['low', 'medium', 'high']},
     'output_classes': 5,  # Assuming 5 investment allocation categories
     'hidden_layers': [64, 32],
     'dropout_rate': 0.2,
     'learning_rate': 0.001,
-    'batch_size': 32,
-    'epochs': 100
+    'epochs': 100,
+    # Overrides of the training callback settings (see training.callbacks)
+    'callbacks': {'patience': 10, 'lr_schedule': 'plateau', 'lr_factor': 0.5, 'lr_patience': 5}
 }
 
 class InvestmentRecommendationModel:
@@ -23,95 +30,141 @@ class InvestmentRecommendationModel:
     model architecture, training, and prediction functions.
     """
 
-    def __init__(self):
+    def __init__(self, build: bool = True, hidden_layers: list = None, learning_rate: float = None,
+                 batch_size: int = None, epochs: int = None):
         """
         Initializes the InvestmentRecommendationModel with the configuration from INVESTMENT_RECOMMENDATION_MODEL.
+
+        Args:
+            build (bool): Whether to build the Keras network. Serving from an exported
+                artifact skips it, so TensorFlow is not imported.
+            hidden_layers (list): Units of every hidden layer, overriding the configuration.
+            learning_rate (float): Learning rate of the Adam optimizer, overriding the configuration.
+            batch_size (int): Training batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned
+                to the available memory (see utils.input_pipeline).
+            epochs (int): Training epochs, overriding the configuration.
         """
-        self.model = self._create_model_architecture()
+        self.hidden_layers = hidden_layers or INVESTMENT_RECOMMENDATION_MODEL['hidden_layers']
+        self.learning_rate = learning_rate or INVESTMENT_RECOMMENDATION_MODEL['learning_rate']
+        self.batch_size = batch_size
+        self.epochs = epochs or INVESTMENT_RECOMMENDATION_MODEL['epochs']
+        self.model = self._create_model_architecture() if build else None
+        # Summary of the last training run (see training.callbacks.TrainingReport)
+        self.training_report = None
+        # Epochs trained so far, from which the learning rate schedule of the next train call continues
+        self.trained_epochs = 0
         self.scaler = StandardScaler()
-        self.encoder = OneHotEncoder(sparse=False, handle_unknown='ignore')
+        self.encoder = dense_one_hot_encoder(categories=[INVESTMENT_RECOMMENDATION_MODEL['categories'][feature]
+                                                         for feature in INVESTMENT_RECOMMENDATION_MODEL['categorical_features']],
+                                             handle_unknown='ignore')
 
-    def _create_model_architecture(self) -> tf.keras.Model:
+    def _create_model_architecture(self) -> 'tf.keras.Model':
         """
         Creates the neural network architecture for the investment recommendation model.
 
         Returns:
             tf.keras.Model: Compiled model
         """
+        import tensorflow as tf
+
         input_dim = len(INVESTMENT_RECOMMENDATION_MODEL['numerical_features']) + \
-                    len(INVESTMENT_RECOMMENDATION_MODEL['categorical_features'])
+                    sum(len(INVESTMENT_RECOMMENDATION_MODEL['categories'][feature])
+                        for feature in INVESTMENT_RECOMMENDATION_MODEL['categorical_features'])
         
         model = tf.keras.Sequential()
         model.add(tf.keras.layers.Input(shape=(input_dim,)))
         
-        for units in INVESTMENT_RECOMMENDATION_MODEL['hidden_layers']:
+        for units in self.hidden_layers:
             model.add(tf.keras.layers.Dense(units, activation='relu'))
             model.add(tf.keras.layers.Dropout(INVESTMENT_RECOMMENDATION_MODEL['dropout_rate']))
         
         model.add(tf.keras.layers.Dense(INVESTMENT_RECOMMENDATION_MODEL['output_classes'], activation='softmax'))
         
         model.compile(
-            optimizer=tf.keras.optimizers.Adam(learning_rate=INVESTMENT_RECOMMENDATION_MODEL['learning_rate']),
+            optimizer=tf.keras.optimizers.Adam(learning_rate=self.learning_rate),
             loss='categorical_crossentropy',
             metrics=['accuracy']
         )
         
         return model
 
-    def preprocess_data(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    def preprocess_data(self, data: pd.DataFrame, fit: bool = False) -> Tuple[np.ndarray, np.ndarray]:
         """
         Preprocesses the input data for the model.
 
+        With fit=True the scaler and encoder are fitted on data first; otherwise their
+        fitted state is only applied, so prediction never refits them.
+
         Args:
-            data (pd.DataFrame): Input data containing features and labels
+            data (pd.DataFrame): Input data containing features and, for training, labels
+            fit (bool): Whether to fit the scaler and encoder on this data
 
         Returns:
-            Tuple[np.ndarray, np.ndarray]: Preprocessed features and labels
+            Tuple[np.ndarray, np.ndarray]: Preprocessed features and labels (None without labels)
         """
         # Separate features and labels
         features = data[INVESTMENT_RECOMMENDATION_MODEL['input_features']]
-        labels = data['investment_allocation']  # Assuming this column exists in the data
 
-        # Scale numerical features
         numerical_features = features[INVESTMENT_RECOMMENDATION_MODEL['numerical_features']]
-        scaled_numerical = self.scaler.fit_transform(numerical_features)
+        categorical_features = features[INVESTMENT_RECOMMENDATION_MODEL['categorical_features']]
+
+        if fit:
+            self.scaler.fit(numerical_features)
+            self.encoder.fit(categorical_features)
+
+        # Scale numerical features
+        scaled_numerical = self.scaler.transform(numerical_features)
 
         # Encode categorical features
-        categorical_features = features[INVESTMENT_RECOMMENDATION_MODEL['categorical_features']]
-        encoded_categorical = self.encoder.fit_transform(categorical_features)
+        encoded_categorical = self.encoder.transform(categorical_features)
 
         # Combine preprocessed features
         preprocessed_features = np.hstack((scaled_numerical, encoded_categorical))
 
-        # One-hot encode labels
-        encoded_labels = tf.keras.utils.to_categorical(labels, num_classes=INVESTMENT_RECOMMENDATION_MODEL['output_classes'])
+        # One-hot encode labels if available
+        encoded_labels = None
+        if 'investment_allocation' in data.columns:
+            encoded_labels = np.eye(INVESTMENT_RECOMMENDATION_MODEL['output_classes'])[data['investment_allocation'].astype(int)]
 
         return preprocessed_features, encoded_labels
 
-    def train(self, training_data: pd.DataFrame) -> tf.keras.callbacks.History:
+    def train(self, training_data: pd.DataFrame, epochs: int = None,
+              checkpoint: 'TrainingCheckpoint' = None) -> 'tf.keras.callbacks.History':
         """
-        Trains the investment recommendation model on the given data.
+        Trains the investment recommendation model on the given data. Called again, training
+        continues from the current weights, e.g. for the epochs granted to a hyperparameter search trial.
 
         Args:
             training_data (pd.DataFrame): Training data containing features and labels
+            epochs (int): Training epochs. Defaults to the configured epochs
+            checkpoint (TrainingCheckpoint): Checkpoints of the training job. Training resumes from
+                the latest one up to epochs in total, and is checkpointed periodically
+
+        Early stopping, the learning rate schedule, best-weight restore and the time budget
+        follow INVESTMENT_RECOMMENDATION_MODEL['callbacks'].
 
         Returns:
             tf.keras.callbacks.History: Training history
         """
         # Preprocess the training data
-        X_train, y_train = self.preprocess_data(training_data)
+        X_train, y_train = self.preprocess_data(training_data, fit=True)
+        report = TrainingReport()
+        initial_epoch = checkpoint.restore(self.model, report) if checkpoint else 0
+        epochs = epochs or self.epochs
+        callbacks = create_training_callbacks(callback_settings(INVESTMENT_RECOMMENDATION_MODEL), epochs, initial_epoch, report,
+                                              learning_rate=self.learning_rate, trained_epochs=0 if checkpoint else self.trained_epochs)
 
         # Train the model
+        train_dataset, validation_dataset = make_training_datasets(X_train, y_train, self.batch_size, validation_split=0.2)
         history = self.model.fit(
-            X_train, y_train,
-            batch_size=INVESTMENT_RECOMMENDATION_MODEL['batch_size'],
-            epochs=INVESTMENT_RECOMMENDATION_MODEL['epochs'],
-            validation_split=0.2,
-            callbacks=[
-                tf.keras.callbacks.EarlyStopping(patience=10, restore_best_weights=True),
-                tf.keras.callbacks.ReduceLROnPlateau(factor=0.5, patience=5)
-            ]
+            train_dataset,
+            validation_data=validation_dataset,
+            epochs=epochs,
+            initial_epoch=initial_epoch,
+            callbacks=callbacks + ([checkpoint.callback(report)] if checkpoint else [])
         )
+        self.training_report = report.summary()
+        self.trained_epochs = report.trained_epochs
 
         return history
 
@@ -138,6 +191,19 @@ class InvestmentRecommendationModel:
 
         return recommended_allocation
 
+    def predict_batch(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generates allocation probabilities for several users at once.
+
+        Args:
+            data (pd.DataFrame): Input data with one row per user
+
+        Returns:
+            np.ndarray: Probability of each allocation category, one row per user
+        """
+        X, _ = self.preprocess_data(data)
+        return self.model.predict(X)
+
     def save_model(self, file_path: str) -> None:
         """
         Saves the trained model to disk.
@@ -146,8 +212,8 @@ class InvestmentRecommendationModel:
             file_path (str): Path to save the model
         """
         self.model.save(file_path)
-        np.save(f"{file_path}_scaler.npy", self.scaler.get_params())
-        np.save(f"{file_path}_encoder.npy", self.encoder.get_params())
+        save_scaler(self.scaler, f"{file_path}_scaler.npz")
+        save_one_hot_encoder(self.encoder, f"{file_path}_encoder.json")
 
     def load_model(self, file_path: str) -> None:
         """
@@ -156,11 +222,20 @@ class InvestmentRecommendationModel:
         Args:
             file_path (str): Path to load the model from
         """
-        self.model = tf.keras.models.load_model(file_path)
-        self.scaler = StandardScaler()
-        self.scaler.set_params(**np.load(f"{file_path}_scaler.npy", allow_pickle=True).item())
-        self.encoder = OneHotEncoder()
-        self.encoder.set_params(**np.load(f"{file_path}_encoder.npy", allow_pickle=True).item())
+        from tensorflow.keras.models import load_model
+        self.model = load_model(file_path)
+        self.load_preprocessing(file_path)
+
+    def load_preprocessing(self, file_path: str) -> None:
+        """
+        Loads only the fitted scaler and encoder saved next to a model, without
+        loading the Keras network.
+
+        Args:
+            file_path (str): Path the model was saved to
+        """
+        self.scaler = load_scaler(f"{file_path}_scaler.npz")
+        self.encoder = load_one_hot_encoder(f"{file_path}_encoder.json")
 
 # Pending human tasks:
 # TODO: Review and validate the model architecture with the data science team
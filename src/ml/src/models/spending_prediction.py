@@ -2,69 +2,114 @@ import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+
+from ..preprocessing.artifacts import save_scaler, load_scaler
+from ..preprocessing.sequences import (RaggedArray, compute_history_features, compute_seasonality_features,
+                                       HISTORY_LAGS, HISTORY_WINDOWS)
+from ..utils.input_pipeline import make_dataset, resolve_batch_size, example_bytes
+from ..training.incremental_training import INCREMENTAL_TRAINING_CONFIG, set_learning_rate
+from ..training.callbacks import TrainingReport, callback_settings, create_training_callbacks
 
 # Assuming SPENDING_PREDICTION_MODEL configuration
 SPENDING_PREDICTION_MODEL = {
     'input_features': ['historical_spending', 'income', 'month'],
     'hidden_layers': [64, 32],
     'learning_rate': 0.001,
-    'batch_size': 32,
     'epochs': 100,
     'validation_split': 0.2,
-    'early_stopping_patience': 10
+    # Overrides of the training callback settings (see training.callbacks)
+    'callbacks': {'patience': 10, 'lr_schedule': 'none'}
 }
 
-def preprocess_data(data: pd.DataFrame) -> tuple:
+# Model inputs derived from the input features: income, month seasonality and
+# aggregates of the variable-length spending history
+SPENDING_PREDICTION_MODEL['feature_columns'] = (
+    ['income', 'month_sin', 'month_cos', 'history_length', 'history_mean']
+    + [f'lag_{lag}' for lag in HISTORY_LAGS]
+    + [f'rolling_sum_{window}' for window in HISTORY_WINDOWS]
+    + ['trend_3']
+)
+
+def build_feature_matrix(history: RaggedArray, income: np.ndarray, month: np.ndarray) -> np.ndarray:
+    """
+    Builds the unscaled model inputs for a batch of users in one pass.
+
+    Args:
+        history (RaggedArray): Monthly spending history of every user, oldest first.
+        income (np.ndarray): Income of every user.
+        month (np.ndarray): Month to predict for every user, from 1 to 12.
+
+    Returns:
+        np.ndarray: One row per user, with the columns of SPENDING_PREDICTION_MODEL['feature_columns'].
+    """
+    features = {'income': np.asarray(income, dtype=np.float64)}
+    features.update(compute_seasonality_features(month))
+    features.update(compute_history_features(history))
+    return np.column_stack([features[column] for column in SPENDING_PREDICTION_MODEL['feature_columns']])
+
+def preprocess_data(data: pd.DataFrame, scaler: StandardScaler, fit: bool = False, history: RaggedArray = None) -> tuple:
     """
     Preprocesses the input data for the spending prediction model.
 
     Args:
         data (pd.DataFrame): Input data containing relevant features.
+        scaler (StandardScaler): Scaler holding the training feature statistics.
+        fit (bool): Whether to fit the scaler on this data. Prediction only applies it.
+        history (RaggedArray): Spending histories of the rows of data. Without it they are
+            read from the 'historical_spending' column, one list per row.
 
     Returns:
-        tuple: Preprocessed features (X) and target variable (y).
+        tuple: Preprocessed features (X) and target variable (y), or None for y without a target column.
     """
-    # Extract relevant features
-    features = SPENDING_PREDICTION_MODEL['input_features']
-    X = data[features].values
-    y = data['target_spending'].values
+    if history is None:
+        history = RaggedArray.from_sequences(data['historical_spending'])
+
+    # Derive the model inputs for all rows at once
+    X = build_feature_matrix(history, data['income'].to_numpy(), data['month'].to_numpy())
+    y = data['target_spending'].values if 'target_spending' in data.columns else None
 
     # Normalize numerical features
-    scaler = StandardScaler()
-    X = scaler.fit_transform(X)
+    X = scaler.fit_transform(X) if fit else scaler.transform(X)
 
     return X, y
 
-def build_model() -> Sequential:
+def build_model(hidden_layers: list = None, learning_rate: float = None) -> 'Sequential':
     """
     Builds and compiles the spending prediction model.
 
+    Args:
+        hidden_layers (list): Units of every hidden layer. Defaults to the configured layers.
+        learning_rate (float): Learning rate of the Adam optimizer. Defaults to the configured rate.
+
     Returns:
         tensorflow.keras.Model: Compiled Keras model for spending prediction.
     """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.optimizers import Adam
+
     model = Sequential()
     
     # Add input layer
-    model.add(Dense(SPENDING_PREDICTION_MODEL['hidden_layers'][0], activation='relu', input_shape=(len(SPENDING_PREDICTION_MODEL['input_features']),)))
+    hidden_layers = hidden_layers or SPENDING_PREDICTION_MODEL['hidden_layers']
+    model.add(Dense(hidden_layers[0], activation='relu', input_shape=(len(SPENDING_PREDICTION_MODEL['feature_columns']),)))
     
     # Add hidden layers
-    for units in SPENDING_PREDICTION_MODEL['hidden_layers'][1:]:
+    for units in hidden_layers[1:]:
         model.add(Dense(units, activation='relu'))
     
     # Add output layer
     model.add(Dense(1))  # Single neuron for regression task
     
     # Compile the model
-    model.compile(optimizer=Adam(learning_rate=SPENDING_PREDICTION_MODEL['learning_rate']),
+    model.compile(optimizer=Adam(learning_rate=learning_rate or SPENDING_PREDICTION_MODEL['learning_rate']),
                   loss='mean_squared_error')
     
     return model
 
-def train_model(model: Sequential, X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, y_val: np.ndarray) -> Sequential:
+def train_model(model: 'Sequential', X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, y_val: np.ndarray,
+                epochs: int = None, batch_size: int = None, checkpoint: 'TrainingCheckpoint' = None,
+                report: TrainingReport = None, learning_rate: float = None, trained_epochs: int = 0) -> 'Sequential':
     """
     Trains the spending prediction model on the provided data.
 
@@ -74,27 +119,47 @@ def train_model(model: Sequential, X_train: np.ndarray, y_train: np.ndarray, X_v
         y_train (np.ndarray): Training target values.
         X_val (np.ndarray): Validation features.
         y_val (np.ndarray): Validation target values.
+        epochs (int): Training epochs. Defaults to the configured epochs.
+        batch_size (int): Training batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned
+            to the available memory (see utils.input_pipeline).
+        checkpoint (TrainingCheckpoint): Checkpoints of the training job. Training resumes from
+            the latest one up to epochs in total, and is checkpointed periodically.
+        report (TrainingReport): Filled in with the epochs and time of the run.
+        learning_rate (float): Base learning rate of the learning rate schedule. Defaults to the optimizer's one.
+        trained_epochs (int): Epochs the model was trained for by earlier calls, from which the
+            learning rate schedule continues. Ignored when resuming from a checkpoint.
+
+    Early stopping, the learning rate schedule, best-weight restore and the time budget
+    follow SPENDING_PREDICTION_MODEL['callbacks'].
 
     Returns:
         Sequential: Trained Keras model.
     """
-    # Define callbacks
-    early_stopping = EarlyStopping(patience=SPENDING_PREDICTION_MODEL['early_stopping_patience'], restore_best_weights=True)
-    model_checkpoint = ModelCheckpoint('best_model.h5', save_best_only=True)
+    epochs = epochs or SPENDING_PREDICTION_MODEL['epochs']
+    report = report if report is not None else TrainingReport()
+    initial_epoch = checkpoint.restore(model, report) if checkpoint is not None else 0
 
-    # Train the model
+    # Define callbacks
+    callbacks = create_training_callbacks(callback_settings(SPENDING_PREDICTION_MODEL), epochs, initial_epoch, report,
+                                          learning_rate=learning_rate, trained_epochs=0 if checkpoint is not None else trained_epochs)
+    if checkpoint is not None:
+        callbacks.append(checkpoint.callback(report))
+
+    # Train the model from prefetching tf.data pipelines
+    X_train, X_val = np.asarray(X_train, dtype=np.float32), np.asarray(X_val, dtype=np.float32)
+    batch_size = resolve_batch_size(batch_size, example_bytes(X_train), len(X_train))
     history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
-        epochs=SPENDING_PREDICTION_MODEL['epochs'],
-        batch_size=SPENDING_PREDICTION_MODEL['batch_size'],
-        callbacks=[early_stopping, model_checkpoint],
+        make_dataset(X_train, y_train, batch_size),
+        validation_data=make_dataset(X_val, y_val, batch_size, shuffle=False),
+        epochs=epochs,
+        initial_epoch=initial_epoch,
+        callbacks=callbacks,
         verbose=1
     )
 
     return model
 
-def evaluate_model(model: Sequential, X_test: np.ndarray, y_test: np.ndarray) -> dict:
+def evaluate_model(model: 'Sequential', X_test: np.ndarray, y_test: np.ndarray) -> dict:
     """
     Evaluates the trained model on test data.
 
@@ -120,7 +185,7 @@ def evaluate_model(model: Sequential, X_test: np.ndarray, y_test: np.ndarray) ->
         'r_squared': r_squared
     }
 
-def predict_spending(model: Sequential, input_data: np.ndarray) -> np.ndarray:
+def predict_spending(model: 'Sequential', input_data: np.ndarray) -> np.ndarray:
     """
     Makes spending predictions using the trained model.
 
@@ -134,34 +199,92 @@ def predict_spending(model: Sequential, input_data: np.ndarray) -> np.ndarray:
     return model.predict(input_data).flatten()
 
 class SpendingPredictionModel:
-    def __init__(self):
-        self.model = None
+    def __init__(self, hidden_layers: list = None, learning_rate: float = None, batch_size: int = None,
+                 epochs: int = None):
+        """
+        Initializes the SpendingPredictionModel. The hyperparameters default to SPENDING_PREDICTION_MODEL.
 
-    def train(self, training_data: pd.DataFrame):
+        Args:
+            hidden_layers (list): Units of every hidden layer.
+            learning_rate (float): Learning rate of the Adam optimizer.
+            batch_size (int): Training batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned.
+            epochs (int): Training epochs.
         """
-        Trains the spending prediction model.
+        self.model = None
+        self.scaler = StandardScaler()
+        self.hidden_layers = hidden_layers
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.epochs = epochs
+        # Summary of the last training run (see training.callbacks.TrainingReport)
+        self.training_report = None
+        # Epochs trained so far, from which the learning rate schedule of the next train call continues
+        self.trained_epochs = 0
+
+    def train(self, training_data: pd.DataFrame, epochs: int = None, checkpoint: 'TrainingCheckpoint' = None):
+        """
+        Trains the spending prediction model. Called again, training continues from the
+        current weights, e.g. for the epochs granted to a hyperparameter search trial.
 
         Args:
             training_data (pd.DataFrame): Training data containing features and target.
+            epochs (int): Training epochs. Defaults to the configured epochs.
+            checkpoint (TrainingCheckpoint): Checkpoints of the training job. Training resumes from
+                the latest one up to epochs in total, and is checkpointed periodically.
         """
         # Preprocess data
-        X, y = preprocess_data(training_data)
+        X, y = preprocess_data(training_data, self.scaler, fit=True)
         
         # Split data into train and validation sets
         X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=SPENDING_PREDICTION_MODEL['validation_split'], random_state=42)
         
         # Build model
-        self.model = build_model()
+        if self.model is None:
+            self.model = build_model(self.hidden_layers, self.learning_rate)
         
         # Train model
-        self.model = train_model(self.model, X_train, y_train, X_val, y_val)
+        report = TrainingReport()
+        self.model = train_model(self.model, X_train, y_train, X_val, y_val,
+                                 epochs=epochs or self.epochs, batch_size=self.batch_size, checkpoint=checkpoint, report=report,
+                                 learning_rate=self.learning_rate or SPENDING_PREDICTION_MODEL['learning_rate'],
+                                 trained_epochs=self.trained_epochs)
+        self.training_report = report.summary()
+        self.trained_epochs = report.trained_epochs
+
+    def fine_tune(self, training_data: pd.DataFrame, epochs: int = None, learning_rate_factor: float = None):
+        """
+        Continues training the current weights on new data at a reduced learning rate, keeping
+        the fitted scaler so the inputs keep the scale the weights were trained on. Used to
+        warm-start updates of the deployed model (see training.incremental_training).
+
+        Args:
+            training_data (pd.DataFrame): Training data containing features and target.
+            epochs (int): Training epochs. Defaults to ML_WARM_START_EPOCHS.
+            learning_rate_factor (float): Fraction of the model's learning rate used.
+                Defaults to ML_WARM_START_LEARNING_RATE_FACTOR.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been trained. Call train() first.")
+
+        X, y = preprocess_data(training_data, self.scaler)
+        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=SPENDING_PREDICTION_MODEL['validation_split'], random_state=42)
 
-    def predict(self, input_data: pd.DataFrame) -> np.ndarray:
+        learning_rate = self.learning_rate or SPENDING_PREDICTION_MODEL['learning_rate']
+        set_learning_rate(self.model, learning_rate * (learning_rate_factor or INCREMENTAL_TRAINING_CONFIG['learning_rate_factor']))
+        report = TrainingReport()
+        self.model = train_model(self.model, X_train, y_train, X_val, y_val,
+                                 epochs=epochs or INCREMENTAL_TRAINING_CONFIG['fine_tune_epochs'], batch_size=self.batch_size,
+                                 report=report)
+        self.training_report = report.summary()
+
+    def predict(self, input_data: pd.DataFrame, history: RaggedArray = None) -> np.ndarray:
         """
         Makes spending predictions using the trained model.
 
         Args:
             input_data (pd.DataFrame): Input data for prediction.
+            history (RaggedArray): Spending histories of the rows of input_data, if not given
+                as a 'historical_spending' column.
 
         Returns:
             np.ndarray: Predicted spending amounts.
@@ -170,7 +293,7 @@ class SpendingPredictionModel:
             raise ValueError("Model has not been trained. Call train() first.")
         
         # Preprocess input data
-        X, _ = preprocess_data(input_data)
+        X, _ = preprocess_data(input_data, self.scaler, history=history)
         
         # Make predictions
         return predict_spending(self.model, X)
@@ -189,7 +312,7 @@ class SpendingPredictionModel:
             raise ValueError("Model has not been trained. Call train() first.")
         
         # Preprocess test data
-        X_test, y_test = preprocess_data(test_data)
+        X_test, y_test = preprocess_data(test_data, self.scaler)
         
         # Evaluate model
         return evaluate_model(self.model, X_test, y_test)
@@ -205,6 +328,7 @@ class SpendingPredictionModel:
             raise ValueError("Model has not been trained. Call train() first.")
         
         self.model.save(file_path)
+        save_scaler(self.scaler, f"{file_path}_scaler.npz")
 
     def load_model(self, file_path: str):
         """
@@ -215,6 +339,16 @@ class SpendingPredictionModel:
         """
         from tensorflow.keras.models import load_model
         self.model = load_model(file_path)
+        self.load_preprocessing(file_path)
+
+    def load_preprocessing(self, file_path: str):
+        """
+        Loads only the fitted scaler saved next to a model, without loading the Keras network.
+
+        Args:
+            file_path (str): Path the model was saved to.
+        """
+        self.scaler = load_scaler(f"{file_path}_scaler.npz")
 
 # Pending human tasks:
 # TODO: Review and optimize model architecture for spending prediction
@@ -1,10 +1,27 @@
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import Tokenizer
+from sklearn.exceptions import NotFittedError
 from sklearn.preprocessing import LabelEncoder
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
+
+# The preprocessing needs no TensorFlow, so that it can be applied by the TFLite serving
+# mode. TensorFlow itself is only imported where a Keras network is built, trained or loaded.
+from ..preprocessing.text_hashing import HashingVectorizer
+from ..preprocessing.artifacts import (fit_standardization, apply_standardization, save_label_encoder,
+                                       load_label_encoder, save_json, load_json)
+from ..preprocessing.chunk_statistics import ChunkStatistics
+from ..utils.input_pipeline import INPUT_PIPELINE_CONFIG, make_training_datasets, stream_dataset
+from ..utils.parquet_dataset import iter_dataset_chunks, list_dataset_files, read_dataset_file
+from ..training.callbacks import TrainingReport, callback_settings, create_training_callbacks
+
+TRANSACTION_CATEGORIZATION_MODEL = {
+    # Fields every transaction to categorize must have
+    'input_features': ['description', 'amount', 'date'],
+    # Overrides of the training callback settings (see training.callbacks)
+    'callbacks': {'patience': 3, 'lr_schedule': 'cosine'}
+}
+
+# Columns read from the cleaned dataset when training from it
+SOURCE_COLUMNS = ['description', 'amount', 'date', 'category']
 
 class TransactionCategorizationModel:
     """
@@ -12,41 +29,69 @@ class TransactionCategorizationModel:
     data preprocessing, model training, and prediction functionality.
     """
 
-    def __init__(self):
+    def __init__(self, embedding_dim: int = 100, lstm_units: int = 64, learning_rate: float = 0.001,
+                 batch_size: int = None, epochs: int = 10):
         """
         Initializes the TransactionCategorizationModel with configuration.
+
+        Args:
+            embedding_dim (int): Size of the word embeddings.
+            lstm_units (int): Units of the LSTM reading the description.
+            learning_rate (float): Learning rate of the Adam optimizer.
+            batch_size (int): Training batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned
+                to the available memory (see utils.input_pipeline).
+            epochs (int): Training epochs.
         """
         self.model = None
-        self.tokenizer = Tokenizer()
-        self.label_encoder = LabelEncoder()
         self.max_sequence_length = 100
-        self.embedding_dim = 100
-        self.lstm_units = 64
+        # Hashes descriptions into a constant-size id space, so there is no vocabulary to fit
+        self.vectorizer = HashingVectorizer(max_length=self.max_sequence_length)
+        self.label_encoder = LabelEncoder()
+        self.embedding_dim = embedding_dim
+        self.lstm_units = lstm_units
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.epochs = epochs
         self.num_classes = None
+        # Summary of the last training run (see training.callbacks.TrainingReport)
+        self.training_report = None
+        # Epochs trained so far, from which the learning rate schedule of the next train call continues
+        self.trained_epochs = 0
+        # Training statistics used to standardize the numerical features
+        self.feature_stats = {}
 
-    def preprocess_data(self, data: pd.DataFrame):
+    def preprocess_data(self, data: pd.DataFrame, fit: bool = False):
         """
         Preprocesses the input data for training or prediction.
 
+        With fit=True the amount and date statistics and the label encoder are fitted on data
+        first; descriptions are hashed, which needs no fitting. Otherwise the fitted state is only applied, so the
+        features of a transaction do not depend on the other transactions in the batch.
+
         Args:
             data (pd.DataFrame): Input data containing transaction information.
+            fit (bool): Whether to fit the preprocessing state on this data.
 
         Returns:
             tuple: Preprocessed features and labels (if available).
         """
-        # Tokenize transaction descriptions
-        self.tokenizer.fit_on_texts(data['description'])
-        X_text = self.tokenizer.texts_to_sequences(data['description'])
-        X_text = tf.keras.preprocessing.sequence.pad_sequences(X_text, maxlen=self.max_sequence_length)
+        # Convert dates to numerical features
+        dates = pd.to_datetime(data['date']).astype('int64') // 10**9
 
-        # Normalize transaction amounts
-        X_amount = data['amount'].values.reshape(-1, 1)
-        X_amount = (X_amount - X_amount.mean()) / X_amount.std()
+        if fit:
+            self.feature_stats = {
+                'amount': fit_standardization(data['amount']),
+                'date': fit_standardization(dates)
+            }
+        elif not self.feature_stats:
+            raise NotFittedError("Preprocessing is not fitted; train or load the model first")
 
-        # Convert dates to numerical features
-        X_date = pd.to_datetime(data['date']).astype(int) // 10**9
-        X_date = X_date.values.reshape(-1, 1)
-        X_date = (X_date - X_date.mean()) / X_date.std()
+        # Hash transaction descriptions into sequences of word and character n-gram ids
+        X_text = self.vectorizer.transform(data['description'])
+
+        # Normalize transaction amounts and dates
+        X_amount = apply_standardization(data['amount'], self.feature_stats['amount'])
+        X_date = apply_standardization(dates, self.feature_stats['date'])
 
         # Combine features
         X = [X_text, X_amount, X_date]
@@ -54,8 +99,11 @@ class TransactionCategorizationModel:
         # Encode transaction categories if available
         y = None
         if 'category' in data.columns:
-            y = self.label_encoder.fit_transform(data['category'])
-            self.num_classes = len(self.label_encoder.classes_)
+            if fit:
+                y = self.label_encoder.fit_transform(data['category'])
+                self.num_classes = len(self.label_encoder.classes_)
+            else:
+                y = self.label_encoder.transform(data['category'])
 
         return X, y
 
@@ -66,12 +114,15 @@ class TransactionCategorizationModel:
         Returns:
             tensorflow.keras.Model: Compiled Keras model.
         """
+        import tensorflow as tf
+        from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
+
         text_input = tf.keras.Input(shape=(self.max_sequence_length,), name='text_input')
         amount_input = tf.keras.Input(shape=(1,), name='amount_input')
         date_input = tf.keras.Input(shape=(1,), name='date_input')
 
         # Text processing branch
-        embedding = Embedding(input_dim=len(self.tokenizer.word_index) + 1,
+        embedding = Embedding(input_dim=self.vectorizer.num_buckets,
                               output_dim=self.embedding_dim,
                               input_length=self.max_sequence_length)(text_input)
         lstm = LSTM(self.lstm_units)(embedding)
@@ -87,33 +138,131 @@ class TransactionCategorizationModel:
         output = Dense(self.num_classes, activation='softmax')(dropout2)
 
         model = tf.keras.Model(inputs=[text_input, amount_input, date_input], outputs=output)
-        model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+        model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=self.learning_rate),
+                      loss='sparse_categorical_crossentropy', metrics=['accuracy'])
 
         self.model = model
         return model
 
-    def train(self, training_data: pd.DataFrame):
+    def train(self, training_data: pd.DataFrame, epochs: int = None, checkpoint: 'TrainingCheckpoint' = None):
         """
         Trains the transaction categorization model on the provided data.
 
+        The preprocessing is fitted with the network, on the first call. A later call continues
+        training the network, e.g. for the epochs granted to a hyperparameter search trial,
+        since refitting the label encoder would no longer match its output layer. Early stopping, the
+        learning rate schedule, best-weight restore and the time budget follow
+        TRANSACTION_CATEGORIZATION_MODEL['callbacks'].
+
         Args:
             training_data (pd.DataFrame): Training data containing transaction information.
+            epochs (int): Training epochs. Defaults to the configured epochs.
+            checkpoint (TrainingCheckpoint): Checkpoints of the training job. Training resumes from
+                the latest one up to epochs in total, and is checkpointed periodically.
 
         Returns:
             dict: Training history.
         """
-        X, y = self.preprocess_data(training_data)
+        X, y = self.preprocess_data(training_data, fit=self.model is None)
         if self.model is None:
             self.build_model()
+        report = TrainingReport()
+        initial_epoch = checkpoint.restore(self.model, report) if checkpoint else 0
+
+        train_dataset, validation_dataset = make_training_datasets(X, y, self.batch_size, validation_split=0.2)
+        history = self._fit(train_dataset, validation_dataset, epochs or self.epochs, initial_epoch, report, checkpoint)
+        return history.history
 
+    def fit_preprocessing_from_source(self, dataset_root: str = None, filters: list = None):
+        """
+        Fits the amount and date statistics and the label encoder on the cleaned dataset,
+        one chunk at a time, so the dataset need not fit in memory.
+
+        Args:
+            dataset_root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+            filters (list): Conditions the training rows must all meet (see parquet_dataset.build_filters).
+        """
+        statistics = ChunkStatistics()
+        categories = set()
+        for chunk in iter_dataset_chunks(dataset_root, columns=['amount', 'date', 'category'], filters=filters):
+            statistics.update(pd.DataFrame({'amount': chunk['amount'].astype('float64'),
+                                            'date': pd.to_datetime(chunk['date']).astype('int64') // 10**9}))
+            categories.update(chunk['category'].dropna().unique())
+
+        self.feature_stats = {
+            column: {'mean': statistics.mean(column), 'std': statistics.std(column) or 1.0}
+            for column in ('amount', 'date')
+        }
+        self.label_encoder.fit(sorted(categories))
+        self.num_classes = len(self.label_encoder.classes_)
+
+    def train_from_source(self, dataset_root: str = None, filters: list = None, epochs: int = None,
+                          validation_split: float = 0.2, checkpoint: 'TrainingCheckpoint' = None):
+        """
+        Trains the model on the cleaned Parquet dataset without loading it into memory.
+
+        The files of the dataset are read and preprocessed in parallel by a tf.data pipeline,
+        cached after the first epoch and prefetched (see utils.input_pipeline.stream_dataset).
+        The latest files, i.e. the latest months, are held out for validation.
+
+        Args:
+            dataset_root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+            filters (list): Conditions the training rows must all meet (see parquet_dataset.build_filters).
+            epochs (int): Training epochs. Defaults to the configured epochs.
+            validation_split (float): Fraction of the files held out for validation.
+            checkpoint (TrainingCheckpoint): Checkpoints of the training job, as for train.
+
+        Returns:
+            dict: Training history.
+        """
+        import tensorflow as tf
+
+        if self.model is None:
+            self.fit_preprocessing_from_source(dataset_root, filters)
+            self.build_model()
+        report = TrainingReport()
+        initial_epoch = checkpoint.restore(self.model, report) if checkpoint else 0
+
+        files = list_dataset_files(dataset_root, filters)
+        if not files:
+            raise ValueError("The dataset has no files matching the filters")
+        held_out = int(round(len(files) * validation_split)) if len(files) > 1 else 0
+        train_files, validation_files = files[:len(files) - held_out], files[len(files) - held_out:]
+
+        def load(path):
+            return self.preprocess_data(read_dataset_file(path, dataset_root, SOURCE_COLUMNS, filters))
+
+        output_signature = ((tf.TensorSpec((self.max_sequence_length,), tf.int32),
+                             tf.TensorSpec((1,), tf.float32), tf.TensorSpec((1,), tf.float32)),
+                            tf.TensorSpec((), tf.int64))
+        cache = INPUT_PIPELINE_CONFIG['cache']
+        train_dataset = stream_dataset(train_files, load, output_signature, self.batch_size, cache=cache)
+        validation_dataset = None
+        if validation_files:
+            # A file cache must not be shared by the two pipelines
+            validation_cache = cache if cache in ('memory', 'none') else f"{cache}_validation"
+            validation_dataset = stream_dataset(validation_files, load, output_signature, self.batch_size,
+                                                shuffle=False, cache=validation_cache)
+
+        history = self._fit(train_dataset, validation_dataset, epochs or self.epochs, initial_epoch, report, checkpoint)
+        return history.history
+
+    def _fit(self, train_dataset: 'tf.data.Dataset', validation_dataset: 'tf.data.Dataset', epochs: int,
+             initial_epoch: int, report: TrainingReport, checkpoint: 'TrainingCheckpoint' = None) -> 'tf.keras.callbacks.History':
+        # Fits the network with the configured training callbacks, and keeps the report of the run
+        callbacks = create_training_callbacks(callback_settings(TRANSACTION_CATEGORIZATION_MODEL), epochs, initial_epoch, report,
+                                              learning_rate=self.learning_rate, trained_epochs=0 if checkpoint else self.trained_epochs)
         history = self.model.fit(
-            X, y,
-            epochs=10,
-            batch_size=32,
-            validation_split=0.2,
+            train_dataset,
+            validation_data=validation_dataset,
+            epochs=epochs,
+            initial_epoch=initial_epoch,
+            callbacks=callbacks + ([checkpoint.callback(report)] if checkpoint else []),
             verbose=1
         )
-        return history.history
+        self.training_report = report.summary()
+        self.trained_epochs = report.trained_epochs
+        return history
 
     def predict(self, transactions: pd.DataFrame):
         """
@@ -137,8 +286,9 @@ class TransactionCategorizationModel:
             file_path (str): Path to save the model.
         """
         self.model.save(file_path)
-        np.save(f"{file_path}_tokenizer.npy", self.tokenizer.to_json())
-        np.save(f"{file_path}_label_encoder.npy", self.label_encoder.classes_)
+        save_json({'vectorizer': self.vectorizer.get_config(), 'feature_stats': self.feature_stats},
+                  f"{file_path}_preprocessing.json")
+        save_label_encoder(self.label_encoder, f"{file_path}_label_encoder.json")
 
     def load_model(self, file_path: str):
         """
@@ -147,9 +297,25 @@ class TransactionCategorizationModel:
         Args:
             file_path (str): Path to load the model from.
         """
-        self.model = tf.keras.models.load_model(file_path)
-        self.tokenizer = tf.keras.preprocessing.text.tokenizer_from_json(np.load(f"{file_path}_tokenizer.npy", allow_pickle=True).item())
-        self.label_encoder.classes_ = np.load(f"{file_path}_label_encoder.npy", allow_pickle=True)
+        from tensorflow.keras.models import load_model
+        self.model = load_model(file_path)
+        self.load_preprocessing(file_path)
+
+    def load_preprocessing(self, file_path: str):
+        """
+        Loads only the vectorizer settings, feature statistics and label encoder saved
+        next to a model, without loading the Keras network.
+
+        Args:
+            file_path (str): Path the model was saved to.
+        """
+        preprocessing = load_json(f"{file_path}_preprocessing.json")
+        if 'vectorizer' not in preprocessing:
+            raise ValueError(f"{file_path} was saved with a fitted tokenizer vocabulary; retrain it with hashed descriptions")
+        self.vectorizer = HashingVectorizer.from_config(preprocessing['vectorizer'])
+        self.max_sequence_length = self.vectorizer.max_length
+        self.feature_stats = preprocessing['feature_stats']
+        self.label_encoder = load_label_encoder(f"{file_path}_label_encoder.json")
         self.num_classes = len(self.label_encoder.classes_)
 
 def create_transaction_categorization_model():
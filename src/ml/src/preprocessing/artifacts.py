@@ -0,0 +1,157 @@
+import json
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
+from typing import Any, Dict
+
+def fit_standardization(values: pd.Series) -> Dict[str, float]:
+    """
+    Computes the mean and standard deviation used to standardize a numerical feature.
+
+    Args:
+        values (pd.Series): Training values of the feature.
+
+    Returns:
+        Dict[str, float]: The fitted 'mean' and 'std'. A constant feature gets a std of 1.0.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    std = float(values.std())
+    return {'mean': float(values.mean()), 'std': std if std > 0 else 1.0}
+
+def apply_standardization(values: pd.Series, stats: Dict[str, float]) -> np.ndarray:
+    """
+    Standardizes a numerical feature with previously fitted statistics.
+
+    Args:
+        values (pd.Series): Values to transform.
+        stats (Dict[str, float]): Statistics returned by fit_standardization.
+
+    Returns:
+        np.ndarray: Standardized values as a column vector.
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 1)
+    return (values - stats['mean']) / stats['std']
+
+def dense_one_hot_encoder(**kwargs) -> OneHotEncoder:
+    """
+    Creates a OneHotEncoder that returns dense arrays. scikit-learn 1.2 renamed the sparse
+    argument to sparse_output, so the one the installed version accepts is used.
+
+    Args:
+        **kwargs: Further OneHotEncoder arguments, e.g. categories and handle_unknown.
+
+    Returns:
+        OneHotEncoder: An unfitted encoder.
+    """
+    try:
+        return OneHotEncoder(sparse_output=False, **kwargs)
+    except TypeError:
+        return OneHotEncoder(sparse=False, **kwargs)
+
+def save_scaler(scaler: StandardScaler, file_path: str) -> None:
+    """
+    Saves the fitted statistics of a StandardScaler as an .npz archive.
+
+    Args:
+        scaler (StandardScaler): A fitted scaler.
+        file_path (str): Destination path.
+    """
+    with open(file_path, 'wb') as f:
+        np.savez(f, mean=scaler.mean_, scale=scaler.scale_, var=scaler.var_,
+                 n_samples_seen=np.asarray(scaler.n_samples_seen_))
+
+def load_scaler(file_path: str) -> StandardScaler:
+    """
+    Restores a fitted StandardScaler saved with save_scaler.
+
+    Args:
+        file_path (str): Path of the .npz archive.
+
+    Returns:
+        StandardScaler: A scaler that transforms exactly like the saved one.
+    """
+    with np.load(file_path) as artifact:
+        scaler = StandardScaler()
+        scaler.mean_ = artifact['mean']
+        scaler.scale_ = artifact['scale']
+        scaler.var_ = artifact['var']
+        scaler.n_samples_seen_ = artifact['n_samples_seen']
+        scaler.n_features_in_ = len(scaler.mean_)
+    return scaler
+
+def save_one_hot_encoder(encoder: OneHotEncoder, file_path: str) -> None:
+    """
+    Saves the fitted categories of a OneHotEncoder as JSON.
+
+    Args:
+        encoder (OneHotEncoder): A fitted encoder.
+        file_path (str): Destination path.
+    """
+    save_json({'categories': [categories.tolist() for categories in encoder.categories_]}, file_path)
+
+def load_one_hot_encoder(file_path: str) -> OneHotEncoder:
+    """
+    Restores a fitted OneHotEncoder saved with save_one_hot_encoder. Unknown
+    categories are encoded as all zeros.
+
+    Args:
+        file_path (str): Path of the JSON file.
+
+    Returns:
+        OneHotEncoder: An encoder with the saved categories.
+    """
+    categories = load_json(file_path)['categories']
+    encoder = dense_one_hot_encoder(categories=categories, handle_unknown='ignore')
+    # With explicit categories fit only validates its input, so one row of known values is enough
+    encoder.fit(np.array([[column[0] for column in categories]], dtype=object))
+    return encoder
+
+def save_label_encoder(encoder: LabelEncoder, file_path: str) -> None:
+    """
+    Saves the classes of a fitted LabelEncoder as JSON.
+
+    Args:
+        encoder (LabelEncoder): A fitted encoder.
+        file_path (str): Destination path.
+    """
+    save_json({'classes': encoder.classes_.tolist()}, file_path)
+
+def load_label_encoder(file_path: str) -> LabelEncoder:
+    """
+    Restores a fitted LabelEncoder saved with save_label_encoder.
+
+    Args:
+        file_path (str): Path of the JSON file.
+
+    Returns:
+        LabelEncoder: An encoder with the saved classes.
+    """
+    encoder = LabelEncoder()
+    encoder.classes_ = np.array(load_json(file_path)['classes'])
+    return encoder
+
+def save_json(data: Dict[str, Any], file_path: str) -> None:
+    """
+    Saves a preprocessing artifact as JSON.
+
+    Args:
+        data (Dict[str, Any]): JSON-serializable artifact.
+        file_path (str): Destination path.
+    """
+    with open(file_path, 'w') as f:
+        json.dump(data, f)
+
+def load_json(file_path: str) -> Dict[str, Any]:
+    """
+    Loads a preprocessing artifact saved with save_json.
+
+    Args:
+        file_path (str): Path of the JSON file.
+
+    Returns:
+        Dict[str, Any]: The artifact.
+    """
+    with open(file_path) as f:
+        return json.load(f)
+
+# TODO: Store a checksum of each artifact next to the model so mismatched artifacts are detected at load time
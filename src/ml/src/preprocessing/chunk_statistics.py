@@ -0,0 +1,189 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Tuple
+
+# Default statistics settings, overridable through the environment: the most distinct values
+# counted per categorical column. Identifier-like columns, such as transaction_id or description,
+# exceed it and are not counted, so the counts stay bounded however many rows are seen.
+CHUNK_STATISTICS_CONFIG = {
+    'max_categories': int(os.environ.get('ML_STATS_MAX_CATEGORIES', 10000)),
+}
+
+class ChunkStatistics:
+    """
+    Column statistics that are accumulated chunk by chunk and can be merged, so that data
+    too large for memory can be preprocessed with the statistics of the whole dataset.
+
+    Numerical columns keep their count, mean and sum of squared deviations (merged with
+    Chan's parallel algorithm), minimum and maximum, and a bottom-k sample for quantiles:
+    every value gets a random key and the sample_size values with the smallest keys are
+    kept, which is a uniform sample of the column no matter how it was split into chunks.
+    Categorical columns keep exact value counts, up to max_categories distinct values; beyond
+    that only their number of values is kept, and they have no mode or categories.
+    """
+
+    def __init__(self, sample_size: int = 10000, seed: int = 0, max_categories: int = None):
+        """
+        Initializes empty ChunkStatistics.
+
+        Args:
+            sample_size (int): Number of values per numerical column kept for quantile estimates.
+            seed (int): Seed of the sampling keys.
+            max_categories (int): Most distinct values counted per categorical column. Defaults to
+                ML_STATS_MAX_CATEGORIES.
+        """
+        self.sample_size = sample_size
+        self.max_categories = max_categories or CHUNK_STATISTICS_CONFIG['max_categories']
+        self.moments: Dict[str, Dict[str, float]] = {}
+        self.samples: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.value_counts: Dict[str, pd.Series] = {}
+        # Number of values of the categorical columns with more than max_categories distinct values
+        self.uncounted: Dict[str, int] = {}
+        self._rng = np.random.RandomState(seed)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], sample_size: int = 10000, seed: int = 0,
+                    max_categories: int = None) -> 'ChunkStatistics':
+        """
+        Accumulates the statistics of a stream of chunks.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The chunks.
+            sample_size (int): Number of values per numerical column kept for quantile estimates.
+            seed (int): Seed of the sampling keys.
+            max_categories (int): Most distinct values counted per categorical column.
+
+        Returns:
+            ChunkStatistics: Statistics of all chunks together.
+        """
+        statistics = cls(sample_size=sample_size, seed=seed, max_categories=max_categories)
+        for chunk in chunks:
+            statistics.update(chunk)
+        return statistics
+
+    def update(self, chunk: pd.DataFrame) -> 'ChunkStatistics':
+        """
+        Adds a chunk to the statistics.
+
+        Args:
+            chunk (pd.DataFrame): The chunk.
+
+        Returns:
+            ChunkStatistics: self, for chaining.
+        """
+        for column in chunk.select_dtypes(include=[np.number]).columns:
+            values = chunk[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            mean = values.mean()
+            self._merge_moments(column, {'count': len(values), 'mean': mean, 'm2': float(((values - mean) ** 2).sum()),
+                                         'min': values.min(), 'max': values.max()})
+            self._merge_sample(column, self._rng.random_sample(len(values)), values)
+
+        for column in chunk.select_dtypes(include=['object', 'category', 'bool']).columns:
+            if column in self.uncounted:
+                self.uncounted[column] += int(chunk[column].count())
+            else:
+                self._merge_counts(column, chunk[column].value_counts(dropna=True))
+        return self
+
+    def merge(self, other: 'ChunkStatistics') -> 'ChunkStatistics':
+        """
+        Adds the statistics of another, e.g. computed on a different worker.
+
+        Args:
+            other (ChunkStatistics): Statistics of other chunks of the same dataset.
+
+        Returns:
+            ChunkStatistics: self, for chaining.
+        """
+        for column, moments in other.moments.items():
+            self._merge_moments(column, moments)
+        for column, (keys, values) in other.samples.items():
+            self._merge_sample(column, keys, values)
+        for column, count in other.uncounted.items():
+            if column in self.value_counts:
+                count += int(self.value_counts.pop(column).sum())
+            self.uncounted[column] = self.uncounted.get(column, 0) + count
+        for column, counts in other.value_counts.items():
+            if column in self.uncounted:
+                self.uncounted[column] += int(counts.sum())
+            else:
+                self._merge_counts(column, counts)
+        return self
+
+    def count(self, column: str) -> int:
+        """Number of non-missing values of a column."""
+        if column in self.moments:
+            return int(self.moments[column]['count'])
+        if column in self.uncounted:
+            return self.uncounted[column]
+        return int(self.value_counts[column].sum()) if column in self.value_counts else 0
+
+    def mean(self, column: str) -> float:
+        """Mean of a numerical column."""
+        return self.moments[column]['mean']
+
+    def std(self, column: str) -> float:
+        """Population standard deviation of a numerical column, as used by StandardScaler."""
+        moments = self.moments[column]
+        return float(np.sqrt(moments['m2'] / moments['count']))
+
+    def quantile(self, column: str, q: float) -> float:
+        """Estimated quantile of a numerical column; exact while the column has at most sample_size values."""
+        return float(np.quantile(self.samples[column][1], q))
+
+    def median(self, column: str) -> float:
+        """Estimated median of a numerical column."""
+        return self.quantile(column, 0.5)
+
+    def mode(self, column: str):
+        """Most frequent value of a categorical column."""
+        self._check_counted(column)
+        return self.value_counts[column].idxmax()
+
+    def categories(self, column: str) -> List:
+        """Sorted distinct values of a categorical column."""
+        self._check_counted(column)
+        return sorted(self.value_counts[column].index)
+
+    def _check_counted(self, column: str) -> None:
+        if column in self.uncounted:
+            raise ValueError(f"Column {column} has more than {self.max_categories} distinct values, which are not counted")
+
+    def _merge_counts(self, column: str, counts: pd.Series) -> None:
+        if column in self.value_counts:
+            counts = counts.add(self.value_counts[column], fill_value=0)
+        if len(counts) > self.max_categories:
+            # Too many distinct values to be a category: only their number is kept from now on
+            self.value_counts.pop(column, None)
+            self.uncounted[column] = int(counts.sum())
+        else:
+            self.value_counts[column] = counts
+
+    def _merge_moments(self, column: str, moments: Dict[str, float]) -> None:
+        if column not in self.moments:
+            self.moments[column] = dict(moments)
+            return
+
+        current = self.moments[column]
+        count = current['count'] + moments['count']
+        delta = moments['mean'] - current['mean']
+        self.moments[column] = {
+            'count': count,
+            'mean': current['mean'] + delta * moments['count'] / count,
+            'm2': current['m2'] + moments['m2'] + delta ** 2 * current['count'] * moments['count'] / count,
+            'min': min(current['min'], moments['min']),
+            'max': max(current['max'], moments['max']),
+        }
+
+    def _merge_sample(self, column: str, keys: np.ndarray, values: np.ndarray) -> None:
+        if column in self.samples:
+            keys = np.concatenate([self.samples[column][0], keys])
+            values = np.concatenate([self.samples[column][1], values])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, values = keys[keep], values[keep]
+        self.samples[column] = (keys, values)
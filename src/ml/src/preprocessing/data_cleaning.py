@@ -1,19 +1,33 @@
 import pandas as pd
 import numpy as np
 from sklearn.impute import SimpleImputer
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Set
 from ..utils import data_loader  # Assuming this module exists and has a load_data function
+from .chunk_statistics import ChunkStatistics
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+def remove_duplicates(df: pd.DataFrame, seen_hashes: Set[int] = None) -> pd.DataFrame:
     """
     Removes duplicate entries from the dataset.
 
     Args:
         df (pd.DataFrame): Input dataframe.
+        seen_hashes (Set[int]): Row hashes of the chunks processed before, when df is one
+            chunk of a larger dataset. Rows repeating an earlier chunk are removed too, and
+            the hashes of the kept rows are added to the set.
 
     Returns:
         pd.DataFrame: Dataframe with duplicates removed.
     """
+    if seen_hashes is not None:
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        # Set lookups per row of the chunk, so the cost does not grow with the rows seen before
+        seen = np.fromiter((value in seen_hashes for value in hashes.tolist()), dtype=bool, count=len(hashes))
+        duplicates = pd.Series(pd.Series(hashes).duplicated().to_numpy() | seen, index=df.index)
+        seen_hashes.update(hashes[~duplicates.to_numpy()].tolist())
+        df_cleaned = df[~duplicates].reset_index(drop=True)
+        print(f"Removed {sum(duplicates)} duplicate rows.")
+        return df_cleaned
+
     # Check for duplicate rows in the dataframe
     duplicates = df.duplicated()
     
@@ -26,12 +40,14 @@ def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     print(f"Removed {sum(duplicates)} duplicate rows.")
     return df_cleaned
 
-def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+def handle_missing_values(df: pd.DataFrame, statistics: ChunkStatistics = None) -> pd.DataFrame:
     """
     Handles missing values in the dataset using appropriate strategies.
 
     Args:
         df (pd.DataFrame): Input dataframe.
+        statistics (ChunkStatistics): Statistics of the whole dataset when df is one chunk of
+            it, so every chunk is imputed with the same medians and modes.
 
     Returns:
         pd.DataFrame: Dataframe with missing values handled.
@@ -39,6 +55,15 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     # Identify columns with missing values
     columns_with_missing = df.columns[df.isnull().any()].tolist()
     
+    if statistics is not None:
+        fill_values = {col: statistics.median(col) for col in df.select_dtypes(include=[np.number]).columns
+                       if col in statistics.moments}
+        fill_values.update({col: statistics.mode(col) for col in df.select_dtypes(include=['object', 'category']).columns
+                            if col in statistics.value_counts})
+        df = df.fillna(fill_values)
+        print(f"Handled missing values in {len(columns_with_missing)} columns.")
+        return df
+    
     # For numerical columns, impute missing values with median
     numerical_columns = df.select_dtypes(include=[np.number]).columns
     numerical_imputer = SimpleImputer(strategy='median')
@@ -105,6 +130,30 @@ def clean_data(data_path: str) -> pd.DataFrame:
     print("Data cleaning completed successfully.")
     return df_cleaned
 
+def clean_data_chunks(data_source: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Cleans a dataset too large for memory chunk by chunk. The source is read twice: once
+    to collect the imputation statistics of the whole dataset, then to clean each chunk.
+    Duplicates are removed across chunks by keeping the 64-bit hash of every distinct row,
+    so that set grows with the number of distinct rows (roughly 70 bytes per row); only the
+    rows themselves are bounded by the chunk size. High-cardinality text columns are not
+    imputed, as they have no mode (see ChunkStatistics).
+
+    Args:
+        data_source (str): Path to a CSV or Parquet file, or SQL query for database.
+        chunk_size (int): Rows per chunk. Defaults to ML_DATA_CHUNK_SIZE.
+
+    Yields:
+        pd.DataFrame: The next cleaned chunk.
+    """
+    statistics = ChunkStatistics.from_chunks(data_loader.iter_data_chunks(data_source, chunk_size))
+
+    seen_hashes = set()
+    for chunk in data_loader.iter_data_chunks(data_source, chunk_size):
+        chunk = remove_duplicates(chunk, seen_hashes)
+        chunk = handle_missing_values(chunk, statistics)
+        yield normalize_data_formats(chunk)
+
 # List of human tasks
 """
 Human tasks:
@@ -1,7 +1,11 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
-from typing import List
+from sklearn.preprocessing import StandardScaler, OrdinalEncoder
+from typing import Callable, Iterator, List
+
+from .feature_store import TransactionFeatureStore
+from .chunk_statistics import ChunkStatistics
+from .artifacts import dense_one_hot_encoder
 
 def create_time_based_features(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -28,12 +32,14 @@ def create_time_based_features(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def encode_categorical_variables(df: pd.DataFrame) -> pd.DataFrame:
+def encode_categorical_variables(df: pd.DataFrame, statistics: ChunkStatistics = None) -> pd.DataFrame:
     """
     Encodes categorical variables using appropriate encoding techniques.
 
     Args:
         df (pd.DataFrame): Input dataframe with categorical variables.
+        statistics (ChunkStatistics): Statistics of the whole dataset when df is one chunk of
+            it. The encoders then use its categories, so every chunk gets the same columns.
 
     Returns:
         pd.DataFrame: Dataframe with encoded categorical variables.
@@ -43,14 +49,16 @@ def encode_categorical_variables(df: pd.DataFrame) -> pd.DataFrame:
 
     # Apply one-hot encoding for nominal categorical variables
     nominal_columns = ['category', 'merchant']  # Add more nominal columns as needed
-    onehot_encoder = OneHotEncoder(sparse=False, handle_unknown='ignore')
+    onehot_categories = [statistics.categories(col) for col in nominal_columns] if statistics else 'auto'
+    onehot_encoder = dense_one_hot_encoder(categories=onehot_categories, handle_unknown='ignore')
     onehot_encoded = onehot_encoder.fit_transform(df[nominal_columns])
     onehot_columns = [f"{col}_{val}" for col, vals in zip(nominal_columns, onehot_encoder.categories_) for val in vals]
     df_onehot = pd.DataFrame(onehot_encoded, columns=onehot_columns, index=df.index)
 
     # Apply ordinal encoding for ordinal categorical variables
     ordinal_columns = ['transaction_type']  # Add more ordinal columns as needed
-    ordinal_encoder = OrdinalEncoder()
+    ordinal_categories = [statistics.categories(col) for col in ordinal_columns] if statistics else 'auto'
+    ordinal_encoder = OrdinalEncoder(categories=ordinal_categories)
     df[ordinal_columns] = ordinal_encoder.fit_transform(df[ordinal_columns])
 
     # Combine encoded features with original dataframe
@@ -58,38 +66,51 @@ def encode_categorical_variables(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def create_transaction_features(df: pd.DataFrame) -> pd.DataFrame:
+def create_transaction_features(df: pd.DataFrame, feature_store: TransactionFeatureStore = None,
+                                statistics: ChunkStatistics = None) -> pd.DataFrame:
     """
     Creates features based on transaction data.
 
     Args:
         df (pd.DataFrame): Input dataframe with transaction data.
+        feature_store (TransactionFeatureStore): Optional store of precomputed aggregates. When
+            given, the per-category and per-account aggregates are read from it instead of being
+            recomputed over df, and cumulative_sum is the account total as of the latest update.
+        statistics (ChunkStatistics): Statistics of the whole dataset when df is one chunk of
+            it, for the high-value threshold.
 
     Returns:
         pd.DataFrame: Dataframe with additional transaction-based features.
     """
-    # Calculate average transaction amount per category
-    df['avg_amount_per_category'] = df.groupby('category')['amount'].transform('mean')
+    if feature_store is not None:
+        stored = feature_store.get_features(df)
+        for column in stored.columns:
+            df[column] = stored[column]
+    else:
+        # Calculate average transaction amount per category
+        df['avg_amount_per_category'] = df.groupby('category')['amount'].transform('mean')
+
+        # Calculate transaction frequency per category
+        df['transaction_frequency'] = df.groupby('category')['transaction_id'].transform('count')
 
-    # Calculate transaction frequency per category
-    df['transaction_frequency'] = df.groupby('category')['transaction_id'].transform('count')
+        # Calculate cumulative sum of transactions
+        df['cumulative_sum'] = df.groupby('account_id')['amount'].cumsum()
 
     # Create binary flags for high-value transactions
     # TODO: Determine the threshold for high-value transactions
-    high_value_threshold = df['amount'].quantile(0.95)  # Placeholder, adjust as needed
+    high_value_threshold = statistics.quantile('amount', 0.95) if statistics else df['amount'].quantile(0.95)  # Placeholder, adjust as needed
     df['is_high_value'] = (df['amount'] > high_value_threshold).astype(int)
 
-    # Calculate cumulative sum of transactions
-    df['cumulative_sum'] = df.groupby('account_id')['amount'].cumsum()
-
     return df
 
-def normalize_numerical_features(df: pd.DataFrame) -> pd.DataFrame:
+def normalize_numerical_features(df: pd.DataFrame, statistics: ChunkStatistics = None) -> pd.DataFrame:
     """
     Normalizes numerical features to a standard scale.
 
     Args:
         df (pd.DataFrame): Input dataframe with numerical features.
+        statistics (ChunkStatistics): Statistics of the unnormalized features of the whole
+            dataset when df is one chunk of it, so every chunk is scaled the same way.
 
     Returns:
         pd.DataFrame: Dataframe with normalized numerical features.
@@ -97,6 +118,15 @@ def normalize_numerical_features(df: pd.DataFrame) -> pd.DataFrame:
     # Identify numerical columns
     numerical_columns = df.select_dtypes(include=['int64', 'float64']).columns
 
+    if statistics is not None:
+        for col in numerical_columns:
+            if col not in statistics.moments:
+                continue
+            # Constant columns are only centred, as StandardScaler does
+            std = statistics.std(col)
+            df[col] = (df[col] - statistics.mean(col)) / (std if std > 0 else 1.0)
+        return df
+
     # Apply StandardScaler to numerical features
     scaler = StandardScaler()
     df[numerical_columns] = scaler.fit_transform(df[numerical_columns])
@@ -124,32 +154,68 @@ def create_interaction_features(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+def engineer_features(df: pd.DataFrame, feature_store: TransactionFeatureStore = None,
+                      statistics: ChunkStatistics = None, scaling_statistics: ChunkStatistics = None) -> pd.DataFrame:
     """
     Main function to perform feature engineering on the cleaned financial data.
 
     Args:
         df (pd.DataFrame): Input dataframe with cleaned financial data.
+        feature_store (TransactionFeatureStore): Optional store of precomputed transaction aggregates.
+        statistics (ChunkStatistics): Statistics of the raw columns of the whole dataset when
+            df is one chunk of it. See engineer_feature_chunks.
+        scaling_statistics (ChunkStatistics): Statistics of the unnormalized features of the
+            whole dataset, used for normalization when df is one chunk of it.
 
     Returns:
         pd.DataFrame: Dataframe with engineered features.
     """
+    df = _create_unnormalized_features(df, feature_store, statistics)
+
+    # Normalize numerical features
+    df = normalize_numerical_features(df, scaling_statistics)
+
+    # Create interaction features
+    df = create_interaction_features(df)
+
+    return df
+
+def _create_unnormalized_features(df: pd.DataFrame, feature_store: TransactionFeatureStore = None,
+                                  statistics: ChunkStatistics = None) -> pd.DataFrame:
     # Create time-based features
     df = create_time_based_features(df)
 
     # Encode categorical variables
-    df = encode_categorical_variables(df)
+    df = encode_categorical_variables(df, statistics)
 
     # Create transaction-based features
-    df = create_transaction_features(df)
+    return create_transaction_features(df, feature_store, statistics)
 
-    # Normalize numerical features
-    df = normalize_numerical_features(df)
+def engineer_feature_chunks(make_chunks: Callable[[], Iterator[pd.DataFrame]],
+                            feature_store: TransactionFeatureStore) -> Iterator[pd.DataFrame]:
+    """
+    Performs feature engineering on a dataset too large for memory, chunk by chunk, with
+    the same results for every chunk as if the dataset had been processed at once.
 
-    # Create interaction features
-    df = create_interaction_features(df)
+    The chunks are read three times: to collect the categories and quantiles of the raw
+    columns, to collect the scaling statistics of the engineered features, and to yield
+    the normalized chunks. The per-category and per-account aggregates are read from the
+    feature store, which must already contain the dataset.
 
-    return df
+    Args:
+        make_chunks (Callable[[], Iterator[pd.DataFrame]]): Returns a new iterator over the
+            cleaned chunks each time it is called, e.g. lambda: clean_data_chunks(source).
+        feature_store (TransactionFeatureStore): Store of the transaction aggregates.
+
+    Yields:
+        pd.DataFrame: The next chunk with engineered features.
+    """
+    statistics = ChunkStatistics.from_chunks(make_chunks())
+    scaling_statistics = ChunkStatistics.from_chunks(
+        _create_unnormalized_features(chunk, feature_store, statistics) for chunk in make_chunks())
+
+    for chunk in make_chunks():
+        yield engineer_features(chunk, feature_store, statistics, scaling_statistics)
 
 # List of human tasks
 """
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Location of the persistent aggregate store
+FEATURE_STORE_CONFIG = {
+    'path': os.environ.get('ML_FEATURE_STORE_PATH', './data/feature_store.sqlite'),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS category_aggregates (
+    category TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS account_aggregates (
+    account_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS account_category_aggregates (
+    account_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (account_id, category)
+);
+CREATE TABLE IF NOT EXISTS applied_batches (
+    batch_id TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+class TransactionFeatureStore:
+    """
+    Persistent per-account and per-category transaction aggregates, updated incrementally
+    as new transactions arrive instead of being recomputed over the full history.
+
+    Each update aggregates the new rows with one groupby and adds the counts and sums to
+    the stored ones, so its cost depends on the size of the update, not of the history.
+    Reading features is a primary-key lookup per distinct account and category.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Initializes the TransactionFeatureStore, creating the database if needed.
+
+        Args:
+            path (str): SQLite database file, or ':memory:'. Defaults to ML_FEATURE_STORE_PATH.
+        """
+        self.path = path or FEATURE_STORE_CONFIG['path']
+        if self.path != ':memory:' and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    def update(self, transactions: pd.DataFrame, batch_id: str = None) -> int:
+        """
+        Adds new transactions to the aggregates in one transaction.
+
+        Args:
+            transactions (pd.DataFrame): New transactions with 'account_id', 'category' and 'amount'.
+            batch_id (str): Optional identifier of the batch. A batch that was already applied is
+                skipped, so a re-run of an ingestion job does not count its rows twice.
+
+        Returns:
+            int: Number of transactions added.
+        """
+        if transactions.empty:
+            return 0
+
+        data = pd.DataFrame({
+            'account_id': transactions['account_id'].astype(str),
+            'category': transactions['category'].astype(str),
+            'amount': transactions['amount'].astype(float)
+        })
+        by_account_category = data.groupby(['account_id', 'category'])['amount'].agg(['count', 'sum']).reset_index()
+        by_account = by_account_category.groupby('account_id')[['count', 'sum']].sum().reset_index()
+        by_category = by_account_category.groupby('category')[['count', 'sum']].sum().reset_index()
+
+        with self._lock, self._connection:
+            if batch_id is not None:
+                applied = self._connection.execute("SELECT 1 FROM applied_batches WHERE batch_id = ?", (batch_id,)).fetchone()
+                if applied:
+                    logger.info(f"Skipping feature store batch {batch_id}, already applied")
+                    return 0
+                self._connection.execute("INSERT INTO applied_batches (batch_id, rows) VALUES (?, ?)", (batch_id, len(data)))
+
+            self._connection.executemany(
+                "INSERT INTO category_aggregates (category, count, total) VALUES (?, ?, ?) "
+                "ON CONFLICT(category) DO UPDATE SET count = count + excluded.count, total = total + excluded.total",
+                _rows(by_category, ['category', 'count', 'sum']))
+            self._connection.executemany(
+                "INSERT INTO account_aggregates (account_id, count, total) VALUES (?, ?, ?) "
+                "ON CONFLICT(account_id) DO UPDATE SET count = count + excluded.count, total = total + excluded.total",
+                _rows(by_account, ['account_id', 'count', 'sum']))
+            self._connection.executemany(
+                "INSERT INTO account_category_aggregates (account_id, category, count, total) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(account_id, category) DO UPDATE SET count = count + excluded.count, total = total + excluded.total",
+                _rows(by_account_category, ['account_id', 'category', 'count', 'sum']))
+
+        return len(data)
+
+    def get_features(self, transactions: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reads the stored aggregates for a batch of transactions.
+
+        Args:
+            transactions (pd.DataFrame): Transactions with 'account_id' and 'category'.
+
+        Returns:
+            pd.DataFrame: Aligned with transactions: avg_amount_per_category and
+            transaction_frequency over all accounts, cumulative_sum of the account, and
+            account_avg_amount_per_category and account_transaction_frequency of the
+            account in the category. Keys the store has not seen get 0.
+        """
+        keys = pd.DataFrame({'account_id': transactions['account_id'].astype(str).to_numpy(),
+                             'category': transactions['category'].astype(str).to_numpy()})
+
+        # The temporary key tables are written in a transaction that also holds a shared lock on
+        # the database; ending it with the lookups lets other connections write again
+        with self._lock, self._connection:
+            category_stats = self._lookup('category_aggregates', keys[['category']].drop_duplicates())
+            account_stats = self._lookup('account_aggregates', keys[['account_id']].drop_duplicates())
+            pair_stats = self._lookup('account_category_aggregates', keys.drop_duplicates())
+
+        # Left joins keep the input order; keys the store has not seen get 0
+        category = keys.merge(category_stats, on='category', how='left').fillna(0)
+        account = keys.merge(account_stats, on='account_id', how='left').fillna(0)
+        pair = keys.merge(pair_stats, on=['account_id', 'category'], how='left').fillna(0)
+
+        return pd.DataFrame({
+            'avg_amount_per_category': _mean(category['total'].to_numpy(), category['count'].to_numpy()),
+            'transaction_frequency': category['count'].to_numpy(dtype=np.int64),
+            'cumulative_sum': account['total'].to_numpy(),
+            'account_avg_amount_per_category': _mean(pair['total'].to_numpy(), pair['count'].to_numpy()),
+            'account_transaction_frequency': pair['count'].to_numpy(dtype=np.int64),
+        }, index=transactions.index)
+
+    def get_account_features(self, account_id: str, category: str) -> Dict[str, float]:
+        """
+        Reads the stored aggregates for a single transaction, for online inference.
+
+        Args:
+            account_id (str): Account of the transaction.
+            category (str): Category of the transaction.
+
+        Returns:
+            Dict[str, float]: The same features as get_features.
+        """
+        features = self.get_features(pd.DataFrame({'account_id': [account_id], 'category': [category]}))
+        return {name: float(value) for name, value in features.iloc[0].items()}
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    def _lookup(self, table: str, keys: pd.DataFrame) -> pd.DataFrame:
+        # Fetches count and total for the given primary keys by joining them in from a temporary table
+        columns = ', '.join(keys.columns)
+        self._connection.execute("DROP TABLE IF EXISTS temp.lookup_keys")
+        self._connection.execute(f"CREATE TEMP TABLE lookup_keys ({columns})")
+        self._connection.executemany(f"INSERT INTO lookup_keys VALUES ({', '.join('?' * len(keys.columns))})",
+                                     keys.itertuples(index=False))
+        rows = self._connection.execute(
+            f"SELECT {', '.join('a.' + column for column in keys.columns)}, a.count, a.total "
+            f"FROM lookup_keys k JOIN {table} a USING ({columns})").fetchall()
+        # Typed explicitly, since an empty result would otherwise have object columns
+        return pd.DataFrame(rows, columns=list(keys.columns) + ['count', 'total']).astype({'count': np.int64, 'total': np.float64})
+
+def _rows(frame: pd.DataFrame, columns: List[str]) -> Iterable[tuple]:
+    # Converts NumPy scalars to the Python types sqlite3 can bind
+    return [tuple(value.item() if isinstance(value, np.generic) else value for value in row)
+            for row in frame[columns].itertuples(index=False)]
+
+def _mean(totals: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    return np.divide(totals, counts, out=np.zeros(len(totals)), where=counts > 0)
+
+# TODO: Keep time-windowed aggregates (e.g. last 30/90 days) next to the all-time ones
@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import inspect
+import logging
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Default cache settings, overridable through the environment. A max_entries of 0 disables the cache.
+PREPROCESSING_CACHE_CONFIG = {
+    'directory': os.environ.get('ML_PREPROCESSING_CACHE_DIR', './data/preprocessing_cache'),
+    'max_entries': int(os.environ.get('ML_PREPROCESSING_CACHE_MAX_ENTRIES', 20)),
+}
+
+DATA_FILE = 'features.arrow'
+METADATA_FILE = 'metadata.json'
+
+def fingerprint_data_source(data_source: str) -> Optional[str]:
+    """
+    Fingerprints the input of a preprocessing run without reading it.
+
+    A dataset written by ingestion is fingerprinted by its manifest, which lists every
+    ingested batch; a file by its path, size and modification time.
+
+    Args:
+        data_source (str): Path to a dataset directory or data file, or SQL query.
+
+    Returns:
+        Optional[str]: The fingerprint, or None for sources that cannot be fingerprinted
+        (database queries), whose results are never cached.
+    """
+    # Imported here, as the dataset module is only needed for dataset sources
+    from ..utils.parquet_dataset import MANIFEST_FILE, is_dataset
+
+    if is_dataset(data_source):
+        with open(os.path.join(data_source, MANIFEST_FILE), 'rb') as f:
+            return 'dataset:' + hashlib.sha256(f.read()).hexdigest()
+    if os.path.isfile(data_source):
+        stat = os.stat(data_source)
+        return f"file:{os.path.abspath(data_source)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return None
+
+def _package_modules(module: Any) -> Dict[str, Any]:
+    # The module and the modules of the same package it uses directly, by name
+    package = module.__name__.rsplit('.', 2)[0]
+    modules = {module.__name__: module}
+    for value in vars(module).values():
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+        if isinstance(name, str) and name.startswith(package + '.') and name in sys.modules:
+            modules[name] = sys.modules[name]
+    return modules
+
+def fingerprint_code(functions: Sequence[Callable]) -> str:
+    """
+    Fingerprints the version of preprocessing functions: the source of the modules that
+    define them and of the modules of the same package those use directly. Changing any
+    of them gives a new fingerprint, so the cached results of the old code are not reused.
+
+    Args:
+        functions (Sequence[Callable]): The preprocessing functions.
+
+    Returns:
+        str: The fingerprint.
+    """
+    modules = {}
+    for function in functions:
+        modules.update(_package_modules(sys.modules[function.__module__]))
+
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        digest.update(name.encode())
+        try:
+            digest.update(inspect.getsource(modules[name]).encode())
+        except (OSError, TypeError):
+            # Modules without source (e.g. compiled) are identified by their name only
+            pass
+    return digest.hexdigest()
+
+def make_cache_key(data_fingerprint: str, code_fingerprint: str, config: Dict[str, Any] = None) -> str:
+    """
+    Combines the fingerprints of the input, the code and the configuration into a cache key.
+
+    Args:
+        data_fingerprint (str): From fingerprint_data_source.
+        code_fingerprint (str): From fingerprint_code.
+        config (Dict[str, Any]): Configuration of the preprocessing; must be JSON serializable.
+
+    Returns:
+        str: The key.
+    """
+    payload = json.dumps({'data': data_fingerprint, 'code': code_fingerprint, 'config': config or {}},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class PreprocessingCache:
+    """
+    Content-addressed store of preprocessed training data on disk.
+
+    Each entry is one Arrow IPC file, read back through a memory map: the buffers of the
+    numerical columns are used in place without being parsed or copied, so hyperparameter
+    sweeps over the same data start in the time it takes to map the file. The least
+    recently used entries are removed beyond max_entries.
+    """
+
+    def __init__(self, directory: str = PREPROCESSING_CACHE_CONFIG['directory'],
+                 max_entries: int = PREPROCESSING_CACHE_CONFIG['max_entries']):
+        """
+        Initializes the PreprocessingCache.
+
+        Args:
+            directory (str): Directory of the cache entries.
+            max_entries (int): Maximum number of entries kept. 0 disables the cache.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are stored and read: the cache is not disabled and pyarrow is installed."""
+        return self.max_entries > 0 and pa is not None
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Reads an entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[pd.DataFrame]: The cached data, read-only where it is memory-mapped, or None on a miss.
+        """
+        path = os.path.join(self.directory, key)
+        if not self.enabled or not os.path.isfile(os.path.join(path, METADATA_FILE)):
+            return None
+
+        source = pa.memory_map(os.path.join(path, DATA_FILE), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        # Separate blocks per column let pandas keep the mapped buffers instead of consolidating them
+        df = table.to_pandas(split_blocks=True)
+        os.utime(os.path.join(path, METADATA_FILE))
+        return df
+
+    def put(self, key: str, df: pd.DataFrame, description: Dict[str, Any] = None) -> None:
+        """
+        Stores an entry, replacing any entry with the same key.
+
+        Args:
+            key (str): The cache key.
+            df (pd.DataFrame): The preprocessed data.
+            description (Dict[str, Any]): What the entry was computed from, stored with it for inspection.
+        """
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Written to a temporary directory first, so a reader never sees a partial entry
+        staging = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            table = pa.Table.from_pandas(df)
+            with pa.OSFile(os.path.join(staging, DATA_FILE), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+                json.dump({'key': key, 'rows': len(df), 'columns': len(df.columns), 'created_at': time.time(),
+                           'description': description or {}}, f, indent=2, default=str)
+
+            path = os.path.join(self.directory, key)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict()
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _evict(self) -> None:
+        # Removes the least recently read or written entries beyond max_entries
+        entries = []
+        for name in os.listdir(self.directory):
+            metadata = os.path.join(self.directory, name, METADATA_FILE)
+            if not name.startswith('.') and os.path.isfile(metadata):
+                entries.append((os.path.getmtime(metadata), name))
+        for _, name in sorted(entries, reverse=True)[self.max_entries:]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+def cached_preprocessing(data_source: str, preprocess: Callable[[], pd.DataFrame], functions: Sequence[Callable],
+                         config: Dict[str, Any] = None, cache: PreprocessingCache = None) -> pd.DataFrame:
+    """
+    Returns the cached result of a preprocessing run, or runs and caches it.
+
+    The result is reused only when the input, the source of the preprocessing functions
+    and the configuration are all unchanged.
+
+    Args:
+        data_source (str): The input the preprocessing reads.
+        preprocess (Callable[[], pd.DataFrame]): Runs the preprocessing.
+        functions (Sequence[Callable]): The preprocessing functions preprocess uses, e.g.
+            [clean_data, engineer_features], whose code versions are part of the key.
+        config (Dict[str, Any]): Everything else the result depends on, e.g. the columns and
+            filters read and the model type.
+        cache (PreprocessingCache): The cache. Defaults to the configured preprocessing_cache.
+
+    Returns:
+        pd.DataFrame: The preprocessed data.
+    """
+    cache = cache or preprocessing_cache
+    data_fingerprint = fingerprint_data_source(data_source) if cache.enabled else None
+    if data_fingerprint is None:
+        return preprocess()
+
+    key = make_cache_key(data_fingerprint, fingerprint_code(functions), config)
+    df = cache.get(key)
+    if df is not None:
+        logger.info(f"Reusing preprocessed data {key[:12]} for {data_source}")
+        return df
+
+    df = preprocess()
+    cache.put(key, df, description={'data_source': data_source, 'data': data_fingerprint, 'config': config})
+    logger.info(f"Cached preprocessed data {key[:12]} for {data_source}")
+    return df
+
+# Shared cache used by the training scripts
+preprocessing_cache = PreprocessingCache()
+
+def load_engineered_features(data_source: str, columns: List[str] = None, filters: Sequence[Any] = None,
+                             cache: PreprocessingCache = None) -> pd.DataFrame:
+    """
+    Loads the cleaned data and engineers its features, as the training scripts do, reusing
+    the result of an earlier run on the same input with the same code and arguments.
+
+    Args:
+        data_source (str): Path to the dataset written by ingestion, or to a raw data file.
+        columns (List[str]): Columns to read from the dataset (defaults to all).
+        filters (Sequence[Filter]): Conditions on the rows read from the dataset, e.g. a range of months.
+        cache (PreprocessingCache): The cache. Defaults to the configured preprocessing_cache.
+
+    Returns:
+        pd.DataFrame: The engineered features, with the target columns.
+    """
+    # Imported here, as they pull in scikit-learn and the data loaders
+    from .data_cleaning import clean_data
+    from .feature_engineering import engineer_features
+    from ..utils.data_loader import load_data
+    from ..utils.parquet_dataset import is_dataset
+
+    def preprocess() -> pd.DataFrame:
+        # The dataset is already cleaned and typed at ingestion; raw data is cleaned here
+        if is_dataset(data_source):
+            cleaned_data = load_data(data_source, columns=columns, filters=filters)
+        else:
+            cleaned_data = clean_data(data_source)
+        return engineer_features(cleaned_data)
+
+    return cached_preprocessing(data_source, preprocess, [load_data, clean_data, engineer_features],
+                                config={'columns': columns, 'filters': filters}, cache=cache)
+
+# TODO: Fingerprint database sources, e.g. from a table's last update time, so their results can be cached too
@@ -0,0 +1,131 @@
+import numpy as np
+from typing import Dict, Iterable, List, Sequence
+
+# Default lags (in months) and rolling window lengths of the history features
+HISTORY_LAGS = (1, 2, 3, 12)
+HISTORY_WINDOWS = (3, 6, 12)
+
+class RaggedArray:
+    """
+    A batch of variable-length float sequences stored as one flat value array plus
+    offsets: sequence i is values[offsets[i]:offsets[i + 1]]. Unlike a column of Python
+    lists, every operation over the batch can be expressed with NumPy on the flat array.
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        """
+        Initializes the RaggedArray.
+
+        Args:
+            values (np.ndarray): The concatenated sequences.
+            offsets (np.ndarray): Start of each sequence in values, followed by len(values).
+        """
+        self.values = np.asarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets.ndim != 1 or len(self.offsets) == 0 or self.offsets[0] != 0 \
+                or self.offsets[-1] != len(self.values) or np.any(np.diff(self.offsets) < 0):
+            raise ValueError("offsets must start at 0, be non-decreasing and end at len(values)")
+
+    @classmethod
+    def from_sequences(cls, sequences: Iterable[Sequence[float]]) -> 'RaggedArray':
+        """
+        Builds a RaggedArray from a sequence per row. A scalar is treated as a sequence of length one.
+
+        Args:
+            sequences (Iterable[Sequence[float]]): The sequences, e.g. a column of lists.
+
+        Returns:
+            RaggedArray: The ragged representation.
+
+        Raises:
+            ValueError: If a sequence contains values that are not numbers.
+        """
+        arrays = [np.atleast_1d(np.asarray(sequence, dtype=np.float64)) for sequence in sequences]
+        if any(array.ndim != 1 for array in arrays):
+            raise ValueError("Each sequence must be one-dimensional")
+
+        lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        values = np.concatenate(arrays) if arrays else np.empty(0)
+        return cls(values, offsets)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Length of every sequence."""
+        return np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def to_lists(self) -> List[List[float]]:
+        """
+        Converts back to one Python list per sequence.
+
+        Returns:
+            List[List[float]]: The sequences.
+        """
+        return [self[i].tolist() for i in range(len(self))]
+
+def _tail_sums(history: RaggedArray, cumulative: np.ndarray, window: int) -> np.ndarray:
+    # Sum of the last `window` values of every sequence (all of it if shorter), from the running sum
+    starts, ends = history.offsets[:-1], history.offsets[1:]
+    return cumulative[ends] - cumulative[np.maximum(starts, ends - window)]
+
+def compute_history_features(history: RaggedArray, lags: Sequence[int] = HISTORY_LAGS,
+                             windows: Sequence[int] = HISTORY_WINDOWS) -> Dict[str, np.ndarray]:
+    """
+    Computes lag, rolling window and trend features of every sequence at once.
+
+    Sequences are ordered oldest to newest, so lag_1 is the most recent value. A lag
+    beyond the length of a sequence is 0, and rolling windows cover what is available.
+
+    Args:
+        history (RaggedArray): The spending histories, one per user.
+        lags (Sequence[int]): Lags to extract.
+        windows (Sequence[int]): Lengths of the rolling sums.
+
+    Returns:
+        Dict[str, np.ndarray]: One array per feature, with one value per sequence.
+    """
+    lengths = history.lengths
+    ends = history.offsets[1:]
+    cumulative = np.concatenate([[0.0], np.cumsum(history.values)])
+
+    totals = cumulative[ends] - cumulative[history.offsets[:-1]]
+    features = {
+        'history_length': lengths.astype(np.float64),
+        'history_mean': np.divide(totals, lengths, out=np.zeros(len(history)), where=lengths > 0),
+    }
+
+    for lag in lags:
+        available = lengths >= lag
+        # Clip the index so sequences shorter than the lag read a valid (ignored) position
+        index = np.clip(ends - lag, 0, max(len(history.values) - 1, 0))
+        lagged = history.values[index] if len(history.values) else np.zeros(len(history))
+        features[f'lag_{lag}'] = np.where(available, lagged, 0.0)
+
+    for window in windows:
+        features[f'rolling_sum_{window}'] = _tail_sums(history, cumulative, window)
+
+    # Change of the mean of the last three values against the three before them
+    recent = _tail_sums(history, cumulative, 3)
+    previous = _tail_sums(history, cumulative, 6) - recent
+    features['trend_3'] = np.where(lengths >= 6, (recent - previous) / 3, 0.0)
+
+    return features
+
+def compute_seasonality_features(month: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Encodes the month of the year on the unit circle, so December and January are close.
+
+    Args:
+        month (np.ndarray): Months from 1 to 12.
+
+    Returns:
+        Dict[str, np.ndarray]: 'month_sin' and 'month_cos'.
+    """
+    angle = 2 * np.pi * (np.asarray(month, dtype=np.float64) - 1) / 12
+    return {'month_sin': np.sin(angle), 'month_cos': np.cos(angle)}
@@ -1,11 +1,17 @@
 import pandas as pd
 import numpy as np
+from datetime import datetime
 from typing import Dict, Any
 
 # Assuming these imports will be available when the dependent files are implemented
 from ..models.credit_score_prediction import CreditScorePredictionModel
 from ..config.model_config import CREDIT_SCORE_PREDICTION_MODEL
-from ..utils.model_utils import save_model, load_model, evaluate_model, preprocess_input, postprocess_output
+from ..utils.model_utils import save_model, evaluate_model, preprocess_input, postprocess_output
+from ..inference.model_registry import get_model, load_trainable_model, model_registry, CREDIT_SCORE_PREDICTION
+from ..training.incremental_training import INCREMENTAL_TRAINING_CONFIG, model_replay_buffer, warm_start_update
+
+# Column holding the labels in the replay buffer
+TARGET_COLUMN = 'credit_score'
 
 class CreditScorePredictionService:
     """A service class that manages credit score prediction operations"""
@@ -13,12 +19,14 @@ class CreditScorePredictionService:
     def __init__(self):
         """Initializes the CreditScorePredictionService"""
         self.model = CreditScorePredictionModel()
+        # Details of the last update_model call that updated the model
+        self.last_update = None
         self._load_model()
 
     def _load_model(self):
-        """Loads the pre-trained model if available"""
+        """Uses the shared pre-trained model from the model registry if available"""
         try:
-            self.model = load_model(CREDIT_SCORE_PREDICTION_MODEL)
+            self.model = get_model(CREDIT_SCORE_PREDICTION)
         except FileNotFoundError:
             print("Pre-trained model not found. Using a new model instance.")
 
@@ -70,25 +78,82 @@ class CreditScorePredictionService:
         X_test_preprocessed = preprocess_input(X_test)
         return evaluate_model(self.model, X_test_preprocessed, y_test)
 
-    def update_model(self, new_data: pd.DataFrame, new_labels: pd.Series) -> bool:
+    def update_model(self, new_data: pd.DataFrame, new_labels: pd.Series, warm_start: bool = None) -> bool:
         """
         Updates the model with new data and retrains if necessary
 
+        With warm_start, the deployed weights are fine-tuned on the new data and a bounded replay
+        buffer of past data, so the cost of an update does not grow with the history; the model
+        is retrained from scratch on the existing plus new data only if the new data drifted or
+        fine-tuning degraded the model (see training.incremental_training). The details of the
+        update are kept in last_update.
+
         Args:
             new_data (pd.DataFrame): New features
             new_labels (pd.Series): New labels
+            warm_start (bool): Whether to warm-start from the deployed weights. Defaults to ML_WARM_START
 
         Returns:
             bool: True if model was updated, False otherwise
         """
         current_performance = self.evaluate_model(new_data, new_labels)
-        if self._should_retrain(current_performance):
-            old_data, old_labels = self._get_existing_data()
-            combined_data = pd.concat([old_data, new_data])
-            combined_labels = pd.concat([old_labels, new_labels])
-            self.train_model(combined_data, combined_labels)
+        if not self._should_retrain(current_performance):
+            return False
+
+        warm_start = INCREMENTAL_TRAINING_CONFIG['warm_start'] if warm_start is None else warm_start
+        if not warm_start:
+            self._retrain(new_data, new_labels)
+            self.last_update = {'mode': 'full_retrain', 'reason': 'warm_start_disabled'}
             return True
-        return False
+
+        trainable = load_trainable_model(CREDIT_SCORE_PREDICTION)
+
+        def fine_tune(frame: pd.DataFrame):
+            trainable.fine_tune(frame.drop(TARGET_COLUMN, axis=1), frame[TARGET_COLUMN])
+
+        def retrain(_):
+            nonlocal trainable
+            trainable = self._retrain(new_data, new_labels)
+
+        def evaluate(frame: pd.DataFrame) -> Dict[str, float]:
+            return trainable.evaluate(frame.drop(TARGET_COLUMN, axis=1), frame[TARGET_COLUMN])
+
+        new_rows = new_data.assign(**{TARGET_COLUMN: np.asarray(new_labels)})
+        self.last_update = warm_start_update(new_rows, model_replay_buffer(CREDIT_SCORE_PREDICTION), fine_tune, retrain,
+                                             evaluate, metric='mae', drift_columns=list(new_data.select_dtypes(include=[np.number]).columns))
+        if self.last_update['mode'] == 'warm_start':
+            self._deploy(trainable)
+        return True
+
+    def _retrain(self, new_data: pd.DataFrame, new_labels: pd.Series) -> CreditScorePredictionModel:
+        """
+        Retrains a new model from scratch on the existing plus new data and deploys it
+
+        Args:
+            new_data (pd.DataFrame): New features
+            new_labels (pd.Series): New labels
+
+        Returns:
+            CreditScorePredictionModel: The retrained model
+        """
+        old_data, old_labels = self._get_existing_data()
+        combined_data = pd.concat([old_data, new_data])
+        combined_labels = pd.concat([old_labels, new_labels])
+        model = CreditScorePredictionModel()
+        model.train(combined_data, combined_labels)
+        self._deploy(model)
+        return model
+
+    def _deploy(self, model: CreditScorePredictionModel):
+        """
+        Saves an updated model over the served artifact and hot-swaps the served model to it
+
+        Args:
+            model (CreditScorePredictionModel): The updated model
+        """
+        model_path = model_registry.get_path(CREDIT_SCORE_PREDICTION)
+        model.save_model(model_path)
+        self.model = model_registry.reload(CREDIT_SCORE_PREDICTION, model_path, datetime.now().strftime('%Y%m%d%H%M%S'))
 
     def _should_retrain(self, current_performance: Dict[str, float]) -> bool:
         """
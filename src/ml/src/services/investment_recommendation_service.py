@@ -3,8 +3,9 @@ import pandas as pd
 from typing import Dict, Any
 
 from ..models.investment_recommendation import InvestmentRecommendationModel
-from ..utils.model_utils import save_model, load_model, preprocess_input, postprocess_output
+from ..utils.model_utils import save_model, preprocess_input, postprocess_output
 from ..config.model_config import INVESTMENT_RECOMMENDATION_MODEL
+from ..inference.model_registry import model_registry, INVESTMENT_RECOMMENDATION
 
 class InvestmentRecommendationService:
     """
@@ -13,10 +14,11 @@ class InvestmentRecommendationService:
 
     def __init__(self):
         """
-        Initializes the InvestmentRecommendationService by loading or creating a new model.
+        Initializes the InvestmentRecommendationService with the shared model from the
+        model registry, or a new model if no trained model is available.
         """
         try:
-            self.model = load_model(INVESTMENT_RECOMMENDATION_MODEL)
+            self.model = model_registry.get(INVESTMENT_RECOMMENDATION)
         except FileNotFoundError:
             self.model = InvestmentRecommendationModel()
 
@@ -62,18 +64,21 @@ class InvestmentRecommendationService:
 
         return training_results
 
-    def update_model(self, new_model_path: str) -> bool:
+    def update_model(self, new_model_path: str, version: str = INVESTMENT_RECOMMENDATION_MODEL.get('version', '1.0.0')) -> bool:
         """
-        Updates the current model with a newly trained version.
+        Updates the current model with a newly trained version. The new model is
+        hot-swapped into the model registry, so every consumer picks it up without
+        dropping requests that are already being served.
 
         Args:
             new_model_path (str): The file path of the new model.
+            version (str): Version of the new model.
 
         Returns:
             bool: True if the update was successful, False otherwise.
         """
         try:
-            new_model = load_model(new_model_path)
+            new_model = model_registry.reload(INVESTMENT_RECOMMENDATION, new_model_path, version)
             self.model = new_model
             save_model(self.model, INVESTMENT_RECOMMENDATION_MODEL)
             return True
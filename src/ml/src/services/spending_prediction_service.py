@@ -1,8 +1,14 @@
 import pandas as pd
 import numpy as np
+from datetime import datetime
 from typing import Dict, Any
 from ..models.spending_prediction import SpendingPredictionModel
 from ...config.model_config import SPENDING_PREDICTION_MODEL
+from ..inference.model_registry import get_model, load_trainable_model, model_registry, SPENDING_PREDICTION
+from ..training.incremental_training import INCREMENTAL_TRAINING_CONFIG, model_replay_buffer, warm_start_update
+
+# Numerical columns whose drift forces a full retrain; the spending history is summarized by its target
+DRIFT_COLUMNS = ['income', 'month', 'target_spending']
 
 class SpendingPredictionService:
     """
@@ -18,10 +24,10 @@ class SpendingPredictionService:
 
     def _load_model(self):
         """
-        Loads the pre-trained model if available, otherwise sets model to None
+        Uses the shared pre-trained model from the model registry if available, otherwise sets model to None
         """
         try:
-            self.model.load(SPENDING_PREDICTION_MODEL)
+            self.model = get_model(SPENDING_PREDICTION)
         except FileNotFoundError:
             self.model = None
 
@@ -141,12 +147,18 @@ class SpendingPredictionService:
 
         return evaluation_metrics
 
-    def update_model(self, new_data: pd.DataFrame) -> Dict[str, Any]:
+    def update_model(self, new_data: pd.DataFrame, warm_start: bool = None) -> Dict[str, Any]:
         """
         Updates the model with new data
 
+        With warm_start, the deployed weights are fine-tuned on the new data and a bounded replay
+        buffer of past data, so the cost of a daily refresh does not grow with the history; the
+        model is retrained from scratch on the existing plus new data only if the new data
+        drifted or fine-tuning degraded the model (see training.incremental_training).
+
         Args:
             new_data (pd.DataFrame): New data for updating the model
+            warm_start (bool): Whether to warm-start from the deployed weights. Defaults to ML_WARM_START
 
         Returns:
             Dict[str, Any]: Update results and new model performance metrics
@@ -155,24 +167,70 @@ class SpendingPredictionService:
         if not isinstance(new_data, pd.DataFrame) or new_data.empty:
             raise ValueError("Invalid new data. Please provide a non-empty pandas DataFrame.")
 
-        # Combine new_data with existing training data
-        existing_data = self.model.get_training_data()
-        combined_data = pd.concat([existing_data, new_data], ignore_index=True)
+        warm_start = INCREMENTAL_TRAINING_CONFIG['warm_start'] if warm_start is None else warm_start
+        if not warm_start:
+            self._retrain(new_data)
+            return {
+                "update_results": {"mode": "full_retrain", "reason": "warm_start_disabled"},
+                "new_evaluation_metrics": self.model.evaluate(new_data)
+            }
 
-        # Retrain the model using the combined dataset
-        update_results = self.train_model(combined_data)
+        trainable = load_trainable_model(SPENDING_PREDICTION)
 
-        # Evaluate the updated model
-        evaluation_metrics = self.evaluate_model(new_data)
+        def retrain(_):
+            nonlocal trainable
+            trainable = self._retrain(new_data)
 
-        # Save the updated model
-        self.model.save(SPENDING_PREDICTION_MODEL)
+        update_results = warm_start_update(new_data, model_replay_buffer(SPENDING_PREDICTION),
+                                           fine_tune=lambda frame: trainable.fine_tune(frame), retrain=retrain,
+                                           evaluate=lambda frame: trainable.evaluate(frame), metric='mae',
+                                           drift_columns=[column for column in DRIFT_COLUMNS if column in new_data.columns])
+        if update_results['mode'] == 'warm_start':
+            self._deploy(trainable)
 
         return {
             "update_results": update_results,
-            "new_evaluation_metrics": evaluation_metrics
+            "new_evaluation_metrics": trainable.evaluate(new_data)
         }
 
+    def _retrain(self, new_data: pd.DataFrame) -> SpendingPredictionModel:
+        """
+        Retrains a new model from scratch on the existing plus new data and deploys it
+
+        Args:
+            new_data (pd.DataFrame): New data for updating the model
+
+        Returns:
+            SpendingPredictionModel: The retrained model
+        """
+        combined_data = pd.concat([self._get_existing_data(), new_data], ignore_index=True)
+        model = SpendingPredictionModel()
+        model.train(combined_data)
+        self._deploy(model)
+        return model
+
+    def _deploy(self, model: SpendingPredictionModel):
+        """
+        Saves an updated model over the served artifact and hot-swaps the served model to it
+
+        Args:
+            model (SpendingPredictionModel): The updated model
+        """
+        model_path = model_registry.get_path(SPENDING_PREDICTION)
+        model.save_model(model_path)
+        self.model = model_registry.reload(SPENDING_PREDICTION, model_path, datetime.now().strftime('%Y%m%d%H%M%S'))
+
+    def _get_existing_data(self) -> pd.DataFrame:
+        """
+        Retrieves existing training data
+
+        Returns:
+            pd.DataFrame: Existing training data, with the target
+        """
+        # This is a placeholder implementation. In a real-world scenario,
+        # you would implement logic to retrieve existing training data.
+        return pd.DataFrame()
+
 def format_prediction_result(raw_predictions: np.ndarray, user_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Formats the raw prediction output into a user-friendly format
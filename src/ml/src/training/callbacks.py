@@ -0,0 +1,243 @@
+import os
+import math
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default training callback settings, overridable through the environment and, per model, by the
+# 'callbacks' entry of its model configuration:
+# - monitor: the validation metric the callbacks watch; mode 'min' or 'max' for better values
+# - patience / min_delta: early stopping after patience epochs without an improvement above min_delta (0 disables it)
+# - restore_best_weights: whether training ends with the weights of the best epoch, however it stopped
+# - lr_schedule: 'none', 'plateau' (divide by lr_factor after lr_patience epochs without improvement),
+#   'step' (multiply by lr_factor every lr_step_epochs), 'exponential' (multiply by lr_decay every epoch)
+#   or 'cosine' (anneal to min_learning_rate over the planned epochs)
+# - time_budget_seconds: wall-clock budget of a training run; no epoch is started that would overrun it (0 disables it)
+TRAINING_CALLBACKS_CONFIG = {
+    'monitor': os.environ.get('ML_CALLBACKS_MONITOR', 'val_loss'),
+    'mode': os.environ.get('ML_CALLBACKS_MODE', 'min'),
+    'patience': int(os.environ.get('ML_EARLY_STOPPING_PATIENCE', 10)),
+    'min_delta': float(os.environ.get('ML_EARLY_STOPPING_MIN_DELTA', 0.0)),
+    'restore_best_weights': os.environ.get('ML_RESTORE_BEST_WEIGHTS', 'true').lower() == 'true',
+    'lr_schedule': os.environ.get('ML_LR_SCHEDULE', 'plateau'),
+    'lr_factor': float(os.environ.get('ML_LR_FACTOR', 0.5)),
+    'lr_patience': int(os.environ.get('ML_LR_PATIENCE', 5)),
+    'lr_step_epochs': int(os.environ.get('ML_LR_STEP_EPOCHS', 10)),
+    'lr_decay': float(os.environ.get('ML_LR_DECAY', 0.95)),
+    'min_learning_rate': float(os.environ.get('ML_MIN_LEARNING_RATE', 1e-6)),
+    'time_budget_seconds': float(os.environ.get('ML_TRAINING_TIME_BUDGET', 0)),
+}
+
+LR_SCHEDULES = ('none', 'plateau', 'step', 'exponential', 'cosine')
+
+def callback_settings(model_config: Dict[str, Any] = None, **overrides) -> Dict[str, Any]:
+    """
+    Resolves the callback settings of a model.
+
+    Args:
+        model_config (Dict[str, Any]): The model's configuration, whose 'callbacks' entry
+            overrides TRAINING_CALLBACKS_CONFIG.
+        **overrides: Settings overriding both, e.g. for one run.
+
+    Returns:
+        Dict[str, Any]: The settings.
+    """
+    settings = dict(TRAINING_CALLBACKS_CONFIG)
+    settings.update((model_config or {}).get('callbacks', {}))
+    settings.update(overrides)
+    if settings['lr_schedule'] not in LR_SCHEDULES:
+        raise ValueError(f"Unknown learning rate schedule: {settings['lr_schedule']}")
+    if settings['mode'] not in ('min', 'max'):
+        raise ValueError(f"Unknown monitor mode: {settings['mode']}")
+    return settings
+
+def scheduled_learning_rate(epoch: int, initial_learning_rate: float, epochs: int, settings: Dict[str, Any]) -> float:
+    """
+    Computes the learning rate of an epoch under an epoch-based schedule.
+
+    Args:
+        epoch (int): The epoch, counted from 0.
+        initial_learning_rate (float): Learning rate of the first epoch.
+        epochs (int): Planned epochs, over which the cosine schedule anneals.
+        settings (Dict[str, Any]): From callback_settings.
+
+    Returns:
+        float: The learning rate, no lower than min_learning_rate. Constant for 'none' and 'plateau'.
+    """
+    schedule, floor = settings['lr_schedule'], settings['min_learning_rate']
+    if schedule == 'step':
+        learning_rate = initial_learning_rate * settings['lr_factor'] ** (epoch // settings['lr_step_epochs'])
+    elif schedule == 'exponential':
+        learning_rate = initial_learning_rate * settings['lr_decay'] ** epoch
+    elif schedule == 'cosine':
+        progress = min(epoch / max(epochs, 1), 1.0)
+        learning_rate = floor + 0.5 * (initial_learning_rate - floor) * (1 + math.cos(math.pi * progress))
+    else:
+        learning_rate = initial_learning_rate
+    return max(learning_rate, floor)
+
+def exceeds_time_budget(elapsed_seconds: float, epoch_seconds: List[float], budget_seconds: float) -> bool:
+    """
+    Checks whether another epoch would overrun the time budget of a training run.
+
+    Args:
+        elapsed_seconds (float): Time since training started.
+        epoch_seconds (List[float]): Durations of the epochs run so far.
+        budget_seconds (float): The budget; 0 for none.
+
+    Returns:
+        bool: Whether the next epoch, expected to last as long as the slowest so far, would end past the budget.
+    """
+    if not budget_seconds:
+        return False
+    next_epoch = max(epoch_seconds) if epoch_seconds else 0.0
+    return elapsed_seconds + next_epoch > budget_seconds
+
+class TrainingReport:
+    """
+    Record of one training run: epochs and time spent, how the run stopped, and the epochs
+    and estimated time saved by stopping before the planned epochs.
+
+    It also holds the early stopping state: the best epoch, its value and weights, and the
+    epochs waited for an improvement. Checkpoints save that state, so a run resumed from
+    one (see training.checkpointing) keeps its patience and its best weights.
+    """
+
+    def __init__(self, epochs_planned: int = 0):
+        """
+        Initializes the TrainingReport.
+
+        Args:
+            epochs_planned (int): Epochs the run would take without stopping early.
+        """
+        self.epochs_planned = epochs_planned
+        self.epoch_seconds: List[float] = []
+        self.stopped_by: Optional[str] = None
+        self.best_epoch: Optional[int] = None
+        self.best_value: Optional[float] = None
+        self.best_weights: Optional[List[Any]] = None
+        # Early stopping waits for an improvement by min_delta over this value
+        self.reference: Optional[float] = None
+        self.waited = 0
+        # Epochs the model has been trained for in total, by this and earlier runs; the model
+        # keeps it to continue the learning rate schedule where the next run starts
+        self.trained_epochs = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarizes the run.
+
+        Returns:
+            Dict[str, Any]: 'epochs_planned', 'epochs_run', 'epochs_saved', 'seconds', 'seconds_saved'
+            (the epochs saved at the mean epoch time), 'stopped_by' ('early_stopping', 'time_budget'
+            or None), and the 'best_epoch' (counted from 0) and its monitored 'best_value'.
+        """
+        epochs_run = len(self.epoch_seconds)
+        seconds = sum(self.epoch_seconds)
+        epochs_saved = max(self.epochs_planned - epochs_run, 0)
+        return {
+            'epochs_planned': self.epochs_planned,
+            'epochs_run': epochs_run,
+            'epochs_saved': epochs_saved,
+            'seconds': seconds,
+            'seconds_saved': seconds / epochs_run * epochs_saved if epochs_run else 0.0,
+            'stopped_by': self.stopped_by,
+            'best_epoch': self.best_epoch,
+            'best_value': self.best_value,
+        }
+
+def create_training_callbacks(settings: Dict[str, Any], epochs: int, initial_epoch: int = 0,
+                              report: TrainingReport = None, learning_rate: float = None,
+                              trained_epochs: int = 0) -> List['tf.keras.callbacks.Callback']:
+    """
+    Creates the Keras callbacks of a training run: early stopping, the learning rate schedule,
+    best-weight restore and the time budget, all watching the same validation metric, and the
+    bookkeeping of the run's TrainingReport, which is logged when training ends.
+
+    Args:
+        settings (Dict[str, Any]): From callback_settings.
+        epochs (int): Epochs passed to model.fit.
+        initial_epoch (int): Epoch training starts from, e.g. when resumed from a checkpoint.
+        report (TrainingReport): Filled in during training. Pass one to read the summary afterwards.
+        learning_rate (float): Base learning rate of the 'step', 'exponential' and 'cosine'
+            schedules. Defaults to the optimizer's learning rate when the run starts, which an
+            earlier run may have decayed already.
+        trained_epochs (int): Epochs the model was trained for by earlier runs, e.g. the earlier
+            rungs of a hyperparameter search trial. The schedule continues from there instead of
+            restarting, and the cosine schedule anneals over the earlier and this run's epochs.
+
+    Returns:
+        List[tf.keras.callbacks.Callback]: The callbacks, to pass to model.fit.
+    """
+    import tensorflow as tf
+
+    report = report if report is not None else TrainingReport()
+    report.epochs_planned = max(epochs - initial_epoch, 0)
+    report.trained_epochs = trained_epochs + initial_epoch
+    monitor, sign = settings['monitor'], (1 if settings['mode'] == 'min' else -1)
+
+    def improved(value: float, best: Optional[float], min_delta: float = 0.0) -> bool:
+        return best is None or sign * (best - value) > min_delta
+
+    class RunMonitor(tf.keras.callbacks.Callback):
+        # Times the epochs, keeps the best weights, stops on patience or on the time budget
+        def on_train_begin(self, logs=None):
+            # The early stopping state starts from the report's, restored when resuming from a checkpoint
+            self.started = time.monotonic()
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self.epoch_started = time.monotonic()
+
+        def on_epoch_end(self, epoch, logs=None):
+            report.epoch_seconds.append(time.monotonic() - self.epoch_started)
+            report.trained_epochs = trained_epochs + epoch + 1
+            value = (logs or {}).get(monitor)
+            if value is not None:
+                if improved(value, report.best_value):
+                    report.best_epoch, report.best_value = epoch, float(value)
+                    if settings['restore_best_weights']:
+                        report.best_weights = self.model.get_weights()
+                if improved(value, report.reference, settings['min_delta']):
+                    report.reference, report.waited = float(value), 0
+                else:
+                    report.waited += 1
+
+            if settings['patience'] and report.waited >= settings['patience']:
+                report.stopped_by = 'early_stopping'
+            elif exceeds_time_budget(time.monotonic() - self.started, report.epoch_seconds, settings['time_budget_seconds']):
+                report.stopped_by = 'time_budget'
+            if report.stopped_by and epoch + 1 < epochs:
+                self.model.stop_training = True
+
+        def on_train_end(self, logs=None):
+            if report.stopped_by and len(report.epoch_seconds) >= report.epochs_planned:
+                # Stopped on the last planned epoch anyway
+                report.stopped_by = None
+            if report.best_weights is not None:
+                self.model.set_weights(report.best_weights)
+            summary = report.summary()
+            logger.info(f"Trained {summary['epochs_run']} of {summary['epochs_planned']} epochs in {summary['seconds']:.1f} s"
+                        + (f", stopped by {summary['stopped_by']}, saving {summary['epochs_saved']} epochs "
+                           f"(~{summary['seconds_saved']:.1f} s)" if summary['stopped_by'] else "")
+                        + (f"; best {monitor} {summary['best_value']:.4g} at epoch {summary['best_epoch'] + 1}"
+                           if summary['best_epoch'] is not None else ""))
+
+    callbacks = [RunMonitor()]
+    if settings['lr_schedule'] == 'plateau':
+        callbacks.append(tf.keras.callbacks.ReduceLROnPlateau(monitor=monitor, mode=settings['mode'], factor=settings['lr_factor'],
+                                                              patience=settings['lr_patience'], min_lr=settings['min_learning_rate']))
+    elif settings['lr_schedule'] != 'none':
+        initial_learning_rate = {}
+
+        def schedule(epoch, current_learning_rate):
+            # Without a base learning rate, the optimizer's one when the run starts is the schedule's initial one
+            initial_learning_rate.setdefault('value', current_learning_rate if learning_rate is None else learning_rate)
+            return scheduled_learning_rate(trained_epochs + epoch, initial_learning_rate['value'],
+                                           trained_epochs + epochs, settings)
+
+        callbacks.append(tf.keras.callbacks.LearningRateScheduler(schedule))
+    return callbacks
+
+# TODO: Report the epochs saved across hyperparameter search trials, where successive halving already stops most runs early
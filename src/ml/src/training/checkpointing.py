@@ -0,0 +1,342 @@
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import logging
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default checkpoint settings, overridable through the environment: the directory holding the
+# checkpoints of every training job, the epochs between checkpoints and the checkpoints kept per job
+CHECKPOINT_CONFIG = {
+    'directory': os.environ.get('ML_CHECKPOINT_DIR', './checkpoints'),
+    'every_epochs': int(os.environ.get('ML_CHECKPOINT_EVERY_EPOCHS', 1)),
+    'keep': int(os.environ.get('ML_CHECKPOINT_KEEP', 2)),
+}
+
+STATE_FILE = 'state.npz'
+METADATA_FILE = 'metadata.json'
+CHECKPOINT_PREFIX = 'epoch-'
+
+def capture_rng_state() -> Dict[str, Any]:
+    """
+    Captures the state of the random number generators training draws from: Python's,
+    NumPy's global one and, if TensorFlow is loaded, TensorFlow's global generator.
+
+    Returns:
+        Dict[str, Any]: The state, for restore_rng_state.
+    """
+    version, internal, gauss_next = random.getstate()
+    algorithm, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    state = {
+        'python': [version, list(internal), gauss_next],
+        'numpy': [algorithm, keys, int(position), int(has_gauss), float(cached_gaussian)],
+    }
+    # Only captured when training already loaded TensorFlow, so this module does not import it
+    tf = sys.modules.get('tensorflow')
+    if tf is not None:
+        state['tensorflow'] = tf.random.get_global_generator().state.numpy()
+    return state
+
+def restore_rng_state(state: Dict[str, Any]) -> None:
+    """
+    Restores the random number generators to a state captured by capture_rng_state.
+
+    Args:
+        state (Dict[str, Any]): The captured state.
+    """
+    version, internal, gauss_next = state['python']
+    random.setstate((version, tuple(internal), gauss_next))
+    algorithm, keys, position, has_gauss, cached_gaussian = state['numpy']
+    np.random.set_state((algorithm, np.asarray(keys, dtype=np.uint32), position, has_gauss, cached_gaussian))
+    tf = sys.modules.get('tensorflow')
+    if tf is not None and state.get('tensorflow') is not None:
+        tf.random.get_global_generator().state.assign(state['tensorflow'])
+
+def get_optimizer_weights(optimizer: Any) -> List[np.ndarray]:
+    """
+    Copies the state of an optimizer, its step counter and slots, into host memory.
+
+    Args:
+        optimizer (tf.keras.optimizers.Optimizer): The optimizer. Keras 3 optimizers no longer
+            have get_weights, so their variables are read instead.
+
+    Returns:
+        List[np.ndarray]: The state; empty before the optimizer's first step.
+    """
+    if hasattr(optimizer, 'get_weights'):
+        return optimizer.get_weights()
+    return [variable.numpy() for variable in optimizer.variables] if optimizer.built else []
+
+def set_optimizer_weights(optimizer: Any, weights: List[np.ndarray]) -> None:
+    """
+    Restores the state of an optimizer copied by get_optimizer_weights.
+
+    Args:
+        optimizer (tf.keras.optimizers.Optimizer): The optimizer, with its slots created.
+        weights (List[np.ndarray]): The state.
+    """
+    if hasattr(optimizer, 'set_weights'):
+        optimizer.set_weights(weights)
+        return
+    for variable, value in zip(optimizer.variables, weights):
+        variable.assign(value)
+
+def snapshot_training_state(model: Any, epoch: int, report: 'TrainingReport' = None) -> Dict[str, Any]:
+    """
+    Copies the state needed to resume training after an epoch into host memory.
+
+    Args:
+        model (tf.keras.Model): The compiled model being trained.
+        epoch (int): Number of epochs completed.
+        report (TrainingReport): Report of the run (see training.callbacks), whose early stopping state is copied.
+
+    Returns:
+        Dict[str, Any]: The 'epoch', the model 'weights', the 'optimizer' weights (its step
+        counter and slots, e.g. Adam's moments), the 'rng' state and the 'early_stopping'
+        state, None without a report, with the 'best_weights' kept for best-weight restore.
+    """
+    early_stopping, best_weights = None, []
+    if report is not None:
+        early_stopping = {'best_epoch': report.best_epoch, 'best_value': report.best_value,
+                          'reference': report.reference, 'waited': report.waited}
+        best_weights = [np.copy(weight) for weight in report.best_weights or []]
+    return {
+        'epoch': epoch,
+        'weights': model.get_weights(),
+        'optimizer': get_optimizer_weights(model.optimizer) if model.optimizer is not None else [],
+        'rng': capture_rng_state(),
+        'early_stopping': early_stopping,
+        'best_weights': best_weights,
+    }
+
+def write_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """
+    Writes a training state snapshot to a checkpoint directory, atomically: the directory
+    either holds the complete checkpoint or does not exist.
+
+    Args:
+        path (str): The checkpoint directory.
+        state (Dict[str, Any]): From snapshot_training_state.
+    """
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    # Written to a temporary directory first, so a job killed mid-write leaves no partial checkpoint
+    staging = os.path.join(parent, f".{os.path.basename(path)}.{uuid.uuid4().hex}")
+    os.makedirs(staging)
+    try:
+        arrays = {f"weight_{i}": value for i, value in enumerate(state['weights'])}
+        arrays.update({f"optimizer_{i}": value for i, value in enumerate(state['optimizer'])})
+        arrays.update({f"best_weight_{i}": value for i, value in enumerate(state['best_weights'])})
+        arrays['numpy_rng_keys'] = state['rng']['numpy'][1]
+        if state['rng'].get('tensorflow') is not None:
+            arrays['tensorflow_rng_state'] = state['rng']['tensorflow']
+        with open(os.path.join(staging, STATE_FILE), 'wb') as f:
+            np.savez(f, **arrays)
+
+        numpy_rng = list(state['rng']['numpy'])
+        numpy_rng[1] = None
+        with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+            json.dump({'epoch': state['epoch'], 'weights': len(state['weights']), 'optimizer': len(state['optimizer']),
+                       'best_weights': len(state['best_weights']), 'early_stopping': state['early_stopping'],
+                       'python_rng': state['rng']['python'], 'numpy_rng': numpy_rng, 'created_at': time.time()}, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(staging, path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+def read_checkpoint(path: str) -> Dict[str, Any]:
+    """
+    Reads a checkpoint written by write_checkpoint.
+
+    Args:
+        path (str): The checkpoint directory.
+
+    Returns:
+        Dict[str, Any]: The training state, as returned by snapshot_training_state.
+    """
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    with np.load(os.path.join(path, STATE_FILE)) as arrays:
+        numpy_rng = metadata['numpy_rng']
+        numpy_rng[1] = arrays['numpy_rng_keys']
+        return {
+            'epoch': metadata['epoch'],
+            'weights': [arrays[f"weight_{i}"] for i in range(metadata['weights'])],
+            'optimizer': [arrays[f"optimizer_{i}"] for i in range(metadata['optimizer'])],
+            'rng': {'python': metadata['python_rng'], 'numpy': numpy_rng,
+                    'tensorflow': arrays['tensorflow_rng_state'] if 'tensorflow_rng_state' in arrays else None},
+            # Absent from checkpoints written before the early stopping state was saved
+            'early_stopping': metadata.get('early_stopping'),
+            'best_weights': [arrays[f"best_weight_{i}"] for i in range(metadata.get('best_weights', 0))],
+        }
+
+def _create_optimizer_slots(model: Any) -> None:
+    # An optimizer creates its slots on its first step. A step with zero gradients creates them
+    # without moving the weights; its step counter and slots are then overwritten by the checkpoint.
+    import tensorflow as tf
+
+    variables = model.trainable_variables
+    model.optimizer.apply_gradients(zip([tf.zeros_like(variable) for variable in variables], variables))
+
+class TrainingCheckpoint:
+    """
+    Periodic checkpoints of one training job, from which a killed or preempted job resumes.
+
+    A checkpoint holds the model weights, the optimizer state, the number of epochs completed,
+    the state of the random number generators and, given the run's TrainingReport, the early
+    stopping state, so a resumed run keeps its patience and best weights. Saving only copies the state to host memory
+    on the training thread; a background thread writes it to disk, so training goes on with
+    the next epoch meanwhile. At most one write is pending: a save waits for the previous one.
+    """
+
+    def __init__(self, directory: str, every_epochs: int = None, keep: int = None):
+        """
+        Initializes the TrainingCheckpoint.
+
+        Args:
+            directory (str): Directory of the checkpoints of this job.
+            every_epochs (int): Epochs between checkpoints. Defaults to ML_CHECKPOINT_EVERY_EPOCHS.
+            keep (int): Number of most recent checkpoints kept. Defaults to ML_CHECKPOINT_KEEP.
+        """
+        self.directory = directory
+        self.every_epochs = every_epochs or CHECKPOINT_CONFIG['every_epochs']
+        self.keep = keep or CHECKPOINT_CONFIG['keep']
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint-writer')
+        self._pending: Optional[Future] = None
+
+    def checkpoints(self) -> List[str]:
+        """
+        Lists the complete checkpoints of the job.
+
+        Returns:
+            List[str]: Their directories, oldest first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(CHECKPOINT_PREFIX) and os.path.isfile(os.path.join(self.directory, name, METADATA_FILE)))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def latest(self) -> Optional[str]:
+        """
+        Finds the most recent complete checkpoint.
+
+        Returns:
+            Optional[str]: Its directory, or None if the job has no checkpoint.
+        """
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def save(self, model: Any, epoch: int, report: 'TrainingReport' = None) -> None:
+        """
+        Checkpoints the training state after an epoch. Returns once the state is copied;
+        it is written in the background.
+
+        Args:
+            model (tf.keras.Model): The model being trained.
+            epoch (int): Number of epochs completed.
+            report (TrainingReport): Report of the run, whose early stopping state is saved.
+        """
+        state = snapshot_training_state(model, epoch, report)
+        self.wait()
+        self._pending = self._writer.submit(self._write, state)
+
+    def wait(self) -> None:
+        """Waits for the pending checkpoint write, raising its error if it failed."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def restore(self, model: Any, report: 'TrainingReport' = None) -> int:
+        """
+        Restores the model, its optimizer and the random number generators from the latest checkpoint.
+
+        Args:
+            model (tf.keras.Model): The built and compiled model to restore into.
+            report (TrainingReport): Report of the resumed run, into which the early stopping
+                state is restored, if the checkpoint has one.
+
+        Returns:
+            int: The number of epochs the checkpoint was taken after, from which training
+            resumes, or 0 if the job has no checkpoint.
+        """
+        self.wait()
+        path = self.latest()
+        if path is None:
+            return 0
+
+        state = read_checkpoint(path)
+        model.set_weights(state['weights'])
+        if state['optimizer']:
+            if len(get_optimizer_weights(model.optimizer)) != len(state['optimizer']):
+                _create_optimizer_slots(model)
+            set_optimizer_weights(model.optimizer, state['optimizer'])
+        restore_rng_state(state['rng'])
+        if report is not None and state['early_stopping'] is not None:
+            for name, value in state['early_stopping'].items():
+                setattr(report, name, value)
+            report.best_weights = state['best_weights'] or None
+        logger.info(f"Resuming training from {path} after epoch {state['epoch']}")
+        return state['epoch']
+
+    def callback(self, report: 'TrainingReport' = None) -> 'tf.keras.callbacks.Callback':
+        """
+        Creates the Keras callback that checkpoints every every_epochs epochs during model.fit
+        and waits for the last write when training ends.
+
+        Args:
+            report (TrainingReport): Report of the run, whose early stopping state is saved.
+                It must be filled in by callbacks preceding this one (see create_training_callbacks).
+
+        Returns:
+            tf.keras.callbacks.Callback: The callback.
+        """
+        import tensorflow as tf
+
+        checkpoint = self
+
+        class CheckpointCallback(tf.keras.callbacks.Callback):
+            def on_epoch_end(self, epoch, logs=None):
+                # Keras counts epochs from 0, checkpoints count completed epochs
+                if (epoch + 1) % checkpoint.every_epochs == 0:
+                    checkpoint.save(self.model, epoch + 1, report)
+
+            def on_train_end(self, logs=None):
+                checkpoint.wait()
+
+        return CheckpointCallback()
+
+    def clear(self) -> None:
+        """Removes all checkpoints of the job, e.g. once its model is saved or to start it afresh."""
+        self.wait()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        # Runs on the writer thread
+        write_checkpoint(os.path.join(self.directory, f"{CHECKPOINT_PREFIX}{state['epoch']:06d}"), state)
+        for path in self.checkpoints()[:-self.keep]:
+            shutil.rmtree(path, ignore_errors=True)
+        logger.info(f"Checkpointed epoch {state['epoch']} to {self.directory}")
+
+def job_checkpoint(job_name: str, directory: str = None) -> TrainingCheckpoint:
+    """
+    Creates the checkpoints of a named training job, e.g. a model type of the training pipeline.
+
+    Args:
+        job_name (str): Name of the job; its checkpoints are kept in a directory of that name.
+        directory (str): Directory of the checkpoints of all jobs. Defaults to ML_CHECKPOINT_DIR.
+
+    Returns:
+        TrainingCheckpoint: The checkpoints of the job.
+    """
+    return TrainingCheckpoint(os.path.join(directory or CHECKPOINT_CONFIG['directory'], job_name))
+
+# TODO: Checkpoint the fitted preprocessing state as well, so a resumed job need not refit it on the same data
@@ -0,0 +1,593 @@
+import os
+import json
+import math
+import sqlite3
+import logging
+import tempfile
+import functools
+import numpy as np
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..preprocessing.preprocessing_cache import PreprocessingCache
+from .parallel_training import available_cpus, create_pinned_workers
+
+logger = logging.getLogger(__name__)
+
+# Default search settings, overridable through the environment. max_workers is the number
+# of concurrent trials; 0 means one per CPU. Trials are trained for min_epochs, then the best
+# 1/reduction_factor of them for reduction_factor times as many, and so on up to the model's epochs.
+HYPERPARAMETER_SEARCH_CONFIG = {
+    'study_path': os.environ.get('ML_SEARCH_STUDY_PATH', './data/hyperparameter_search.sqlite'),
+    'n_trials': int(os.environ.get('ML_SEARCH_TRIALS', 20)),
+    'max_workers': int(os.environ.get('ML_SEARCH_MAX_WORKERS', 0)),
+    'sampler': os.environ.get('ML_SEARCH_SAMPLER', 'tpe'),
+    'startup_trials': int(os.environ.get('ML_SEARCH_STARTUP_TRIALS', 5)),
+    'min_epochs': int(os.environ.get('ML_SEARCH_MIN_EPOCHS', 2)),
+    'reduction_factor': int(os.environ.get('ML_SEARCH_REDUCTION_FACTOR', 3)),
+    'seed': 42,
+}
+
+# Search space of every model type. A dimension is ('choice', values) or ('log_uniform', low, high).
+_HIDDEN_LAYERS = ('choice', [[32], [64], [64, 32], [128, 64], [128, 64, 32]])
+_LEARNING_RATE = ('log_uniform', 1e-4, 1e-2)
+_BATCH_SIZE = ('choice', [32, 64, 128, 256])
+
+SEARCH_SPACES = {
+    'transaction': {'embedding_dim': ('choice', [32, 64, 100, 128]), 'lstm_units': ('choice', [32, 64, 128]),
+                    'learning_rate': _LEARNING_RATE, 'batch_size': _BATCH_SIZE},
+    'spending': {'hidden_layers': _HIDDEN_LAYERS, 'learning_rate': _LEARNING_RATE, 'batch_size': _BATCH_SIZE},
+    'investment': {'hidden_layers': _HIDDEN_LAYERS, 'learning_rate': _LEARNING_RATE, 'batch_size': _BATCH_SIZE},
+    'credit': {'hidden_layers': _HIDDEN_LAYERS, 'learning_rate': _LEARNING_RATE, 'batch_size': _BATCH_SIZE},
+}
+
+# Validation metric trials are ranked by, whether it is maximized, and the full training epochs of every model type
+SEARCH_METRICS = {
+    'transaction': ('accuracy', True, 10),
+    'spending': ('mse', False, 100),
+    'investment': ('mse', False, 100),
+    'credit': ('mse', False, 100),
+}
+
+# Cache key of the data shared with the trial processes
+SHARED_DATA_KEY = 'search_data'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    name TEXT PRIMARY KEY,
+    maximize INTEGER NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS trials (
+    trial_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    study TEXT NOT NULL,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    value REAL,
+    epochs INTEGER,
+    started_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS trial_reports (
+    trial_id INTEGER NOT NULL,
+    rung INTEGER NOT NULL,
+    epochs INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (trial_id, rung)
+);
+"""
+
+# States of trials that are over; 'running' trials of an interrupted search are run again
+FINISHED_STATES = ('complete', 'pruned', 'failed')
+
+class Study:
+    """
+    The trials of a hyperparameter search and their intermediate results, in a SQLite database.
+
+    Every trial process opens the study itself, reports its validation metric after each
+    rung of epochs and learns in the same transaction whether it is pruned, so concurrent
+    trials are pruned against each other as their results come in. A search resumed on the
+    same study continues up to its number of trials and learns from the earlier ones.
+    """
+
+    def __init__(self, path: str = None, name: str = 'default', maximize: bool = None):
+        """
+        Initializes the Study, creating the database and the study if needed.
+
+        Args:
+            path (str): SQLite database file. Defaults to ML_SEARCH_STUDY_PATH.
+            name (str): Name of the study within the database, e.g. the model type.
+            maximize (bool): Whether higher metric values are better. Required to create a study;
+                an existing study keeps its direction.
+        """
+        self.path = path or HYPERPARAMETER_SEARCH_CONFIG['study_path']
+        self.name = name
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Trial processes write concurrently, so writers wait for each other's transactions
+        self._connection = sqlite3.connect(self.path, timeout=60)
+        self._connection.executescript(_SCHEMA)
+
+        row = self._connection.execute("SELECT maximize FROM studies WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            if maximize is None:
+                raise ValueError(f"Study {name} does not exist in {self.path}")
+            with self._connection:
+                self._connection.execute("INSERT INTO studies (name, maximize) VALUES (?, ?)", (name, int(maximize)))
+        elif maximize is not None and bool(row[0]) != maximize:
+            raise ValueError(f"Study {name} in {self.path} was created with maximize={bool(row[0])}")
+        self.maximize = bool(row[0]) if row is not None else maximize
+
+    def create_trial(self, params: Dict[str, Any]) -> int:
+        """
+        Records a new running trial.
+
+        Args:
+            params (Dict[str, Any]): The JSON serializable hyperparameters of the trial.
+
+        Returns:
+            int: The id of the trial.
+        """
+        with self._connection:
+            cursor = self._connection.execute("INSERT INTO trials (study, params, state) VALUES (?, ?, 'running')",
+                                              (self.name, json.dumps(params)))
+        return cursor.lastrowid
+
+    def report(self, trial_id: int, rung: int, epochs: int, value: float, reduction_factor: int = None) -> bool:
+        """
+        Records the validation metric of a trial after a rung of epochs and decides whether it continues.
+
+        A trial continues if its value is among the best 1/reduction_factor of the values all
+        trials of the study reported at this rung so far. Until reduction_factor trials have
+        reached the rung, every trial continues.
+
+        Args:
+            trial_id (int): The trial.
+            rung (int): Index of the rung.
+            epochs (int): Epochs the trial was trained for so far.
+            value (float): The validation metric.
+            reduction_factor (int): Inverse of the fraction of trials continuing. Defaults to ML_SEARCH_REDUCTION_FACTOR.
+
+        Returns:
+            bool: Whether the trial should continue to the next rung.
+        """
+        reduction_factor = reduction_factor or HYPERPARAMETER_SEARCH_CONFIG['reduction_factor']
+        # The insert takes the write lock, so the ranking below sees every earlier report
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO trial_reports (trial_id, rung, epochs, value) VALUES (?, ?, ?, ?)",
+                                     (trial_id, rung, epochs, float(value)))
+            values = [row[0] for row in self._connection.execute(
+                "SELECT r.value FROM trial_reports r JOIN trials t USING (trial_id) WHERE t.study = ? AND r.rung = ?",
+                (self.name, rung))]
+
+        if len(values) < reduction_factor:
+            return True
+        better = sum(1 for other in values if (other > value if self.maximize else other < value))
+        return better < len(values) // reduction_factor
+
+    def finish(self, trial_id: int, state: str, value: float = None, epochs: int = None) -> None:
+        """
+        Records the end of a trial.
+
+        Args:
+            trial_id (int): The trial.
+            state (str): One of 'complete', 'pruned' and 'failed'.
+            value (float): The last validation metric of the trial.
+            epochs (int): Epochs the trial was trained for.
+        """
+        with self._connection:
+            self._connection.execute("UPDATE trials SET state = ?, value = ?, epochs = ?, finished_at = CURRENT_TIMESTAMP "
+                                     "WHERE trial_id = ?", (state, value, epochs, trial_id))
+
+    def trials(self, states: Sequence[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lists the trials of the study.
+
+        Args:
+            states (Sequence[str]): States of the trials to list. Defaults to all.
+
+        Returns:
+            List[Dict[str, Any]]: Every trial's 'trial_id', 'params', 'state', last 'value', 'epochs'
+            and the index of the highest 'rung' it reported (-1 for none).
+        """
+        rows = self._connection.execute(
+            "SELECT t.trial_id, t.params, t.state, t.value, t.epochs, COALESCE(MAX(r.rung), -1) "
+            "FROM trials t LEFT JOIN trial_reports r USING (trial_id) WHERE t.study = ? "
+            "GROUP BY t.trial_id ORDER BY t.trial_id", (self.name,)).fetchall()
+        trials = [{'trial_id': trial_id, 'params': json.loads(params), 'state': state, 'value': value,
+                   'epochs': epochs, 'rung': rung}
+                  for trial_id, params, state, value, epochs, rung in rows]
+        return [trial for trial in trials if states is None or trial['state'] in states]
+
+    def ranked_trials(self) -> List[Dict[str, Any]]:
+        """
+        Lists the finished trials that reported a result, best first: trials that reached a
+        higher rung rank above pruned ones, and trials of the same rung by their value there.
+
+        Returns:
+            List[Dict[str, Any]]: The trials, as listed by trials().
+        """
+        trials = [trial for trial in self.trials(('complete', 'pruned')) if trial['value'] is not None]
+        sign = -1 if self.maximize else 1
+        return sorted(trials, key=lambda trial: (-trial['rung'], sign * trial['value']))
+
+    def best_trial(self) -> Optional[Dict[str, Any]]:
+        """
+        Finds the best complete trial.
+
+        Returns:
+            Optional[Dict[str, Any]]: The trial, as listed by trials(), or None before any trial completed.
+        """
+        complete = [trial for trial in self.ranked_trials() if trial['state'] == 'complete']
+        return complete[0] if complete else None
+
+    def requeue_interrupted(self) -> List[Dict[str, Any]]:
+        """
+        Marks the trials left running by an interrupted search as such, so they are run again.
+
+        Returns:
+            List[Dict[str, Any]]: The hyperparameters of the interrupted trials.
+        """
+        interrupted = self.trials(('running',))
+        with self._connection:
+            self._connection.executemany("UPDATE trials SET state = 'interrupted' WHERE trial_id = ?",
+                                         [(trial['trial_id'],) for trial in interrupted])
+        return [trial['params'] for trial in interrupted]
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+def rung_epochs(min_epochs: int, max_epochs: int, reduction_factor: int) -> List[int]:
+    """
+    Computes the cumulative epochs after which trials are evaluated and pruned.
+
+    Args:
+        min_epochs (int): Epochs of the first rung.
+        max_epochs (int): Epochs of a complete trial.
+        reduction_factor (int): Growth of the epochs from one rung to the next.
+
+    Returns:
+        List[int]: The epochs of every rung, ending with max_epochs.
+    """
+    epochs = []
+    budget = min_epochs
+    while budget < max_epochs:
+        epochs.append(budget)
+        budget *= reduction_factor
+    return epochs + [max_epochs]
+
+def _sample_dimension(dimension: Tuple, rng: np.random.RandomState) -> Any:
+    if dimension[0] == 'choice':
+        return dimension[1][rng.randint(len(dimension[1]))]
+    if dimension[0] == 'log_uniform':
+        return float(np.exp(rng.uniform(np.log(dimension[1]), np.log(dimension[2]))))
+    raise ValueError(f"Unknown search dimension {dimension[0]}")
+
+def sample_random(space: Dict[str, Tuple], rng: np.random.RandomState) -> Dict[str, Any]:
+    """
+    Draws hyperparameters uniformly from a search space.
+
+    Args:
+        space (Dict[str, Tuple]): The search space (see SEARCH_SPACES).
+        rng (np.random.RandomState): Random number generator.
+
+    Returns:
+        Dict[str, Any]: The hyperparameters.
+    """
+    return {name: _sample_dimension(dimension, rng) for name, dimension in space.items()}
+
+def _parzen_log_density(x: np.ndarray, centers: np.ndarray, low: float, high: float) -> np.ndarray:
+    # Mixture of the uniform prior and a Gaussian around every observation, in log space
+    width = high - low
+    sigma = max(width / (1 + len(centers)), 0.05 * width)
+    densities = np.full(len(x), 1 / width)
+    if len(centers):
+        gaussians = np.exp(-0.5 * ((x[:, None] - centers[None, :]) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi))
+        densities = (densities + gaussians.sum(axis=1)) / (1 + len(centers))
+    return np.log(densities)
+
+def _sample_parzen(centers: np.ndarray, low: float, high: float, size: int, rng: np.random.RandomState) -> np.ndarray:
+    # Draws from the mixture of _parzen_log_density, clipped to the bounds
+    width = high - low
+    sigma = max(width / (1 + len(centers)), 0.05 * width)
+    component = rng.randint(len(centers) + 1, size=size)
+    samples = rng.uniform(low, high, size=size)
+    from_center = component < len(centers)
+    samples[from_center] = rng.normal(centers[component[from_center]], sigma)
+    return np.clip(samples, low, high)
+
+def sample_tpe(space: Dict[str, Tuple], history: Sequence[Dict[str, Any]], rng: np.random.RandomState,
+               gamma: float = 0.25, n_candidates: int = 24) -> Dict[str, Any]:
+    """
+    Draws hyperparameters with the Tree-structured Parzen Estimator, a Bayesian sampler.
+
+    The ranked earlier trials are split into the best gamma fraction and the rest, and every
+    dimension is modelled by one density over the good and one over the other trials. Of
+    candidates drawn from the good density, the one most likely under it relative to the
+    other is chosen, so sampling concentrates where good trials were found.
+
+    Args:
+        space (Dict[str, Tuple]): The search space (see SEARCH_SPACES).
+        history (Sequence[Dict[str, Any]]): Earlier trials best first, as ranked by Study.ranked_trials.
+        rng (np.random.RandomState): Random number generator.
+        gamma (float): Fraction of the trials considered good.
+        n_candidates (int): Candidates drawn per dimension.
+
+    Returns:
+        Dict[str, Any]: The hyperparameters.
+    """
+    n_good = max(1, int(math.ceil(gamma * len(history))))
+    good, bad = history[:n_good], history[n_good:]
+
+    params = {}
+    for name, dimension in space.items():
+        if dimension[0] == 'choice':
+            choices = dimension[1]
+
+            def weights(trials):
+                # Frequency of every choice among the trials, smoothed by one observation each
+                counts = np.ones(len(choices))
+                for trial in trials:
+                    if trial['params'].get(name) in choices:
+                        counts[choices.index(trial['params'][name])] += 1
+                return counts / counts.sum()
+
+            good_weights, bad_weights = weights(good), weights(bad)
+            candidates = rng.choice(len(choices), size=n_candidates, p=good_weights)
+            scores = np.log(good_weights[candidates]) - np.log(bad_weights[candidates])
+            params[name] = choices[candidates[np.argmax(scores)]]
+        elif dimension[0] == 'log_uniform':
+            low, high = np.log(dimension[1]), np.log(dimension[2])
+
+            def centers(trials):
+                return np.log([trial['params'][name] for trial in trials if name in trial['params']])
+
+            candidates = _sample_parzen(centers(good), low, high, n_candidates, rng)
+            scores = _parzen_log_density(candidates, centers(good), low, high) - \
+                _parzen_log_density(candidates, centers(bad), low, high)
+            params[name] = float(np.exp(candidates[np.argmax(scores)]))
+        else:
+            raise ValueError(f"Unknown search dimension {dimension[0]}")
+    return params
+
+def suggest_parameters(space: Dict[str, Tuple], study: Study, rng: np.random.RandomState,
+                       sampler: str = None) -> Dict[str, Any]:
+    """
+    Chooses the hyperparameters of the next trial.
+
+    Args:
+        space (Dict[str, Tuple]): The search space (see SEARCH_SPACES).
+        study (Study): The study, whose finished trials guide the TPE sampler.
+        rng (np.random.RandomState): Random number generator.
+        sampler (str): 'tpe' or 'random'. Defaults to ML_SEARCH_SAMPLER. TPE samples randomly
+            until ML_SEARCH_STARTUP_TRIALS trials finished.
+
+    Returns:
+        Dict[str, Any]: The hyperparameters.
+    """
+    sampler = sampler or HYPERPARAMETER_SEARCH_CONFIG['sampler']
+    if sampler not in ('tpe', 'random'):
+        raise ValueError(f"Unknown sampler {sampler}")
+
+    history = study.ranked_trials()
+    if sampler == 'random' or len(history) < HYPERPARAMETER_SEARCH_CONFIG['startup_trials']:
+        return sample_random(space, rng)
+    return sample_tpe(space, history, rng)
+
+def run_trial(study_path: str, study_name: str, trial_id: int, objective: Callable[..., Iterator[float]],
+              params: Dict[str, Any], shared: Union[str, pd.DataFrame], epochs: List[int],
+              reduction_factor: int) -> str:
+    """
+    Runs one trial in a search process: trains it rung by rung, reporting to the study,
+    until it is pruned or completes.
+
+    Args:
+        study_path (str): SQLite database of the study.
+        study_name (str): Name of the study.
+        trial_id (int): The trial.
+        objective (Callable[..., Iterator[float]]): Called with the hyperparameters, the data and
+            the rung epochs, trains a model and yields its validation metric after every rung.
+        params (Dict[str, Any]): The hyperparameters of the trial.
+        shared (Union[str, pd.DataFrame]): The data, or the directory it was shared through by run_search.
+        epochs (List[int]): The cumulative epochs of every rung (see rung_epochs).
+        reduction_factor (int): Inverse of the fraction of trials continuing at every rung.
+
+    Returns:
+        str: The final state of the trial.
+    """
+    study = Study(study_path, study_name)
+    try:
+        data = PreprocessingCache(shared).get(SHARED_DATA_KEY) if isinstance(shared, str) else shared
+        rungs = objective(params, data, epochs)
+        for rung, value in enumerate(rungs):
+            if rung == len(epochs) - 1:
+                study.report(trial_id, rung, epochs[rung], value, reduction_factor)
+                study.finish(trial_id, 'complete', value, epochs[rung])
+                return 'complete'
+            if not study.report(trial_id, rung, epochs[rung], value, reduction_factor):
+                study.finish(trial_id, 'pruned', value, epochs[rung])
+                return 'pruned'
+        raise ValueError(f"The objective reported fewer than {len(epochs)} rungs")
+    except Exception:
+        study.finish(trial_id, 'failed')
+        raise
+    finally:
+        study.close()
+
+def run_search(study: Study, objective: Callable[..., Iterator[float]], space: Dict[str, Tuple], data: pd.DataFrame,
+               max_epochs: int, n_trials: int = None, max_workers: int = None, sampler: str = None,
+               min_epochs: int = None, reduction_factor: int = None, seed: int = None) -> Optional[Dict[str, Any]]:
+    """
+    Runs a hyperparameter search, with trials running concurrently in processes pinned to their own CPUs.
+
+    A new trial starts as soon as a worker is free, with hyperparameters chosen from all
+    trials finished so far. Trials are pruned by asynchronous successive halving: after each
+    rung of epochs (see rung_epochs) only the best of the trials that reached that rung
+    continue, so most of the compute goes to promising hyperparameters. The data is written
+    once to an Arrow file that the trial processes memory-map.
+
+    A search on a study with earlier trials resumes it: it runs the trials an interrupted
+    search left unfinished again, and new ones until the study has n_trials finished trials.
+
+    Args:
+        study (Study): The study the trials are recorded in.
+        objective (Callable[..., Iterator[float]]): Module-level function (or partial of one)
+            called with the hyperparameters, the data and the rung epochs, that trains a model
+            and yields its validation metric after every rung.
+        space (Dict[str, Tuple]): The search space (see SEARCH_SPACES).
+        data (pd.DataFrame): The data passed to the objective.
+        max_epochs (int): Epochs of a complete trial.
+        n_trials (int): Number of finished trials of the study to reach. Defaults to ML_SEARCH_TRIALS.
+        max_workers (int): Number of concurrent trials. Defaults to ML_SEARCH_MAX_WORKERS, or one per CPU.
+        sampler (str): 'tpe' or 'random'. Defaults to ML_SEARCH_SAMPLER.
+        min_epochs (int): Epochs of the first rung. Defaults to ML_SEARCH_MIN_EPOCHS.
+        reduction_factor (int): Inverse of the fraction of trials continuing at every rung.
+            Defaults to ML_SEARCH_REDUCTION_FACTOR.
+        seed (int): Seed of the sampler.
+
+    Returns:
+        Optional[Dict[str, Any]]: The best complete trial (see Study.best_trial), or None if none completed.
+    """
+    n_trials = n_trials or HYPERPARAMETER_SEARCH_CONFIG['n_trials']
+    reduction_factor = reduction_factor or HYPERPARAMETER_SEARCH_CONFIG['reduction_factor']
+    epochs = rung_epochs(min(min_epochs or HYPERPARAMETER_SEARCH_CONFIG['min_epochs'], max_epochs), max_epochs,
+                         reduction_factor)
+
+    requeued = study.requeue_interrupted()
+    remaining = n_trials - len(study.trials(FINISHED_STATES))
+    if remaining <= 0:
+        logger.info(f"Study {study.name} already has {n_trials} finished trials")
+        return study.best_trial()
+
+    # Seeded with the number of earlier trials, so a resumed search does not repeat their hyperparameters
+    seed = HYPERPARAMETER_SEARCH_CONFIG['seed'] if seed is None else seed
+    rng = np.random.RandomState(seed + len(study.trials()))
+    num_workers = min(max_workers or HYPERPARAMETER_SEARCH_CONFIG['max_workers'] or len(available_cpus()), remaining)
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared_cache = PreprocessingCache(directory, max_entries=1)
+        shared_cache.put(SHARED_DATA_KEY, data)
+        # Without pyarrow the cache is disabled, and the data is sent to the processes instead
+        shared = directory if shared_cache.enabled else data
+
+        workers = create_pinned_workers(num_workers)
+        idle, running = list(workers), {}
+        try:
+            while remaining > 0 or running:
+                while idle and remaining > 0:
+                    params = requeued.pop(0) if requeued else suggest_parameters(space, study, rng, sampler)
+                    trial_id = study.create_trial(params)
+                    logger.info(f"Starting trial {trial_id} of study {study.name}: {params}")
+                    worker = idle.pop()
+                    running[worker.submit(run_trial, study.path, study.name, trial_id, objective, params, shared,
+                                          epochs, reduction_factor)] = (worker, trial_id)
+                    remaining -= 1
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    worker, trial_id = running.pop(future)
+                    idle.append(worker)
+                    try:
+                        logger.info(f"Trial {trial_id} of study {study.name}: {future.result()}")
+                    except Exception as e:
+                        logger.error(f"Trial {trial_id} of study {study.name} failed: {str(e)}")
+        finally:
+            for worker in workers:
+                worker.shutdown(wait=True)
+
+    best = study.best_trial()
+    if best is not None:
+        logger.info(f"Best trial of study {study.name}: {best['trial_id']} with value {best['value']}: {best['params']}")
+    return best
+
+def create_model(model_type: str, params: Dict[str, Any]) -> Any:
+    """
+    Creates an untrained model with the given hyperparameters.
+
+    Args:
+        model_type (str): One of 'transaction', 'spending', 'investment' and 'credit'.
+        params (Dict[str, Any]): Keyword arguments of the model's constructor.
+
+    Returns:
+        Any: The model.
+    """
+    # Imported here, as the models pull in TensorFlow
+    if model_type == 'transaction':
+        from ..models.transaction_categorization import TransactionCategorizationModel
+        return TransactionCategorizationModel(**params)
+    if model_type == 'spending':
+        from ..models.spending_prediction import SpendingPredictionModel
+        return SpendingPredictionModel(**params)
+    if model_type == 'investment':
+        from ..models.investment_recommendation import InvestmentRecommendationModel
+        return InvestmentRecommendationModel(**params)
+    if model_type == 'credit':
+        from ..models.credit_score_prediction import CreditScorePredictionModel
+        return CreditScorePredictionModel(**params)
+    raise ValueError(f"Unknown model type {model_type}")
+
+def train_model_trial(model_type: str, params: Dict[str, Any], data: pd.DataFrame, epochs: List[int]) -> Iterator[float]:
+    """
+    Search objective of the models: trains a model on all but the last cross-validation fold
+    of data, continuing its training up to the epochs of every rung, and yields its metric
+    (see SEARCH_METRICS) on the last fold after each. Spending and transactions are
+    validated on their latest period when data has a time column, and on a shuffled fold
+    otherwise (see splits_by_time).
+
+    Args:
+        model_type (str): One of 'transaction', 'spending', 'investment' and 'credit'.
+        params (Dict[str, Any]): The hyperparameters.
+        data (pd.DataFrame): Features and target of the model.
+        epochs (List[int]): The cumulative epochs of every rung.
+
+    Returns:
+        Iterator[float]: The validation metric after every rung.
+    """
+    from ..evaluation.cross_validation import make_splits
+    from ..evaluation.model_evaluation import CROSS_VALIDATION_MODELS
+
+    _, evaluate, target_column, time_series = CROSS_VALIDATION_MODELS[model_type]
+    train_positions, validation_positions = make_splits(data, time_series=time_series)[-1]
+    train_data, validation_data = data.iloc[train_positions], data.iloc[validation_positions]
+
+    model = create_model(model_type, params)
+    trained = 0
+    for budget in epochs:
+        if model_type == 'credit':
+            model.train(train_data.drop(target_column, axis=1), train_data[target_column], epochs=budget - trained)
+        else:
+            model.train(train_data, epochs=budget - trained)
+        trained = budget
+
+        metrics = evaluate(model, validation_data.drop(target_column, axis=1), validation_data[target_column])
+        yield float(metrics[SEARCH_METRICS[model_type][0]])
+
+def search_hyperparameters(model_type: str, data: pd.DataFrame, study_path: str = None, n_trials: int = None,
+                           max_workers: int = None, sampler: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Searches the hyperparameters of one of the models (see SEARCH_SPACES), resuming the
+    study of the model type in the study database if there is one.
+
+    Args:
+        model_type (str): One of 'transaction', 'spending', 'investment' and 'credit'.
+        data (pd.DataFrame): Features and target of the model.
+        study_path (str): SQLite database of the studies. Defaults to ML_SEARCH_STUDY_PATH.
+        n_trials (int): Number of finished trials to reach. Defaults to ML_SEARCH_TRIALS.
+        max_workers (int): Number of concurrent trials. Defaults to ML_SEARCH_MAX_WORKERS, or one per CPU.
+        sampler (str): 'tpe' or 'random'. Defaults to ML_SEARCH_SAMPLER.
+
+    Returns:
+        Optional[Dict[str, Any]]: The best complete trial, with its 'params', or None if none completed.
+    """
+    _, maximize, max_epochs = SEARCH_METRICS[model_type]
+    study = Study(study_path, name=model_type, maximize=maximize)
+    try:
+        return run_search(study, functools.partial(train_model_trial, model_type), SEARCH_SPACES[model_type], data,
+                          max_epochs, n_trials=n_trials, max_workers=max_workers, sampler=sampler)
+    finally:
+        study.close()
+
+# TODO: Resume the training of interrupted trials from checkpoints instead of from scratch
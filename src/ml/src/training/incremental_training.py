@@ -0,0 +1,275 @@
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Sequence
+
+from ..preprocessing.preprocessing_cache import PreprocessingCache
+
+logger = logging.getLogger(__name__)
+
+# Default incremental training settings, overridable through the environment: whether updates
+# warm-start from the deployed weights, the directory and rows of the replay buffers, the
+# fine-tuning epochs and learning rate (as a fraction of the model's), the population stability
+# index above which a feature has drifted, the relative loss of quality that counts as a
+# degradation, and the fraction of the new rows held out to check it
+INCREMENTAL_TRAINING_CONFIG = {
+    'warm_start': os.environ.get('ML_WARM_START', 'true').lower() == 'true',
+    'replay_directory': os.environ.get('ML_REPLAY_BUFFER_DIR', './data/replay_buffers'),
+    'replay_size': int(os.environ.get('ML_REPLAY_BUFFER_SIZE', 50000)),
+    'fine_tune_epochs': int(os.environ.get('ML_WARM_START_EPOCHS', 5)),
+    'learning_rate_factor': float(os.environ.get('ML_WARM_START_LEARNING_RATE_FACTOR', 0.1)),
+    'drift_threshold': float(os.environ.get('ML_DRIFT_PSI_THRESHOLD', 0.2)),
+    'degradation_tolerance': float(os.environ.get('ML_DEGRADATION_TOLERANCE', 0.05)),
+    'validation_fraction': float(os.environ.get('ML_WARM_START_VALIDATION_FRACTION', 0.2)),
+    'seed': 42,
+}
+
+# Cache key of the rows of a replay buffer, and the file of its state next to them
+REPLAY_KEY = 'replay'
+STATE_FILE = 'replay_state.json'
+
+# Floor of the bin proportions of the population stability index, so empty bins stay finite
+PSI_EPSILON = 1e-4
+
+class ReplayBuffer:
+    """
+    A bounded, uniform sample of every row a model was trained on, replayed when the model is
+    fine-tuned on new data so that it does not forget the older data.
+
+    Rows are kept by reservoir sampling: the n-th row seen replaces a random kept row with
+    probability capacity / n, so the buffer is a uniform sample of the whole history whatever
+    its length, and updates cost the size of the new data only. The buffer is stored as an
+    Arrow file (see PreprocessingCache); without pyarrow it is only kept in memory.
+    """
+
+    def __init__(self, directory: str, capacity: int = None, seed: int = None):
+        """
+        Initializes the ReplayBuffer, loading the rows stored in directory if any.
+
+        Args:
+            directory (str): Directory the buffer is stored in.
+            capacity (int): Maximum rows kept. Defaults to ML_REPLAY_BUFFER_SIZE.
+            seed (int): Seed of the sampling.
+        """
+        self.directory = directory
+        self.capacity = capacity or INCREMENTAL_TRAINING_CONFIG['replay_size']
+        self.seed = INCREMENTAL_TRAINING_CONFIG['seed'] if seed is None else seed
+        self._cache = PreprocessingCache(directory, max_entries=1)
+        self.data = self._cache.get(REPLAY_KEY)
+        self.seen = 0
+        if self.data is None:
+            self.data = pd.DataFrame()
+        else:
+            with open(os.path.join(directory, STATE_FILE)) as f:
+                self.seen = json.load(f)['seen']
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def add(self, data: pd.DataFrame) -> 'ReplayBuffer':
+        """
+        Offers new rows to the buffer.
+
+        Args:
+            data (pd.DataFrame): The rows, in the order they were seen.
+
+        Returns:
+            ReplayBuffer: self, for chaining.
+        """
+        data = data.reset_index(drop=True)
+        kept = len(self.data)
+        fill = min(max(self.capacity - kept, 0), len(data))
+        combined = pd.concat([self.data, data], ignore_index=True) if kept else data
+        selection = np.arange(kept + fill)
+
+        # Rows beyond the capacity replace a random kept row with probability capacity / n
+        rest = np.arange(fill, len(data))
+        if len(rest):
+            # Drawn from the number of rows seen, so a restarted buffer continues the same sequence
+            rng = np.random.RandomState([self.seed, self.seen % 2**32])
+            arrival = self.seen + rest
+            slots = (rng.random_sample(len(rest)) * (arrival + 1)).astype(np.int64)
+            replaced = slots < self.capacity
+            # A later row replacing the same slot wins
+            selection[slots[replaced]] = kept + rest[replaced]
+
+        self.data = combined.iloc[selection].reset_index(drop=True)
+        self.seen += len(data)
+        return self
+
+    def save(self) -> None:
+        """Stores the buffer, replacing the stored one."""
+        if not self._cache.enabled:
+            logger.warning(f"pyarrow is not installed; the replay buffer in {self.directory} is not stored")
+            return
+        self._cache.put(REPLAY_KEY, self.data, {'seen': self.seen, 'capacity': self.capacity})
+        with open(os.path.join(self.directory, STATE_FILE), 'w') as f:
+            json.dump({'seen': self.seen}, f)
+
+def model_replay_buffer(model_name: str, directory: str = None) -> ReplayBuffer:
+    """
+    Opens the replay buffer of a served model.
+
+    Args:
+        model_name (str): Name of the model, e.g. a model registry name.
+        directory (str): Directory of the replay buffers of all models. Defaults to ML_REPLAY_BUFFER_DIR.
+
+    Returns:
+        ReplayBuffer: The buffer of the model.
+    """
+    return ReplayBuffer(os.path.join(directory or INCREMENTAL_TRAINING_CONFIG['replay_directory'], model_name))
+
+def population_stability_index(reference: np.ndarray, current: np.ndarray, bins: int = 10) -> float:
+    """
+    Measures how far the distribution of a feature moved, over the deciles of its reference values.
+
+    Args:
+        reference (np.ndarray): Values the model was trained on.
+        current (np.ndarray): New values.
+        bins (int): Number of quantile bins of the reference values.
+
+    Returns:
+        float: The index; below 0.1 is commonly read as stable, above 0.2 as a significant shift.
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    current = np.asarray(current, dtype=np.float64)
+    reference, current = reference[np.isfinite(reference)], current[np.isfinite(current)]
+    if len(reference) == 0 or len(current) == 0:
+        return 0.0
+
+    edges = np.unique(np.quantile(reference, np.linspace(0, 1, bins + 1)))
+    # A constant reference still separates lower new values from it
+    inner = edges[1:-1] if len(edges) > 2 else edges[:1]
+    expected = np.bincount(np.searchsorted(inner, reference, side='right'), minlength=len(inner) + 1) / len(reference)
+    actual = np.bincount(np.searchsorted(inner, current, side='right'), minlength=len(inner) + 1) / len(current)
+    expected, actual = np.maximum(expected, PSI_EPSILON), np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def detect_drift(reference: pd.DataFrame, current: pd.DataFrame, columns: Sequence[str] = None,
+                 threshold: float = None) -> Dict[str, Any]:
+    """
+    Checks whether new data drifted away from the data a model was trained on.
+
+    Args:
+        reference (pd.DataFrame): Rows the model was trained on, e.g. its replay buffer.
+        current (pd.DataFrame): New rows.
+        columns (Sequence[str]): Columns to compare. Defaults to the numerical columns of both.
+        threshold (float): Population stability index above which a column drifted.
+            Defaults to ML_DRIFT_PSI_THRESHOLD.
+
+    Returns:
+        Dict[str, Any]: The 'psi' of every column, the 'drifted_columns' and whether any column 'drifted'.
+    """
+    threshold = INCREMENTAL_TRAINING_CONFIG['drift_threshold'] if threshold is None else threshold
+    if columns is None:
+        numerical = reference.select_dtypes(include=[np.number]).columns
+        columns = [column for column in numerical if column in current.columns]
+
+    psi = {column: population_stability_index(reference[column], current[column]) for column in columns}
+    drifted = [column for column, value in psi.items() if value > threshold]
+    return {'psi': psi, 'drifted_columns': drifted, 'drifted': bool(drifted)}
+
+def is_degraded(baseline: Dict[str, float], candidate: Dict[str, float], metric: str, lower_is_better: bool = True,
+                tolerance: float = None) -> bool:
+    """
+    Checks whether a fine-tuned model is worse than the model it started from.
+
+    Args:
+        baseline (Dict[str, float]): Metrics of the deployed model.
+        candidate (Dict[str, float]): Metrics of the fine-tuned model on the same rows.
+        metric (str): The metric compared.
+        lower_is_better (bool): Whether lower values of the metric are better, as for errors.
+        tolerance (float): Loss of quality allowed, relative to the baseline. Defaults to ML_DEGRADATION_TOLERANCE.
+
+    Returns:
+        bool: Whether the candidate is worse than the baseline by more than the tolerance.
+    """
+    tolerance = INCREMENTAL_TRAINING_CONFIG['degradation_tolerance'] if tolerance is None else tolerance
+    if baseline.get(metric) is None or candidate.get(metric) is None:
+        return False
+    baseline_value, candidate_value = float(baseline[metric]), float(candidate[metric])
+    allowed = tolerance * abs(baseline_value)
+    if lower_is_better:
+        return candidate_value > baseline_value + allowed
+    return candidate_value < baseline_value - allowed
+
+def set_learning_rate(model: Any, learning_rate: float) -> None:
+    """
+    Sets the learning rate of the optimizer of a compiled Keras model, e.g. to fine-tune it gently.
+
+    Args:
+        model (tf.keras.Model): The compiled model.
+        learning_rate (float): The new learning rate.
+    """
+    import tensorflow as tf
+    tf.keras.backend.set_value(model.optimizer.learning_rate, learning_rate)
+
+def warm_start_update(new_data: pd.DataFrame, replay_buffer: ReplayBuffer, fine_tune: Callable[[pd.DataFrame], Any],
+                      retrain: Callable[[pd.DataFrame], Any], evaluate: Callable[[pd.DataFrame], Dict[str, float]],
+                      metric: str, lower_is_better: bool = True, drift_columns: Sequence[str] = None) -> Dict[str, Any]:
+    """
+    Updates a deployed model with new data, fine-tuning its weights on the new data and the
+    replay buffer, and retraining it from scratch only when the warm start cannot be trusted:
+    when the replay buffer is empty, when the new data drifted away from it, or when the
+    fine-tuned model is worse than the deployed one on held-out new and replayed rows.
+
+    Args:
+        new_data (pd.DataFrame): New rows, with the target, oldest first.
+        replay_buffer (ReplayBuffer): The model's replay buffer. The new rows are added to it and it is stored.
+        fine_tune (Callable[[pd.DataFrame], Any]): Continues training the deployed model on rows with the target.
+        retrain (Callable[[pd.DataFrame], Any]): Trains the model from scratch, given the new rows;
+            it is responsible for combining them with the full history.
+        evaluate (Callable[[pd.DataFrame], Dict[str, float]]): Evaluates the current model on rows with the target.
+        metric (str): Metric of evaluate checked for degradation.
+        lower_is_better (bool): Whether lower values of the metric are better.
+        drift_columns (Sequence[str]): Columns checked for drift. Defaults to the numerical columns.
+
+    Returns:
+        Dict[str, Any]: The update 'mode' ('warm_start' or 'full_retrain'), the 'reason' of a
+        full retrain, the 'drift' check, the 'baseline_metrics' of the deployed model and the
+        'metrics' of the warm-started model on the held-out rows, and the 'replay_rows' kept.
+        After a full retrain 'metrics' is None: retrain trains on the full history, held-out rows
+        included, so no rows are left to score the retrained model on.
+    """
+    result = {'mode': 'warm_start', 'reason': None, 'drift': None, 'baseline_metrics': None, 'metrics': None}
+    reference = replay_buffer.data
+
+    if len(reference) == 0:
+        result['reason'] = 'empty_replay_buffer'
+    else:
+        result['drift'] = detect_drift(reference, new_data, drift_columns)
+        if result['drift']['drifted']:
+            result['reason'] = 'drift'
+
+    if result['reason'] is None:
+        # The latest new rows and as many replayed rows are held out, to check both the fit to
+        # the new data and that the older data is not forgotten
+        held_out = max(1, int(len(new_data) * INCREMENTAL_TRAINING_CONFIG['validation_fraction']))
+        new_train, new_validation = new_data.iloc[:-held_out], new_data.iloc[-held_out:]
+        replay_validation = reference.sample(min(held_out, len(reference) // 2),
+                                             random_state=INCREMENTAL_TRAINING_CONFIG['seed'])
+        replay_train = reference.drop(replay_validation.index)
+        validation = pd.concat([new_validation, replay_validation], ignore_index=True)
+
+        result['baseline_metrics'] = evaluate(validation)
+        fine_tune(pd.concat([replay_train, new_train], ignore_index=True))
+        result['metrics'] = evaluate(validation)
+        if is_degraded(result['baseline_metrics'], result['metrics'], metric, lower_is_better):
+            result['reason'] = 'degradation'
+
+    if result['reason'] is not None:
+        logger.info(f"Retraining from scratch: {result['reason']}")
+        result['mode'] = 'full_retrain'
+        retrain(new_data)
+        result['metrics'] = None
+    else:
+        logger.info(f"Warm-started update: {metric} {result['baseline_metrics'].get(metric)} -> {result['metrics'].get(metric)}")
+
+    replay_buffer.add(new_data)
+    replay_buffer.save()
+    result['replay_rows'] = len(replay_buffer)
+    return result
+
+# TODO: Weight the replayed rows by age when the history spans long enough for seasonality to matter
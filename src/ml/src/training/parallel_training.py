@@ -0,0 +1,172 @@
+import os
+import logging
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Default settings of concurrent training, overridable through the environment.
+# max_workers is the number of training processes; 0 means one per model.
+PARALLEL_TRAINING_CONFIG = {
+    'max_workers': int(os.environ.get('ML_TRAINING_MAX_WORKERS', 0)),
+}
+
+# Environment variables read by the native thread pools of NumPy's BLAS and TensorFlow
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS']
+
+def available_cpus() -> List[int]:
+    """
+    Lists the CPUs this process may run on.
+
+    Returns:
+        List[int]: CPU ids, from the affinity mask where the platform has one.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def plan_cpu_assignments(num_workers: int, cpus: Sequence[int] = None) -> List[List[int]]:
+    """
+    Splits the available CPUs into disjoint, contiguous groups, one per worker, so that
+    concurrent training processes do not compete for the same cores. With fewer CPUs than
+    workers, workers share CPUs round-robin.
+
+    Args:
+        num_workers (int): Number of worker processes.
+        cpus (Sequence[int]): CPUs to split. Defaults to available_cpus().
+
+    Returns:
+        List[List[int]]: The CPUs of every worker.
+    """
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    if len(cpus) < num_workers:
+        return [[cpus[i % len(cpus)]] for i in range(num_workers)]
+
+    size, remainder = divmod(len(cpus), num_workers)
+    groups, start = [], 0
+    for i in range(num_workers):
+        end = start + size + (1 if i < remainder else 0)
+        groups.append(cpus[start:end])
+        start = end
+    return groups
+
+def _thread_settings(cpus: Sequence[int]) -> Dict[str, str]:
+    # One intra-op thread per assigned CPU, and no concurrent ops competing for them
+    settings = {name: str(len(cpus)) for name in THREAD_ENV_VARS}
+    settings['TF_NUM_INTEROP_THREADS'] = '1'
+    return settings
+
+@contextmanager
+def _environment(settings: Dict[str, str]) -> Iterator[None]:
+    # Temporarily sets environment variables, so that processes started meanwhile inherit them
+    previous = {name: os.environ.get(name) for name in settings}
+    os.environ.update(settings)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def pin_process(cpus: Sequence[int]) -> None:
+    """
+    Restricts the current process to the given CPUs and sizes its thread pools to match.
+
+    Args:
+        cpus (Sequence[int]): CPUs the process may run on.
+    """
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, set(cpus))
+    os.environ.update(_thread_settings(cpus))
+
+class PinnedWorker:
+    """
+    A worker process pinned to its own CPUs.
+
+    The worker is a single-process pool whose initializer pins it, so the pinning holds for
+    everything the process runs. It is spawned rather than forked, with the thread settings
+    already in its environment, so the BLAS and TensorFlow thread pools are sized for its
+    CPUs when they are created. Tasks submitted to it run one after the other.
+    """
+
+    def __init__(self, cpus: Sequence[int]):
+        """
+        Initializes the PinnedWorker. Its process is started by the first submit.
+
+        Args:
+            cpus (Sequence[int]): CPUs the worker may run on.
+        """
+        self.cpus = list(cpus)
+        self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=pin_process, initargs=(self.cpus,))
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        """
+        Runs a task in the worker.
+
+        Args:
+            function (Callable[..., Any]): Module-level function to run.
+            *args: Its picklable positional arguments.
+
+        Returns:
+            Future: The future of the task.
+        """
+        # The worker process is started by its first submit and inherits this environment
+        with _environment(_thread_settings(self.cpus)):
+            return self._pool.submit(function, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the worker once its tasks finished.
+
+        Args:
+            wait (bool): Whether to wait for the tasks to finish.
+        """
+        self._pool.shutdown(wait=wait)
+
+def create_pinned_workers(num_workers: int) -> List[PinnedWorker]:
+    """
+    Creates workers pinned to disjoint groups of the available CPUs (see plan_cpu_assignments).
+
+    Args:
+        num_workers (int): Number of worker processes.
+
+    Returns:
+        List[PinnedWorker]: The workers.
+    """
+    return [PinnedWorker(cpus) for cpus in plan_cpu_assignments(num_workers)]
+
+def run_pinned(tasks: Dict[str, Callable[..., Any]], args: Dict[str, Sequence[Any]],
+               max_workers: int = None) -> Dict[str, Future]:
+    """
+    Runs tasks concurrently, each worker in its own process pinned to its own CPUs
+    (see PinnedWorker). Tasks are distributed over the workers round-robin and the tasks
+    of one worker run one after the other.
+
+    Args:
+        tasks (Dict[str, Callable[..., Any]]): Module-level functions to run, by name.
+        args (Dict[str, Sequence[Any]]): Picklable positional arguments of every task.
+        max_workers (int): Number of worker processes. Defaults to ML_TRAINING_MAX_WORKERS,
+            or one per task.
+
+    Returns:
+        Dict[str, Future]: The future of every task. The workers are shut down once all tasks finished.
+    """
+    names = list(tasks)
+    num_workers = min(max_workers or PARALLEL_TRAINING_CONFIG['max_workers'] or len(names), len(names))
+    workers = create_pinned_workers(num_workers)
+
+    futures = {}
+    try:
+        for i, name in enumerate(names):
+            worker = workers[i % num_workers]
+            logger.info(f"Running {name} in worker {i % num_workers} on CPUs {worker.cpus}")
+            futures[name] = worker.submit(tasks[name], *args[name])
+    finally:
+        for worker in workers:
+            worker.shutdown(wait=True)
+    return futures
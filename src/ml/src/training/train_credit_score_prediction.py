@@ -1,12 +1,12 @@
 import pandas as pd
 import numpy as np
+from typing import List, Sequence
 from sklearn.model_selection import train_test_split
 import tensorflow as tf
 from src.ml.src.config.model_config import CREDIT_SCORE_PREDICTION_MODEL
-from src.ml.src.preprocessing.data_cleaning import clean_data
-from src.ml.src.preprocessing.feature_engineering import engineer_features
+from src.ml.src.preprocessing.preprocessing_cache import load_engineered_features
 from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel
-from src.ml.src.utils.data_loader import data_loader
+from src.ml.src.utils.parquet_dataset import PARQUET_DATASET_CONFIG, Filter
 from src.ml.src.evaluation.model_evaluation import model_evaluation
 
 # Set random seed for reproducibility
@@ -17,24 +17,20 @@ tf.random.set_seed(RANDOM_SEED)
 # Define the path to save the trained model
 MODEL_SAVE_PATH = 'models/credit_score_prediction_model.h5'
 
-def load_and_preprocess_data(data_path):
+def load_and_preprocess_data(data_path, columns: List[str] = None, filters: Sequence[Filter] = None):
     """
     Loads and preprocesses the credit score data
     
     Args:
-    data_path (str): Path to the raw data file
+    data_path (str): Path to the dataset written by ingestion, or to a raw data file
+    columns (List[str]): Columns to read from the dataset (defaults to all)
+    filters (Sequence[Filter]): Conditions on the rows read from the dataset
     
     Returns:
     tuple: (X: pandas.DataFrame, y: pandas.Series)
     """
-    # Load raw data
-    raw_data = data_loader(data_path)
-    
-    # Clean the data
-    cleaned_data = clean_data(raw_data)
-    
-    # Engineer features
-    featured_data = engineer_features(cleaned_data)
+    # Clean the data and engineer features, or reuse the result of an earlier run on the same data
+    featured_data = load_engineered_features(data_path, columns, filters)
     
     # Split the data into features (X) and target (y)
     X = featured_data.drop('credit_score', axis=1)
@@ -111,7 +107,7 @@ def main():
     print("Starting credit score prediction model training...")
     
     # Load and preprocess data
-    data_path = 'data/credit_score_data.csv'  # Update this path as needed
+    data_path = PARQUET_DATASET_CONFIG['path']
     X, y = load_and_preprocess_data(data_path)
     
     # Split data
@@ -139,7 +135,6 @@ if __name__ == "__main__":
 # Human Tasks:
 # TODO: Review and validate the data preprocessing steps for credit score prediction
 # TODO: Determine the optimal train-test split ratio for credit score data
-# TODO: Implement cross-validation for more robust model evaluation
 # TODO: Set up a logging mechanism for tracking training progress and results
 # TODO: Implement error handling for data loading and model training processes
 # TODO: Optimize model hyperparameters using techniques like grid search or random search
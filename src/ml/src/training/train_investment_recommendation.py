@@ -1,14 +1,14 @@
 import numpy as np
 import pandas as pd
+from typing import List, Sequence
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import tensorflow as tf
 
 from src.ml.src.config.model_config import INVESTMENT_RECOMMENDATION_MODEL
 from src.ml.src.models.investment_recommendation import InvestmentRecommendationModel
-from src.ml.src.preprocessing.data_cleaning import clean_data
-from src.ml.src.preprocessing.feature_engineering import engineer_features
-from src.ml.src.utils.data_loader import load_investment_data
+from src.ml.src.preprocessing.preprocessing_cache import load_engineered_features
+from src.ml.src.utils.parquet_dataset import PARQUET_DATASET_CONFIG, Filter
 from src.ml.src.utils.model_utils import save_model
 
 # Set random seed for reproducibility
@@ -19,21 +19,23 @@ tf.random.set_seed(RANDOM_SEED)
 # Set the path for saving the trained model
 MODEL_SAVE_PATH = '../../models/investment_recommendation_model'
 
-def load_and_preprocess_data():
+def load_and_preprocess_data(data_path: str = None, columns: List[str] = None, filters: Sequence[Filter] = None):
     """
     Loads and preprocesses the investment data for model training.
     
+    Args:
+        data_path (str): Path to the dataset written by ingestion, or to a raw data file.
+            Defaults to ML_DATASET_PATH.
+        columns (List[str]): Columns to read from the dataset (defaults to all).
+        filters (Sequence[Filter]): Conditions on the rows read from the dataset.
+    
     Returns:
         pandas.DataFrame: Preprocessed investment data
     """
-    # Load raw investment data
-    raw_data = load_investment_data()
-    
-    # Clean the data
-    cleaned_data = clean_data(raw_data)
+    data_path = data_path or PARQUET_DATASET_CONFIG['path']
     
-    # Perform feature engineering
-    preprocessed_data = engineer_features(cleaned_data)
+    # Clean the data and engineer features, or reuse the result of an earlier run on the same data
+    preprocessed_data = load_engineered_features(data_path, columns, filters)
     
     return preprocessed_data
 
@@ -150,5 +152,4 @@ if __name__ == "__main__":
 # TODO: Review and validate the feature engineering process for investment recommendation
 # TODO: Determine appropriate evaluation metrics for the investment recommendation model
 # TODO: Set up a process for regular model retraining and performance monitoring
-# TODO: Implement cross-validation for more robust model evaluation
 # TODO: Develop a strategy for handling class imbalance in investment data, if present
\ No newline at end of file
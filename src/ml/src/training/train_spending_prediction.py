@@ -1,37 +1,33 @@
 import pandas as pd
 import numpy as np
+from typing import List, Sequence
 from sklearn.model_selection import train_test_split
 import tensorflow as tf
 
 # Assuming these imports are correct based on the provided specification
 from ...config.model_config import SPENDING_PREDICTION_MODEL
-from ..preprocessing.data_cleaning import clean_data
-from ..preprocessing.feature_engineering import engineer_features
+from ..preprocessing.preprocessing_cache import load_engineered_features
 from ..models.spending_prediction import SpendingPredictionModel
-from ..utils.data_loader import data_loader
+from ..utils.parquet_dataset import PARQUET_DATASET_CONFIG, Filter
 
 # Global constants
 RANDOM_SEED = 42
 MODEL_SAVE_PATH = '../../models/spending_prediction_model.h5'
 
-def load_and_preprocess_data(data_path: str) -> pd.DataFrame:
+def load_and_preprocess_data(data_path: str, columns: List[str] = None, filters: Sequence[Filter] = None) -> pd.DataFrame:
     """
     Loads and preprocesses the data for spending prediction.
 
     Args:
-        data_path (str): Path to the raw data file.
+        data_path (str): Path to the dataset written by ingestion, or to a raw data file.
+        columns (List[str]): Columns to read from the dataset (defaults to all).
+        filters (Sequence[Filter]): Conditions on the rows read from the dataset, e.g. a range of months.
 
     Returns:
         pd.DataFrame: Preprocessed data ready for model training.
     """
-    # Load raw data
-    raw_data = data_loader(data_path)
-    
-    # Clean data
-    cleaned_data = clean_data(raw_data)
-    
-    # Engineer features
-    preprocessed_data = engineer_features(cleaned_data)
+    # Clean the data and engineer features, or reuse the result of an earlier run on the same data
+    preprocessed_data = load_engineered_features(data_path, columns, filters)
     
     return preprocessed_data
 
@@ -95,7 +91,7 @@ def main():
     tf.random.set_seed(RANDOM_SEED)
     
     # Load and preprocess data
-    data_path = "path/to/raw/data.csv"  # Replace with actual data path
+    data_path = PARQUET_DATASET_CONFIG['path']
     preprocessed_data = load_and_preprocess_data(data_path)
     
     # Train spending prediction model
@@ -109,7 +105,6 @@ if __name__ == "__main__":
 # Human Tasks:
 # TODO: Review and validate the data preprocessing steps for spending prediction
 # TODO: Determine the optimal train-validation-test split ratios
-# TODO: Implement cross-validation for more robust model evaluation
 # TODO: Set up a logging mechanism to track training progress and results
 # TODO: Implement error handling and graceful failure mechanisms
 # TODO: Optimize hyperparameters for the spending prediction model
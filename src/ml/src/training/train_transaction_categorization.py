@@ -1,34 +1,34 @@
 import numpy as np
 import pandas as pd
+from typing import List, Sequence
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import tensorflow as tf
 
 # Assuming these imports are correct based on the provided specification
 from ..models.transaction_categorization import TransactionCategorizationModel
-from ..preprocessing.data_cleaning import clean_data
-from ..preprocessing.feature_engineering import engineer_features
+from ..preprocessing.preprocessing_cache import load_engineered_features
 from ..config.model_config import TRANSACTION_CATEGORIZATION_MODEL
+from ..utils.parquet_dataset import PARQUET_DATASET_CONFIG, Filter
 
 # Global variables
 RANDOM_SEED = 42
-DATA_PATH = 'path/to/transaction/data.csv'
+DATA_PATH = PARQUET_DATASET_CONFIG['path']
 
-def load_and_preprocess_data():
+def load_and_preprocess_data(data_path: str = DATA_PATH, columns: List[str] = None, filters: Sequence[Filter] = None):
     """
     Loads and preprocesses the transaction data for model training.
 
+    Args:
+        data_path (str): Path to the dataset written by ingestion, or to a raw data file.
+        columns (List[str]): Columns to read from the dataset (defaults to all).
+        filters (Sequence[Filter]): Conditions on the rows read from the dataset, e.g. a range of months.
+
     Returns:
         tuple: (X, y) preprocessed features and labels
     """
-    # Load raw data
-    raw_data = pd.read_csv(DATA_PATH)
-
-    # Clean data
-    cleaned_data = clean_data(raw_data)
-
-    # Engineer features
-    features = engineer_features(cleaned_data)
+    # Clean the data and engineer features, or reuse the result of an earlier run on the same data
+    features = load_engineered_features(data_path, columns, filters)
 
     # Split features (X) and labels (y)
     X = features.drop('category', axis=1)  # Assuming 'category' is the target column
@@ -126,6 +126,5 @@ if __name__ == "__main__":
 
 # TODO: Determine the optimal path for transaction data and update DATA_PATH
 # TODO: Review and optimize hyperparameters in TRANSACTION_CATEGORIZATION_MODEL config
-# TODO: Implement cross-validation for more robust model evaluation
 # TODO: Add logging and error handling throughout the training process
 # TODO: Implement model versioning and experiment tracking
\ No newline at end of file
@@ -0,0 +1,201 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List
+
+# Merchant descriptions the synthetic transactions are drawn from
+SYNTHETIC_DESCRIPTIONS = [
+    'Grocery store', 'Gas station', 'Restaurant', 'Online shopping', 'Utility bill',
+    'Coffee shop', 'Pharmacy', 'Streaming subscription', 'Airline ticket', 'Rent payment'
+]
+
+def generate_transactions(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates synthetic transactions in the format accepted by the categorization endpoints.
+
+    Args:
+        n (int): Number of transactions.
+        seed (int): Random seed, so that every run benchmarks the same data.
+
+    Returns:
+        List[Dict[str, Any]]: Transactions with description, amount and date.
+    """
+    rng = np.random.RandomState(seed)
+    descriptions = rng.choice(SYNTHETIC_DESCRIPTIONS, size=n)
+    store_numbers = rng.randint(1, 5000, size=n)
+    amounts = np.round(rng.lognormal(mean=3.5, sigma=1.0, size=n), 2)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.randint(0, 365, size=n), unit='D')
+
+    return [
+        {'description': f"{description} #{store_number}", 'amount': float(amount), 'date': date.strftime('%Y-%m-%d')}
+        for description, store_number, amount, date in zip(descriptions, store_numbers, amounts, dates)
+    ]
+
+def generate_spending_users(n: int, history_months: int = 12, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates synthetic users in the format accepted by the spending predictor.
+
+    Args:
+        n (int): Number of users.
+        history_months (int): Length of each user's monthly spending history.
+        seed (int): Random seed.
+
+    Returns:
+        List[Dict[str, Any]]: Users with historical_spending, income and month.
+    """
+    rng = np.random.RandomState(seed)
+    incomes = rng.lognormal(mean=8.3, sigma=0.5, size=n)
+    spending = incomes[:, None] * rng.uniform(0.4, 0.9, size=(n, history_months))
+    months = rng.randint(1, 13, size=n)
+
+    return [
+        {'historical_spending': np.round(history, 2).tolist(), 'income': float(income), 'month': int(month)}
+        for history, income, month in zip(spending, incomes, months)
+    ]
+
+def generate_investment_profiles(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates synthetic user profiles that pass InvestmentRecommender.validate_user_data.
+
+    Args:
+        n (int): Number of profiles.
+        seed (int): Random seed.
+
+    Returns:
+        List[Dict[str, Any]]: Profiles with age, income, savings, risk_tolerance and investment_horizon.
+    """
+    rng = np.random.RandomState(seed)
+    return [
+        {
+            'age': int(age),
+            'income': float(income),
+            'savings': float(savings),
+            'risk_tolerance': int(risk_tolerance),
+            'investment_horizon': int(horizon)
+        }
+        for age, income, savings, risk_tolerance, horizon in zip(
+            rng.randint(18, 80, size=n),
+            np.round(rng.lognormal(mean=11.0, sigma=0.5, size=n), 2),
+            np.round(rng.lognormal(mean=10.0, sigma=1.0, size=n), 2),
+            rng.randint(1, 11, size=n),
+            rng.randint(1, 40, size=n)
+        )
+    ]
+
+def generate_credit_records(n: int, features: List[str], seed: int = 0) -> pd.DataFrame:
+    """
+    Generates synthetic credit score inputs.
+
+    Args:
+        n (int): Number of records.
+        features (List[str]): Input feature names of the credit score model.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: One row per record, one column per feature, with values in [0, 1).
+    """
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame(rng.uniform(size=(n, len(features))), columns=features)
+
+def generate_transaction_extract(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a synthetic transaction extract as it is read from a CSV file, with dates
+    as strings, for the data loading benchmarks. Built with vectorized operations, so that
+    extracts of millions of rows can be generated.
+
+    Args:
+        n (int): Number of transactions.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Transactions with ids, dates, description, category, merchant and amount.
+    """
+    rng = np.random.RandomState(seed)
+    days = pd.Timestamp('2023-01-01') + pd.to_timedelta(np.arange(730), unit='D')
+    day_index = rng.randint(0, len(days), size=n)
+    seconds = rng.randint(0, 86400, size=n)
+    posted = days[day_index] + pd.to_timedelta(seconds, unit='s')
+
+    return pd.DataFrame({
+        'transaction_id': np.char.add('t', np.arange(n).astype(str)),
+        'account_id': np.char.add('a', rng.randint(0, 50000, size=n).astype(str)),
+        'date': np.asarray(days.strftime('%Y-%m-%d'))[day_index],
+        'posted_at': posted.strftime('%Y-%m-%d %H:%M:%S'),
+        'description': rng.choice(SYNTHETIC_DESCRIPTIONS, size=n),
+        'category': rng.choice(['Groceries', 'Transport', 'Dining', 'Shopping', 'Bills'], size=n),
+        'merchant': np.char.add('m', rng.randint(0, 5000, size=n).astype(str)),
+        'reference': np.char.add('REF-', rng.randint(0, 10 ** 8, size=n).astype(str)),
+        'amount': np.round(rng.lognormal(mean=3.5, sigma=1.0, size=n), 2),
+    })
+
+def benchmark(fn: Callable[[Any], Any], inputs: Any, rows: int, repeats: int = 5, warmup: int = 1,
+              setup: Callable[[], None] = None) -> Dict[str, float]:
+    """
+    Times repeated calls of fn on the same inputs.
+
+    Args:
+        fn (Callable[[Any], Any]): Function under test, called as fn(inputs).
+        inputs (Any): Input passed to every call.
+        rows (int): Number of rows in inputs, used for the throughput.
+        repeats (int): Number of timed calls.
+        warmup (int): Number of untimed calls made first.
+        setup (Callable[[], None]): Called before every call, outside the timing, e.g. to clear a cache.
+
+    Returns:
+        Dict[str, float]: p50/p95/p99 call latency in milliseconds and rows per second at the median.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn(inputs)
+
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn(inputs)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    p50 = float(np.percentile(timings, 50))
+    return {
+        'rows': rows,
+        'repeats': repeats,
+        'p50_ms': p50,
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'rows_per_sec': rows / (p50 / 1000) if p50 > 0 else float('inf')
+    }
+
+def compare_to_baseline(results: Dict[str, Dict[str, Dict[str, float]]],
+                        baseline: Dict[str, Dict[str, Dict[str, float]]],
+                        max_regression: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Finds the benchmarks that got slower than the stored baseline.
+
+    Results and baseline are keyed by target, then by batch size. Benchmarks missing
+    from either side are not compared.
+
+    Args:
+        results (Dict): Current benchmark results.
+        baseline (Dict): Baseline benchmark results.
+        max_regression (float): Largest acceptable relative increase of p95 latency, or
+            decrease of throughput.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per regressed benchmark and metric.
+    """
+    regressions = []
+    for target, batches in results.items():
+        for batch_size, current in batches.items():
+            reference = baseline.get(target, {}).get(batch_size)
+            if not reference:
+                continue
+
+            if current['p95_ms'] > reference['p95_ms'] * (1 + max_regression):
+                regressions.append({'target': target, 'batch_size': batch_size, 'metric': 'p95_ms',
+                                    'baseline': reference['p95_ms'], 'current': current['p95_ms']})
+            if current['rows_per_sec'] < reference['rows_per_sec'] * (1 - max_regression):
+                regressions.append({'target': target, 'batch_size': batch_size, 'metric': 'rows_per_sec',
+                                    'baseline': reference['rows_per_sec'], 'current': current['rows_per_sec']})
+    return regressions
@@ -0,0 +1,172 @@
+import os
+import logging
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Declared types of the columns of the financial data extracts. Declared columns are never
+# probed: 'datetime' columns are parsed (with their format, when given after a colon), and
+# 'string' columns are left as they are.
+COLUMN_TYPES = {
+    'date': 'datetime:%Y-%m-%d',
+    'transaction_date': 'datetime:%Y-%m-%d',
+    'account_id': 'string',
+    'transaction_id': 'string',
+    'description': 'string',
+    'category': 'string',
+    'merchant': 'string',
+    'transaction_type': 'string',
+    'institution': 'string',
+}
+
+# Number of values of an undeclared object column that are probed before parsing it
+COLUMN_TYPES_CONFIG = {
+    'probe_size': int(os.environ.get('ML_DATE_PROBE_SIZE', 1000)),
+}
+
+# Formats tried, in order, on the probe of an undeclared column
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+]
+
+# Formats found by earlier probes, by source and column name. Later loads and chunks of the
+# same source parse with the cached format directly; it is only a hint, checked by every parse.
+# It is never shared between sources: a probe of day/month dates that are all ambiguous parses
+# with either order, so a format found on one file says nothing about the same column elsewhere.
+_format_cache: Dict[Tuple[str, str], str] = {}
+
+def _declared_type(column: str, column_types: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    # Splits a declaration such as 'datetime:%Y-%m-%d' into its type and format
+    declaration = column_types.get(column)
+    if declaration is None:
+        return None, None
+    kind, _, date_format = declaration.partition(':')
+    return kind, date_format or None
+
+def infer_date_format(values: pd.Series, probe_size: int = None) -> Optional[str]:
+    """
+    Finds the date format of a column from a probe of its values.
+
+    Only the distinct values among the first probe_size non-missing ones are tried, so
+    a column whose values are not dates is rejected without reading the rest of it.
+
+    Args:
+        values (pd.Series): The column.
+        probe_size (int): Number of values probed. Defaults to ML_DATE_PROBE_SIZE.
+
+    Returns:
+        Optional[str]: The first format of DATE_FORMATS that parses every probed value, or
+        None if the column does not look like dates.
+    """
+    probe = pd.Series(values.dropna().head(probe_size or COLUMN_TYPES_CONFIG['probe_size']).unique())
+    if probe.empty or not probe.map(lambda value: isinstance(value, str)).all():
+        return None
+
+    for date_format in DATE_FORMATS:
+        if pd.to_datetime(probe, format=date_format, errors='coerce').notnull().all():
+            return date_format
+    return None
+
+def parse_dates(values: pd.Series, date_format: str) -> Optional[pd.Series]:
+    """
+    Parses a column with a known format in one vectorized pass.
+
+    Args:
+        values (pd.Series): The column.
+        date_format (str): strftime format of its values.
+
+    Returns:
+        Optional[pd.Series]: The parsed column, or None if some non-missing value does not
+        match the format.
+    """
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+    if (parsed.isnull() & values.notnull()).any():
+        return None
+    return parsed
+
+def detect_date_formats(df: pd.DataFrame, column_types: Dict[str, str] = None, source: str = None) -> Dict[str, str]:
+    """
+    Finds the date columns of a dataframe and their formats, without parsing them.
+
+    Declared columns are taken from the schema. Undeclared object columns use the cached
+    format of the same column of the same source, or are probed.
+
+    Args:
+        df (pd.DataFrame): The dataframe.
+        column_types (Dict[str, str]): Declared column types. Defaults to COLUMN_TYPES.
+        source (str): The file or query df was read from. Without it, formats are not cached.
+
+    Returns:
+        Dict[str, str]: Format of every date column, by column name.
+    """
+    column_types = COLUMN_TYPES if column_types is None else column_types
+    formats = {}
+    for column in df.columns:
+        kind, date_format = _declared_type(column, column_types)
+        if kind == 'datetime' and date_format:
+            formats[column] = date_format
+            continue
+        if kind is not None or not pd.api.types.is_string_dtype(df[column]):
+            continue
+
+        date_format = (source is not None and _format_cache.get((source, column))) or infer_date_format(df[column])
+        if date_format is not None:
+            formats[column] = date_format
+    return formats
+
+def apply_date_types(df: pd.DataFrame, formats: Dict[str, str] = None, column_types: Dict[str, str] = None,
+                     source: str = None) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Converts the date columns of a dataframe to datetime, parsing each column once.
+
+    A column whose values turn out not to match its format, for example because the probe
+    missed a malformed value, is probed again on all its values; if no format fits all of
+    them, it is left unparsed, as a column that is not all dates.
+
+    Args:
+        df (pd.DataFrame): The dataframe, modified in place.
+        formats (Dict[str, str]): Date formats by column, e.g. detected on the first chunk of
+            a dataset. Detected with detect_date_formats otherwise.
+        column_types (Dict[str, str]): Declared column types. Defaults to COLUMN_TYPES.
+        source (str): The file or query df was read from, under which the formats are cached.
+
+    Returns:
+        Tuple[pd.DataFrame, List[str]]: The dataframe and the names of the parsed columns.
+    """
+    if formats is None:
+        formats = detect_date_formats(df, column_types, source)
+
+    date_columns = []
+    for column, date_format in formats.items():
+        if column not in df.columns:
+            continue
+        parsed = parse_dates(df[column], date_format)
+        if parsed is None:
+            date_format = infer_date_format(df[column], probe_size=len(df))
+            parsed = parse_dates(df[column], date_format) if date_format else None
+        if parsed is None:
+            logger.warning(f"Column {column} does not match a single date format; leaving it unparsed")
+            _format_cache.pop((source, column), None)
+            continue
+
+        df[column] = parsed
+        if source is not None:
+            _format_cache[(source, column)] = date_format
+        date_columns.append(column)
+    return df, date_columns
+
+def clear_format_cache() -> None:
+    """Forgets the date formats found by earlier probes."""
+    _format_cache.clear()
+
+# TODO: Move COLUMN_TYPES to the shared config once its Python loader exists
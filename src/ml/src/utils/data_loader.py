@@ -1,10 +1,25 @@
+import os
 import pandas as pd
 import numpy as np
 from sqlalchemy import create_engine
-from typing import Tuple
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
 
-# Assuming the config file will be created later
-from ..config import DATABASE_URL
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from ..preprocessing.chunk_statistics import ChunkStatistics
+from .column_types import detect_date_formats, apply_date_types
+from .parquet_dataset import is_dataset, read_dataset, iter_dataset_chunks, Filter
+
+# The database queries are run against, read from the environment as src/config/index.ts does
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+# Rows per chunk of the streaming loaders, overridable through the environment
+DATA_LOADER_CONFIG = {
+    'chunk_size': int(os.environ.get('ML_DATA_CHUNK_SIZE', 100000)),
+}
 
 def load_data_from_csv(file_path: str) -> pd.DataFrame:
     """
@@ -57,27 +72,146 @@ def load_data_from_database(query: str) -> pd.DataFrame:
     except Exception as e:
         raise IOError(f"Error loading data from database: {str(e)}")
 
-def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
+def _apply_dtypes(chunk: pd.DataFrame, dtypes: Dict[str, str] = None) -> pd.DataFrame:
+    # Casts the declared columns, so every chunk has the same types regardless of its values
+    if dtypes:
+        chunk = chunk.astype({column: dtype for column, dtype in dtypes.items() if column in chunk.columns})
+    return chunk
+
+def iter_csv_chunks(file_path: str, chunk_size: int = None, dtypes: Dict[str, str] = None,
+                    columns: List[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV file in chunks, without loading it into memory at once.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        chunk_size (int): Rows per chunk. Defaults to ML_DATA_CHUNK_SIZE.
+        dtypes (Dict[str, str]): Types of the columns; declaring them keeps chunk types consistent.
+        columns (List[str]): Columns to read (defaults to all).
+
+    Yields:
+        pd.DataFrame: The next chunk.
+    """
+    try:
+        reader = pd.read_csv(file_path, chunksize=chunk_size or DATA_LOADER_CONFIG['chunk_size'],
+                             dtype=dtypes, usecols=columns)
+        for chunk in reader:
+            yield chunk
+    except (OSError, pd.errors.ParserError) as e:
+        raise IOError(f"Error loading data from CSV: {str(e)}")
+
+def iter_parquet_chunks(file_path: str, chunk_size: int = None, dtypes: Dict[str, str] = None,
+                        columns: List[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Reads a Parquet file in record batches, reading only the requested columns.
+
+    Args:
+        file_path (str): The path to the Parquet file.
+        chunk_size (int): Rows per chunk. Defaults to ML_DATA_CHUNK_SIZE.
+        dtypes (Dict[str, str]): Types to cast columns to.
+        columns (List[str]): Columns to read (defaults to all).
+
+    Yields:
+        pd.DataFrame: The next chunk.
+    """
+    if pq is None:
+        raise ImportError("Reading Parquet files requires pyarrow to be installed")
+
+    parquet_file = pq.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size or DATA_LOADER_CONFIG['chunk_size'], columns=columns):
+        yield _apply_dtypes(batch.to_pandas(), dtypes)
+
+def iter_database_chunks(query: str, chunk_size: int = None, dtypes: Dict[str, str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Runs a query with a server-side cursor and yields the result in chunks, so the full
+    result set is never held by the client.
+
+    Args:
+        query (str): SQL query to fetch the data.
+        chunk_size (int): Rows per chunk. Defaults to ML_DATA_CHUNK_SIZE.
+        dtypes (Dict[str, str]): Types to cast columns to.
+
+    Yields:
+        pd.DataFrame: The next chunk.
+    """
+    engine = create_engine(DATABASE_URL)
+    try:
+        with engine.connect().execution_options(stream_results=True) as connection:
+            for chunk in pd.read_sql(query, connection, chunksize=chunk_size or DATA_LOADER_CONFIG['chunk_size']):
+                yield _apply_dtypes(chunk, dtypes)
+    finally:
+        engine.dispose()
+
+def iter_data_chunks(data_source: str, chunk_size: int = None, dtypes: Dict[str, str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Streams a data source in chunks: a CSV or Parquet file, a dataset written by
+    ingestion, or an SQL query for the database.
+
+    Args:
+        data_source (str): Path to a CSV or Parquet file or dataset directory, or SQL query for database.
+        chunk_size (int): Rows per chunk. Defaults to ML_DATA_CHUNK_SIZE.
+        dtypes (Dict[str, str]): Types of the columns.
+
+    Yields:
+        pd.DataFrame: The next chunk.
+    """
+    if is_dataset(data_source):
+        return iter_dataset_chunks(data_source, chunk_size=chunk_size or DATA_LOADER_CONFIG['chunk_size'])
+    if data_source.endswith('.csv'):
+        return iter_csv_chunks(data_source, chunk_size, dtypes)
+    if data_source.endswith('.parquet'):
+        return iter_parquet_chunks(data_source, chunk_size, dtypes)
+    return iter_database_chunks(data_source, chunk_size, dtypes)
+
+def load_data(data_source: str, columns: List[str] = None, filters: Sequence[Filter] = None) -> pd.DataFrame:
+    """
+    Loads financial data from a CSV file, a Parquet file, a dataset written by ingestion or the database.
+
+    Args:
+        data_source (str): Path to a CSV or Parquet file or dataset directory, or SQL query for database.
+        columns (List[str]): Columns to read from a Parquet file or dataset (defaults to all).
+        filters (Sequence[Filter]): Conditions on the rows read from a dataset, pushed down to the
+            partitions and row groups (see utils/parquet_dataset.py).
+
+    Returns:
+        pd.DataFrame: Dataframe containing the loaded financial data.
+    """
+    if is_dataset(data_source):
+        return read_dataset(data_source, columns=columns, filters=filters)
+    if data_source.endswith('.parquet'):
+        return pd.read_parquet(data_source, columns=columns)
+    if data_source.endswith('.csv'):
+        return load_data_from_csv(data_source)
+    return load_data_from_database(data_source)
+
+def preprocess_data(df: pd.DataFrame, statistics: ChunkStatistics = None, date_formats: Dict[str, str] = None,
+                    source: str = None) -> pd.DataFrame:
     """
     Performs initial preprocessing on the loaded financial data.
 
     Args:
         df (pd.DataFrame): The input dataframe.
+        statistics (ChunkStatistics): Statistics of the whole dataset when df is one chunk of it.
+            Missing values are then filled from them instead of from df alone.
+        date_formats (Dict[str, str]): Formats of the date columns, when df is one chunk. Detected
+            from the declared column types and a probe of df otherwise (see utils/column_types.py).
+        source (str): The file or query df was read from, under which detected date formats are cached.
 
     Returns:
         pd.DataFrame: Preprocessed dataframe.
     """
-    # Convert date columns to datetime format
-    date_columns = df.select_dtypes(include=['object']).columns[df.select_dtypes(include=['object']).apply(lambda x: pd.to_datetime(x, errors='coerce').notnull().all())]
-    for col in date_columns:
-        df[col] = pd.to_datetime(df[col])
+    # Convert date columns to datetime format, parsing each once with its detected format
+    df, _ = apply_date_types(df, date_formats, source=source)
     
     # Handle missing values (this strategy should be adjusted based on specific requirements)
     numeric_columns = df.select_dtypes(include=[np.number]).columns
-    df[numeric_columns] = df[numeric_columns].fillna(df[numeric_columns].mean())
-    
     categorical_columns = df.select_dtypes(include=['object']).columns
-    df[categorical_columns] = df[categorical_columns].fillna(df[categorical_columns].mode().iloc[0])
+    if statistics is None:
+        df[numeric_columns] = df[numeric_columns].fillna(df[numeric_columns].mean())
+        df[categorical_columns] = df[categorical_columns].fillna(df[categorical_columns].mode().iloc[0])
+    else:
+        df = df.fillna({col: statistics.mean(col) for col in numeric_columns if col in statistics.moments})
+        df = df.fillna({col: statistics.mode(col) for col in categorical_columns if col in statistics.value_counts})
     
     # Perform basic data type conversions if necessary
     # Add any specific type conversions here
@@ -105,33 +239,78 @@ def split_data(df: pd.DataFrame, target_column: str, test_size: float = 0.2) ->
     
     return X_train, X_test, y_train, y_test
 
-def load_and_prepare_data(data_source: str, target_column: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+def iter_preprocessed_chunks(make_chunks: Callable[[], Iterator[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+    """
+    Preprocesses a dataset that does not fit in memory, chunk by chunk. A first pass over
+    the chunks collects the statistics used to fill missing values, and date formats are
+    detected on the first chunk; the second pass yields the preprocessed chunks.
+
+    Args:
+        make_chunks (Callable[[], Iterator[pd.DataFrame]]): Returns a new iterator over the
+            chunks of the dataset each time it is called, e.g. lambda: iter_data_chunks(source).
+
+    Yields:
+        pd.DataFrame: The next preprocessed chunk.
+    """
+    statistics = ChunkStatistics()
+    date_formats = None
+    for chunk in make_chunks():
+        if date_formats is None:
+            date_formats = detect_date_formats(chunk)
+        statistics.update(chunk)
+
+    for chunk in make_chunks():
+        yield preprocess_data(chunk, statistics, date_formats or {})
+
+def load_and_prepare_data(data_source: str, target_column: str, columns: List[str] = None,
+                          filters: Sequence[Filter] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
     """
     Main function to load, preprocess, and prepare data for model training.
 
+    A dataset written by ingestion is already cleaned and typed, so it is only read, with
+    the requested columns and filters, and not preprocessed again.
+
     Args:
-        data_source (str): Path to CSV file or SQL query for database.
+        data_source (str): Path to CSV file or dataset directory, or SQL query for database.
         target_column (str): The name of the target variable column.
+        columns (List[str]): Feature columns to read from a dataset (defaults to all). The target is always read.
+        filters (Sequence[Filter]): Conditions on the rows read from a dataset, e.g. a range of months.
 
     Returns:
         tuple: (X_train, X_test, y_train, y_test)
     """
-    # Determine the data source (CSV or database)
-    if data_source.endswith('.csv'):
-        df = load_data_from_csv(data_source)
+    if is_dataset(data_source):
+        df = read_dataset(data_source, columns=columns and list(dict.fromkeys(columns + [target_column])), filters=filters)
     else:
-        df = load_data_from_database(data_source)
-    
-    # Preprocess the loaded data
-    df = preprocess_data(df)
+        # Load the data from the CSV file or database and preprocess it
+        df = preprocess_data(load_data(data_source), source=data_source)
     
     # Split the data into training and testing sets
     X_train, X_test, y_train, y_test = split_data(df, target_column)
     
     return X_train, X_test, y_train, y_test
 
+def draw_calibration_sample(X_train: pd.DataFrame, sample_size: int = 500, random_state: int = 42) -> pd.DataFrame:
+    """
+    Draws the calibration dataset used to estimate activation ranges for post-training
+    quantization. It is taken from the training split so it never overlaps the test split
+    the quantized model is evaluated on.
+
+    Args:
+        X_train (pd.DataFrame): The training features returned by load_and_prepare_data.
+        sample_size (int): Maximum number of rows to draw.
+        random_state (int): Seed of the random sample.
+
+    Returns:
+        pd.DataFrame: The calibration rows.
+    """
+    if len(X_train) <= sample_size:
+        return X_train
+    return X_train.sample(n=sample_size, random_state=random_state)
+
 # Pending human tasks:
 # TODO: Define specific data validation checks for financial data integrity
 # TODO: Specify the exact structure and column names expected in the input data
 # TODO: Determine the appropriate test_size for data splitting based on the available data volume
-# TODO: Implement proper error handling and logging for data loading and preprocessing steps
\ No newline at end of file
+# TODO: Implement proper error handling and logging for data loading and preprocessing steps
+# TODO: Stream CSV files through pyarrow.csv once the CSV schemas are declared
\ No newline at end of file
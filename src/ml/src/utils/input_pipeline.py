@@ -0,0 +1,243 @@
+import os
+import logging
+import numpy as np
+from typing import Any, Callable, Optional, Sequence, Tuple, Union
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Default input pipeline settings, overridable through the environment. A batch_size of 0 is
+# auto-tuned between min_batch_size and max_batch_size against memory_fraction of the available
+# memory. cache is 'memory', 'none', or a file path prefix to cache preprocessed examples on disk.
+INPUT_PIPELINE_CONFIG = {
+    'batch_size': int(os.environ.get('ML_INPUT_BATCH_SIZE', 0)),
+    'min_batch_size': int(os.environ.get('ML_INPUT_MIN_BATCH_SIZE', 32)),
+    'max_batch_size': int(os.environ.get('ML_INPUT_MAX_BATCH_SIZE', 512)),
+    'memory_fraction': float(os.environ.get('ML_INPUT_MEMORY_FRACTION', 0.1)),
+    'shuffle_buffer': int(os.environ.get('ML_INPUT_SHUFFLE_BUFFER', 10000)),
+    'cache': os.environ.get('ML_INPUT_CACHE', 'memory'),
+}
+
+# Memory a training step holds per example (activations, gradients and prefetched batches),
+# as a multiple of the size of its inputs. A conservative estimate for the models' small networks.
+STEP_MEMORY_FACTOR = 64
+
+Arrays = Union[np.ndarray, Sequence[np.ndarray]]
+
+def available_memory() -> Optional[int]:
+    """
+    Finds the memory available to the process.
+
+    Returns:
+        Optional[int]: Available bytes, or None where it cannot be determined.
+    """
+    if psutil is not None:
+        return int(psutil.virtual_memory().available)
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def auto_batch_size(example_bytes: int, num_examples: int = None, memory: int = None) -> int:
+    """
+    Chooses the largest power-of-two batch size whose training steps fit the memory budget.
+
+    Args:
+        example_bytes (int): Size of the inputs of one example.
+        num_examples (int): Number of training examples; the batch is no larger than needed for them.
+        memory (int): Available bytes. Defaults to available_memory().
+
+    Returns:
+        int: The batch size, between ML_INPUT_MIN_BATCH_SIZE and ML_INPUT_MAX_BATCH_SIZE.
+    """
+    low, high = INPUT_PIPELINE_CONFIG['min_batch_size'], INPUT_PIPELINE_CONFIG['max_batch_size']
+    memory = available_memory() if memory is None else memory
+    if num_examples:
+        high = max(low, min(high, num_examples))
+    if memory is None:
+        return low
+
+    budget = memory * INPUT_PIPELINE_CONFIG['memory_fraction']
+    batch_size = low
+    while batch_size * 2 <= high and batch_size * 2 * example_bytes * STEP_MEMORY_FACTOR <= budget:
+        batch_size *= 2
+    return batch_size
+
+def resolve_batch_size(batch_size: Optional[int], example_bytes: int, num_examples: int = None) -> int:
+    """
+    Resolves the batch size of a training run: the given one, else ML_INPUT_BATCH_SIZE, else auto-tuned.
+
+    Args:
+        batch_size (Optional[int]): Batch size requested by the model, e.g. a hyperparameter.
+        example_bytes (int): Size of the inputs of one example.
+        num_examples (int): Number of training examples.
+
+    Returns:
+        int: The batch size.
+    """
+    batch_size = batch_size or INPUT_PIPELINE_CONFIG['batch_size']
+    if batch_size:
+        return batch_size
+    batch_size = auto_batch_size(example_bytes, num_examples)
+    logger.info(f"Auto-tuned batch size {batch_size} for {example_bytes} bytes per example")
+    return batch_size
+
+def _as_tuple(inputs: Arrays) -> Tuple:
+    # Multi-input models take a tuple of arrays
+    return tuple(inputs) if isinstance(inputs, (list, tuple)) else (inputs,)
+
+def _restore(arrays: Tuple, like: Arrays) -> Arrays:
+    return tuple(arrays) if isinstance(like, (list, tuple)) else arrays[0]
+
+def example_bytes(inputs: Arrays) -> int:
+    """
+    Computes the size of the inputs of one example.
+
+    Args:
+        inputs (Arrays): Input array, or arrays of a multi-input model, with one row per example.
+
+    Returns:
+        int: Bytes per example.
+    """
+    return sum(int(np.prod(array.shape[1:], dtype=np.int64)) * array.dtype.itemsize
+               for array in (np.asarray(array) for array in _as_tuple(inputs)))
+
+def split_validation(inputs: Arrays, labels: np.ndarray, validation_split: float) -> Tuple[Tuple[Arrays, np.ndarray], Tuple[Arrays, np.ndarray]]:
+    """
+    Holds out the last rows for validation, as Keras' validation_split does.
+
+    Args:
+        inputs (Arrays): Input array, or arrays of a multi-input model.
+        labels (np.ndarray): Labels.
+        validation_split (float): Fraction of the rows held out.
+
+    Returns:
+        Tuple: ((training inputs, training labels), (validation inputs, validation labels)).
+    """
+    num_examples = len(labels)
+    split_at = int(num_examples * (1 - validation_split))
+    arrays = _as_tuple(inputs)
+    return ((_restore(tuple(array[:split_at] for array in arrays), inputs), labels[:split_at]),
+            (_restore(tuple(array[split_at:] for array in arrays), inputs), labels[split_at:]))
+
+def make_dataset(inputs: Arrays, labels: np.ndarray = None, batch_size: int = None, shuffle: bool = True,
+                 seed: int = None) -> 'tf.data.Dataset':
+    """
+    Builds the training input pipeline of in-memory arrays.
+
+    Batches are gathered from shuffled row indices by a parallel map, and prefetched so that
+    the next batches are ready while the current step runs, instead of Keras slicing NumPy
+    arrays on the training thread between steps.
+
+    Args:
+        inputs (Arrays): Input array, or arrays of a multi-input model, with one row per example.
+        labels (np.ndarray): Labels, if any.
+        batch_size (int): Batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned (see resolve_batch_size).
+        shuffle (bool): Whether to reshuffle the examples every epoch.
+        seed (int): Seed of the shuffle.
+
+    Returns:
+        tf.data.Dataset: Batches of (inputs, labels), or of inputs without labels.
+    """
+    import tensorflow as tf
+
+    arrays = _as_tuple(inputs)
+    num_examples = len(arrays[0])
+    batch_size = resolve_batch_size(batch_size, example_bytes(inputs), num_examples)
+
+    tensors = tuple(tf.convert_to_tensor(np.asarray(array)) for array in arrays)
+    label_tensor = tf.convert_to_tensor(np.asarray(labels)) if labels is not None else None
+
+    def gather(indices):
+        batch_inputs = _restore(tuple(tf.gather(tensor, indices) for tensor in tensors), inputs)
+        return (batch_inputs, tf.gather(label_tensor, indices)) if label_tensor is not None else batch_inputs
+
+    dataset = tf.data.Dataset.range(num_examples)
+    if shuffle:
+        dataset = dataset.shuffle(num_examples, seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).map(gather, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+def make_training_datasets(inputs: Arrays, labels: np.ndarray, batch_size: int = None, validation_split: float = 0.2,
+                           seed: int = None) -> Tuple['tf.data.Dataset', Optional['tf.data.Dataset']]:
+    """
+    Builds the training and validation pipelines of in-memory arrays, holding out the last
+    rows for validation as Keras' validation_split does.
+
+    Args:
+        inputs (Arrays): Input array, or arrays of a multi-input model.
+        labels (np.ndarray): Labels.
+        batch_size (int): Batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned.
+        validation_split (float): Fraction of the rows held out; 0 for none.
+        seed (int): Seed of the shuffle.
+
+    Returns:
+        Tuple[tf.data.Dataset, Optional[tf.data.Dataset]]: The training batches and the validation batches, or None.
+    """
+    labels = np.asarray(labels)
+    batch_size = resolve_batch_size(batch_size, example_bytes(inputs), len(labels))
+    if not validation_split:
+        return make_dataset(inputs, labels, batch_size, seed=seed), None
+
+    (train_inputs, train_labels), (validation_inputs, validation_labels) = split_validation(inputs, labels, validation_split)
+    return (make_dataset(train_inputs, train_labels, batch_size, seed=seed),
+            make_dataset(validation_inputs, validation_labels, batch_size, shuffle=False))
+
+def _spec_bytes(spec: Any) -> int:
+    import tensorflow as tf
+    return sum(int(np.prod(s.shape, dtype=np.int64)) * s.dtype.size for s in tf.nest.flatten(spec))
+
+def stream_dataset(sources: Sequence[Any], load: Callable[[Any], Tuple[Arrays, np.ndarray]], output_signature: Tuple,
+                   batch_size: int = None, shuffle: bool = True, cache: str = None, seed: int = None) -> 'tf.data.Dataset':
+    """
+    Builds a training input pipeline streaming from data too large to load at once, e.g.
+    the files of the cleaned dataset (see list_dataset_files).
+
+    Sources are read and preprocessed by a parallel map, several at a time, and split into
+    examples. The preprocessed examples are cached on the first epoch, in memory or in files,
+    so later epochs neither read nor preprocess again; then they are shuffled, batched and
+    prefetched.
+
+    Args:
+        sources (Sequence[Any]): The units of data, e.g. file paths.
+        load (Callable[[Any], Tuple[Arrays, np.ndarray]]): Reads and preprocesses one source into
+            (inputs, labels) with one row per example. Runs on the pipeline's threads.
+        output_signature (Tuple): (inputs, labels) structure of tf.TensorSpec of one example.
+        batch_size (int): Batch size. Defaults to ML_INPUT_BATCH_SIZE, or auto-tuned.
+        shuffle (bool): Whether to shuffle the examples every epoch.
+        cache (str): 'memory', 'none', or a file path prefix. Defaults to ML_INPUT_CACHE.
+        seed (int): Seed of the shuffle.
+
+    Returns:
+        tf.data.Dataset: Batches of (inputs, labels).
+    """
+    import tensorflow as tf
+
+    batch_size = resolve_batch_size(batch_size, _spec_bytes(output_signature))
+    cache = cache or INPUT_PIPELINE_CONFIG['cache']
+    specs = tf.nest.flatten(output_signature)
+
+    def load_source(index):
+        inputs, labels = load(sources[int(index)])
+        arrays = tf.nest.flatten((_restore(_as_tuple(inputs), output_signature[0]), labels))
+        return [np.asarray(array, dtype=spec.dtype.as_numpy_dtype) for array, spec in zip(arrays, specs)]
+
+    def read(index):
+        arrays = tf.numpy_function(load_source, [index], [spec.dtype for spec in specs])
+        for array, spec in zip(arrays, specs):
+            array.set_shape([None] + spec.shape.as_list())
+        return tf.nest.pack_sequence_as(output_signature, arrays)
+
+    dataset = tf.data.Dataset.range(len(sources)).map(read, num_parallel_calls=tf.data.AUTOTUNE).unbatch()
+    if cache == 'memory':
+        dataset = dataset.cache()
+    elif cache != 'none':
+        dataset = dataset.cache(cache)
+    if shuffle:
+        dataset = dataset.shuffle(INPUT_PIPELINE_CONFIG['shuffle_buffer'], seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+# TODO: Measure the peak memory of a training step instead of estimating it with STEP_MEMORY_FACTOR
@@ -0,0 +1,263 @@
+import json
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Union
+
+from ..inference.lite_runtime import LiteModel, get_tflite_path, get_tflite_metadata_path
+from ..inference.numpy_backend import NumpyDenseModel, get_numpy_path
+from ..models.transaction_categorization import TransactionCategorizationModel
+from ..models.spending_prediction import SpendingPredictionModel, preprocess_data as preprocess_spending_data
+from ..models.investment_recommendation import InvestmentRecommendationModel
+from ..models.credit_score_prediction import CreditScorePredictionModel
+
+logger = logging.getLogger(__name__)
+
+# Default tolerance for the parity check between Keras and exported model outputs
+PARITY_ATOL = 1e-4
+PARITY_RTOL = 1e-3
+
+# Recurrent layers only convert to TFLite with static shapes, so models with them are exported
+# with this fixed batch size; LiteModel runs larger batches in slices of it
+RECURRENT_EXPORT_BATCH_SIZE = 1
+
+def export_to_tflite(keras_model: 'tf.keras.Model', model_path: str, quantize: bool = False,
+                     representative_data: Union[np.ndarray, List[np.ndarray]] = None) -> str:
+    """
+    Converts a Keras model to TFLite and writes it next to the saved Keras model,
+    together with the metadata the serving runtime needs. Models with recurrent layers,
+    e.g. the categorization LSTM, are exported with a fixed batch size of RECURRENT_EXPORT_BATCH_SIZE.
+
+    Args:
+        keras_model (tf.keras.Model): The Keras network to convert.
+        model_path (str): Path the Keras model is saved at.
+        quantize (bool): Whether to apply dynamic range quantization of the weights.
+        representative_data (Union[np.ndarray, List[np.ndarray]]): Preprocessed calibration
+            inputs. When given, weights and activations are quantized to int8 using the
+            activation ranges observed on these inputs; model inputs and outputs stay float.
+
+    Returns:
+        str: Path of the written .tflite file.
+    """
+    import tensorflow as tf
+
+    batch_size = RECURRENT_EXPORT_BATCH_SIZE if _has_recurrent_layers(keras_model) else None
+    if batch_size is not None:
+        # Wrapped in inputs of static shape, batch dimension included
+        fixed_inputs = [tf.keras.Input(batch_shape=(batch_size,) + tuple(model_input.shape[1:]), dtype=model_input.dtype,
+                                       name=model_input.name.split(':')[0]) for model_input in keras_model.inputs]
+        keras_model = tf.keras.Model(fixed_inputs, keras_model(fixed_inputs))
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    quantization = 'none'
+    if representative_data is not None:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = _representative_dataset(representative_data)
+        quantization = 'int8'
+    elif quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        quantization = 'dynamic'
+    tflite_model = converter.convert()
+
+    tflite_path = get_tflite_path(model_path)
+    with open(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+
+    metadata = {
+        'input_names': [model_input.name.split(':')[0] for model_input in keras_model.inputs],
+        'quantization': quantization,
+        'batch_size': batch_size,
+        'size_bytes': len(tflite_model),
+        'exported_at': datetime.utcnow().isoformat()
+    }
+    with open(get_tflite_metadata_path(model_path), 'w') as f:
+        json.dump(metadata, f)
+
+    logger.info(f"Exported TFLite model to {tflite_path} ({len(tflite_model)} bytes)")
+    return tflite_path
+
+def export_to_numpy(keras_model: 'tf.keras.Model', model_path: str, dtype: str = 'float32') -> str:
+    """
+    Extracts the weights of a Dense-only Keras model for the NumPy backend and writes
+    them next to the saved Keras model.
+
+    Args:
+        keras_model (tf.keras.Model): The Keras network to convert.
+        model_path (str): Path the Keras model is saved at.
+        dtype (str): Precision of the stored weights: 'float32', 'float16' or 'int8'.
+
+    Returns:
+        str: Path of the written .npz file.
+    """
+    numpy_path = get_numpy_path(model_path)
+    NumpyDenseModel.from_keras(keras_model, dtype=dtype).save(numpy_path)
+    logger.info(f"Exported {dtype} NumPy model to {numpy_path}")
+    return numpy_path
+
+def compare_outputs(keras_model: 'tf.keras.Model', exported_model: Any, inputs: Union[np.ndarray, List[np.ndarray]],
+                    atol: float = PARITY_ATOL, rtol: float = PARITY_RTOL) -> Dict[str, Any]:
+    """
+    Compares the outputs of a Keras model and an exported model on the same inputs.
+
+    Args:
+        keras_model (tf.keras.Model): The original Keras network.
+        exported_model (Any): The exported model, with a Keras-compatible predict().
+        inputs (Union[np.ndarray, List[np.ndarray]]): Preprocessed model inputs.
+        atol (float): Absolute tolerance.
+        rtol (float): Relative tolerance.
+
+    Returns:
+        Dict[str, Any]: Maximum absolute difference, number of compared rows and whether the outputs match.
+    """
+    keras_output = np.asarray(keras_model.predict(inputs))
+    exported_output = np.asarray(exported_model.predict(inputs))
+
+    return {
+        'rows': int(keras_output.shape[0]),
+        'max_abs_diff': float(np.max(np.abs(keras_output - exported_output))) if keras_output.size else 0.0,
+        'passed': bool(np.allclose(keras_output, exported_output, atol=atol, rtol=rtol))
+    }
+
+def check_tflite_parity(keras_model: 'tf.keras.Model', model_path: str, inputs: Union[np.ndarray, List[np.ndarray]],
+                        atol: float = PARITY_ATOL, rtol: float = PARITY_RTOL) -> Dict[str, Any]:
+    """
+    Compares the outputs of a Keras model and its TFLite export on the same inputs.
+
+    Args:
+        keras_model (tf.keras.Model): The original Keras network.
+        model_path (str): Path the Keras model is saved at; the export is read from next to it.
+        inputs (Union[np.ndarray, List[np.ndarray]]): Preprocessed model inputs.
+        atol (float): Absolute tolerance.
+        rtol (float): Relative tolerance.
+
+    Returns:
+        Dict[str, Any]: Maximum absolute difference, number of compared rows and whether the outputs match.
+    """
+    return compare_outputs(keras_model, LiteModel(model_path), inputs, atol=atol, rtol=rtol)
+
+def check_numpy_parity(keras_model: 'tf.keras.Model', model_path: str, inputs: Union[np.ndarray, List[np.ndarray]],
+                       atol: float = PARITY_ATOL, rtol: float = PARITY_RTOL) -> Dict[str, Any]:
+    """
+    Compares the outputs of a Keras model and its NumPy export on the same inputs.
+
+    Args:
+        keras_model (tf.keras.Model): The original Keras network.
+        model_path (str): Path the Keras model is saved at; the export is read from next to it.
+        inputs (Union[np.ndarray, List[np.ndarray]]): Preprocessed model inputs.
+        atol (float): Absolute tolerance.
+        rtol (float): Relative tolerance.
+
+    Returns:
+        Dict[str, Any]: Maximum absolute difference, number of compared rows and whether the outputs match.
+    """
+    return compare_outputs(keras_model, NumpyDenseModel.load(get_numpy_path(model_path)), inputs, atol=atol, rtol=rtol)
+
+def prune_model(keras_model: 'tf.keras.Model', sparsity: float = 0.5) -> float:
+    """
+    Applies one-shot magnitude pruning: in every weight matrix the given fraction of
+    weights with the smallest absolute value is set to zero. Biases are left untouched.
+    The zeros compress well, which shrinks the deployed artifact; the gated quantization
+    stage should be run afterwards to verify the accuracy impact.
+
+    Args:
+        keras_model (tf.keras.Model): The Keras network, pruned in place.
+        sparsity (float): Fraction of each weight matrix to zero out, between 0 and 1.
+
+    Returns:
+        float: The overall fraction of zero weights after pruning.
+    """
+    if not 0 <= sparsity < 1:
+        raise ValueError("sparsity must be in [0, 1)")
+
+    zeros, total = 0, 0
+    for layer in keras_model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue
+
+        pruned = []
+        for values in weights:
+            if values.ndim >= 2:
+                threshold = np.quantile(np.abs(values), sparsity)
+                values = np.where(np.abs(values) < threshold, 0, values).astype(values.dtype)
+                zeros += int(np.sum(values == 0))
+                total += values.size
+            pruned.append(values)
+        layer.set_weights(pruned)
+
+    achieved = zeros / total if total else 0.0
+    logger.info(f"Pruned model to {achieved:.1%} sparsity")
+    return achieved
+
+def get_model_inputs(model: Any, data: pd.DataFrame) -> Union[np.ndarray, List[np.ndarray]]:
+    """
+    Applies the fitted preprocessing of one of the four model classes to raw data.
+
+    Args:
+        model (Any): A trained model instance.
+        data (pd.DataFrame): Raw input data.
+
+    Returns:
+        Union[np.ndarray, List[np.ndarray]]: The inputs of the model's Keras network.
+    """
+    if isinstance(model, (TransactionCategorizationModel, InvestmentRecommendationModel)):
+        inputs, _ = model.preprocess_data(data)
+    elif isinstance(model, CreditScorePredictionModel):
+        inputs = model.preprocess_data(data)
+    elif isinstance(model, SpendingPredictionModel):
+        inputs, _ = preprocess_spending_data(data, model.scaler)
+    else:
+        raise ValueError(f"Unsupported model type: {type(model).__name__}")
+    return inputs
+
+def export_model(model: Any, model_path: str, sample_data: pd.DataFrame, backend: str = 'tflite',
+                 quantize: bool = False, dtype: str = 'float32',
+                 atol: float = PARITY_ATOL, rtol: float = PARITY_RTOL) -> Dict[str, Any]:
+    """
+    Exports the Keras network of a trained model for the given inference backend and
+    checks that the export reproduces the Keras outputs on sample data.
+
+    Args:
+        model (Any): A trained instance of one of the four model classes, saved at model_path.
+        model_path (str): Path the model is saved at.
+        sample_data (pd.DataFrame): Raw data used for the parity check.
+        backend (str): 'tflite' or 'numpy'.
+        quantize (bool): Whether to apply dynamic range quantization of the TFLite weights.
+        dtype (str): Precision of the NumPy weights.
+        atol (float): Absolute tolerance of the parity check.
+        rtol (float): Relative tolerance of the parity check.
+
+    Returns:
+        Dict[str, Any]: Export path and parity check results.
+    """
+    inputs = get_model_inputs(model, sample_data)
+    if backend == 'tflite':
+        export_path = export_to_tflite(model.model, model_path, quantize=quantize)
+        parity = check_tflite_parity(model.model, model_path, inputs, atol=atol, rtol=rtol)
+    elif backend == 'numpy':
+        export_path = export_to_numpy(model.model, model_path, dtype=dtype)
+        parity = check_numpy_parity(model.model, model_path, inputs, atol=atol, rtol=rtol)
+    else:
+        raise ValueError(f"Unsupported export backend: {backend}")
+
+    if not parity['passed']:
+        logger.warning(f"{backend} export of {model_path} differs from Keras by up to {parity['max_abs_diff']}")
+
+    return {'backend': backend, 'export_path': export_path, **parity}
+
+def _has_recurrent_layers(keras_model: 'tf.keras.Model') -> bool:
+    import tensorflow as tf
+    return any(isinstance(layer, tf.keras.layers.RNN) for layer in keras_model.layers)
+
+def _representative_dataset(inputs: Union[np.ndarray, List[np.ndarray]]):
+    # The converter calls this once per calibration sample, each with a batch of one row per model input
+    if not isinstance(inputs, (list, tuple)):
+        inputs = [inputs]
+
+    def generator():
+        for i in range(len(inputs[0])):
+            yield [np.asarray(values[i:i + 1], dtype=np.float32) for values in inputs]
+
+    return generator
+
+# TODO: Add an ONNX export path for serving outside the TFLite runtime
@@ -0,0 +1,301 @@
+import os
+import json
+import uuid
+import logging
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Location of the cleaned, typed dataset written by scripts/data_ingestion.py
+PARQUET_DATASET_CONFIG = {
+    'path': os.environ.get('ML_DATASET_PATH', './data/dataset'),
+}
+
+# Hive-style partition directories: <root>/year_month=2023-01/institution=<name>/part-<batch>.parquet.
+# The month is named year_month so it does not clash with the month-of-year feature columns.
+PARTITION_COLUMNS = ['year_month', 'institution']
+MANIFEST_FILE = '_manifest.json'
+UNKNOWN_PARTITION = 'unknown'
+
+# A filter is a (column, operator, value) tuple; a list of filters must all hold
+Filter = Tuple[str, str, Any]
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("The Parquet dataset requires pyarrow to be installed")
+
+def is_dataset(path: str) -> bool:
+    """
+    Checks whether a path is a dataset written by write_dataset.
+
+    Args:
+        path (str): A data source.
+
+    Returns:
+        bool: True if path is a directory with a dataset manifest.
+    """
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+def read_manifest(root: str) -> Dict[str, Any]:
+    """
+    Reads the manifest of a dataset.
+
+    Args:
+        root (str): Root directory of the dataset.
+
+    Returns:
+        Dict[str, Any]: The manifest: schema, partitions and ingested batches with their files and row counts.
+
+    Raises:
+        FileNotFoundError: If root is not a dataset.
+    """
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No dataset manifest at {path}")
+    with open(path) as f:
+        return json.load(f)
+
+def _partition_value(value: Any) -> str:
+    # Partition values become directory names, so path separators and '=' are replaced
+    return str(value).replace(os.sep, '_').replace('/', '_').replace('=', '_')
+
+def add_partition_columns(df: pd.DataFrame, date_column: str = 'date', institution_column: str = 'institution') -> pd.DataFrame:
+    """
+    Derives the partition columns of a dataframe: the month of the transaction date, and
+    the institution. Rows without either go to the UNKNOWN_PARTITION partition.
+
+    Args:
+        df (pd.DataFrame): Cleaned data.
+        date_column (str): Column with the transaction dates.
+        institution_column (str): Column with the institution of the account.
+
+    Returns:
+        pd.DataFrame: A copy of df with 'year_month' and 'institution' columns.
+    """
+    df = df.copy()
+    if date_column in df.columns:
+        df['year_month'] = pd.to_datetime(df[date_column]).dt.strftime('%Y-%m').fillna(UNKNOWN_PARTITION)
+    else:
+        df['year_month'] = UNKNOWN_PARTITION
+    if institution_column in df.columns:
+        df['institution'] = df[institution_column].fillna(UNKNOWN_PARTITION).map(_partition_value)
+    else:
+        df['institution'] = UNKNOWN_PARTITION
+    return df
+
+def write_dataset(df: pd.DataFrame, root: str = None, batch_id: str = None, date_column: str = 'date',
+                  institution_column: str = 'institution') -> Dict[str, Any]:
+    """
+    Adds cleaned, typed data to the partitioned Parquet dataset and updates its manifest.
+
+    Each batch writes one file per partition it touches. Writing a batch_id again replaces
+    the files of that batch, so re-running an ingestion job does not duplicate its rows.
+    Every file is written with the schema of the first batch, so all partitions can be
+    read as one table.
+
+    Args:
+        df (pd.DataFrame): Cleaned and typed data.
+        root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+        batch_id (str): Identifier of the batch. A new one is generated if not given.
+        date_column (str): Column the month partition is derived from.
+        institution_column (str): Column the institution partition is taken from.
+
+    Returns:
+        Dict[str, Any]: The updated manifest.
+    """
+    _require_pyarrow()
+    root = root or PARQUET_DATASET_CONFIG['path']
+    batch_id = _partition_value(batch_id or datetime.utcnow().strftime('%Y%m%dT%H%M%S') + '-' + uuid.uuid4().hex[:8])
+    os.makedirs(root, exist_ok=True)
+
+    manifest = read_manifest(root) if is_dataset(root) else {'partition_columns': PARTITION_COLUMNS, 'batches': {}}
+    for previous_file in manifest['batches'].pop(batch_id, {}).get('files', {}):
+        previous_path = os.path.join(root, previous_file)
+        if os.path.exists(previous_path):
+            os.remove(previous_path)
+
+    data = add_partition_columns(df, date_column, institution_column)
+    schema = _dataset_schema(root, manifest, data.drop(columns=PARTITION_COLUMNS))
+
+    files = {}
+    for (month, institution), partition in data.groupby(PARTITION_COLUMNS, sort=True):
+        directory = f"year_month={month}/institution={institution}"
+        relative_path = f"{directory}/part-{batch_id}.parquet"
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+        table = pa.Table.from_pandas(partition.drop(columns=PARTITION_COLUMNS), schema=schema, preserve_index=False)
+        pq.write_table(table, os.path.join(root, relative_path))
+        files[relative_path] = len(partition)
+
+    manifest['schema'] = {field.name: str(field.type) for field in schema}
+    manifest['batches'][batch_id] = {'rows': len(data), 'written_at': datetime.utcnow().isoformat(), 'files': files}
+    manifest['partitions'] = _summarize_partitions(manifest['batches'])
+    manifest['rows'] = sum(batch['rows'] for batch in manifest['batches'].values())
+    manifest['updated_at'] = datetime.utcnow().isoformat()
+    _write_manifest(root, manifest)
+
+    logger.info(f"Wrote batch {batch_id} of {len(data)} rows to {len(files)} partitions of {root}")
+    return manifest
+
+def _dataset_schema(root: str, manifest: Dict[str, Any], df: pd.DataFrame) -> 'pa.Schema':
+    # The schema of the existing files, or the schema of this batch for a new dataset
+    for batch in manifest['batches'].values():
+        for relative_path in batch['files']:
+            path = os.path.join(root, relative_path)
+            if os.path.exists(path):
+                return pq.read_schema(path).remove_metadata()
+    return pa.Schema.from_pandas(df, preserve_index=False).remove_metadata()
+
+def _summarize_partitions(batches: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    # Row and file counts per partition directory, over all batches
+    partitions = {}
+    for batch in batches.values():
+        for relative_path, rows in batch['files'].items():
+            summary = partitions.setdefault(os.path.dirname(relative_path), {'rows': 0, 'files': 0})
+            summary['rows'] += rows
+            summary['files'] += 1
+    return dict(sorted(partitions.items()))
+
+def _write_manifest(root: str, manifest: Dict[str, Any]) -> None:
+    # Written to a temporary file first, so readers never see a partial manifest
+    path = os.path.join(root, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+def build_filters(start_month: str = None, end_month: str = None, institutions: Sequence[str] = None) -> List[Filter]:
+    """
+    Builds the filters selecting a range of months and a set of institutions.
+
+    Args:
+        start_month (str): First month to read, as 'YYYY-MM'.
+        end_month (str): Last month to read, as 'YYYY-MM'.
+        institutions (Sequence[str]): Institutions to read.
+
+    Returns:
+        List[Filter]: Filters for read_dataset.
+    """
+    filters = []
+    if start_month:
+        filters.append(('year_month', '>=', start_month))
+    if end_month:
+        filters.append(('year_month', '<=', end_month))
+    if institutions:
+        filters.append(('institution', 'in', [_partition_value(institution) for institution in institutions]))
+    return filters
+
+def _to_expression(filters: Sequence[Filter]) -> 'ds.Expression':
+    # Combines the filters into one dataset expression
+    operators = {
+        '=': lambda field, value: field == value,
+        '==': lambda field, value: field == value,
+        '!=': lambda field, value: field != value,
+        '<': lambda field, value: field < value,
+        '<=': lambda field, value: field <= value,
+        '>': lambda field, value: field > value,
+        '>=': lambda field, value: field >= value,
+        'in': lambda field, value: field.isin(list(value)),
+        'not in': lambda field, value: ~field.isin(list(value)),
+    }
+    expression = None
+    for column, operator, value in filters:
+        if operator not in operators:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        condition = operators[operator](ds.field(column), value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def _open_dataset(root: str) -> 'ds.Dataset':
+    # Partition values are read as strings, so e.g. numeric institution codes keep their leading zeros
+    read_manifest(root)
+    partitioning = ds.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor='hive')
+    return ds.dataset(root, format='parquet', partitioning=partitioning)
+
+def read_dataset(root: str = None, columns: List[str] = None, filters: Sequence[Filter] = None) -> pd.DataFrame:
+    """
+    Reads the dataset, or the requested part of it.
+
+    Only the requested columns are read from the files (projection). Filters on the
+    partition columns skip whole directories, and filters on other columns skip row
+    groups using the Parquet statistics before the remaining rows are filtered (predicate
+    pushdown).
+
+    Args:
+        root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+        columns (List[str]): Columns to read (defaults to all, including 'year_month' and 'institution').
+        filters (Sequence[Filter]): Conditions the rows must all meet, e.g. [('year_month', '>=', '2023-01')].
+
+    Returns:
+        pd.DataFrame: The selected rows and columns.
+    """
+    _require_pyarrow()
+    dataset = _open_dataset(root or PARQUET_DATASET_CONFIG['path'])
+    table = dataset.to_table(columns=columns, filter=_to_expression(filters or []))
+    return table.to_pandas()
+
+def iter_dataset_chunks(root: str = None, columns: List[str] = None, filters: Sequence[Filter] = None,
+                        chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+    """
+    Reads the dataset in record batches, with the same projection and filters as read_dataset.
+
+    Args:
+        root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+        columns (List[str]): Columns to read (defaults to all).
+        filters (Sequence[Filter]): Conditions the rows must all meet.
+        chunk_size (int): Maximum rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk.
+    """
+    _require_pyarrow()
+    dataset = _open_dataset(root or PARQUET_DATASET_CONFIG['path'])
+    for batch in dataset.to_batches(columns=columns, filter=_to_expression(filters or []), batch_size=chunk_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def list_dataset_files(root: str = None, filters: Sequence[Filter] = None) -> List[str]:
+    """
+    Lists the files of the dataset that may hold rows meeting the filters. Filters on the
+    partition columns skip whole directories; other filters are applied when a file is read.
+
+    Args:
+        root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+        filters (Sequence[Filter]): Conditions the rows must all meet.
+
+    Returns:
+        List[str]: Paths of the files, in partition order, i.e. oldest month first.
+    """
+    _require_pyarrow()
+    dataset = _open_dataset(root or PARQUET_DATASET_CONFIG['path'])
+    return sorted(fragment.path for fragment in dataset.get_fragments(filter=_to_expression(filters or [])))
+
+def read_dataset_file(path: str, root: str = None, columns: List[str] = None,
+                      filters: Sequence[Filter] = None) -> pd.DataFrame:
+    """
+    Reads one file of the dataset, e.g. listed by list_dataset_files, so that files can be
+    read independently and in parallel. The partition columns are read from its path.
+
+    Args:
+        path (str): Path of the file.
+        root (str): Root directory of the dataset. Defaults to ML_DATASET_PATH.
+        columns (List[str]): Columns to read (defaults to all).
+        filters (Sequence[Filter]): Conditions the rows must all meet.
+
+    Returns:
+        pd.DataFrame: The selected rows and columns of the file.
+    """
+    _require_pyarrow()
+    partitioning = ds.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor='hive')
+    dataset = ds.dataset([path], format='parquet', partitioning=partitioning,
+                         partition_base_dir=root or PARQUET_DATASET_CONFIG['path'])
+    return dataset.to_table(columns=columns, filter=_to_expression(filters or [])).to_pandas()
+
+# TODO: Compact the files of a partition once many small batches have been ingested into it
@@ -0,0 +1,129 @@
+import os
+import copy
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Tuple
+
+from ..evaluation.model_evaluation import (
+    evaluate_transaction_categorization,
+    evaluate_spending_prediction,
+    evaluate_investment_allocations,
+    evaluate_credit_score_prediction,
+    AllocationPredictor,
+    measure_prediction_latency,
+    compare_metrics,
+    check_metric_drop
+)
+from ..inference.lite_runtime import LiteModel, get_tflite_path, get_tflite_metadata_path
+from ..models.transaction_categorization import TransactionCategorizationModel
+from ..models.spending_prediction import SpendingPredictionModel
+from ..models.investment_recommendation import InvestmentRecommendationModel
+from ..models.credit_score_prediction import CreditScorePredictionModel
+from .model_export import export_to_tflite, get_model_inputs
+
+logger = logging.getLogger(__name__)
+
+# Post-training quantization settings
+QUANTIZATION_CONFIG = {
+    'calibration_size': int(os.environ.get('ML_QUANTIZATION_CALIBRATION_SIZE', 500)),
+    'max_metric_drop': float(os.environ.get('ML_QUANTIZATION_MAX_METRIC_DROP', 0.01)),
+}
+
+def _get_evaluation(model: Any) -> Tuple[Callable, str, bool]:
+    # Evaluate function and gating metric (and its direction) per model class
+    if isinstance(model, TransactionCategorizationModel):
+        return evaluate_transaction_categorization, 'accuracy', True
+    if isinstance(model, SpendingPredictionModel):
+        return evaluate_spending_prediction, 'r2_score', True
+    if isinstance(model, InvestmentRecommendationModel):
+        return evaluate_investment_allocations, 'mse', False
+    if isinstance(model, CreditScorePredictionModel):
+        return evaluate_credit_score_prediction, 'r2_score', True
+    raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+def _batch_predictor(model: Any) -> Any:
+    # The investment model's predict() takes a single user; its batches go through predict_batch
+    return AllocationPredictor(model) if isinstance(model, InvestmentRecommendationModel) else model
+
+def _artifact_size(path: str) -> int:
+    # Keras models are saved either as a single .h5 file or as a SavedModel directory
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path)
+
+def quantize_model(model: Any, model_path: str, calibration_data: pd.DataFrame, X_test: pd.DataFrame,
+                   y_test: pd.Series, max_metric_drop: float = None, promote: bool = True) -> Dict[str, Any]:
+    """
+    Runs post-training int8 quantization of a trained model and gates its promotion on accuracy.
+
+    The network is converted to TFLite with int8 weights and activations, calibrated on
+    calibration_data. The quantized candidate is written next to the Keras model under a
+    staging name, evaluated against the Keras model on the test split, and only moved to
+    the path the 'tflite' inference backend serves from if the gating metric degrades by
+    no more than max_metric_drop.
+
+    Args:
+        model (Any): A trained instance of one of the four model classes, saved at model_path.
+        model_path (str): Path the Keras model is saved at.
+        calibration_data (pd.DataFrame): Raw rows used to calibrate the activation ranges.
+        X_test (pd.DataFrame): Raw test features.
+        y_test (pd.Series): Test targets.
+        max_metric_drop (float): Largest acceptable degradation of the gating metric. Defaults to
+            ML_QUANTIZATION_MAX_METRIC_DROP.
+        promote (bool): Whether to promote the candidate when it passes the gate.
+
+    Returns:
+        Dict[str, Any]: Size, latency and metric comparison of the Keras and quantized models,
+        and whether the quantized model was promoted.
+    """
+    if max_metric_drop is None:
+        max_metric_drop = QUANTIZATION_CONFIG['max_metric_drop']
+
+    candidate_path = f"{model_path}.int8"
+    representative_data = get_model_inputs(model, calibration_data)
+    export_to_tflite(model.model, candidate_path, representative_data=representative_data)
+
+    quantized = copy.copy(model)
+    quantized.model = LiteModel(candidate_path)
+
+    evaluate, metric, higher_is_better = _get_evaluation(model)
+    y_test = np.asarray(y_test)
+
+    baseline_metrics = evaluate(model, X_test, y_test)
+    quantized_metrics = evaluate(quantized, X_test, y_test)
+    passed, metric_drop = check_metric_drop(baseline_metrics, quantized_metrics, metric, max_metric_drop,
+                                            higher_is_better=higher_is_better)
+
+    baseline_size = _artifact_size(model_path)
+    quantized_size = os.path.getsize(get_tflite_path(candidate_path))
+
+    report = {
+        'calibration_rows': len(calibration_data),
+        'size_bytes': {'keras': baseline_size, 'int8': quantized_size},
+        'size_ratio': quantized_size / baseline_size if baseline_size else None,
+        'latency_ms': {
+            'keras': measure_prediction_latency(_batch_predictor(model), X_test),
+            'int8': measure_prediction_latency(_batch_predictor(quantized), X_test)
+        },
+        'metrics': {'keras': baseline_metrics, 'int8': quantized_metrics},
+        'metric_deltas': compare_metrics(baseline_metrics, quantized_metrics),
+        'gate_metric': metric,
+        'metric_drop': metric_drop,
+        'max_metric_drop': max_metric_drop,
+        'passed': passed,
+        'promoted': False
+    }
+
+    if passed and promote:
+        os.replace(get_tflite_path(candidate_path), get_tflite_path(model_path))
+        os.replace(get_tflite_metadata_path(candidate_path), get_tflite_metadata_path(model_path))
+        report['promoted'] = True
+        logger.info(f"Promoted int8 model for {model_path}: {metric} dropped by {metric_drop:.4f}")
+    elif not passed:
+        logger.warning(f"Rejected int8 model for {model_path}: {metric} dropped by {metric_drop:.4f}, "
+                       f"more than the tolerance of {max_metric_drop}")
+
+    return report
+
+# TODO: Quantize the embedding and LSTM of the transaction model separately if full int8 proves too lossy
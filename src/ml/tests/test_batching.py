@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+
+from src.ml.src.inference.batching import MicroBatcher
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+@pytest.fixture(autouse=True)
+def event_loop_for_test():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+def test_concurrent_requests_are_batched_in_order():
+    batch_sizes = []
+
+    def double(items):
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher('double', double, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(10)])
+        await batcher.close()
+        return results, batcher.get_stats()
+
+    results, stats = run(scenario())
+
+    assert results == [i * 2 for i in range(10)]
+    assert batch_sizes == [4, 4, 2]
+    assert stats['batches'] == 3
+    assert stats['items'] == 10
+
+def test_single_request_is_flushed_after_max_wait():
+    async def scenario():
+        batcher = MicroBatcher('identity', lambda items: items, max_batch_size=64, max_wait_ms=1)
+        result = await asyncio.wait_for(batcher.submit('transaction'), timeout=1)
+        await batcher.close()
+        return result
+
+    assert run(scenario()) == 'transaction'
+
+def test_failing_item_does_not_fail_its_neighbours():
+    def reciprocal(items):
+        return [1 / item for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher('reciprocal', reciprocal, max_batch_size=3, max_wait_ms=50)
+        results = await asyncio.gather(*[batcher.submit(i) for i in [1, 0, 2]], return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = run(scenario())
+
+    assert results[0] == 1.0
+    assert isinstance(results[1], ZeroDivisionError)
+    assert results[2] == 0.5
+
+def test_exception_results_are_raised_per_item():
+    def validate(items):
+        return [ValueError('negative') if item < 0 else item for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher('validate', validate, max_batch_size=2, max_wait_ms=50)
+        results = await asyncio.gather(batcher.submit(-1), batcher.submit(5), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = run(scenario())
+
+    assert isinstance(results[0], ValueError)
+    assert results[1] == 5
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        MicroBatcher('invalid', lambda items: items, max_batch_size=0)
@@ -0,0 +1,35 @@
+from src.ml.src.utils.benchmarking import (generate_transactions, generate_spending_users, generate_investment_profiles,
+                                           generate_credit_records, benchmark, compare_to_baseline)
+
+def test_generators_are_reproducible():
+    assert generate_transactions(20, seed=3) == generate_transactions(20, seed=3)
+    assert generate_spending_users(5, seed=3) == generate_spending_users(5, seed=3)
+    assert generate_transactions(20, seed=3) != generate_transactions(20, seed=4)
+
+def test_generators_produce_requested_shapes():
+    assert len(generate_transactions(7)) == 7
+    assert all(len(user['historical_spending']) == 6 for user in generate_spending_users(4, history_months=6))
+    assert all(18 <= profile['age'] <= 100 and 1 <= profile['risk_tolerance'] <= 10
+               for profile in generate_investment_profiles(50))
+    assert generate_credit_records(3, ['a', 'b']).shape == (3, 2)
+
+def test_benchmark_runs_setup_and_reports_percentiles():
+    calls = []
+    stats = benchmark(lambda rows: sum(rows), list(range(100)), rows=100, repeats=4, warmup=2,
+                      setup=lambda: calls.append(1))
+
+    assert len(calls) == 6
+    assert stats['repeats'] == 4
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+    assert stats['rows_per_sec'] > 0
+
+def test_compare_to_baseline_flags_slowdowns_only():
+    baseline = {'credit': {'100': {'p95_ms': 10.0, 'rows_per_sec': 1000.0}}}
+    faster = {'credit': {'100': {'p95_ms': 9.0, 'rows_per_sec': 1100.0}}}
+    slower = {'credit': {'100': {'p95_ms': 15.0, 'rows_per_sec': 700.0}},
+              'spending': {'100': {'p95_ms': 50.0, 'rows_per_sec': 10.0}}}
+
+    assert compare_to_baseline(faster, baseline, max_regression=0.2) == []
+    regressions = compare_to_baseline(slower, baseline, max_regression=0.2)
+    assert {regression['metric'] for regression in regressions} == {'p95_ms', 'rows_per_sec'}
+    assert all(regression['target'] == 'credit' for regression in regressions)
@@ -0,0 +1,74 @@
+import time
+
+from src.ml.src.inference.categorization_cache import CategorizationCache, normalize_description, amount_bucket
+
+MODEL = object()
+
+def test_recurring_descriptions_share_a_key():
+    cache = CategorizationCache()
+
+    first = cache.make_key({'description': 'NETFLIX.COM 866-579-7172', 'amount': 15.49})
+    second = cache.make_key({'description': 'Netflix.com #4411', 'amount': 15.99})
+
+    assert first == second == ('netflix com', amount_bucket(15.49))
+
+def test_amount_buckets_separate_orders_of_magnitude():
+    assert amount_bucket(4.5) != amount_bucket(450.0)
+    assert amount_bucket(-20.0) == -amount_bucket(20.0)
+
+def test_hit_after_put():
+    cache = CategorizationCache(max_size=10, ttl_seconds=60)
+    transaction = {'description': 'Whole Foods #102', 'amount': 54.2}
+
+    assert cache.get(transaction, MODEL) is None
+    cache.put(transaction, 'Groceries', MODEL)
+
+    assert cache.get({'description': 'WHOLE FOODS #317', 'amount': 61.0}, MODEL) == 'Groceries'
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CategorizationCache(max_size=2, ttl_seconds=60)
+    cache.get({'description': 'warmup', 'amount': 1}, MODEL)
+    for description in ['spotify', 'hulu']:
+        cache.put({'description': description, 'amount': 10}, 'Entertainment', MODEL)
+
+    cache.get({'description': 'spotify', 'amount': 10}, MODEL)
+    cache.put({'description': 'starbucks', 'amount': 5}, 'Dining', MODEL)
+
+    assert cache.get({'description': 'hulu', 'amount': 10}, MODEL) is None
+    assert cache.get({'description': 'spotify', 'amount': 10}, MODEL) == 'Entertainment'
+    assert cache.get_stats()['evictions'] == 1
+
+def test_expired_entries_are_not_served():
+    cache = CategorizationCache(max_size=10, ttl_seconds=0.01)
+    transaction = {'description': 'shell oil', 'amount': 40}
+    cache.get(transaction, MODEL)
+    cache.put(transaction, 'Transportation', MODEL)
+
+    time.sleep(0.02)
+
+    assert cache.get(transaction, MODEL) is None
+    assert cache.get_stats()['expirations'] == 1
+
+def test_new_model_invalidates_cache():
+    cache = CategorizationCache(max_size=10, ttl_seconds=60)
+    transaction = {'description': 'comcast', 'amount': 80}
+    cache.get(transaction, MODEL)
+    cache.put(transaction, 'Bills', MODEL)
+
+    new_model = object()
+    assert cache.get(transaction, new_model) is None
+
+    # A late prediction from the old model must not repopulate the cache
+    cache.put(transaction, 'Bills', MODEL)
+    assert cache.get(transaction, new_model) is None
+    assert cache.get_stats()['invalidations'] == 1
+
+def test_transactions_without_description_are_not_cached():
+    cache = CategorizationCache(max_size=10, ttl_seconds=60)
+
+    assert cache.make_key({'amount': 10}) is None
+    assert normalize_description('#1234 5678') == ''
@@ -0,0 +1,107 @@
+import random
+import threading
+import numpy as np
+import pytest
+
+from src.ml.src.training import checkpointing
+from src.ml.src.training.callbacks import TrainingReport
+from src.ml.src.training.checkpointing import TrainingCheckpoint
+
+class FakeOptimizer:
+    def __init__(self, weights):
+        self.weights = weights
+
+    def get_weights(self):
+        return [w.copy() for w in self.weights]
+
+    def set_weights(self, weights):
+        self.weights = [w.copy() for w in weights]
+
+class FakeModel:
+    def __init__(self, seed):
+        rng = np.random.RandomState(seed)
+        self.weights = [rng.normal(size=(4, 3)), rng.normal(size=3)]
+        self.optimizer = FakeOptimizer([np.array(seed, dtype=np.int64), rng.normal(size=(4, 3))])
+
+    def get_weights(self):
+        return [w.copy() for w in self.weights]
+
+    def set_weights(self, weights):
+        self.weights = [w.copy() for w in weights]
+
+def test_resume_restores_weights_optimizer_and_rng(tmp_path):
+    checkpoint = TrainingCheckpoint(str(tmp_path), keep=2)
+    trained = FakeModel(seed=1)
+
+    np.random.seed(7)
+    random.seed(7)
+    checkpoint.save(trained, epoch=3)
+    expected_draws = (np.random.rand(), random.random())
+    checkpoint.wait()
+
+    resumed = FakeModel(seed=2)
+    assert checkpoint.restore(resumed) == 3
+    for restored, saved in zip(resumed.get_weights() + resumed.optimizer.get_weights(),
+                               trained.get_weights() + trained.optimizer.get_weights()):
+        np.testing.assert_array_equal(restored, saved)
+    assert (np.random.rand(), random.random()) == expected_draws
+
+def test_resume_keeps_the_early_stopping_state(tmp_path):
+    checkpoint = TrainingCheckpoint(str(tmp_path))
+    report = TrainingReport()
+    report.best_epoch, report.best_value, report.reference, report.waited = 4, 0.25, 0.25, 3
+    report.best_weights = FakeModel(seed=3).get_weights()
+    checkpoint.save(FakeModel(seed=1), epoch=7, report=report)
+    checkpoint.wait()
+
+    resumed = TrainingReport()
+    assert checkpoint.restore(FakeModel(seed=2), resumed) == 7
+    assert (resumed.best_epoch, resumed.best_value, resumed.reference, resumed.waited) == (4, 0.25, 0.25, 3)
+    for restored, saved in zip(resumed.best_weights, report.best_weights):
+        np.testing.assert_array_equal(restored, saved)
+
+    # Checkpoints saved without a report leave the resumed run's state as it starts
+    checkpoint.save(FakeModel(seed=1), epoch=8)
+    checkpoint.wait()
+    fresh = TrainingReport()
+    assert checkpoint.restore(FakeModel(seed=2), fresh) == 8
+    assert fresh.best_value is None and fresh.waited == 0 and fresh.best_weights is None
+
+def test_without_checkpoint_training_starts_at_epoch_zero(tmp_path):
+    model = FakeModel(seed=1)
+    assert TrainingCheckpoint(str(tmp_path / 'none')).restore(model) == 0
+    np.testing.assert_array_equal(model.get_weights()[0], FakeModel(seed=1).get_weights()[0])
+
+def test_writes_run_in_the_background_and_old_checkpoints_are_removed(tmp_path, monkeypatch):
+    checkpoint = TrainingCheckpoint(str(tmp_path), keep=2)
+    release = threading.Event()
+    write = checkpointing.write_checkpoint
+
+    def slow_write(path, state):
+        release.wait(timeout=10)
+        write(path, state)
+
+    monkeypatch.setattr(checkpointing, 'write_checkpoint', slow_write)
+    checkpoint.save(FakeModel(seed=1), epoch=1)
+    # save returned while the write is still blocked
+    assert checkpoint.latest() is None
+    release.set()
+
+    for epoch in range(2, 5):
+        checkpoint.save(FakeModel(seed=epoch), epoch=epoch)
+    checkpoint.wait()
+
+    assert [path[-6:] for path in checkpoint.checkpoints()] == ['000003', '000004']
+    checkpoint.clear()
+    assert checkpoint.latest() is None
+
+def test_failed_write_is_raised(tmp_path, monkeypatch):
+    checkpoint = TrainingCheckpoint(str(tmp_path))
+
+    def failing_write(path, state):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(checkpointing, 'write_checkpoint', failing_write)
+    checkpoint.save(FakeModel(seed=1), epoch=1)
+    with pytest.raises(OSError):
+        checkpoint.wait()
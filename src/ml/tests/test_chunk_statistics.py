@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.src.preprocessing.chunk_statistics import ChunkStatistics
+
+def random_frame(n, seed):
+    rng = np.random.RandomState(seed)
+    amounts = rng.lognormal(mean=3.0, sigma=1.0, size=n)
+    amounts[rng.uniform(size=n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'amount': amounts,
+        'count': rng.randint(0, 10, size=n),
+        'category': rng.choice(['Groceries', 'Dining', 'Bills'], p=[0.5, 0.3, 0.2], size=n)
+    })
+
+def chunks_of(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+def test_chunked_moments_match_full_dataset():
+    df = random_frame(5000, seed=0)
+
+    statistics = ChunkStatistics.from_chunks(chunks_of(df, 700))
+
+    for column in ['amount', 'count']:
+        assert statistics.count(column) == df[column].count()
+        assert statistics.mean(column) == pytest.approx(df[column].mean())
+        assert statistics.std(column) == pytest.approx(df[column].std(ddof=0))
+        assert statistics.moments[column]['min'] == df[column].min()
+        assert statistics.moments[column]['max'] == df[column].max()
+    assert statistics.mode('category') == df['category'].mode().iloc[0]
+    assert statistics.categories('category') == ['Bills', 'Dining', 'Groceries']
+
+def test_merge_equals_sequential_updates():
+    first, second = random_frame(1000, seed=1), random_frame(1500, seed=2)
+
+    merged = ChunkStatistics().update(first).merge(ChunkStatistics().update(second))
+    sequential = ChunkStatistics().update(first).update(second)
+
+    assert merged.mean('amount') == pytest.approx(sequential.mean('amount'))
+    assert merged.std('amount') == pytest.approx(sequential.std('amount'))
+    assert merged.value_counts['category'].to_dict() == sequential.value_counts['category'].to_dict()
+
+def test_quantiles_are_exact_within_sample_size_and_close_beyond():
+    df = random_frame(5000, seed=3)
+
+    exact = ChunkStatistics(sample_size=10000).update(df)
+    assert exact.quantile('amount', 0.95) == pytest.approx(df['amount'].quantile(0.95))
+
+    sampled = ChunkStatistics.from_chunks(chunks_of(df, 500), sample_size=2000)
+    assert len(sampled.samples['amount'][1]) == 2000
+    assert sampled.median('amount') == pytest.approx(df['amount'].median(), rel=0.1)
+
+def test_high_cardinality_columns_are_not_counted():
+    df = random_frame(1000, seed=3)
+    df['transaction_id'] = [f'txn-{i}' for i in range(len(df))]
+
+    statistics = ChunkStatistics.from_chunks(chunks_of(df, 300), max_categories=100)
+    merged = ChunkStatistics(max_categories=100).update(df[:50]).merge(ChunkStatistics(max_categories=100).update(df[50:]))
+
+    for stats in (statistics, merged):
+        assert 'transaction_id' not in stats.value_counts
+        assert stats.count('transaction_id') == len(df)
+        assert stats.categories('category') == ['Bills', 'Dining', 'Groceries']
+        with pytest.raises(ValueError):
+            stats.mode('transaction_id')
+
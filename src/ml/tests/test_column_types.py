@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from src.ml.src.utils.column_types import (infer_date_format, detect_date_formats, apply_date_types,
+                                           clear_format_cache)
+
+@pytest.fixture(autouse=True)
+def empty_format_cache():
+    clear_format_cache()
+    yield
+    clear_format_cache()
+
+def test_infer_date_format_from_probe():
+    assert infer_date_format(pd.Series(['2023-01-05 10:00:00', '2023-02-28 23:59:59'])) == '%Y-%m-%d %H:%M:%S'
+    assert infer_date_format(pd.Series(['12/31/2023', None, '01/15/2024'])) == '%m/%d/%Y'
+    assert infer_date_format(pd.Series(['REF-1', 'REF-2'])) is None
+    assert infer_date_format(pd.Series([None, None], dtype=object)) is None
+
+def test_declared_columns_are_not_probed():
+    df = pd.DataFrame({'category': ['2023-01-01'], 'date': ['2023-01-01'], 'posted': ['2023-01-01'], 'amount': [1.0]})
+
+    formats = detect_date_formats(df, column_types={'category': 'string', 'date': 'datetime:%Y-%m-%d'})
+
+    assert formats == {'date': '%Y-%m-%d', 'posted': '%Y-%m-%d'}
+
+def test_apply_date_types_matches_full_parse():
+    df = pd.DataFrame({
+        'date': ['2023-01-05', '2023-03-01', None],
+        'posted_at': ['05.01.2023', '01.03.2023', '02.03.2023'],
+        'reference': ['REF-1', 'REF-2', 'REF-3'],
+    })
+
+    df, date_columns = apply_date_types(df)
+
+    assert sorted(date_columns) == ['date', 'posted_at']
+    assert df['date'].tolist()[:2] == [pd.Timestamp('2023-01-05'), pd.Timestamp('2023-03-01')]
+    assert pd.isnull(df['date'].iloc[2])
+    assert df['posted_at'].tolist() == [pd.Timestamp('2023-01-05'), pd.Timestamp('2023-03-01'), pd.Timestamp('2023-03-02')]
+    assert df['reference'].tolist() == ['REF-1', 'REF-2', 'REF-3']
+
+def test_value_missed_by_the_probe_is_not_parsed_to_missing():
+    df = pd.DataFrame({'closed_at': ['2023-01-05'] * 10 + ['not a date']})
+
+    df, date_columns = apply_date_types(df, column_types={}, formats={'closed_at': '%Y-%m-%d'})
+
+    assert date_columns == []
+    assert df['closed_at'].iloc[-1] == 'not a date'
+
+def test_format_mismatch_falls_back_to_a_full_probe():
+    df = pd.DataFrame({'date': ['2023-01-05 08:30:00', '2023-03-01 12:00:00']})
+
+    df, date_columns = apply_date_types(df)
+
+    assert date_columns == ['date']
+    assert df['date'].iloc[0] == pd.Timestamp('2023-01-05 08:30:00')
+
+def test_formats_are_cached_per_source():
+    # Day-first dates; only 25/04 rules out month-first
+    apply_date_types(pd.DataFrame({'settled': ['03/04/2024', '25/04/2024']}), source='eu.csv')
+
+    us, _ = apply_date_types(pd.DataFrame({'settled': ['03/04/2024']}), source='us.csv')
+    eu, _ = apply_date_types(pd.DataFrame({'settled': ['03/04/2024']}), source='eu.csv')
+
+    assert us['settled'].iloc[0] == pd.Timestamp('2024-03-04')
+    assert eu['settled'].iloc[0] == pd.Timestamp('2024-04-03')
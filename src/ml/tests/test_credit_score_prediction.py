@@ -2,9 +2,11 @@ import pytest
 import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.exceptions import NotFittedError
 from tensorflow.keras.models import Model
 
-from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel, create_credit_score_prediction_model
+from src.ml.src.models.credit_score_prediction import (CREDIT_SCORE_PREDICTION_MODEL, CreditScorePredictionModel,
+                                                       create_credit_score_prediction_model)
 
 # Sample data for testing
 SAMPLE_DATA = pd.DataFrame({
@@ -40,11 +42,18 @@ def test_data_preprocessing(credit_score_model):
         'payment_history': [0.9, 0.8, 1.0, 0.7, 0.95],
     })
     
-    preprocessed_data = credit_score_model.preprocess_data(sample_data)
+    preprocessed_data = credit_score_model.preprocess_data(sample_data, fit=True)
     assert isinstance(preprocessed_data, np.ndarray)
     assert preprocessed_data.shape == (5, 4)  # Assuming 4 features after preprocessing
     assert not np.isnan(preprocessed_data).any()  # No missing values
 
+    # Once fitted, a single row is transformed with the training statistics
+    np.testing.assert_allclose(credit_score_model.preprocess_data(sample_data.iloc[:1]), preprocessed_data[:1])
+
+def test_data_preprocessing_requires_fit(credit_score_model):
+    with pytest.raises(NotFittedError):
+        credit_score_model.preprocess_data(SAMPLE_DATA.drop('credit_score', axis=1))
+
 def test_model_training(credit_score_model):
     X_train = SAMPLE_DATA.drop('credit_score', axis=1)
     y_train = SAMPLE_DATA['credit_score']
@@ -54,6 +63,23 @@ def test_model_training(credit_score_model):
     assert 'loss' in history.history
     assert len(history.history['loss']) == 5  # 5 epochs
 
+def test_learning_rate_schedule_continues_across_train_calls(credit_score_model, monkeypatch):
+    monkeypatch.setitem(CREDIT_SCORE_PREDICTION_MODEL, 'callbacks',
+                        {'lr_schedule': 'exponential', 'lr_decay': 0.5, 'patience': 0, 'restore_best_weights': False})
+    rng = np.random.RandomState(0)
+    X_train = pd.DataFrame(rng.normal(size=(40, CREDIT_SCORE_PREDICTION_MODEL['input_dim'])),
+                           columns=[f'feature_{i}' for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])])
+    y_train = X_train.sum(axis=1) * 10 + 650
+
+    credit_score_model.train(X_train, y_train, epochs=2)
+    credit_score_model.train(X_train, y_train, epochs=2)
+
+    # The second call decays from the base learning rate over epochs 2 and 3, instead of
+    # restarting at epoch 0 from the already decayed rate
+    assert credit_score_model.trained_epochs == 4
+    learning_rate = float(credit_score_model.model.optimizer.learning_rate.numpy())
+    assert learning_rate == pytest.approx(credit_score_model.learning_rate * 0.5 ** 3)
+
 def test_model_prediction(credit_score_model):
     X_test = SAMPLE_DATA.drop('credit_score', axis=1)
     
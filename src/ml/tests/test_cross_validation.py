@@ -0,0 +1,99 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.src.evaluation.cross_validation import (kfold_splits, time_series_splits, aggregate_metrics, cross_validate,
+                                                    find_time_column, splits_by_time)
+from src.ml.src.evaluation.model_evaluation import cross_validate_model
+from src.ml.src.models.credit_score_prediction import CREDIT_SCORE_PREDICTION_MODEL
+
+def fit_mean(training_data):
+    return float(training_data['target'].mean())
+
+def evaluate_mean(model, X_test, y_test):
+    return {'mae': float(np.mean(np.abs(y_test - model))), 'rows': len(y_test), 'pid': os.getpid()}
+
+def test_kfold_tests_every_row_once():
+    splits = kfold_splits(103, n_splits=5, seed=0)
+
+    assert len(splits) == 5
+    assert sorted(np.concatenate([test for _, test in splits]).tolist()) == list(range(103))
+    for train, test in splits:
+        assert len(np.intersect1d(train, test)) == 0
+        assert len(train) + len(test) == 103
+
+def test_time_series_folds_train_on_the_past_only():
+    dates = pd.Series(pd.date_range('2023-01-01', periods=12, freq='MS').repeat(10))
+    shuffled = dates.sample(frac=1, random_state=0).to_numpy()
+
+    splits = time_series_splits(shuffled, n_splits=3, gap=1)
+
+    assert len(splits) == 3
+    for train, test in splits:
+        assert len(np.unique(shuffled[test])) == 3
+        # One month is left out between training and test
+        assert pd.Timestamp(shuffled[train].max()) + pd.DateOffset(months=2) == pd.Timestamp(shuffled[test].min())
+    assert [len(train) for train, _ in splits] == [20, 50, 80]
+
+    with pytest.raises(ValueError):
+        time_series_splits(dates[:30], n_splits=3)
+
+def test_time_column_is_found_by_preference():
+    assert find_time_column(pd.DataFrame(columns=['year_month', 'date'])) == 'date'
+    with pytest.raises(ValueError):
+        find_time_column(pd.DataFrame(columns=['amount']))
+
+def test_metrics_are_aggregated_with_confidence_intervals():
+    aggregated = aggregate_metrics([{'mse': 1.0, 'r2': 0.5}, {'mse': 2.0, 'r2': 0.5}, {'mse': 3.0}], confidence=0.95)
+
+    assert set(aggregated) == {'mse'}
+    mse = aggregated['mse']
+    assert mse['mean'] == pytest.approx(2.0)
+    assert mse['std'] == pytest.approx(1.0)
+    assert mse['ci_low'] < 2.0 < mse['ci_high']
+    assert mse['ci_high'] - 2.0 == pytest.approx(2.0 - mse['ci_low'])
+    assert mse['values'] == [1.0, 2.0, 3.0]
+
+    constant = aggregate_metrics([{'accuracy': 0.8}] * 4)['accuracy']
+    assert constant['ci_low'] == pytest.approx(0.8) and constant['ci_high'] == pytest.approx(0.8)
+
+def test_folds_run_in_separate_processes():
+    data = pd.DataFrame({'date': pd.date_range('2023-01-01', periods=60, freq='D'),
+                         'target': np.arange(60, dtype=np.float64)}, index=np.zeros(60, dtype=int))
+
+    result = cross_validate(data, fit_mean, evaluate_mean, 'target', n_splits=3, time_series=True, max_workers=3)
+
+    assert result['split'] == 'time_series'
+    assert [fold['test_rows'] for fold in result['folds']] == [15, 15, 15]
+    assert len({fold['metrics']['pid'] for fold in result['folds']} - {os.getpid()}) == 3
+    assert result['metrics']['mae']['values'] == [fold['metrics']['mae'] for fold in result['folds']]
+
+def test_real_model_is_cross_validated():
+    rng = np.random.RandomState(0)
+    features = [f'feature_{i}' for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])]
+    data = pd.DataFrame(rng.normal(size=(60, len(features))), columns=features)
+    data['credit_score'] = data.sum(axis=1) * 10 + 650
+
+    result = cross_validate_model('credit', data, n_splits=2, max_workers=2)
+
+    assert result['split'] == 'kfold'
+    assert [fold['test_rows'] for fold in result['folds']] == [30, 30]
+    assert set(result['metrics']) == {'mse', 'rmse', 'r2_score'}
+    assert all(np.isfinite(result['metrics']['mse']['values']))
+
+def test_spending_schema_without_time_column_falls_back_to_kfold():
+    rng = np.random.RandomState(0)
+    data = pd.DataFrame({
+        'historical_spending': [rng.uniform(100, 500, size=rng.randint(1, 13)).tolist() for _ in range(40)],
+        'income': rng.uniform(1000, 5000, size=40),
+        'month': rng.randint(1, 13, size=40),
+    })
+    data['target_spending'] = data['historical_spending'].apply(np.mean)
+
+    assert not splits_by_time(data, time_series=True)
+    result = cross_validate_model('spending', data, n_splits=2, max_workers=2)
+
+    assert result['split'] == 'kfold'
+    assert [fold['test_rows'] for fold in result['folds']] == [20, 20]
+    assert all(np.isfinite(result['metrics']['mse']['values']))
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import threading
+import pytest
+
+from src.ml.src.inference.executor import InferenceExecutor, ExecutorSaturatedError
+from src.ml.src.inference.batching import MicroBatcher
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+@pytest.fixture(autouse=True)
+def event_loop_for_test():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(mode='thread', max_workers=4, max_concurrency_per_model=1, max_queue_depth=2)
+    yield executor
+    executor.shutdown()
+
+def test_inference_runs_off_the_event_loop(executor):
+    loop_thread = threading.get_ident()
+
+    async def scenario():
+        return await executor.run('stub', threading.get_ident)
+
+    assert run(scenario()) != loop_thread
+
+def test_event_loop_stays_responsive_during_inference(executor):
+    async def scenario():
+        inference = asyncio.ensure_future(executor.run('stub', time.sleep, 0.2))
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        heartbeat_delay = time.perf_counter() - started
+        await inference
+        return heartbeat_delay
+
+    assert run(scenario()) < 0.1
+
+def test_per_model_concurrency_limit(executor):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+
+    async def scenario():
+        await asyncio.gather(*[executor.run('stub', work) for _ in range(3)])
+
+    run(scenario())
+
+    assert max(peak) == 1
+
+def test_full_queue_is_rejected(executor):
+    async def scenario():
+        calls = [executor.run('stub', time.sleep, 0.05) for _ in range(4)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = run(scenario())
+    metrics = executor.get_metrics()['stub']
+
+    assert sum(isinstance(result, ExecutorSaturatedError) for result in results) == 1
+    assert metrics['rejected'] == 1
+    assert metrics['requests'] == 3
+    assert metrics['p99_wait_ms'] >= metrics['p50_wait_ms']
+
+def test_batcher_dispatches_through_executor(executor):
+    async def scenario():
+        batcher = MicroBatcher('stub', lambda items: [item + 1 for item in items], max_batch_size=4, max_wait_ms=20, executor=executor)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(4)])
+        await batcher.close()
+        return results
+
+    assert run(scenario()) == [1, 2, 3, 4]
+    assert executor.get_metrics()['stub']['requests'] == 1
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode='gpu')
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.src.preprocessing.feature_store import TransactionFeatureStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = TransactionFeatureStore(str(tmp_path / 'feature_store.sqlite'))
+    yield store
+    store.close()
+
+def random_transactions(n, seed):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'account_id': rng.randint(0, 20, size=n),
+        'category': rng.choice(['Groceries', 'Dining', 'Bills'], size=n),
+        'amount': np.round(rng.uniform(1, 200, size=n), 2)
+    })
+
+def test_incremental_updates_match_full_recomputation(store):
+    batches = [random_transactions(100, seed) for seed in range(3)]
+    for batch in batches:
+        store.update(batch)
+    history = pd.concat(batches, ignore_index=True)
+
+    features = store.get_features(history)
+
+    np.testing.assert_allclose(features['avg_amount_per_category'], history.groupby('category')['amount'].transform('mean'))
+    np.testing.assert_array_equal(features['transaction_frequency'], history.groupby('category')['amount'].transform('count'))
+    np.testing.assert_allclose(features['cumulative_sum'], history.groupby('account_id')['amount'].transform('sum'))
+    np.testing.assert_array_equal(features['account_transaction_frequency'],
+                                  history.groupby(['account_id', 'category'])['amount'].transform('count'))
+
+def test_reapplied_batch_is_skipped(store):
+    batch = random_transactions(10, seed=0)
+
+    assert store.update(batch, batch_id='2023-05-01') == 10
+    assert store.update(batch, batch_id='2023-05-01') == 0
+    assert store.get_account_features(str(batch['account_id'][0]), batch['category'][0])['transaction_frequency'] > 0
+
+def test_store_persists_and_unknown_keys_are_zero(tmp_path):
+    path = str(tmp_path / 'feature_store.sqlite')
+    store = TransactionFeatureStore(path)
+    store.update(pd.DataFrame({'account_id': ['a'], 'category': ['Dining'], 'amount': [20.0]}))
+    store.close()
+
+    reopened = TransactionFeatureStore(path)
+    features = reopened.get_features(pd.DataFrame({'account_id': ['a', 'b'], 'category': ['Dining', 'Travel']}, index=[5, 6]))
+
+    assert features.index.tolist() == [5, 6]
+    assert features.loc[5, 'cumulative_sum'] == 20.0
+    assert features.loc[6].tolist() == [0, 0, 0, 0, 0]
+
+def test_reads_do_not_block_other_writers(tmp_path):
+    path = str(tmp_path / 'feature_store.sqlite')
+    reader = TransactionFeatureStore(path)
+    writer = TransactionFeatureStore(path)
+    writer._connection.execute("PRAGMA busy_timeout = 0")
+    batch = random_transactions(10, seed=0)
+
+    reader.get_features(batch)
+
+    assert not reader._connection.in_transaction
+    assert writer.update(batch) == 10
+    assert reader.get_features(batch)['transaction_frequency'].sum() > 0
+    reader.close()
+    writer.close()
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.src.training.hyperparameter_search import (Study, rung_epochs, sample_random, sample_tpe, run_search,
+                                                       train_model_trial, SEARCH_SPACES)
+from src.ml.src.models.credit_score_prediction import CREDIT_SCORE_PREDICTION_MODEL
+
+SPACE = {'learning_rate': ('log_uniform', 1e-4, 1e-2), 'batch_size': ('choice', [32, 64, 128])}
+
+def learning_rate_objective(params, data, epochs):
+    # Distance of the learning rate to the optimum, shrinking with training
+    for budget in epochs:
+        yield abs(np.log10(params['learning_rate']) + 3) + len(data) / budget
+
+def test_rungs_grow_by_the_reduction_factor():
+    assert rung_epochs(2, 100, 3) == [2, 6, 18, 54, 100]
+    assert rung_epochs(10, 10, 3) == [10]
+
+def test_random_samples_lie_in_the_space():
+    rng = np.random.RandomState(0)
+    for _ in range(50):
+        params = sample_random(SEARCH_SPACES['transaction'], rng)
+        assert 1e-4 <= params['learning_rate'] <= 1e-2
+        assert params['lstm_units'] in [32, 64, 128]
+
+def test_tpe_concentrates_on_good_trials():
+    rng = np.random.RandomState(0)
+    history = [{'params': sample_random(SPACE, rng)} for _ in range(40)]
+    # Large batches were best, with small learning rates first
+    history.sort(key=lambda trial: (trial['params']['batch_size'] != 128, trial['params']['learning_rate']))
+
+    suggestions = [sample_tpe(SPACE, history, rng) for _ in range(30)]
+
+    # Below the median of the prior, 1e-3
+    assert np.median([params['learning_rate'] for params in suggestions]) < 1e-3
+    assert np.mean([params['batch_size'] == 128 for params in suggestions]) > 0.5
+
+def test_reports_prune_all_but_the_best_fraction(tmp_path):
+    study = Study(str(tmp_path / 'study.sqlite'), name='credit', maximize=False)
+    trials = [study.create_trial({'learning_rate': 0.001 * i}) for i in range(6)]
+
+    decisions = [study.report(trial_id, 0, 2, value, reduction_factor=3)
+                 for trial_id, value in zip(trials, [5.0, 4.0, 6.0, 1.0, 3.0, 7.0])]
+
+    # Every trial continues until three reported; then only the best third
+    assert decisions == [True, True, False, True, False, False]
+
+    with pytest.raises(ValueError):
+        Study(study.path, name='credit', maximize=True)
+
+def test_interrupted_trials_are_run_again(tmp_path):
+    study = Study(str(tmp_path / 'study.sqlite'), name='credit', maximize=False)
+    finished = study.create_trial({'learning_rate': 0.01})
+    study.finish(finished, 'complete', 1.0, 10)
+    study.create_trial({'learning_rate': 0.001})
+
+    reopened = Study(study.path, name='credit')
+
+    assert reopened.requeue_interrupted() == [{'learning_rate': 0.001}]
+    assert reopened.best_trial()['trial_id'] == finished
+
+def test_search_runs_trials_concurrently_and_resumes(tmp_path):
+    path = str(tmp_path / 'study.sqlite')
+    data = pd.DataFrame({'amount': np.arange(4, dtype=np.float64)})
+
+    best = run_search(Study(path, name='search', maximize=False), learning_rate_objective, SPACE, data,
+                      max_epochs=18, n_trials=8, max_workers=2, sampler='random', min_epochs=2)
+
+    study = Study(path, name='search')
+    trials = study.trials()
+    assert len(trials) == 8
+    assert {trial['state'] for trial in trials} <= {'complete', 'pruned'}
+    assert any(trial['state'] == 'pruned' for trial in trials)
+    assert best == study.best_trial()
+    assert best['epochs'] == 18
+
+    run_search(study, learning_rate_objective, SPACE, data, max_epochs=18, n_trials=10, max_workers=2, min_epochs=2)
+    assert len(study.trials()) == 10
+
+def test_real_model_trial_reports_every_rung():
+    rng = np.random.RandomState(0)
+    features = [f'feature_{i}' for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])]
+    data = pd.DataFrame(rng.normal(size=(100, len(features))), columns=features)
+    data['credit_score'] = data.sum(axis=1) * 10 + 650
+    params = {'hidden_layers': [16], 'learning_rate': 1e-2, 'batch_size': 16}
+
+    values = list(train_model_trial('credit', params, data, [1, 3]))
+
+    assert len(values) == 2
+    assert all(np.isfinite(values))
+
+def test_spending_trial_runs_on_the_spending_schema():
+    rng = np.random.RandomState(0)
+    data = pd.DataFrame({
+        'historical_spending': [rng.uniform(100, 500, size=rng.randint(1, 13)).tolist() for _ in range(50)],
+        'income': rng.uniform(1000, 5000, size=50),
+        'month': rng.randint(1, 13, size=50),
+    })
+    data['target_spending'] = data['historical_spending'].apply(np.mean)
+    params = {'hidden_layers': [16], 'learning_rate': 1e-2, 'batch_size': 16}
+
+    values = list(train_model_trial('spending', params, data, [1, 3]))
+
+    assert len(values) == 2
+    assert all(np.isfinite(values))
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from src.ml.src.training.incremental_training import (ReplayBuffer, population_stability_index, detect_drift,
+                                                      is_degraded, warm_start_update)
+
+def frame(values, offset=0):
+    return pd.DataFrame({'feature': np.asarray(values, dtype=float), 'row': np.arange(len(values)) + offset})
+
+def test_replay_buffer_keeps_a_bounded_uniform_sample_and_persists(tmp_path):
+    buffer = ReplayBuffer(str(tmp_path), capacity=100, seed=0)
+    buffer.add(frame(np.zeros(60)))
+    assert len(buffer) == 60 and buffer.seen == 60
+
+    for batch in range(1, 50):
+        buffer.add(frame(np.zeros(100), offset=batch * 100))
+    assert len(buffer) == 100 and buffer.seen == 4960
+    assert buffer.data['row'].is_unique
+    # A uniform sample of the history, not only the latest rows
+    assert buffer.data['row'].min() < 2500 < buffer.data['row'].max()
+
+    buffer.save()
+    reloaded = ReplayBuffer(str(tmp_path), capacity=100, seed=0)
+    assert reloaded.seen == 4960
+    assert reloaded.data['row'].tolist() == buffer.data['row'].tolist()
+
+def test_population_stability_index_grows_with_the_shift():
+    rng = np.random.RandomState(0)
+    reference = rng.normal(size=5000)
+    assert population_stability_index(reference, rng.normal(size=5000)) < 0.05
+    assert population_stability_index(reference, rng.normal(1.0, size=5000)) > 0.2
+    assert population_stability_index(np.ones(100), np.zeros(100)) > 0.2
+
+def test_drift_is_reported_per_column():
+    rng = np.random.RandomState(0)
+    reference = pd.DataFrame({'stable': rng.normal(size=2000), 'shifted': rng.normal(size=2000)})
+    current = pd.DataFrame({'stable': rng.normal(size=2000), 'shifted': rng.normal(3.0, size=2000)})
+
+    drift = detect_drift(reference, current)
+    assert drift['drifted'] and drift['drifted_columns'] == ['shifted']
+    assert not detect_drift(reference, current, columns=['stable'])['drifted']
+
+def test_degradation_allows_the_tolerance():
+    assert not is_degraded({'mae': 10.0}, {'mae': 10.4}, 'mae', tolerance=0.05)
+    assert is_degraded({'mae': 10.0}, {'mae': 10.6}, 'mae', tolerance=0.05)
+    assert is_degraded({'accuracy': 0.9}, {'accuracy': 0.8}, 'accuracy', lower_is_better=False, tolerance=0.05)
+
+class FakeModel:
+    def __init__(self, error):
+        self.error = error
+        self.calls = []
+
+def run_update(tmp_path, new_data, error_after_fine_tuning, reference=None):
+    buffer = ReplayBuffer(str(tmp_path), capacity=1000)
+    if reference is not None:
+        buffer.add(reference)
+    model = FakeModel(1.0)
+
+    def fine_tune(data):
+        model.calls.append(('fine_tune', len(data)))
+        model.error = error_after_fine_tuning
+
+    def retrain(data):
+        model.calls.append(('retrain', len(data)))
+        model.error = 0.5
+
+    result = warm_start_update(new_data, buffer, fine_tune, retrain, lambda data: {'mae': model.error}, 'mae',
+                               drift_columns=['feature'])
+    return result, model, buffer
+
+def test_warm_start_fine_tunes_on_replay_and_new_rows(tmp_path):
+    rng = np.random.RandomState(0)
+    result, model, buffer = run_update(tmp_path, frame(rng.normal(size=100), 1000), 0.8, reference=frame(rng.normal(size=500)))
+
+    assert result['mode'] == 'warm_start' and result['reason'] is None
+    # 20 new and 20 replayed rows are held out
+    assert model.calls == [('fine_tune', 80 + 480)]
+    assert result['baseline_metrics'] == {'mae': 1.0} and result['metrics'] == {'mae': 0.8}
+    assert result['replay_rows'] == len(buffer) == 600
+
+def test_full_retrain_on_degradation_drift_or_empty_buffer(tmp_path):
+    rng = np.random.RandomState(0)
+    result, model, _ = run_update(tmp_path / 'degraded', frame(rng.normal(size=100)), 1.5, reference=frame(rng.normal(size=500)))
+    assert result['mode'] == 'full_retrain' and result['reason'] == 'degradation'
+    assert [call[0] for call in model.calls] == ['fine_tune', 'retrain']
+    # The retrained model saw the held-out rows, so it is not scored on them
+    assert result['baseline_metrics'] == {'mae': 1.0} and result['metrics'] is None
+
+    result, model, _ = run_update(tmp_path / 'drifted', frame(rng.normal(5.0, size=100)), 0.8, reference=frame(rng.normal(size=500)))
+    assert result['reason'] == 'drift' and model.calls == [('retrain', 100)]
+
+    result, model, buffer = run_update(tmp_path / 'empty', frame(rng.normal(size=100)), 0.8)
+    assert result['reason'] == 'empty_replay_buffer' and model.calls == [('retrain', 100)]
+    assert len(buffer) == 100
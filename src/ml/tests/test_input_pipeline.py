@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.ml.src.utils.input_pipeline import (INPUT_PIPELINE_CONFIG, STEP_MEMORY_FACTOR, auto_batch_size,
+                                             resolve_batch_size, example_bytes, split_validation)
+
+def test_example_bytes_sums_the_inputs_of_one_row():
+    text = np.zeros((10, 100), dtype=np.int32)
+    amount = np.zeros((10, 1), dtype=np.float64)
+    assert example_bytes(text) == 400
+    assert example_bytes([text, amount, amount]) == 416
+
+def test_batch_size_is_the_largest_power_of_two_fitting_the_memory_budget():
+    low, high = INPUT_PIPELINE_CONFIG['min_batch_size'], INPUT_PIPELINE_CONFIG['max_batch_size']
+    budget_per_batch = lambda batch_size: batch_size * 40 * STEP_MEMORY_FACTOR / INPUT_PIPELINE_CONFIG['memory_fraction']
+
+    assert auto_batch_size(40, memory=budget_per_batch(4 * low)) == 4 * low
+    assert auto_batch_size(40, memory=budget_per_batch(4 * low) - 1) == 2 * low
+    assert auto_batch_size(40, memory=0) == low
+    assert auto_batch_size(40, memory=10**15) == high
+    # No larger than the data, nor below the minimum
+    assert auto_batch_size(40, num_examples=3 * low, memory=10**15) == 2 * low
+    assert auto_batch_size(40, num_examples=1, memory=10**15) == low
+
+def test_requested_batch_size_is_kept():
+    assert resolve_batch_size(48, example_bytes=10**9) == 48
+
+def test_validation_rows_are_the_last_ones():
+    X = np.arange(20).reshape(10, 2)
+    y = np.arange(10)
+
+    (X_train, y_train), (X_val, y_val) = split_validation(X, y, 0.2)
+    assert X_train.tolist() == X[:8].tolist() and y_train.tolist() == list(range(8))
+    assert X_val.tolist() == X[8:].tolist() and y_val.tolist() == [8, 9]
+
+    (inputs, _), (validation_inputs, _) = split_validation((X, y), y, 0.2)
+    assert isinstance(inputs, tuple) and len(inputs) == 2
+    assert validation_inputs[1].tolist() == [8, 9]
@@ -2,11 +2,11 @@ import pytest
 import numpy as np
 import pandas as pd
 from unittest.mock import Mock, patch
+from sklearn.exceptions import NotFittedError
 
-from src.models.investment_recommendation import InvestmentRecommendationModel
-from src.services.investment_recommendation_service import InvestmentRecommendationService
-from src.config.model_config import INVESTMENT_RECOMMENDATION_MODEL
-from src.utils.model_utils import preprocess_input, postprocess_output
+from src.ml.src.models.investment_recommendation import InvestmentRecommendationModel, INVESTMENT_RECOMMENDATION_MODEL
+from src.ml.src.services.investment_recommendation_service import InvestmentRecommendationService
+from src.ml.src.utils.model_utils import preprocess_input, postprocess_output
 
 @pytest.fixture
 def sample_model():
@@ -14,8 +14,8 @@ def sample_model():
 
 @pytest.fixture
 def sample_service():
-    with patch('src.services.investment_recommendation_service.load_model') as mock_load_model:
-        mock_load_model.return_value = InvestmentRecommendationModel()
+    with patch('src.ml.src.services.investment_recommendation_service.model_registry') as mock_registry:
+        mock_registry.get.return_value = InvestmentRecommendationModel()
         return InvestmentRecommendationService()
 
 def test_investment_recommendation_model_initialization(sample_model):
@@ -28,15 +28,27 @@ def test_investment_recommendation_model_preprocess_data(sample_model):
         'age': [30, 40, 50],
         'income': [50000, 75000, 100000],
         'risk_tolerance': ['low', 'medium', 'high'],
-        'investment_horizon': [5, 10, 15]
+        'investment_horizon': [5, 10, 15],
+        'investment_allocation': [0, 2, 4]
     })
     
-    features, labels = sample_model.preprocess_data(sample_data)
+    features, labels = sample_model.preprocess_data(sample_data, fit=True)
     
     assert isinstance(features, np.ndarray)
     assert isinstance(labels, np.ndarray)
-    assert features.shape[1] == 4  # Assuming 4 features after preprocessing
-    assert labels.shape[1] == 1  # Assuming single label column
+    assert features.shape == (3, 6)  # 3 scaled numerical features and 3 one-hot risk tolerances
+    assert labels.shape == (3, INVESTMENT_RECOMMENDATION_MODEL['output_classes'])
+
+def test_investment_recommendation_model_preprocess_data_requires_fit(sample_model):
+    sample_data = pd.DataFrame({
+        'age': [30],
+        'income': [50000],
+        'risk_tolerance': ['low'],
+        'investment_horizon': [5]
+    })
+
+    with pytest.raises(NotFittedError):
+        sample_model.preprocess_data(sample_data)
 
 def test_investment_recommendation_model_train(sample_model):
     sample_data = pd.DataFrame({
@@ -118,9 +130,10 @@ def test_investment_recommendation_service_train_model(sample_service):
     assert 'model_version' in training_results
 
 def test_investment_recommendation_service_update_model(sample_service):
-    with patch('src.services.investment_recommendation_service.load_model') as mock_load_model:
-        mock_load_model.return_value = InvestmentRecommendationModel()
+    with patch('src.ml.src.services.investment_recommendation_service.model_registry') as mock_registry:
+        mock_registry.reload.return_value = InvestmentRecommendationModel()
         result = sample_service.update_model('path/to/new/model.h5')
+        mock_registry.reload.assert_called_once()
     
     assert result is True
     assert isinstance(sample_service.model, InvestmentRecommendationModel)
@@ -1,7 +1,14 @@
+import asyncio
+import httpx
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 import json
+from src.ml.src.api import ml_api
 from src.ml.src.api.ml_api import app
+from src.ml.src.inference import spending_predictor
+from src.ml.src.inference.batching import MicroBatcher
+from src.ml.src.inference.model_registry import SPENDING_PREDICTION
 
 client = TestClient(app)
 
@@ -176,4 +183,40 @@ Human tasks:
 2. Add more edge cases and boundary value tests for each endpoint (Required)
 3. Implement integration tests that cover the entire ML pipeline (Optional)
 4. Add performance tests to ensure the API endpoints meet response time requirements (Optional)
-"""
\ No newline at end of file
+"""
+class FakeSpendingModel:
+    """Predicts the latest historical spending and records the batch sizes it receives"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, features, history=None):
+        self.calls.append(len(features))
+        return np.array([history[i][-1] for i in range(len(history))])
+
+def test_concurrent_spending_requests_are_batched(monkeypatch):
+    model = FakeSpendingModel()
+    monkeypatch.setattr(spending_predictor, 'load_spending_prediction_model', lambda: model)
+    # A fresh batcher, bound to the event loop of this test
+    batcher = MicroBatcher(SPENDING_PREDICTION, spending_predictor.predict_spending_batch, max_wait_ms=50,
+                           executor=ml_api.inference_executor)
+    monkeypatch.setitem(ml_api.batchers, SPENDING_PREDICTION, batcher)
+
+    users = [{'historical_spending': [100.0, float(i)], 'income': 10.0, 'month': 1} for i in range(8)]
+    users.insert(3, {'historical_spending': 'abc', 'income': 10.0, 'month': 1})
+
+    async def send_all():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as async_client:
+            responses = await asyncio.gather(*(async_client.post('/predict-spending', json=user) for user in users))
+        await batcher.close()
+        return responses
+
+    responses = asyncio.run(send_all())
+
+    # The invalid user fails on its own with a 400, without failing its batch
+    assert responses[3].status_code == 400
+    assert 'historical_spending' in responses[3].json()['detail']
+    del responses[3]
+    assert [response.status_code for response in responses] == [200] * 8
+    assert [response.json()['predicted_spending'] for response in responses] == [float(i) for i in range(8)]
+    assert sum(model.calls) == 8 and len(model.calls) < 8
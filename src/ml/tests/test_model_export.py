@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel, CREDIT_SCORE_PREDICTION_MODEL
+from src.ml.src.models.transaction_categorization import TransactionCategorizationModel
+from src.ml.src.inference.lite_runtime import LiteModel
+from src.ml.src.utils.model_export import export_to_tflite, check_tflite_parity
+
+ML_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+SAMPLE_TRANSACTIONS = pd.DataFrame({
+    'amount': [100.0, 50.0, 200.0, 75.0, 300.0],
+    'description': ['Grocery store', 'Gas station', 'Restaurant', 'Online shopping', 'Utility bill'],
+    'date': pd.date_range('2023-01-01', periods=5),
+    'category': ['Groceries', 'Transportation', 'Dining', 'Shopping', 'Bills']
+})
+
+@pytest.fixture
+def credit_model_path(tmp_path):
+    model = CreditScorePredictionModel()
+    model_path = str(tmp_path / 'credit_score_prediction_model.h5')
+    model.model.save(model_path)
+    export_to_tflite(model.model, model_path)
+    return model, model_path
+
+def test_tflite_export_matches_keras(credit_model_path):
+    model, model_path = credit_model_path
+    inputs = np.random.RandomState(0).normal(size=(32, CREDIT_SCORE_PREDICTION_MODEL['input_dim']))
+
+    parity = check_tflite_parity(model.model, model_path, inputs)
+
+    assert parity['passed']
+    assert parity['rows'] == 32
+
+def test_lite_model_handles_changing_batch_sizes(credit_model_path):
+    model, model_path = credit_model_path
+    lite_model = LiteModel(model_path)
+    inputs = np.random.RandomState(1).normal(size=(5, CREDIT_SCORE_PREDICTION_MODEL['input_dim'])).astype(np.float32)
+
+    batch_output = lite_model.predict(inputs)
+    single_outputs = np.concatenate([lite_model.predict(inputs[i:i + 1]) for i in range(5)])
+
+    np.testing.assert_allclose(batch_output, single_outputs, atol=1e-6)
+
+def test_multi_input_export_keeps_input_order(tmp_path):
+    model = TransactionCategorizationModel()
+    inputs, _ = model.preprocess_data(SAMPLE_TRANSACTIONS, fit=True)
+    model.build_model()
+    model_path = str(tmp_path / 'transaction_categorization_model.h5')
+    export_to_tflite(model.model, model_path)
+
+    parity = check_tflite_parity(model.model, model_path, inputs)
+
+    assert parity['passed']
+    # The LSTM only converts with static shapes, so larger batches run in slices
+    assert LiteModel(model_path).metadata['batch_size'] == 1
+
+def test_export_script_exports_a_saved_model(tmp_path):
+    model = CreditScorePredictionModel()
+    features = [f'feature_{i}' for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])]
+    data = pd.DataFrame(np.random.RandomState(3).normal(size=(20, len(features))), columns=features)
+    model.train(data, data.sum(axis=1) * 10 + 650, epochs=1)
+    model_path = str(tmp_path / 'credit_score_prediction_model.h5')
+    model.save_model(model_path)
+    data.to_csv(tmp_path / 'sample.csv', index=False)
+
+    # Scripts import the source tree as 'src', so they run from src/ml
+    result = subprocess.run([sys.executable, '-m', 'scripts.export_lite_models', '--model-type', 'credit',
+                             '--model-path', model_path, '--sample-data', str(tmp_path / 'sample.csv')],
+                            cwd=ML_ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    # The report is printed last; TensorFlow may print to stdout before it
+    output = '\n' + result.stdout
+    assert json.loads(output[output.rindex('\n{'):])['credit']['passed']
@@ -0,0 +1,61 @@
+import threading
+import pytest
+
+from src.ml.src.inference.model_registry import ModelRegistry
+
+class StubModel:
+    def __init__(self, path):
+        self.path = path
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry()
+    registry.loads = []
+
+    def loader(path):
+        registry.loads.append(path)
+        return StubModel(path)
+
+    registry.register('stub', loader, 'models/stub_v1.h5')
+    return registry
+
+def test_get_loads_model_once(registry):
+    first = registry.get('stub')
+    second = registry.get('stub')
+
+    assert first is second
+    assert registry.loads == ['models/stub_v1.h5']
+
+def test_concurrent_first_requests_load_once(registry):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('stub'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(registry.loads) == 1
+    assert all(model is results[0] for model in results)
+
+def test_reload_swaps_without_invalidating_existing_handles(registry):
+    in_flight = registry.get('stub')
+
+    registry.reload('stub', 'models/stub_v2.h5', '2.0.0')
+
+    assert in_flight.path == 'models/stub_v1.h5'
+    assert registry.get('stub').path == 'models/stub_v2.h5'
+    assert registry.get_version('stub') == '2.0.0'
+
+def test_load_all_reports_failures(registry):
+    def failing_loader(path):
+        raise FileNotFoundError(path)
+
+    registry.register('missing', failing_loader, 'models/missing.h5')
+    errors = registry.load_all()
+
+    assert list(errors) == ['missing']
+    assert registry.get_model_info()['stub']['loaded'] is True
+
+def test_unknown_model_raises(registry):
+    with pytest.raises(KeyError):
+        registry.get('unknown')
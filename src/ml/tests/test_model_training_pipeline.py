@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.scripts.model_training_pipeline import MODEL_TRAINERS, train_and_evaluate, train_all_models, select_model_data
+from src.ml.src.inference.model_registry import MODEL_PATHS
+from src.ml.src.models.credit_score_prediction import CREDIT_SCORE_PREDICTION_MODEL
+
+ROWS = 80
+
+def training_data(model_type):
+    rng = np.random.RandomState(0)
+    if model_type == 'transaction':
+        return pd.DataFrame({
+            'description': rng.choice(['Grocery store', 'Gas station', 'Restaurant', 'Utility bill'], size=ROWS),
+            'amount': rng.uniform(5, 300, size=ROWS),
+            'date': pd.date_range('2023-01-01', periods=ROWS, freq='D'),
+            'category': rng.choice(['Groceries', 'Transportation', 'Dining'], size=ROWS),
+        })
+    if model_type == 'spending':
+        return pd.DataFrame({
+            'historical_spending': [rng.uniform(100, 500, size=rng.randint(1, 13)).tolist() for _ in range(ROWS)],
+            'income': rng.uniform(2000, 8000, size=ROWS),
+            'month': rng.randint(1, 13, size=ROWS),
+            'target_spending': rng.uniform(100, 500, size=ROWS),
+        })
+    if model_type == 'investment':
+        return pd.DataFrame({
+            'age': rng.randint(20, 70, size=ROWS),
+            'income': rng.uniform(20000, 150000, size=ROWS),
+            'risk_tolerance': rng.choice(['low', 'medium', 'high'], size=ROWS),
+            'investment_horizon': rng.randint(1, 30, size=ROWS),
+            'investment_allocation': rng.randint(0, 5, size=ROWS),
+        })
+    features = [f'feature_{i}' for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])]
+    data = pd.DataFrame(rng.normal(size=(ROWS, len(features))), columns=features)
+    data['credit_score'] = data.sum(axis=1) * 10 + 650
+    return data
+
+@pytest.mark.parametrize('model_type', sorted(MODEL_TRAINERS))
+def test_every_model_type_is_trained_evaluated_and_saved(model_type, tmp_path, monkeypatch):
+    # Models and checkpoints are written to relative paths by default
+    monkeypatch.chdir(tmp_path)
+    _, _, model_name, _ = MODEL_TRAINERS[model_type]
+
+    result = train_and_evaluate(model_type, training_data(model_type), {'epochs': 2})
+
+    assert result['status'] == 'trained'
+    assert result['metrics'] and all(np.isfinite(value) for value in result['metrics'].values())
+    assert result['model_path'] == MODEL_PATHS[model_name]
+    assert os.path.exists(result['model_path'])
+
+def test_pooled_data_is_split_by_model_type():
+    pool = pd.concat([training_data(model_type) for model_type in sorted(MODEL_TRAINERS)], ignore_index=True)
+
+    spending = select_model_data('spending', pool)
+
+    assert list(spending.columns) == ['historical_spending', 'income', 'month', 'target_spending']
+    assert len(spending) == ROWS and spending['historical_spending'].notna().all()
+    with pytest.raises(ValueError):
+        select_model_data('credit', training_data('spending'))
+
+def test_all_models_are_trained_from_one_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pool = pd.concat([training_data(model_type) for model_type in sorted(MODEL_TRAINERS)], ignore_index=True)
+
+    report = train_all_models(pool, {model_type: {'epochs': 2} for model_type in MODEL_TRAINERS}, max_workers=2)
+
+    assert set(report) == set(MODEL_TRAINERS)
+    for model_type, result in report.items():
+        assert result['status'] == 'trained', result.get('error')
+        assert all(np.isfinite(value) for value in result['metrics'].values())
+        assert os.path.exists(result['model_path'])
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel, CREDIT_SCORE_PREDICTION_MODEL
+from src.ml.src.models.spending_prediction import build_model as build_spending_model, SPENDING_PREDICTION_MODEL
+from src.ml.src.models.investment_recommendation import InvestmentRecommendationModel, INVESTMENT_RECOMMENDATION_MODEL
+from src.ml.src.models.transaction_categorization import TransactionCategorizationModel
+from src.ml.src.inference.numpy_backend import NumpyDenseModel
+
+def keras_models():
+    return [
+        (CreditScorePredictionModel().model, CREDIT_SCORE_PREDICTION_MODEL['input_dim']),
+        (build_spending_model(), len(SPENDING_PREDICTION_MODEL['feature_columns'])),
+        # The categorical features are one-hot encoded, so the network is wider than the input features
+        (InvestmentRecommendationModel().model, len(INVESTMENT_RECOMMENDATION_MODEL['numerical_features'])
+         + sum(len(categories) for categories in INVESTMENT_RECOMMENDATION_MODEL['categories'].values())),
+    ]
+
+@pytest.mark.parametrize('dtype, atol', [('float32', 1e-5), ('float16', 1e-2), ('int8', 5e-2)])
+def test_matches_keras(dtype, atol):
+    for keras_model, input_dim in keras_models():
+        inputs = np.random.RandomState(0).normal(size=(64, input_dim)).astype(np.float32)
+
+        expected = keras_model.predict(inputs)
+        actual = NumpyDenseModel.from_keras(keras_model, dtype=dtype).predict(inputs)
+
+        assert actual.shape == expected.shape
+        np.testing.assert_allclose(actual, expected, atol=atol, rtol=atol)
+
+def test_single_row_matches_batch():
+    keras_model, input_dim = keras_models()[0]
+    model = NumpyDenseModel.from_keras(keras_model)
+    inputs = np.random.RandomState(1).normal(size=(8, input_dim))
+
+    batch = model.predict(inputs)
+    rows = np.concatenate([model.predict(inputs[i:i + 1]) for i in range(8)])
+
+    np.testing.assert_allclose(batch, rows, atol=1e-6)
+
+@pytest.mark.parametrize('dtype', ['float32', 'float16', 'int8'])
+def test_save_and_load(dtype, tmp_path):
+    keras_model, input_dim = keras_models()[1]
+    model = NumpyDenseModel.from_keras(keras_model, dtype=dtype)
+    inputs = np.random.RandomState(2).normal(size=(4, input_dim))
+
+    model.save(tmp_path / 'model_numpy.npz')
+    loaded = NumpyDenseModel.load(tmp_path / 'model_numpy.npz')
+
+    np.testing.assert_array_equal(loaded.predict(inputs), model.predict(inputs))
+    assert loaded.dtype == dtype
+
+def test_lstm_model_is_rejected():
+    model = TransactionCategorizationModel()
+    model.num_classes = 3
+    model.build_model()
+
+    with pytest.raises(ValueError):
+        NumpyDenseModel.from_keras(model.model)
+
+def test_unsupported_dtype():
+    with pytest.raises(ValueError):
+        NumpyDenseModel([(np.ones((2, 1)), np.zeros(1), 'linear')], dtype='int4')
@@ -0,0 +1,26 @@
+import os
+import pytest
+
+from src.ml.src.training.parallel_training import plan_cpu_assignments, run_pinned, available_cpus
+
+def test_cpus_are_split_into_disjoint_groups():
+    assert plan_cpu_assignments(4, cpus=range(8)) == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert plan_cpu_assignments(3, cpus=range(8)) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert plan_cpu_assignments(4, cpus=[0, 1]) == [[0], [1], [0], [1]]
+
+@pytest.mark.skipif(not hasattr(os, 'sched_getaffinity'), reason="CPU affinity is not supported on this platform")
+def test_tasks_run_pinned_in_separate_processes():
+    previous = os.environ.get('OMP_NUM_THREADS')
+
+    futures = run_pinned({'first': os.sched_getaffinity, 'second': os.sched_getaffinity,
+                          'threads': os.getenv, 'pid': os.getpid},
+                         {'first': (0,), 'second': (0,), 'threads': ('OMP_NUM_THREADS',), 'pid': ()},
+                         max_workers=2)
+
+    groups = plan_cpu_assignments(2)
+    assert futures['first'].result() == set(groups[0])
+    assert futures['second'].result() == set(groups[1])
+    assert futures['threads'].result() == str(len(groups[0]))
+    assert futures['pid'].result() != os.getpid()
+    assert os.environ.get('OMP_NUM_THREADS') == previous
+    assert set().union(*groups) <= set(available_cpus())
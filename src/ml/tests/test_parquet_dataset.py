@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.ml.src.utils.parquet_dataset import (write_dataset, read_dataset, read_manifest, iter_dataset_chunks,
+                                              build_filters, is_dataset, list_dataset_files, read_dataset_file)
+
+def transactions(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'transaction_id': [f't{seed}-{i}' for i in range(n)],
+        'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.randint(0, 120, size=n), unit='D'),
+        'institution': rng.choice(['Bank A', 'Bank B'], size=n),
+        'category': rng.choice(['Groceries', 'Dining'], size=n),
+        'month': rng.randint(1, 13, size=n),
+        'amount': np.round(rng.uniform(1, 200, size=n), 2),
+    })
+
+def test_write_partitions_by_month_and_institution(tmp_path):
+    df = transactions(500)
+
+    manifest = write_dataset(df, str(tmp_path), batch_id='batch-1')
+
+    assert is_dataset(str(tmp_path))
+    assert manifest['rows'] == 500
+    assert sum(partition['rows'] for partition in manifest['partitions'].values()) == 500
+    assert 'year_month=2023-01/institution=Bank A' in manifest['partitions']
+    assert read_manifest(str(tmp_path)) == manifest
+
+    full = read_dataset(str(tmp_path)).sort_values('transaction_id').reset_index(drop=True)
+    expected = df.sort_values('transaction_id').reset_index(drop=True)
+    pd.testing.assert_series_equal(full['amount'], expected['amount'])
+    assert full['month'].tolist() == expected['month'].tolist()
+    assert (full['date'] == expected['date']).all()
+
+def test_projection_and_filters(tmp_path):
+    df = transactions(1000)
+    write_dataset(df, str(tmp_path), batch_id='batch-1')
+
+    filters = build_filters(start_month='2023-02', end_month='2023-03', institutions=['Bank B']) + [('amount', '>', 100)]
+    selected = read_dataset(str(tmp_path), columns=['transaction_id', 'amount'], filters=filters)
+
+    months = df['date'].dt.strftime('%Y-%m')
+    expected = df[months.between('2023-02', '2023-03') & (df['institution'] == 'Bank B') & (df['amount'] > 100)]
+    assert list(selected.columns) == ['transaction_id', 'amount']
+    assert sorted(selected['transaction_id']) == sorted(expected['transaction_id'])
+
+def test_rewriting_a_batch_replaces_its_rows(tmp_path):
+    write_dataset(transactions(300, seed=0), str(tmp_path), batch_id='batch-1')
+    write_dataset(transactions(200, seed=1), str(tmp_path), batch_id='batch-2')
+
+    manifest = write_dataset(transactions(100, seed=1), str(tmp_path), batch_id='batch-2')
+
+    assert manifest['rows'] == 400
+    assert len(read_dataset(str(tmp_path))) == 400
+    assert sum(len(chunk) for chunk in iter_dataset_chunks(str(tmp_path), chunk_size=64)) == 400
+
+def test_files_are_listed_in_month_order_and_read_one_by_one(tmp_path):
+    df = transactions(600)
+    write_dataset(df, str(tmp_path), batch_id='batch-1')
+
+    filters = build_filters(start_month='2023-02') + [('amount', '>', 50)]
+    files = list_dataset_files(str(tmp_path), filters)
+    parts = [read_dataset_file(path, str(tmp_path), columns=['transaction_id', 'year_month'], filters=filters)
+             for path in files]
+
+    assert len(files) == 6
+    assert [part['year_month'].iloc[0] for part in parts] == sorted(part['year_month'].iloc[0] for part in parts)
+    expected = df[(df['date'] >= '2023-02-01') & (df['amount'] > 50)]
+    assert sorted(pd.concat(parts)['transaction_id']) == sorted(expected['transaction_id'])
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+from src.ml.src.preprocessing.artifacts import (fit_standardization, apply_standardization, save_scaler, load_scaler,
+                                                save_one_hot_encoder, load_one_hot_encoder, save_label_encoder,
+                                                load_label_encoder, dense_one_hot_encoder)
+
+def test_standardization_uses_fitted_statistics():
+    stats = fit_standardization(pd.Series([10.0, 20.0, 30.0]))
+
+    single = apply_standardization(pd.Series([20.0]), stats)
+    batch = apply_standardization(pd.Series([20.0, 40.0]), stats)
+
+    assert single[0, 0] == batch[0, 0] == 0.0
+
+def test_constant_feature_does_not_divide_by_zero():
+    stats = fit_standardization(pd.Series([5.0, 5.0]))
+
+    assert stats['std'] == 1.0
+
+def test_scaler_round_trip(tmp_path):
+    data = np.array([[1.0, 100.0], [2.0, 300.0], [3.0, 200.0]])
+    scaler = StandardScaler().fit(data)
+
+    save_scaler(scaler, tmp_path / 'scaler.npz')
+    loaded = load_scaler(tmp_path / 'scaler.npz')
+
+    np.testing.assert_array_equal(loaded.transform(data), scaler.transform(data))
+
+def test_one_hot_encoder_round_trip(tmp_path):
+    data = pd.DataFrame({'risk_tolerance': ['low', 'medium', 'high']})
+    encoder = dense_one_hot_encoder(handle_unknown='ignore').fit(data)
+
+    save_one_hot_encoder(encoder, tmp_path / 'encoder.json')
+    loaded = load_one_hot_encoder(tmp_path / 'encoder.json')
+
+    np.testing.assert_array_equal(loaded.transform(data), encoder.transform(data))
+    assert loaded.transform(pd.DataFrame({'risk_tolerance': ['unknown']})).sum() == 0
+
+def test_label_encoder_round_trip(tmp_path):
+    encoder = LabelEncoder().fit(['Groceries', 'Dining', 'Bills'])
+
+    save_label_encoder(encoder, tmp_path / 'labels.json')
+    loaded = load_label_encoder(tmp_path / 'labels.json')
+
+    assert loaded.inverse_transform([0, 1, 2]).tolist() == encoder.inverse_transform([0, 1, 2]).tolist()
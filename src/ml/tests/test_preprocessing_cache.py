@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.ml.src.preprocessing.preprocessing_cache import (PreprocessingCache, cached_preprocessing, fingerprint_code,
+                                                          fingerprint_data_source)
+from src.ml.src.preprocessing import sequences, chunk_statistics
+
+@pytest.fixture
+def cache(tmp_path):
+    return PreprocessingCache(str(tmp_path / 'cache'), max_entries=2)
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'transactions.csv'
+    path.write_text('amount\n1.0\n2.0\n')
+    return str(path)
+
+class CountingPreprocessing:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return pd.DataFrame({'amount': np.arange(5, dtype=np.float64), 'category': list('abcab')},
+                            index=pd.Index([10, 11, 12, 13, 14]))
+
+def test_second_run_reuses_the_cached_result(cache, data_file):
+    preprocess = CountingPreprocessing()
+
+    first = cached_preprocessing(data_file, preprocess, [sequences.compute_history_features], {'columns': None}, cache)
+    second = cached_preprocessing(data_file, preprocess, [sequences.compute_history_features], {'columns': None}, cache)
+
+    assert preprocess.calls == 1
+    pd.testing.assert_frame_equal(first, second)
+
+def test_changed_input_or_config_is_preprocessed_again(cache, data_file):
+    preprocess = CountingPreprocessing()
+    functions = [sequences.compute_history_features]
+
+    cached_preprocessing(data_file, preprocess, functions, {'columns': None}, cache)
+    cached_preprocessing(data_file, preprocess, functions, {'columns': ['amount']}, cache)
+    with open(data_file, 'a') as f:
+        f.write('3.0\n')
+    cached_preprocessing(data_file, preprocess, functions, {'columns': None}, cache)
+
+    assert preprocess.calls == 3
+    assert len([name for name in os.listdir(cache.directory) if not name.startswith('.')]) == 2
+
+def test_code_fingerprint_depends_on_the_functions():
+    assert fingerprint_code([sequences.compute_history_features]) == fingerprint_code([sequences.RaggedArray])
+    assert fingerprint_code([sequences.compute_history_features]) != fingerprint_code([chunk_statistics.ChunkStatistics])
+
+def test_database_queries_are_not_cached(cache):
+    preprocess = CountingPreprocessing()
+
+    assert fingerprint_data_source('SELECT * FROM transactions') is None
+    cached_preprocessing('SELECT * FROM transactions', preprocess, [], None, cache)
+    cached_preprocessing('SELECT * FROM transactions', preprocess, [], None, cache)
+
+    assert preprocess.calls == 2
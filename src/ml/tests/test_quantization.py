@@ -0,0 +1,70 @@
+import os
+import sys
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.src.models.credit_score_prediction import CreditScorePredictionModel, CREDIT_SCORE_PREDICTION_MODEL
+from src.ml.src.inference.lite_runtime import get_tflite_path
+from src.ml.src.evaluation.model_evaluation import check_metric_drop, compare_metrics
+from src.ml.src.utils.model_export import prune_model
+from src.ml.src.utils.quantization import quantize_model
+
+def credit_data(rows=200):
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.normal(size=(rows, CREDIT_SCORE_PREDICTION_MODEL['input_dim'])),
+                     columns=[f'feature_{i}' for i in range(CREDIT_SCORE_PREDICTION_MODEL['input_dim'])])
+    y = pd.Series(X.sum(axis=1) * 10 + 650)
+    return X, y
+
+@pytest.fixture
+def credit_model_path(tmp_path):
+    X, y = credit_data()
+    model = CreditScorePredictionModel()
+    model.preprocess_data(X, fit=True)
+    model_path = str(tmp_path / 'credit_score_prediction_model.h5')
+    model.model.save(model_path)
+    return model, model_path, X, y
+
+def test_quantized_model_within_tolerance_is_promoted(credit_model_path):
+    model, model_path, X, y = credit_model_path
+
+    report = quantize_model(model, model_path, X[:50], X[50:], y[50:], max_metric_drop=1.0)
+
+    assert report['passed'] and report['promoted']
+    assert os.path.exists(get_tflite_path(model_path))
+    assert report['size_bytes']['int8'] < report['size_bytes']['keras']
+    assert set(report['metric_deltas']) == {'mse', 'rmse', 'r2_score'}
+
+def test_quantized_model_over_tolerance_is_refused(credit_model_path):
+    model, model_path, X, y = credit_model_path
+
+    report = quantize_model(model, model_path, X[:50], X[50:], y[50:], max_metric_drop=-np.inf)
+
+    assert not report['passed'] and not report['promoted']
+    assert not os.path.exists(get_tflite_path(model_path))
+
+def test_check_metric_drop_direction():
+    assert check_metric_drop({'accuracy': 0.90}, {'accuracy': 0.895}, 'accuracy', 0.01) == (True, pytest.approx(0.005))
+    assert not check_metric_drop({'mse': 1.0}, {'mse': 1.5}, 'mse', 0.1, higher_is_better=False)[0]
+    assert compare_metrics({'mse': 1.0, 'r2_score': 0.5}, {'mse': 1.5}) == {'mse': 0.5}
+
+def test_prune_model_reaches_sparsity():
+    model = CreditScorePredictionModel().model
+
+    sparsity = prune_model(model, 0.5)
+
+    assert sparsity == pytest.approx(0.5, abs=0.05)
+    kernels = [weights for layer in model.layers for weights in layer.get_weights() if weights.ndim >= 2]
+    assert all(np.mean(kernel == 0) >= 0.45 for kernel in kernels)
+
+def test_quantize_script_starts():
+    # The script loads its data through utils.data_loader, which needs SQLAlchemy
+    pytest.importorskip('sqlalchemy')
+    # Scripts import the source tree as 'src', so they run from src/ml
+    result = subprocess.run([sys.executable, '-m', 'scripts.quantize_models', '--help'],
+                            cwd=os.path.join(os.path.dirname(__file__), '..'), capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert '--max-metric-drop' in result.stdout
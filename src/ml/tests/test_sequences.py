@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.ml.src.preprocessing.sequences import RaggedArray, compute_history_features, compute_seasonality_features
+
+def test_ragged_array_round_trip():
+    sequences = [[1.0, 2.0, 3.0], [], [4.0], [5.0, 6.0]]
+    ragged = RaggedArray.from_sequences(sequences)
+
+    assert len(ragged) == 4
+    assert ragged.lengths.tolist() == [3, 0, 1, 2]
+    assert ragged.offsets.tolist() == [0, 3, 3, 4, 6]
+    assert ragged.to_lists() == sequences
+
+def test_invalid_offsets_are_rejected():
+    with pytest.raises(ValueError):
+        RaggedArray(np.arange(3.0), np.array([0, 2, 1, 3]))
+
+def test_history_features_match_per_user_computation():
+    rng = np.random.RandomState(0)
+    sequences = [rng.uniform(0, 100, size=length).tolist() for length in [0, 1, 2, 5, 12, 20]]
+
+    features = compute_history_features(RaggedArray.from_sequences(sequences))
+
+    for i, sequence in enumerate(sequences):
+        values = np.array(sequence)
+        assert features['history_length'][i] == len(values)
+        assert features['lag_1'][i] == (values[-1] if len(values) else 0.0)
+        assert features['lag_12'][i] == (values[-12] if len(values) >= 12 else 0.0)
+        assert features['rolling_sum_3'][i] == pytest.approx(values[-3:].sum())
+        assert features['rolling_sum_12'][i] == pytest.approx(values[-12:].sum())
+        expected_trend = (values[-3:].mean() - values[-6:-3].mean()) if len(values) >= 6 else 0.0
+        assert features['trend_3'][i] == pytest.approx(expected_trend)
+
+def test_seasonality_wraps_around_the_year():
+    features = compute_seasonality_features(np.array([1, 12, 7]))
+
+    december_to_january = np.hypot(features['month_sin'][1] - features['month_sin'][0],
+                                   features['month_cos'][1] - features['month_cos'][0])
+    assert december_to_january == pytest.approx(2 * np.sin(np.pi / 12))
+    assert features['month_cos'][2] == pytest.approx(-1.0)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.ml.src.inference import spending_predictor
+from src.ml.src.inference.spending_predictor import SpendingPredictor, build_feature_frame
+
+class FakeSpendingModel:
+    """Predicts income * month + the latest historical spending and records the batch sizes it receives"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, features, history=None):
+        self.calls.append(len(features))
+        latest = np.array([history[i][-1] for i in range(len(history))])
+        return features['income'].to_numpy() * features['month'].to_numpy() + latest
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeSpendingModel()
+    monkeypatch.setattr(spending_predictor, 'load_spending_prediction_model', lambda: model)
+    return model
+
+def test_batch_predict_runs_one_forward_pass(fake_model):
+    users = [{'historical_spending': [80.0, 100.0], 'income': 10.0, 'month': m} for m in range(1, 13)]
+
+    predictions = SpendingPredictor().batch_predict(users)
+
+    assert fake_model.calls == [12]
+    assert predictions == [10.0 * m + 100.0 for m in range(1, 13)]
+
+def test_invalid_users_become_per_item_errors(fake_model):
+    users = [
+        {'historical_spending': [90.0, 100.0], 'income': 10.0, 'month': 2},
+        {'historical_spending': 'abc', 'income': 10.0, 'month': 2},
+        {'income': 10.0, 'month': 2},
+        {'historical_spending': [50.0], 'month': 13},
+        {'historical_spending': 50.0},
+    ]
+
+    predictions = SpendingPredictor().batch_predict(users)
+
+    assert fake_model.calls == [2]
+    assert predictions[0] == 120.0 and predictions[4] == 50.0
+    assert all(isinstance(prediction, ValueError) for prediction in predictions[1:4])
+    assert 'historical_spending' in str(predictions[2])
+
+def test_predict_raises_for_invalid_user(fake_model):
+    assert SpendingPredictor().predict({'historical_spending': 5.0, 'income': 2.0, 'month': 3}) == 11.0
+    with pytest.raises(ValueError):
+        SpendingPredictor().predict({'historical_spending': np.nan})
+
+def test_empty_batch_skips_model(fake_model):
+    features, history, errors = build_feature_frame([])
+
+    assert SpendingPredictor().batch_predict([]) == []
+    assert len(features) == 0 and len(history) == 0 and errors == []
+    assert fake_model.calls == []
+
+def test_histories_are_passed_as_ragged_array(fake_model):
+    features, history, errors = build_feature_frame([
+        {'historical_spending': [1.0, 2.0, 3.0], 'income': 1.0, 'month': 1},
+        {'historical_spending': [1.0, 'x'], 'income': 1.0, 'month': 1},
+        {'historical_spending': [4.0], 'income': 1.0, 'month': 1},
+    ])
+
+    assert history.to_lists() == [[1.0, 2.0, 3.0], [4.0]]
+    assert len(features) == 2
+    assert isinstance(errors[1], ValueError)
@@ -0,0 +1,90 @@
+import json
+import asyncio
+import pytest
+
+from src.ml.src.api.streaming import iter_ndjson_records, iter_arrow_records, iter_chunks, to_ndjson_line, RecordError
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+@pytest.fixture(autouse=True)
+def event_loop_for_test():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+async def byte_stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+def test_ndjson_lines_split_across_chunks():
+    chunks = [b'{"description": "Coff', b'ee", "amount": 3.5}\n{"descr', b'iption": "Rent", "amount": 1200}']
+
+    records = run(collect(iter_ndjson_records(byte_stream(chunks))))
+
+    assert records == [{"description": "Coffee", "amount": 3.5}, {"description": "Rent", "amount": 1200}]
+
+def test_malformed_lines_keep_their_position():
+    chunks = [b'{"amount": 1}\n\nnot json\n[1, 2]\n{"amount": 2}\n']
+
+    records = run(collect(iter_ndjson_records(byte_stream(chunks))))
+
+    assert len(records) == 4
+    assert records[0] == {"amount": 1}
+    assert isinstance(records[1], RecordError)
+    assert isinstance(records[2], RecordError)
+    assert records[3] == {"amount": 2}
+
+def test_records_are_chunked():
+    chunks = run(collect(iter_chunks(byte_stream(range(5)), chunk_size=2)))
+
+    assert chunks == [[0, 1], [2, 3], [4]]
+
+def test_ndjson_line_round_trip():
+    line = to_ndjson_line({"description": "Coffee", "category": "Food"})
+
+    assert line.endswith(b'\n')
+    assert json.loads(line) == {"description": "Coffee", "category": "Food"}
+
+def arrow_stream_bytes(batches, rows_per_batch):
+    pa = pytest.importorskip('pyarrow')
+    sink = pa.BufferOutputStream()
+    schema = pa.schema([('description', pa.string()), ('amount', pa.float64())])
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for b in range(batches):
+            writer.write_batch(pa.record_batch([[f'txn {b}-{i}' for i in range(rows_per_batch)],
+                                                [float(b * rows_per_batch + i) for i in range(rows_per_batch)]], schema=schema))
+    return sink.getvalue().to_pybytes()
+
+def test_arrow_records_are_read_while_uploading():
+    body = arrow_stream_bytes(batches=20, rows_per_batch=50)
+    pieces = [body[i:i + 512] for i in range(0, len(body), 512)]
+    received = []
+
+    async def slow_upload():
+        for piece in pieces:
+            received.append(piece)
+            await asyncio.sleep(0.001)
+            yield piece
+
+    async def first_record_and_rest():
+        records = iter_arrow_records(slow_upload())
+        first = await records.__anext__()
+        pieces_at_first_record = len(received)
+        return [first] + [record async for record in records], pieces_at_first_record
+
+    records, pieces_at_first_record = run(first_record_and_rest())
+
+    assert [record['amount'] for record in records] == [float(i) for i in range(1000)]
+    assert records[0] == {'description': 'txn 0-0', 'amount': 0.0}
+    assert pieces_at_first_record < len(pieces)
+
+def test_truncated_arrow_stream_raises():
+    body = arrow_stream_bytes(batches=3, rows_per_batch=10)
+
+    with pytest.raises(Exception):
+        run(collect(iter_arrow_records(byte_stream([body[:len(body) // 2]]))))
@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.ml.src.preprocessing.text_hashing import HashingVectorizer
+
+def test_sequences_have_a_fixed_length_and_id_range():
+    vectorizer = HashingVectorizer(num_buckets=1000, max_length=30)
+    sequences = vectorizer.transform(['Grocery store', 'UBER TRIP HELP.UBER.COM 1234', '', None])
+
+    assert sequences.shape == (4, 30) and sequences.dtype == np.int32
+    assert sequences.max() < 1000
+    # 2 words, 1 word bigram and the 3- and 4-grams of '<grocery>' and '<store>'; padding is at the start
+    assert (sequences[0, :-25] == 0).all() and (sequences[0, -25:] > 0).all()
+    # Long texts keep their first features; empty and missing texts are all padding
+    assert (sequences[1] > 0).all()
+    assert not sequences[2:].any()
+
+def test_features_are_words_word_ngrams_and_character_ngrams_in_text_order():
+    vectorizer = HashingVectorizer(num_buckets=2**20, max_length=50, word_ngrams=2, char_ngrams=[3])
+    ids = vectorizer.hash_ids(np.array(['ab', '#<ab', '#ab>', 'cd', 'ab cd', '#<cd', '#cd>'], dtype=object))
+
+    assert vectorizer.transform(['AB, cd'])[0, -7:].tolist() == ids.tolist()
+
+def test_hashing_is_stateless_and_batch_independent():
+    texts = ['Starbucks 4521', 'Shell Oil 5733', 'Netflix.com']
+    batch = HashingVectorizer().transform(texts)
+    one_by_one = np.vstack([HashingVectorizer().transform([text]) for text in texts])
+    np.testing.assert_array_equal(batch, one_by_one)
+
+    config = HashingVectorizer(num_buckets=4096, max_length=20, char_ngrams=[3, 5]).get_config()
+    np.testing.assert_array_equal(HashingVectorizer.from_config(config).transform(texts),
+                                  HashingVectorizer(**config).transform(texts))
+
+def test_unseen_merchant_shares_character_ngrams():
+    vectorizer = HashingVectorizer()
+    seen, unseen = vectorizer.transform(['starbucks']), vectorizer.transform(['starbuck'])
+    shared = (set(seen[seen > 0]) & set(unseen[unseen > 0]))
+    assert len(shared) >= 5
@@ -0,0 +1,43 @@
+import math
+import pytest
+
+from src.ml.src.training.callbacks import (TRAINING_CALLBACKS_CONFIG, TrainingReport, callback_settings,
+                                           scheduled_learning_rate, exceeds_time_budget)
+
+def test_model_configuration_overrides_the_defaults():
+    settings = callback_settings({'callbacks': {'patience': 3, 'lr_schedule': 'cosine'}}, time_budget_seconds=60)
+    assert settings['patience'] == 3 and settings['lr_schedule'] == 'cosine'
+    assert settings['time_budget_seconds'] == 60
+    assert settings['monitor'] == TRAINING_CALLBACKS_CONFIG['monitor']
+    assert callback_settings()['patience'] == TRAINING_CALLBACKS_CONFIG['patience']
+
+    with pytest.raises(ValueError):
+        callback_settings({'callbacks': {'lr_schedule': 'linear'}})
+
+def test_learning_rate_schedules():
+    settings = callback_settings(lr_factor=0.5, lr_step_epochs=10, lr_decay=0.9, min_learning_rate=1e-4)
+
+    assert scheduled_learning_rate(25, 0.01, 100, dict(settings, lr_schedule='step')) == pytest.approx(0.0025)
+    assert scheduled_learning_rate(2, 0.01, 100, dict(settings, lr_schedule='exponential')) == pytest.approx(0.0081)
+    cosine = dict(settings, lr_schedule='cosine')
+    assert scheduled_learning_rate(0, 0.01, 100, cosine) == pytest.approx(0.01)
+    assert scheduled_learning_rate(50, 0.01, 100, cosine) == pytest.approx((0.01 + 1e-4) / 2)
+    assert scheduled_learning_rate(100, 0.01, 100, cosine) == pytest.approx(1e-4)
+    # Plateau reductions are left to ReduceLROnPlateau; rates never go below the floor
+    assert scheduled_learning_rate(50, 0.01, 100, dict(settings, lr_schedule='plateau')) == 0.01
+    assert scheduled_learning_rate(1000, 0.01, 100, dict(settings, lr_schedule='exponential')) == 1e-4
+
+def test_no_epoch_is_started_that_would_overrun_the_budget():
+    assert not exceeds_time_budget(50.0, [10.0, 12.0], 0)
+    assert not exceeds_time_budget(50.0, [10.0, 12.0], 62.0)
+    assert exceeds_time_budget(50.0, [10.0, 12.0], 61.0)
+
+def test_report_estimates_the_time_saved():
+    report = TrainingReport(epochs_planned=100)
+    report.epoch_seconds = [2.0] * 20
+    report.stopped_by = 'early_stopping'
+
+    summary = report.summary()
+    assert summary['epochs_run'] == 20 and summary['epochs_saved'] == 80
+    assert math.isclose(summary['seconds'], 40.0) and math.isclose(summary['seconds_saved'], 160.0)
+    assert TrainingReport(10).summary()['seconds_saved'] == 0.0
@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
 import pandas as pd
+from sklearn.exceptions import NotFittedError
 from src.ml.src.models.transaction_categorization import TransactionCategorizationModel, create_transaction_categorization_model
 from tensorflow.keras.models import Sequential
 
@@ -8,6 +9,7 @@ from tensorflow.keras.models import Sequential
 SAMPLE_TRANSACTIONS = pd.DataFrame({
     'amount': [100.0, 50.0, 200.0, 75.0, 300.0],
     'description': ['Grocery store', 'Gas station', 'Restaurant', 'Online shopping', 'Utility bill'],
+    'date': ['2023-01-01', '2023-01-02', '2023-01-03', '2023-01-04', '2023-01-05'],
     'category': ['Groceries', 'Transportation', 'Dining', 'Shopping', 'Bills']
 })
 
@@ -18,17 +20,21 @@ def model():
 def test_transaction_categorization_model_initialization(model):
     assert isinstance(model, TransactionCategorizationModel)
     assert model.model is None
-    assert model.tokenizer is None
+    assert model.vectorizer.num_buckets > 0
     assert model.label_encoder is None
 
 def test_preprocess_data(model):
-    X, y = model.preprocess_data(SAMPLE_TRANSACTIONS)
+    X, y = model.preprocess_data(SAMPLE_TRANSACTIONS, fit=True)
     
-    assert isinstance(X, np.ndarray)
+    assert isinstance(X, list)
+    assert all(isinstance(features, np.ndarray) and features.shape[0] == len(SAMPLE_TRANSACTIONS) for features in X)
     assert isinstance(y, np.ndarray)
-    assert X.shape[0] == len(SAMPLE_TRANSACTIONS)
     assert y.shape[0] == len(SAMPLE_TRANSACTIONS)
 
+def test_preprocess_data_requires_fit(model):
+    with pytest.raises(NotFittedError):
+        model.preprocess_data(SAMPLE_TRANSACTIONS)
+
 def test_build_model(model):
     model.build_model(input_dim=100, num_categories=5)
     
@@ -36,7 +42,7 @@ def test_build_model(model):
     assert len(model.model.layers) > 0
 
 def test_train_model(model):
-    X, y = model.preprocess_data(SAMPLE_TRANSACTIONS)
+    X, y = model.preprocess_data(SAMPLE_TRANSACTIONS, fit=True)
     history = model.train(SAMPLE_TRANSACTIONS, epochs=5, batch_size=2)
     
     assert isinstance(history, dict)
@@ -101,6 +107,16 @@ def test_non_string_descriptions():
     with pytest.raises(ValueError):
         model.train(invalid_df)
 
+def test_batched_and_single_predictions_match(model):
+    transactions = SAMPLE_TRANSACTIONS.assign(date=pd.date_range('2023-01-01', periods=len(SAMPLE_TRANSACTIONS)))
+    model.train(transactions)
+
+    # Preprocessing only applies the fitted state, so a batch does not change its members' predictions
+    batch_predictions = model.predict(transactions)
+    single_predictions = np.concatenate([model.predict(transactions.iloc[[i]]) for i in range(len(transactions))])
+
+    np.testing.assert_array_equal(batch_predictions, single_predictions)
+
 # Integration test with actual transaction data
 def test_integration_with_actual_data(model):
     # This test should be implemented when actual transaction data is available